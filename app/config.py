@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 
 load_dotenv()  # reads variables from a .env file and sets them in os.environ
 
+import json
 import secrets
 from pathlib import Path
 
@@ -25,13 +26,131 @@ if not JWT_SECRET_KEY:
 
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
+# Rotation des clés: JWT_SECRET_KEY signe sous JWT_KEY_ID (claim "kid" de
+# l'en-tête); les anciennes clés restent acceptées en vérification tant
+# qu'elles figurent dans JWT_PREVIOUS_KEYS ("kid1:secret1,kid2:secret2")
+JWT_KEY_ID = os.getenv("JWT_KEY_ID", "k1")
+JWT_PREVIOUS_KEYS = dict(
+    entry.strip().split(":", 1)
+    for entry in os.getenv("JWT_PREVIOUS_KEYS", "").split(",")
+    if ":" in entry
+)
+# Tokens déjà vérifiés gardés en mémoire (par worker)
+JWT_VERIFIED_CACHE_SIZE = int(os.getenv("JWT_VERIFIED_CACHE_SIZE", 4096))
+
 ACCESS_TOKEN_EXPIRE_MIN = int(os.getenv("ACCESS_TOKEN_EXPIRE_MIN", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
 
+# Hachage PBKDF2 dans un pool de processus dédié (hors threadpool HTTP)
+PASSWORD_HASH_POOL_ENABLED = os.getenv("PASSWORD_HASH_POOL_ENABLED", "true").lower() == "true"
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 0))    # 0 = nombre de cœurs
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 32))       # au-delà: 503 immédiat
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 5))  # s, file incluse
+
+# Brute-force: échecs de connexion comptés par login et par IP (Redis),
+# vérifiés avant la lecture de l'utilisateur et avant PBKDF2
+BF_ENABLED = os.getenv("BF_ENABLED", "true").lower() == "true"
 BF_THRESHOLD = int(os.getenv("BF_THRESHOLD", 5))
+BF_IP_THRESHOLD = int(os.getenv("BF_IP_THRESHOLD", 20))          # NAT: plusieurs comptes par IP
 BF_WINDOW_SECONDS = int(os.getenv("BF_WINDOW_SECONDS", 900))      # 15 min
 BF_BLOCK_SECONDS = int(os.getenv("BF_BLOCK_SECONDS", 900))        # 15 min
 
+# ---------------------------------------------------------------------------
+# REDIS (cache partagé par toute l'application)
+# ---------------------------------------------------------------------------
+REDIS_ENABLED = os.getenv("REDIS_ENABLED", "true").lower() == "true"
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
+REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+
+# Cache L1 en mémoire (par worker) devant Redis pour les clés chaudes
+CACHE_L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "true").lower() == "true"
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", 1024))
+
+# Variante asyncio du cache (routes/dépendances async, middlewares)
+CACHE_ASYNC_ENABLED = os.getenv("CACHE_ASYNC_ENABLED", "true").lower() == "true"
+
+# Inventaires en write-behind (hash Redis par utilisateur, flush PostgreSQL par lots)
+INVENTORY_STORE_ENABLED = os.getenv("INVENTORY_STORE_ENABLED", "true").lower() == "true"
+INVENTORY_FLUSH_INTERVAL = float(os.getenv("INVENTORY_FLUSH_INTERVAL", 2))        # s
+INVENTORY_FLUSH_BATCH = int(os.getenv("INVENTORY_FLUSH_BATCH", 200))              # users / transaction
+INVENTORY_MAX_DIRTY_SECONDS = float(os.getenv("INVENTORY_MAX_DIRTY_SECONDS", 30))  # retard max toléré
+INVENTORY_IDLE_TTL = int(os.getenv("INVENTORY_IDLE_TTL", 3600))                   # hash flushé inactif
+
+# Verrouillage optimiste de users (version_id): rejeu des écritures en conflit
+USER_UPDATE_MAX_ATTEMPTS = int(os.getenv("USER_UPDATE_MAX_ATTEMPTS", 4))         # essais avant 409
+USER_UPDATE_RETRY_BACKOFF = float(os.getenv("USER_UPDATE_RETRY_BACKOFF", 0.01))  # s, attente aléatoire max
+
+# Leaderboards (sorted sets Redis), reconstruits périodiquement depuis PostgreSQL
+LEADERBOARD_REBUILD_INTERVAL = int(os.getenv("LEADERBOARD_REBUILD_INTERVAL", 900))  # s
+LEADERBOARD_REBUILD_BATCH = int(os.getenv("LEADERBOARD_REBUILD_BATCH", 1000))       # lignes / lot
+
+# Miroir Redis des refresh tokens (rotation atomique, écriture PostgreSQL différée)
+REFRESH_TOKEN_STORE_ENABLED = os.getenv("REFRESH_TOKEN_STORE_ENABLED", "true").lower() == "true"
+REFRESH_TOKEN_TOMBSTONE_TTL = int(os.getenv("REFRESH_TOKEN_TOMBSTONE_TTL", 300))  # s, détection de rejeu
+REFRESH_TOKEN_WRITE_BATCH = int(os.getenv("REFRESH_TOKEN_WRITE_BATCH", 100))      # écritures / transaction
+
+# Planificateur de maintenance (lifespan): un worker par passage (verrou Redis)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_HISTORY_SIZE = int(os.getenv("SCHEDULER_HISTORY_SIZE", 50))    # passages gardés par tâche
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", 1000))      # lignes / transaction
+SCHEDULER_MAX_BATCHES = int(os.getenv("SCHEDULER_MAX_BATCHES", 100))     # lots max par passage
+SCHEDULER_BATCH_PAUSE = float(os.getenv("SCHEDULER_BATCH_PAUSE", 0.2))   # s, pause aléatoire max entre lots
+SCHEDULER_MATVIEWS = [
+    view.strip()
+    for view in os.getenv(
+        "SCHEDULER_MATVIEWS",
+        "mv_economy_overview,mv_top_traded_resources,mv_leaderboard,"
+        "mv_rare_resources_by_biome,mv_resource_price_history",
+    ).split(",")
+    if view.strip()
+]
+JOB_TOKEN_CLEANUP_INTERVAL = int(os.getenv("JOB_TOKEN_CLEANUP_INTERVAL", 3600))     # s
+JOB_MARKET_EXPIRY_INTERVAL = int(os.getenv("JOB_MARKET_EXPIRY_INTERVAL", 60))       # s
+JOB_MATVIEW_REFRESH_INTERVAL = int(os.getenv("JOB_MATVIEW_REFRESH_INTERVAL", 900))  # s
+
+# Lectures par id des catalogues (CRUDBase): présences et absences cachées
+CRUD_CACHE_TTL = int(os.getenv("CRUD_CACHE_TTL", 300))       # s
+CRUD_NEGATIVE_TTL = int(os.getenv("CRUD_NEGATIVE_TTL", 30))  # s, ids inexistants
+
+# Préchauffage du cache au démarrage (groupes exécutés en parallèle)
+CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP_ENABLED", "true").lower() == "true"
+CACHE_WARMUP_GROUPS = [
+    group.strip()
+    for group in os.getenv("CACHE_WARMUP_GROUPS", "environment,recipes,leaderboard").split(",")
+    if group.strip()
+]
+CACHE_WARMUP_TIMEOUT = float(os.getenv("CACHE_WARMUP_TIMEOUT", 30))  # s par groupe
+# /ready répond 503 tant que le warm-up n'est pas terminé (load balancers)
+CACHE_WARMUP_GATE_READINESS = os.getenv("CACHE_WARMUP_GATE_READINESS", "true").lower() == "true"
+
+# ---------------------------------------------------------------------------
+# RATE LIMITING (middleware ASGI, token bucket dans Redis)
+# ---------------------------------------------------------------------------
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# Politiques par préfixe de route (le plus long préfixe gagne) puis par rôle:
+#   {préfixe: {rôle: [requêtes, période_en_secondes] ou null = illimité}}
+# Rôles: anonymous, user, moderator, admin, default (repli)
+# Surchargeable via RATE_LIMIT_POLICIES (JSON, remplace entièrement la valeur)
+RATE_LIMIT_POLICIES = {
+    "/api/public/auth/login": {"default": [10, 60]},
+    "/api/public/auth/refresh": {"default": [30, 60]},
+    "/api": {
+        "anonymous": [60, 60],
+        "user": [120, 60],
+        "moderator": [300, 60],
+        "admin": None,
+    },
+}
+if os.getenv("RATE_LIMIT_POLICIES"):
+    RATE_LIMIT_POLICIES = json.loads(os.environ["RATE_LIMIT_POLICIES"])
+
+# Jeton du endpoint /metrics (scrape Prometheus); vide = endpoint désactivé
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
 # Active ou désactive complètement le fallback local vers les handlers API
 ENABLE_LOCAL_FALLBACK = True  # mettre False en prod si on veut forcer le HTTP only
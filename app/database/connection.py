@@ -4,12 +4,18 @@ Connexion PostgreSQL avec SQLAlchemy.
 """
 
 from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from contextlib import contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Callable, Generator, Optional, Union
+import asyncio
 import os
+import random
+import time
 
+from database.pool_monitor import PoolMonitor, monitored_pool_class
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,19 +27,42 @@ if not DATABASE_URL:
 
 DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
 
+# Engine asyncio (asyncpg) pour les routes async; URL dérivée de DATABASE_URL
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "true").lower() == "true"
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Pool de connexions (par engine et par worker), réglé par déploiement
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))          # Connexions gardées ouvertes
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))    # Connexions supplémentaires en pic
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))   # Attente max d'une connexion (s)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))  # Recycle les connexions après (s)
+# Requêtes en attente d'une connexion au-delà desquelles on répond 503 (0 = jamais)
+DB_ADMISSION_MAX_WAITING = int(os.getenv("DB_ADMISSION_MAX_WAITING", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+
+
+def _pool_options(poolclass, monitor: PoolMonitor) -> dict:
+    """Options communes des engines sync et async"""
+    return dict(
+        echo=DB_ECHO,  # Log SQL queries si true
+        poolclass=monitored_pool_class(poolclass, monitor),
+        pool_pre_ping=True,  # Vérifie que la connexion est vivante
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
 # ============================================================================
 # ENGINE
 # ============================================================================
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=DB_ECHO,  # Log SQL queries si true
-    pool_pre_ping=True,  # Vérifie que la connexion est vivante
-    pool_size=10,  # Nombre de connexions dans le pool
-    max_overflow=20,  # Connexions supplémentaires en cas de pic
-    pool_recycle=3600,  # Recycle les connexions après 1h
+pool_monitor = PoolMonitor(
+    "sync", max_waiting=DB_ADMISSION_MAX_WAITING, capacity=DB_POOL_SIZE + DB_MAX_OVERFLOW
 )
 
+engine = create_engine(DATABASE_URL, **_pool_options(QueuePool, pool_monitor))
+pool_monitor.attach(engine)
+
 # Event listener pour activer les foreign keys (utile si on passe de SQLite)
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_conn, connection_record):
@@ -71,7 +100,10 @@ def get_db() -> Generator[Session, None, None]:
         def list_users(db: Session = Depends(get_db)):
             users = db.query(User).all()
             return users
+    
+    Lève DatabaseBusy (503) si trop de requêtes attendent déjà une connexion.
     """
+    pool_monitor.admit()
     db = SessionLocal()
     try:
         yield db
@@ -79,6 +111,122 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# ============================================================================
+# ENGINE ASYNC (routes `async def`)
+# ============================================================================
+
+def _async_url() -> Optional[str]:
+    """URL asyncpg équivalente à DATABASE_URL (None si non PostgreSQL)"""
+    if ASYNC_DATABASE_URL:
+        return ASYNC_DATABASE_URL
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        return None
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+class ThreadedSession:
+    """
+    Session synchrone exposée avec l'API d'AsyncSession utilisée par les routes.
+
+    Repli de get_async_db quand l'engine async n'est pas démarré (asyncpg
+    absent, base non PostgreSQL, DB_ASYNC_ENABLED=false): chaque requête
+    s'exécute dans un thread, comme une route synchrone.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, obj):
+        self.sync_session.add(obj)
+
+    async def execute(self, statement, params=None):
+        return await asyncio.to_thread(self.sync_session.execute, statement, params)
+
+    async def scalar(self, statement, params=None):
+        return await asyncio.to_thread(self.sync_session.scalar, statement, params)
+
+    async def get(self, model, id):
+        return await asyncio.to_thread(self.sync_session.get, model, id)
+
+    async def refresh(self, obj):
+        await asyncio.to_thread(self.sync_session.refresh, obj)
+
+    async def delete(self, obj):
+        await asyncio.to_thread(self.sync_session.delete, obj)
+
+    async def commit(self):
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def close(self):
+        await asyncio.to_thread(self.sync_session.close)
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+async_pool_monitor = PoolMonitor(
+    "async", max_waiting=DB_ADMISSION_MAX_WAITING, capacity=DB_POOL_SIZE + DB_MAX_OVERFLOW
+)
+
+
+def init_async_db() -> Optional[AsyncEngine]:
+    """Crée l'engine asyncpg partagé (lifespan), si possible"""
+    global _async_engine, _async_session_factory
+    url = _async_url() if DB_ASYNC_ENABLED else None
+    if url is None:
+        logger.info("Engine async désactivé: routes async servies par le threadpool")
+        return None
+    try:
+        _async_engine = create_async_engine(url, **_pool_options(AsyncAdaptedQueuePool, async_pool_monitor))
+    except ImportError as e:
+        logger.warning(f"⚠️  Driver asyncpg indisponible, repli sur le threadpool: {e}")
+        return None
+    async_pool_monitor.attach(_async_engine)
+    # expire_on_commit=False: pas de lazy load implicite après commit en async
+    _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    logger.info("✅ Engine async (asyncpg) prêt")
+    return _async_engine
+
+
+def get_async_engine() -> Optional[AsyncEngine]:
+    return _async_engine
+
+
+async def close_async_db():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
+async def get_async_db() -> AsyncGenerator[Union[AsyncSession, ThreadedSession], None]:
+    """
+    FastAPI dependency pour les routes `async def`.
+    
+    Sans engine async, retourne une ThreadedSession (même API).
+    Lève DatabaseBusy (503) si le pool concerné est saturé.
+    
+    Usage:
+        @router.get("/resources/{id}")
+        async def get_resource(id: str, db: AsyncSession = Depends(get_async_db)):
+            return await db.get(Resource, id)
+    """
+    if _async_session_factory is None:
+        pool_monitor.admit()
+        db = ThreadedSession(SessionLocal())
+    else:
+        async_pool_monitor.admit()
+        db = _async_session_factory()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 # ============================================================================
 # CONTEXT MANAGER (pour scripts)
 # ============================================================================
@@ -103,6 +251,60 @@ def get_db_context():
         db.close()
 
 
+# ============================================================================
+# TRAITEMENTS PAR LOTS (maintenance)
+# ============================================================================
+
+def run_in_batches(
+    db: Session,
+    statement,
+    batch_size: int = 1000,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """
+    Exécute un DELETE/UPDATE borné (paramètre :limit) jusqu'à épuisement.
+
+    Une transaction par lot: les verrous sont relâchés entre deux lots et
+    les autres requêtes s'intercalent. Entre deux lots, pause aléatoire
+    (0..pause s) pour ne pas enchaîner les écritures à pleine vitesse.
+
+    Usage:
+        run_in_batches(db, text(
+            "DELETE FROM t WHERE id IN (SELECT id FROM t WHERE ... LIMIT :limit)"
+        ), batch_size=500)
+
+    Args:
+        db: Session SQLAlchemy
+        statement: Requête avec un paramètre :limit
+        batch_size: Lignes max par lot
+        max_batches: Lots max par appel (None = jusqu'au bout)
+        pause: Pause max entre deux lots (s)
+        should_stop: Interrompt entre deux lots s'il retourne True
+
+    Returns:
+        Nombre total de lignes traitées
+    """
+    total = 0
+    batches = 0
+    while True:
+        try:
+            affected = db.execute(statement, {"limit": batch_size}).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        total += affected
+        batches += 1
+        if affected < batch_size or (max_batches and batches >= max_batches):
+            return total
+        if should_stop and should_stop():
+            return total
+        if pause:
+            time.sleep(random.uniform(0, pause))
+
+
 # ============================================================================
 # INIT DB (création des tables)
 # ============================================================================
@@ -122,7 +324,9 @@ def init_db():
         Resource, 
         Recipe, 
         Quest, 
-        Setting
+        Setting,
+        UserStatistics,
+        InventoryItem
     )
     
     # Crée les tables
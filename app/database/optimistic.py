@@ -0,0 +1,132 @@
+# app/database/optimistic.py
+"""
+Contrôle de concurrence optimiste sur la ligne users.
+
+User porte un version_id_col: chaque UPDATE de l'ORM vérifie la version lue
+(WHERE version_id = :lue) et l'incrémente. Si une autre requête a écrit
+l'utilisateur entre-temps, le commit lève StaleDataError au lieu d'écraser
+silencieusement sa modification (xp, level, stats).
+
+retry_on_conflict() annule alors la transaction et rejoue l'opération sur
+l'état relu (les objets sont expirés par le rollback), sans verrou de
+ligne: les requêtes d'un même joueur ne sont pas sérialisées, seules les
+rares collisions coûtent un nouvel essai.
+
+Les métriques (tentatives, conflits, abandons par opération) sont propres
+au processus (un registre par worker).
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+import config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class UpdateConflict(Exception):
+    """Conflit persistant après tous les essais: réessayer plus tard (HTTP 409)"""
+
+    def __init__(self, operation: str, attempts: int):
+        super().__init__(f"{operation}: conflit de mise à jour après {attempts} essai(s)")
+        self.operation = operation
+        self.attempts = attempts
+
+
+class ConflictMetrics:
+    """Compteurs de conflits par opération, thread-safe"""
+
+    COUNTERS = ("attempts", "conflicts", "exhausted")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations: Dict[str, Dict[str, int]] = {}
+
+    def count(self, operation: str, counter: str):
+        with self._lock:
+            counters = self.operations.setdefault(operation, dict.fromkeys(self.COUNTERS, 0))
+            counters[counter] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs et taux de conflit (conflits / tentatives) par opération"""
+        with self._lock:
+            return {
+                operation: {
+                    **counters,
+                    "conflict_rate": round(counters["conflicts"] / counters["attempts"], 4)
+                    if counters["attempts"] else 0.0,
+                }
+                for operation, counters in self.operations.items()
+            }
+
+    def render_prometheus(self) -> str:
+        """Export au format texte Prometheus"""
+        stats = self.get_stats()
+        lines = []
+        for counter, help_text in (
+            ("attempts", "Tentatives d'écriture optimiste sur users"),
+            ("conflicts", "Tentatives annulées par un conflit de version"),
+            ("exhausted", "Opérations abandonnées après tous les essais (409)"),
+        ):
+            metric = f"bcraftd_user_update_{counter}_total"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for operation, counters in sorted(stats.items()):
+                lines.append(f'{metric}{{operation="{operation}"}} {counters[counter]}')
+        return "\n".join(lines) + "\n"
+
+
+conflict_metrics = ConflictMetrics()
+
+
+def retry_on_conflict(
+    db: Session,
+    operation: str,
+    fn: Callable[[], T],
+    max_attempts: Optional[int] = None,
+    backoff: Optional[float] = None
+) -> T:
+    """
+    Exécute une opération qui committe, en la rejouant sur conflit de version.
+
+    `fn` doit relire ce dont elle dépend (les objets de la session sont
+    expirés par le rollback) et être rejouable: ses effets hors PostgreSQL
+    doivent être annulés en cas d'échec du commit (cf. InventoryUnitOfWork).
+
+    Args:
+        db: Session SQLAlchemy
+        operation: Nom de l'opération (label des métriques)
+        fn: Opération (vérifications, modifications, commit)
+        max_attempts: Essais max (défaut: USER_UPDATE_MAX_ATTEMPTS)
+        backoff: Attente aléatoire max avant le 2e essai, doublée ensuite (s)
+
+    Returns:
+        Résultat de fn
+
+    Raises:
+        UpdateConflict: Conflit à chaque essai
+    """
+    max_attempts = max_attempts or config.USER_UPDATE_MAX_ATTEMPTS
+    backoff = config.USER_UPDATE_RETRY_BACKOFF if backoff is None else backoff
+
+    for attempt in range(1, max_attempts + 1):
+        conflict_metrics.count(operation, "attempts")
+        try:
+            return fn()
+        except StaleDataError as e:
+            db.rollback()
+            conflict_metrics.count(operation, "conflicts")
+            if attempt == max_attempts:
+                conflict_metrics.count(operation, "exhausted")
+                logger.warning(f"⚠️  {operation}: conflit persistant après {attempt} essai(s)")
+                raise UpdateConflict(operation, attempt) from e
+            logger.debug(f"🔁 {operation}: conflit de version, essai {attempt + 1}/{max_attempts}")
+            if backoff:
+                time.sleep(random.uniform(0, backoff * 2 ** (attempt - 1)))
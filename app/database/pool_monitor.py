@@ -0,0 +1,202 @@
+# app/database/pool_monitor.py
+"""
+Télémétrie des pools de connexions PostgreSQL et admission des requêtes.
+
+Chaque engine (sync, async) a son PoolMonitor:
+- événements du pool (checkout, checkin, connect, invalidate): connexions
+  prêtées, ouvertes, invalidées
+- attente au checkout mesurée par la classe de pool (monitored_pool_class):
+  latence, requêtes en attente d'une connexion, timeouts
+
+Admission: quand toutes les connexions sont prêtées et que trop de requêtes
+en attendent déjà une (max_waiting), admit() lève DatabaseBusy
+immédiatement (HTTP 503) au lieu de bloquer un thread de plus jusqu'au
+timeout du pool.
+
+Les métriques sont propres au processus (un registre par worker).
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+from services.cache_metrics import Histogram
+
+# Attente d'une connexion: de ~0 (connexion libre) au timeout du pool
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class DatabaseBusy(Exception):
+    """Trop de requêtes en attente d'une connexion: réessayer plus tard (HTTP 503)"""
+
+
+class PoolMonitor:
+    """
+    Compteurs et jauges d'un pool de connexions, thread-safe.
+
+    Usage:
+        monitor = PoolMonitor("sync", max_waiting=30, capacity=30)
+        engine = create_engine(url, poolclass=monitored_pool_class(QueuePool, monitor))
+        monitor.attach(engine)
+
+        monitor.admit()  # lève DatabaseBusy si le pool est saturé
+    """
+
+    def __init__(self, name: str, max_waiting: int = 0, capacity: int = 0):
+        """
+        Args:
+            name: Nom de l'engine (label des métriques)
+            max_waiting: Requêtes en attente au-delà desquelles admit() refuse (0 = jamais)
+            capacity: Connexions max du pool (pool_size + max_overflow)
+        """
+        self.name = name
+        self.max_waiting = max_waiting
+        self.capacity = capacity
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.waiting = 0
+        self.counters = {
+            "checkouts": 0, "connects": 0, "invalidated": 0, "timeouts": 0, "rejected": 0,
+        }
+        self.wait_latency = Histogram(WAIT_BUCKETS)
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    # ------------------------------------------------------------------
+    # ÉVÉNEMENTS DU POOL
+    # ------------------------------------------------------------------
+
+    def attach(self, engine):
+        """Branche les événements du pool de l'engine (sync_engine pour un AsyncEngine)"""
+        engine = getattr(engine, "sync_engine", engine)
+        self.pool = engine.pool
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.in_use += 1
+            self.counters["checkouts"] += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use -= 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self._count("connects")
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self._count("invalidated")
+
+    # ------------------------------------------------------------------
+    # ATTENTE AU CHECKOUT (appelé par la classe de pool)
+    # ------------------------------------------------------------------
+
+    def wait_started(self):
+        with self._lock:
+            self.waiting += 1
+
+    def wait_ended(self, duration: float, timed_out: bool):
+        with self._lock:
+            self.waiting -= 1
+            self.wait_latency.observe(duration)
+            if timed_out:
+                self.counters["timeouts"] += 1
+
+    # ------------------------------------------------------------------
+    # ADMISSION
+    # ------------------------------------------------------------------
+
+    def admit(self):
+        """
+        Refuse la requête si le pool est épuisé et que trop d'autres attendent.
+
+        Une rafale de checkouts quand des connexions restent disponibles
+        (ouverture, pre-ping) n'est pas une saturation.
+        """
+        if not self.max_waiting or self.in_use < self.capacity:
+            return
+        if self.waiting >= self.max_waiting:
+            self._count("rejected")
+            raise DatabaseBusy(f"{self.waiting} requests waiting for a {self.name} connection")
+
+    # ------------------------------------------------------------------
+    # EXPORT
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Jauges, compteurs et latence d'attente (pour /metrics et l'admin)"""
+        pool = self.pool
+        with self._lock:
+            return {
+                "pool_size": pool.size() if pool is not None else None,
+                "in_use": self.in_use,
+                "idle": pool.checkedin() if pool is not None else None,
+                "overflow": max(0, pool.overflow()) if pool is not None else None,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                **self.counters,
+                "wait_latency": self.wait_latency.to_dict(),
+            }
+
+    def render_prometheus(self) -> str:
+        """Export au format texte Prometheus"""
+        stats = self.get_stats()
+        label = f'engine="{self.name}"'
+        lines = []
+        for gauge, help_text in (
+            ("in_use", "Connexions prêtées"),
+            ("idle", "Connexions libres dans le pool"),
+            ("overflow", "Connexions ouvertes au-delà de pool_size"),
+            ("waiting", "Requêtes en attente d'une connexion"),
+        ):
+            if stats[gauge] is None:
+                continue
+            metric = f"bcraftd_db_pool_{gauge}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", f"{metric}{{{label}}} {stats[gauge]}"]
+        for counter in ("checkouts", "connects", "invalidated", "timeouts", "rejected"):
+            metric = f"bcraftd_db_pool_{counter}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric}{{{label}}} {stats[counter]}"]
+        metric = "bcraftd_db_pool_wait_seconds"
+        lines += [f"# HELP {metric} Attente d'une connexion au checkout", f"# TYPE {metric} histogram"]
+        with self._lock:
+            for bound, count in self.wait_latency.cumulative():
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum{{{label}}} {self.wait_latency.total}")
+            lines.append(f"{metric}_count{{{label}}} {self.wait_latency.count}")
+        return "\n".join(lines) + "\n"
+
+
+def monitored_pool_class(base: Type[Pool], monitor: PoolMonitor) -> Type[Pool]:
+    """
+    Classe de pool qui mesure l'attente au checkout pour `monitor`.
+
+    Les événements du pool ne signalent que les checkouts aboutis: l'attente
+    et les timeouts sont mesurés autour de connect(). La classe survit à
+    engine.dispose() (le pool recréé est de la même classe).
+    """
+
+    class MonitoredPool(base):
+        def connect(self):
+            monitor.wait_started()
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                timed_out = True
+                raise
+            finally:
+                monitor.wait_ended(time.perf_counter() - start, timed_out)
+
+    MonitoredPool.__name__ = f"Monitored{base.__name__}"
+    return MonitoredPool
@@ -4,18 +4,35 @@ Point d'entrée FastAPI principal avec PostgreSQL.
 """
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm.exc import StaleDataError
 from contextlib import asynccontextmanager
+import asyncio
+import hmac
 
 from utils.logger import get_logger
-from utils.auth import cleanup_expired_tokens
 from utils.settings import init_default_settings
 from utils.feature_flags import init_feature_flags
-from database.connection import SessionLocal, init_db, check_db_connection
+from database.connection import (
+    SessionLocal, init_db, check_db_connection, init_async_db, close_async_db,
+    pool_monitor, async_pool_monitor, get_async_engine,
+)
+from database.optimistic import UpdateConflict, conflict_metrics
+from database.pool_monitor import DatabaseBusy
+from services.cache_service import init_cache_service, close_cache_service, get_cache
+from services.async_cache_service import init_async_cache_service, close_async_cache_service
+from services.inventory_store import init_inventory_store, close_inventory_store
+from services.leaderboard_service import init_leaderboard_service, close_leaderboard_service
+from services.refresh_token_store import init_refresh_token_store, close_refresh_token_store
+from services.scheduler import init_scheduler, close_scheduler
+from services.password_hasher import init_password_hasher, close_password_hasher, get_password_hasher
+from services.cache_warmup import run_warmup
+from utils.rate_limit import RateLimitMiddleware
 
 # API Routers
 from routes.api import router as api_router
@@ -32,12 +49,28 @@ logger = get_logger(__name__)
 # LIFESPAN (remplace les events startup/shutdown)
 # ============================================================================
 
+async def _warm_up_cache(app: FastAPI):
+    """Préchauffe le cache puis marque le worker prêt (voir /ready)"""
+    try:
+        app.state.warmup_report = await run_warmup(
+            app.state.cache,
+            SessionLocal,
+            config.CACHE_WARMUP_GROUPS,
+            timeout=config.CACHE_WARMUP_TIMEOUT
+        )
+    except Exception as e:
+        logger.error(f"❌ Warm-up du cache interrompu: {e}", exc_info=True)
+    finally:
+        app.state.ready = True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Gère le cycle de vie de l'application.
-    - startup: Initialise la DB + nettoie les tokens expirés
-    - shutdown: Nettoyage si nécessaire
+    - startup: Initialise la DB + le cache Redis partagé + lance le warm-up
+      du cache + nettoie les tokens expirés
+    - shutdown: Flushe les inventaires puis ferme le cache Redis
     """
     # STARTUP
     logger.info("🚀 Démarrage de B-CraftD...")
@@ -49,13 +82,36 @@ async def lifespan(app: FastAPI):
     
     # Initialise les tables
     init_db()
+    # Engine asyncpg des routes async (repli threadpool si indisponible)
+    init_async_db()
+    
+    # Instance CacheService unique (pool de connexions partagé)
+    app.state.cache = init_cache_service()
+    # Variante asyncio pour le code async (même L1, mêmes métriques)
+    app.state.async_cache = await init_async_cache_service(shared=app.state.cache)
+    # Inventaires en Redis, flushés par lots vers PostgreSQL
+    app.state.inventory_store = init_inventory_store(app.state.cache, SessionLocal)
+    # Leaderboards (sorted sets), reconstruits périodiquement depuis PostgreSQL
+    app.state.leaderboards = init_leaderboard_service(app.state.cache, SessionLocal)
+    # Refresh tokens actifs en Redis (rotation atomique), PostgreSQL en différé
+    app.state.refresh_tokens = init_refresh_token_store(app.state.cache, SessionLocal)
+    # Tâches de maintenance (tokens expirés, offres échues, vues matérialisées)
+    app.state.scheduler = init_scheduler(app.state.cache, SessionLocal)
+    # PBKDF2 dans un pool de processus dédié (logins isolés du threadpool)
+    app.state.password_hasher = init_password_hasher()
     
+    # Warm-up en arrière-plan; /ready échoue jusqu'à la fin si demandé
+    app.state.warmup_report = {}
+    app.state.ready = not config.CACHE_WARMUP_GATE_READINESS
+    warmup_task = None
+    if config.CACHE_WARMUP_ENABLED and app.state.cache is not None:
+        warmup_task = asyncio.create_task(_warm_up_cache(app))
+    else:
+        app.state.ready = True
     
     try:
         db = SessionLocal()
-        # deleted = cleanup_expired_tokens(db) # Nettoie les tokens expirés au démarrage
-        # if deleted > 0:
-        #     logger.info(f"🧹 {deleted} refresh token(s) expiré(s) nettoyé(s)")
+        # Tokens expirés: tâche token_cleanup du planificateur (services/scheduler.py)
         
         # init_feature_flags(db)  # Crée les feature flags par défaut
         # init_default_settings(db)  # Crée les settings par défaut
@@ -70,6 +126,17 @@ async def lifespan(app: FastAPI):
     
     # SHUTDOWN
     logger.info("👋 Arrêt de l'application...")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    close_scheduler()
+    # Flush final des inventaires avant de fermer Redis
+    close_inventory_store()
+    close_leaderboard_service()
+    close_refresh_token_store()
+    close_password_hasher()
+    await close_async_cache_service()
+    close_cache_service()
+    await close_async_db()
 
 
 # ============================================================================
@@ -126,6 +193,36 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     )
 
 
+@app.exception_handler(DatabaseBusy)
+@app.exception_handler(PoolTimeoutError)
+async def database_busy_handler(request: Request, exc: Exception):
+    """Pool PostgreSQL saturé: 503 immédiat plutôt qu'une file sans fin."""
+    logger.warning(f"⚠️  Pool DB saturé sur {request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Database busy, retry later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(UpdateConflict)
+@app.exception_handler(StaleDataError)
+async def update_conflict_handler(request: Request, exc: Exception):
+    """
+    Utilisateur modifié en parallèle: le client peut rejouer.
+
+    UpdateConflict: conflit à chaque essai de retry_on_conflict.
+    StaleDataError: commit d'un User périmé hors retry_on_conflict (admin,
+    profil, blocage de connexion), la requête n'est pas rejouée côté serveur.
+    """
+    logger.warning(f"⚠️  Conflit de mise à jour sur {request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=409,
+        content={"error": "Concurrent update, retry"},
+        headers={"Retry-After": "0"},
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Gère les erreurs de validation Pydantic."""
@@ -175,6 +272,11 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# Rate limiting: ajouté en dernier = middleware le plus externe,
+# les requêtes rejetées n'atteignent ni les routes ni PostgreSQL
+app.add_middleware(RateLimitMiddleware)
+
+
 # --------------------------------------
 # Routers
 # --------------------------------------
@@ -224,5 +326,44 @@ def health_check():
     }
 
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness pour load balancer: 503 tant que le warm-up du cache n'est pas
+    terminé (si CACHE_WARMUP_GATE_READINESS).
+    """
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {
+        "status": "ready",
+        "warmup": getattr(app.state, "warmup_report", {}),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """
+    Métriques cache, pools DB, conflits de version et pool de hachage au format Prometheus (ce worker).
+
+    Protégé par METRICS_TOKEN (header Authorization: Bearer <token>),
+    désactivé si la variable n'est pas définie.
+    """
+    if not config.METRICS_TOKEN:
+        return JSONResponse(status_code=404, content={"error": "Not Found"})
+    expected = f"Bearer {config.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+        return JSONResponse(status_code=403, content={"error": "Forbidden"})
+
+    cache = get_cache()
+    body = cache.metrics.render_prometheus() if cache is not None else ""
+    body += pool_monitor.render_prometheus()
+    body += conflict_metrics.render_prometheus()
+    if get_async_engine() is not None:
+        body += async_pool_monitor.render_prometheus()
+    hasher = get_password_hasher()
+    if hasher is not None:
+        body += hasher.render_prometheus()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 logger.info("✅ Application FastAPI prête!")
 logger.info(f"📚 Documentation API disponible sur /docs et /redoc")
\ No newline at end of file
@@ -11,6 +11,8 @@ from .recipe import Recipe
 from .refresh_token import RefreshToken
 from .quest import Quest
 from .setting import Setting
+from .user_statistics import UserStatistics
+from .inventory_item import InventoryItem
 
 # Pour la compatibilité avec l'ancien code
 __all__ = [
@@ -21,4 +23,6 @@ __all__ = [
     "RefreshToken",
     "Quest",
     "Setting",
+    "UserStatistics",
+    "InventoryItem",
 ]
\ No newline at end of file
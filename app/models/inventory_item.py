@@ -0,0 +1,42 @@
+# app/models/inventory_item.py
+"""
+Modèle SQLAlchemy pour l'inventaire normalisé (une ligne par item possédé).
+
+Remplace la colonne JSON User.inventory: les variations sont des UPDATE
+conditionnels / INSERT ... ON CONFLICT sur une seule ligne
+(services.inventory_rows), sans réécrire tout l'inventaire.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, UniqueConstraint, CheckConstraint, text
+from sqlalchemy.sql import func
+from database.connection import Base
+
+
+class InventoryItem(Base):
+    __tablename__ = "inventory"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Pas de clé étrangère: l'inventaire accepte des items hors table resources
+    resource_id = Column(String(50), nullable=False)
+    quantity = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'resource_id', name='uq_inventory_user_resource'),
+        CheckConstraint('quantity >= 0', name='chk_inventory_quantity'),
+        # Les lignes à 0 sont conservées (réutilisées par l'upsert suivant)
+        Index(
+            'idx_inventory_nonzero', 'user_id', 'resource_id',
+            postgresql_where=text('quantity > 0')
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "resource_id": self.resource_id,
+            "quantity": self.quantity,
+        }
@@ -4,6 +4,7 @@ Modèle SQLAlchemy pour les utilisateurs.
 """
 
 from sqlalchemy import Column, String, Integer, Boolean, JSON, DateTime, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.connection import Base
 
@@ -40,11 +41,25 @@ class User(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Verrouillage optimiste: incrémenté à chaque UPDATE de l'ORM, un UPDATE
+    # basé sur une version périmée lève StaleDataError (database.optimistic)
+    version_id = Column(Integer, default=1, server_default="1", nullable=False)
+    
+    # Statistiques (leaderboards)
+    statistics = relationship(
+        "UserStatistics",
+        back_populates="user",
+        uselist=False,
+        passive_deletes=True
+    )
+    
     # Index composites
     __table_args__ = (
         Index('ix_users_profession_level', 'profession', 'level'),
     )
     
+    __mapper_args__ = {"version_id_col": version_id}
+    
     def to_dict(self):
         """Conversion en dict pour compatibilité."""
         return {
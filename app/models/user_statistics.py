@@ -3,13 +3,13 @@ Module: models.user_statistics
 Version: 3.0
 """
 
-from sqlalchemy import Column, Integer, BigInteger, ForeignKey, TIMESTAMP, CheckConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, TIMESTAMP, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from pydantic import ConfigDict
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-from database import Base
+from database.connection import Base
 
 
 class UserStatistics(Base):
@@ -21,7 +21,7 @@ class UserStatistics(Base):
     
     Attributes:
         id (int): Identifiant unique
-        user_id (int): Référence à l'utilisateur
+        user_id (str): Référence à l'utilisateur
         total_crafts (int): Nombre total d'objets craftés
         total_sales (int): Nombre total de ventes sur le marché
         total_purchases (int): Nombre total d'achats sur le marché
@@ -57,7 +57,7 @@ class UserStatistics(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     user_id = Column(
-        Integer,
+        String(36),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
         unique=True,
@@ -444,11 +444,31 @@ class UserStatistics(Base):
             .limit(limit)\
             .all()
     
+    @classmethod
+    def rank_score_expression(cls):
+        """
+        Expression SQL équivalente à get_rank_score (tri côté PostgreSQL)
+        
+        Returns:
+            ColumnElement: Score calculé par la base
+        """
+        return (
+            cls.total_crafts * 1.0 +
+            cls.total_sales * 2.0 +
+            cls.total_gold_earned * 0.001 +
+            cls.professions_mastered * 100.0 +
+            cls.achievements_unlocked * 50.0 +
+            cls.rare_items_crafted * 5.0
+        )
+    
     @staticmethod
     def get_leaderboard(session, limit: int = 100):
         """
         Récupère le classement global (par rank_score)
         
+        Tri et limite faits par PostgreSQL. Pour les requêtes fréquentes
+        (top-K, rang d'un joueur), utiliser services.leaderboard_service.
+        
         Args:
             session: Session SQLAlchemy
             limit (int): Nombre de résultats
@@ -456,13 +476,13 @@ class UserStatistics(Base):
         Returns:
             list[tuple]: Liste de (UserStatistics, rank_score)
         """
-        stats = session.query(UserStatistics).all()
-        
-        # Calculer les scores et trier
-        leaderboard = [(stat, stat.get_rank_score()) for stat in stats]
-        leaderboard.sort(key=lambda x: x[1], reverse=True)
+        score = UserStatistics.rank_score_expression().label("rank_score")
+        rows = session.query(UserStatistics, score)\
+            .order_by(score.desc())\
+            .limit(limit)\
+            .all()
         
-        return leaderboard[:limit]
+        return [(stat, round(rank_score, 2)) for stat, rank_score in rows]
     
     # ==================== SÉRIALISATION ====================
     
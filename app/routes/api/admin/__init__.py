@@ -1,6 +1,9 @@
 # app/routes/api/admin/__init__.py
 
 from fastapi import APIRouter
+from .cache import router as cache_router
+from .database import router as database_router
+from .jobs import router as jobs_router
 from .professions import router as professions_router
 from .recipes import router as recipes_router
 from .resources import router as resources_router
@@ -9,6 +12,9 @@ from .users import router as users_router
 
 router = APIRouter(prefix="/admin")
 
+router.include_router(cache_router)
+router.include_router(database_router)
+router.include_router(jobs_router)
 router.include_router(professions_router)
 router.include_router(recipes_router)
 router.include_router(resources_router)
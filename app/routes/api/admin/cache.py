@@ -0,0 +1,93 @@
+# app/routes/api/admin/cache.py
+"""
+Routes Admin pour le cache Redis (statistiques et métriques)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from utils.roles import require_admin
+from utils.logger import get_logger
+from utils.auth import get_token_verifier
+from services.cache_service import CacheService, get_cache
+from services.inventory_store import get_inventory_store
+from services.refresh_token_store import get_refresh_token_store
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/cache",
+    tags=["Admin - Cache"],
+    dependencies=[Depends(require_admin())]
+)
+
+
+def _require_cache(cache: Optional[CacheService] = Depends(get_cache)) -> CacheService:
+    """Cache partagé, 503 si Redis est désactivé ou injoignable."""
+    if cache is None:
+        raise HTTPException(503, "Cache unavailable")
+    return cache
+
+
+@router.get("/stats")
+def read_cache_stats(cache: CacheService = Depends(_require_cache)):
+    """
+    Statistiques du cache.
+
+    Returns:
+        - server: statistiques Redis (INFO, toutes clés confondues)
+        - prefixes: métriques côté client par préfixe (ce worker)
+        - inventory_store: backlog et flushs du store d'inventaires (None si inactif)
+        - refresh_tokens: rotations Redis et écritures PostgreSQL en attente (None si inactif)
+        - jwt_verifier: LRU des access tokens déjà vérifiés (ce worker)
+    """
+    logger.info("📊 Admin: Lecture des statistiques cache")
+    store = get_inventory_store()
+    refresh_store = get_refresh_token_store()
+    return {
+        "server": cache.get_stats(),
+        "prefixes": cache.get_client_metrics(),
+        "inventory_store": store.get_stats() if store else None,
+        "refresh_tokens": refresh_store.get_stats() if refresh_store else None,
+        "jwt_verifier": get_token_verifier().get_stats(),
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_cache_metrics(cache: CacheService = Depends(_require_cache)):
+    """Métriques cache au format texte Prometheus."""
+    return PlainTextResponse(
+        cache.metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.post("/metrics/reset")
+def reset_cache_metrics(cache: CacheService = Depends(_require_cache)):
+    """Remet à zéro les métriques côté client (ce worker)."""
+    logger.info("🧹 Admin: Remise à zéro des métriques cache")
+    cache.metrics.reset()
+    return {"status": "reset"}
+
+
+
+@router.get("/login-failures")
+def read_login_failures(limit: int = 100, cache: CacheService = Depends(_require_cache)):
+    """
+    Échecs de connexion en cours de fenêtre et blocages actifs (brute-force).
+
+    Returns:
+        - entries: {kind: login|ip, subject, failures, blocked_for (s)}, bloqués d'abord
+    """
+    logger.info("🚫 Admin: Lecture des échecs de connexion")
+    return {"entries": cache.get_login_failures(limit=max(1, limit))}
+
+
+@router.delete("/login-failures/{kind}/{subject}")
+def clear_login_block(kind: str, subject: str, cache: CacheService = Depends(_require_cache)):
+    """Lève le blocage d'un login ou d'une IP (tous les workers)."""
+    if kind not in ("login", "ip"):
+        raise HTTPException(400, "kind must be 'login' or 'ip'")
+    logger.info(f"🔓 Admin: Déblocage {kind}={subject}")
+    return {"deleted": cache.unblock_login(kind, subject)}
@@ -0,0 +1,48 @@
+# app/routes/api/admin/database.py
+"""
+Routes Admin pour PostgreSQL: pools de connexions et conflits de version (télémétrie)
+"""
+
+from fastapi import APIRouter, Depends
+
+from utils.roles import require_admin
+from utils.logger import get_logger
+from database.connection import async_pool_monitor, get_async_engine, pool_monitor
+from database.optimistic import conflict_metrics
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/database",
+    tags=["Admin - Database"],
+    dependencies=[Depends(require_admin())]
+)
+
+
+@router.get("/pool")
+def read_pool_stats():
+    """
+    État des pools de connexions (ce worker).
+
+    Returns:
+        - sync / async: connexions prêtées, libres, en overflow, requêtes en
+          attente, checkouts, timeouts, refus d'admission et latence
+          d'attente (async: None si l'engine asyncpg n'est pas démarré)
+    """
+    logger.info("📊 Admin: Lecture des pools de connexions")
+    return {
+        "sync": pool_monitor.get_stats(),
+        "async": async_pool_monitor.get_stats() if get_async_engine() is not None else None,
+    }
+
+
+@router.get("/conflicts")
+def read_conflict_stats():
+    """
+    Conflits du verrouillage optimiste de users (ce worker).
+
+    Returns:
+        - {opération: tentatives, conflits, abandons (409), taux de conflit}
+    """
+    logger.info("📊 Admin: Lecture des conflits de version")
+    return conflict_metrics.get_stats()
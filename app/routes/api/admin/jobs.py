@@ -0,0 +1,53 @@
+# app/routes/api/admin/jobs.py
+"""
+Routes Admin pour le planificateur de maintenance (état, historique, exécution)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from utils.roles import require_admin
+from utils.logger import get_logger
+from services.scheduler import JobScheduler, get_scheduler
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Admin - Jobs"],
+    dependencies=[Depends(require_admin())]
+)
+
+
+def _require_scheduler(scheduler: Optional[JobScheduler] = Depends(get_scheduler)) -> JobScheduler:
+    """Planificateur partagé, 503 s'il est désactivé."""
+    if scheduler is None:
+        raise HTTPException(503, "Scheduler disabled")
+    return scheduler
+
+
+def _require_job(name: str, scheduler: JobScheduler) -> str:
+    if name not in scheduler.jobs:
+        raise HTTPException(404, f"Unknown job '{name}'")
+    return name
+
+
+@router.get("")
+def read_jobs(scheduler: JobScheduler = Depends(_require_scheduler)):
+    """Tâches planifiées, prochaine tentative (ce worker) et dernier passage (tous workers)."""
+    return scheduler.get_stats()
+
+
+@router.get("/{name}/history")
+def read_job_history(name: str, limit: int = 20, scheduler: JobScheduler = Depends(_require_scheduler)):
+    """Derniers passages d'une tâche (plus récent d'abord)."""
+    _require_job(name, scheduler)
+    return {"job": name, "runs": scheduler.get_history(name, limit=max(1, limit))}
+
+
+@router.post("/{name}/run")
+def run_job_now(name: str, scheduler: JobScheduler = Depends(_require_scheduler)):
+    """Exécute une tâche immédiatement sur ce worker (le passage suivant est décalé d'un intervalle)."""
+    _require_job(name, scheduler)
+    logger.info(f"⏱️  Admin: Exécution manuelle de la tâche {name}")
+    return scheduler.run_job(name, force=True)
@@ -121,14 +121,16 @@ def add_resource_to_profession(
     """Ajoute une ressource trouvable à une profession."""
     logger.info(f"➕ Ajout ressource '{resource_id}' à profession '{profession_id}'")
     
-    # Récupère la profession
+    # Récupère la profession (instance de session, pas le cache)
     profession = profession_crud.get_or_404(db, profession_id, "Profession")
     
     # Ajoute la ressource si pas déjà présente
     if resource_id not in profession.resources_found:
-        profession.resources_found.append(resource_id)
+        # Nouvelle liste: une mutation en place de la colonne JSON n'est pas écrite
+        profession.resources_found = [*profession.resources_found, resource_id]
         db.commit()
         db.refresh(profession)
+        profession_crud.invalidate_cached(profession_id)
         
         logger.info(f"✅ Ressource '{resource_id}' ajoutée")
     else:
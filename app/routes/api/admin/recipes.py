@@ -5,7 +5,7 @@ Routes Admin pour la gestion des recettes - VERSION POSTGRESQL
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from utils.roles import require_admin
 from utils.logger import get_logger
@@ -13,6 +13,7 @@ from utils.db_crud import recipe_crud, resource_crud, profession_crud
 from database.connection import get_db
 from models import Recipe
 from schemas.recipe import RecipeCreate, RecipeUpdate, RecipeResponse
+from services.cache_service import CacheService, get_cache
 
 logger = get_logger(__name__)
 
@@ -70,7 +71,8 @@ def get_recipe(
 @router.post("/", response_model=RecipeResponse, status_code=201)
 def create_recipe(
     recipe: RecipeCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    cache: Optional[CacheService] = Depends(get_cache)
 ):
     """
     Crée une nouvelle recette.
@@ -111,6 +113,8 @@ def create_recipe(
     
     # Crée la recette
     new_recipe = recipe_crud.create(db, obj_in=recipe.model_dump())
+    if cache:
+        cache.invalidate_recipe_catalog()
     
     logger.info(f"✅ Recette '{recipe.id}' créée avec succès")
     return new_recipe
@@ -120,7 +124,8 @@ def create_recipe(
 def update_recipe(
     recipe_id: str,
     recipe: RecipeUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    cache: Optional[CacheService] = Depends(get_cache)
 ):
     """Met à jour une recette existante."""
     logger.info(f"✏️  Admin: Mise à jour recette '{recipe_id}'")
@@ -154,6 +159,8 @@ def update_recipe(
                 raise HTTPException(400, f"Ingredient '{ingredient_id}' not found")
     
     updated = recipe_crud.update_by_id(db, id=recipe_id, obj_in=update_data)
+    if cache:
+        cache.invalidate_recipe_catalog()
     
     logger.info(f"✅ Recette '{recipe_id}' mise à jour")
     return updated
@@ -162,7 +169,8 @@ def update_recipe(
 @router.delete("/{recipe_id}")
 def delete_recipe(
     recipe_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    cache: Optional[CacheService] = Depends(get_cache)
 ):
     """
     Supprime une recette.
@@ -172,6 +180,8 @@ def delete_recipe(
     logger.info(f"🗑️  Admin: Suppression recette '{recipe_id}'")
     
     recipe_crud.delete(db, id=recipe_id)
+    if cache:
+        cache.invalidate_recipe_catalog()
     
     logger.info(f"✅ Recette '{recipe_id}' supprimée")
     return {"status": "deleted", "id": recipe_id}
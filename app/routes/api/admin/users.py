@@ -4,18 +4,21 @@ Routes Admin pour la gestion des utilisateurs - VERSION POSTGRESQL
 """
 
 from fastapi import APIRouter, HTTPException, Body, Depends
+from redis import RedisError
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
 
 from utils.roles import require_admin
-from utils.auth import hash_password
 from utils.logger import get_logger
 from utils.db_crud import user_crud
 from database.connection import get_db
+from database.optimistic import UpdateConflict
 from models import User
 from schemas.user import UserResponse, UserCreate
-from services.xp_service import add_xp
+from services.xp_service import apply_xp
+from services.password_hasher import PasswordHasherBusy, hash_password
+from services.refresh_token_store import get_refresh_token_store
 
 logger = get_logger(__name__)
 
@@ -71,6 +74,11 @@ def create_user(
     uid = str(uuid.uuid4())
     logger.debug(f"   → Génération ID: {uid}")
     
+    try:
+        password_hash = hash_password(payload.password)
+    except PasswordHasherBusy:
+        raise HTTPException(503, "Password hashing temporarily unavailable", headers={"Retry-After": "1"})
+    
     try:
         user = User(
             id=uid,
@@ -78,7 +86,7 @@ def create_user(
             lastname=payload.lastname,
             mail=payload.mail,
             login=payload.login,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             profession=payload.profession or "",
             subclasses=[],
             inventory={},
@@ -175,7 +183,14 @@ def delete_user(
     logger.info(f"🗑️  Admin: Suppression utilisateur {uid}")
     
     try:
-        # Supprime les refresh tokens associés
+        # Révoque les refresh tokens dans le miroir Redis (consulté avant
+        # PostgreSQL par /auth/refresh), puis les supprime avec l'utilisateur
+        store = get_refresh_token_store()
+        if store is not None:
+            try:
+                store.revoke_user(uid)
+            except RedisError as e:
+                logger.warning(f"⚠️  Miroir Redis indisponible, tokens de {uid} supprimés en base seulement: {e}")
         from models import RefreshToken
         db.query(RefreshToken).filter(RefreshToken.user_id == uid).delete()
         
@@ -216,14 +231,10 @@ def grant_xp(
     try:
         user = user_crud.get_or_404(db, uid, "User")
         
-        old_level = user.level
-        add_xp(user, amount)
-        
-        db.commit()
-        db.refresh(user)
+        levels_gained = apply_xp(db, user, amount)
         
-        if user.level > old_level:
-            logger.info(f"   🎉 Level up! {old_level} → {user.level}")
+        if levels_gained:
+            logger.info(f"   🎉 Level up! {user.level - levels_gained} → {user.level}")
         else:
             logger.info(f"   ✅ {amount} XP ajoutée (Level: {user.level})")
         
@@ -231,10 +242,10 @@ def grant_xp(
             "status": "ok",
             "xp": user.xp,
             "level": user.level,
-            "level_up": user.level > old_level
+            "level_up": levels_gained > 0
         }
         
-    except HTTPException:
+    except (HTTPException, UpdateConflict):
         raise
     except Exception as e:
         db.rollback()
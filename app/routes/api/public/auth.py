@@ -3,11 +3,15 @@
 Routes d'authentification - VERSION POSTGRESQL
 """
 
+import math
+
 from fastapi import APIRouter, Body, Request, Response, HTTPException, Depends
+from redis import RedisError
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from uuid import uuid4
 
+import config
 from config import REFRESH_TOKEN_EXPIRE_DAYS
 from utils.logger import get_logger
 from utils.auth import (
@@ -15,15 +19,19 @@ from utils.auth import (
     create_refresh_token,
     decode_refresh_token,
     rotate_refresh_token,
-    verify_password,
     store_refresh_token,
     revoke_refresh_token,
-    revoke_all_tokens_for_user,
-    get_active_devices,
+    token_role,
+    _token_hash,
 )
 from utils.deps import get_current_user_required
 from database.connection import get_db
 from models import User
+from services.cache_service import get_cache
+from services.password_hasher import PasswordHasherBusy, verify_password
+from services.refresh_token_store import (
+    ROTATED, REUSED, REVOKED, get_refresh_token_store, get_user_devices, revoke_user_tokens
+)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -47,11 +55,66 @@ def _find_user_by_login(db: Session, login: str) -> Optional[User]:
     return user
 
 
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _check_login_block(login: str, ip: str) -> None:
+    """Refuse (429) un login ou une IP bloqués, avant SQL et PBKDF2."""
+    cache = get_cache()
+    if not config.BF_ENABLED or cache is None:
+        return
+    blocked_for = cache.check_login_block(login, ip)
+    if blocked_for > 0:
+        retry = max(1, math.ceil(blocked_for))
+        logger.warning(f"🚫 Connexion bloquée pour {login} depuis {ip} ({retry}s restantes)")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(retry)},
+        )
+
+
+def _record_login_failure(login: str, ip: str) -> None:
+    """Compte un échec (login inconnu ou mot de passe faux)."""
+    cache = get_cache()
+    if not config.BF_ENABLED or cache is None:
+        return
+    _, _, blocked_for = cache.record_login_failure(
+        login, ip,
+        threshold=config.BF_THRESHOLD,
+        ip_threshold=config.BF_IP_THRESHOLD,
+        window_seconds=config.BF_WINDOW_SECONDS,
+        block_seconds=config.BF_BLOCK_SECONDS,
+    )
+    if blocked_for:
+        logger.warning(f"🚫 Seuil d'échecs atteint pour {login} / {ip}: blocage {int(blocked_for)}s")
+
+
+def _revoke_device_family(db: Session, uid: str, device_id: str) -> None:
+    """Révoque tous les refresh tokens d'un appareil (rejeu détecté)."""
+    revoke_user_tokens(db, uid, device_id)
+
+
+def _mirror_refresh_token(token: str, uid: str, device_id: str, device_name: str) -> None:
+    """Ajoute un refresh token déjà écrit dans PostgreSQL au miroir Redis."""
+    store = get_refresh_token_store()
+    if store is None:
+        return
+    payload = decode_refresh_token(token) or {}
+    try:
+        store.add(_token_hash(token), uid, device_id, device_name, payload["exp"])
+    except (RedisError, KeyError) as e:
+        # Sans miroir, le token reste validé par PostgreSQL (repli de /refresh)
+        logger.warning(f"⚠️  Refresh token non ajouté au miroir Redis: {e}")
+
+
 # ---------------------------------------------------------------------------
 # LOGIN
 # ---------------------------------------------------------------------------
 @router.post("/login")
 def login(
+    request: Request,
     payload: Dict[str, Any] = Body(...), 
     response: Response = None,
     db: Session = Depends(get_db)
@@ -73,6 +136,8 @@ def login(
     
     **Cookie:**
     - refresh_token: Token HTTP-only pour renouveler l'access_token
+    
+    **429:** trop d'échecs récents pour ce login ou cette IP (Retry-After)
     """
     login_val = payload.get("login") or payload.get("username")
     password = payload.get("password")
@@ -86,28 +151,51 @@ def login(
         logger.warning("⚠️  Connexion refusée: login ou mot de passe manquant")
         raise HTTPException(status_code=400, detail="Missing login or password")
 
+    # Brute-force: refus immédiat avant toute lecture SQL et tout PBKDF2
+    bf_login = login_val.strip().lower()
+    client_ip = _client_ip(request)
+    _check_login_block(bf_login, client_ip)
+
     # Recherche utilisateur
     user = _find_user_by_login(db, login_val)
     if not user:
         logger.warning(f"⚠️  Échec de connexion pour {login_val}: utilisateur introuvable")
+        _record_login_failure(bf_login, client_ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Vérification password
     logger.debug(f"   → Vérification du mot de passe pour {login_val}")
-    if not verify_password(password, user.password_hash):
+    try:
+        password_ok = verify_password(password, user.password_hash)
+    except PasswordHasherBusy:
+        logger.warning(f"⚠️  Connexion de {login_val} refusée: pool de hachage saturé")
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication temporarily unavailable",
+            headers={"Retry-After": "1"},
+        )
+    if not password_ok:
         logger.warning(f"⚠️  Échec de connexion pour {login_val}: mot de passe incorrect")
+        _record_login_failure(bf_login, client_ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    cache = get_cache()
+    if config.BF_ENABLED and cache is not None:
+        cache.clear_login_failures(bf_login)
+
     # Création des tokens
     uid = user.id
     logger.debug(f"   → Génération des tokens pour user_id={uid}")
     
-    access = create_access_token({"sub": uid})
-    refresh = create_refresh_token({"sub": uid})
+    claims = {"sub": uid, "role": token_role(user)}
+    access = create_access_token(claims)
+    # "did": famille de l'appareil, révoquée si un token rotaté est rejoué
+    refresh = create_refresh_token({**claims, "did": device_id})
 
     # Stockage du refresh token dans PostgreSQL
     logger.debug(f"   → Stockage du refresh token pour device_id={device_id}")
     store_refresh_token(db, refresh, uid, device_id, device_name)
+    _mirror_refresh_token(refresh, uid, device_id, device_name)
 
     # Préparation de la réponse utilisateur (sans password_hash)
     safe_user = user.to_dict()
@@ -147,6 +235,9 @@ def refresh(
     
     **Rotation:** L'ancien refresh_token est révoqué et un nouveau est généré.
     
+    **Rejeu:** un refresh_token déjà rotaté ou révoqué est refusé et tous les
+    tokens de son appareil sont révoqués (l'appareil doit se reconnecter).
+    
     **Payload:**
     - refresh_token: Token de rafraîchissement
     
@@ -174,33 +265,49 @@ def refresh(
         logger.error("❌ Refresh token malformé: sub manquant")
         raise HTTPException(status_code=400, detail="Malformed token")
 
-    # Vérification que le token existe dans la DB
-    from utils.auth import is_refresh_token_known
-    if not is_refresh_token_known(db, old_refresh):
-        logger.warning(f"⚠️  Token inconnu ou expiré pour user_id={uid}")
-        raise HTTPException(status_code=401, detail="Token not found or expired")
-
     logger.debug(f"   → Génération de nouveaux tokens pour user_id={uid}")
     
-    # Création de nouveaux tokens
-    new_access = create_access_token({"sub": uid})
-    new_refresh = create_refresh_token({"sub": uid})
-
-    # Récupération du device_id depuis la DB
-    from models import RefreshToken
-    from utils.auth import _token_hash
-    
-    old_hash = _token_hash(old_refresh)
-    token_entry = db.query(RefreshToken).filter(RefreshToken.token_hash == old_hash).first()
-    
-    device_id = token_entry.device_id if token_entry else str(uuid4())
-    device_name = token_entry.device_name if token_entry else ""
-    
-    logger.debug(f"   → Device trouvé: {device_id}")
-
-    # ROTATION: révoque l'ancien et stocke le nouveau
-    logger.debug(f"   → Rotation du token pour device={device_id}")
-    rotate_refresh_token(db, old_refresh, new_refresh, uid, device_id, device_name)
+    # Création de nouveaux tokens (même famille d'appareil)
+    family = old_payload.get("did")
+    claims = {"sub": uid, "role": old_payload.get("role", "user")}
+    new_access = create_access_token(claims)
+    new_refresh = create_refresh_token({**claims, "did": family} if family else claims)
+
+    # ROTATION dans le miroir Redis: validation + rotation en une opération,
+    # PostgreSQL mis à jour en arrière-plan
+    rotated = False
+    store = get_refresh_token_store()
+    if store is not None:
+        try:
+            new_exp = decode_refresh_token(new_refresh)["exp"]
+            status, device_id, device_name = store.rotate(
+                _token_hash(old_refresh), _token_hash(new_refresh), uid, new_exp
+            )
+        except RedisError as e:
+            logger.warning(f"⚠️  Miroir Redis indisponible, rotation via PostgreSQL: {e}")
+            status = None
+        if status == REUSED:
+            logger.warning(f"🚨 Refresh token rejoué pour user_id={uid}, device={device_id}: famille révoquée")
+            _revoke_device_family(db, uid, device_id)
+            raise HTTPException(status_code=401, detail="Token not found or expired")
+        if status == REVOKED:
+            logger.warning(f"⚠️  Refresh token révoqué pour user_id={uid}, device={device_id}")
+            raise HTTPException(status_code=401, detail="Token not found or expired")
+        rotated = status == ROTATED
+
+    if not rotated:
+        # Repli PostgreSQL (token absent du miroir, ou Redis indisponible):
+        # DELETE ... RETURNING + INSERT dans une transaction
+        device = rotate_refresh_token(db, old_refresh, new_refresh, uid, family)
+        if device is None:
+            logger.warning(f"⚠️  Token inconnu, expiré ou rejoué pour user_id={uid}")
+            if family and store is not None:
+                _revoke_device_family(db, uid, family)
+            raise HTTPException(status_code=401, detail="Token not found or expired")
+
+        device_id, device_name = device
+        logger.debug(f"   → Token rotaté pour device={device_id}")
+        _mirror_refresh_token(new_refresh, uid, device_id, device_name)
 
     # Cookie mis à jour
     response.set_cookie(
@@ -246,7 +353,14 @@ def logout(
     if refresh_token:
         try:
             logger.debug("   → Révocation du refresh token")
-            revoke_refresh_token(db, refresh_token)
+            store = get_refresh_token_store()
+            try:
+                if store is None:
+                    revoke_refresh_token(db, refresh_token)
+                else:
+                    store.revoke(_token_hash(refresh_token))
+            except RedisError:
+                revoke_refresh_token(db, refresh_token)
             logger.info("✅ Déconnexion réussie")
         except Exception as e:
             logger.warning(f"⚠️  Erreur lors de la révocation du token: {str(e)}")
@@ -278,7 +392,7 @@ def logout_all(
     logger.info(f"🔒 Révocation de toutes les sessions pour user_id={uid}")
     
     try:
-        count = revoke_all_tokens_for_user(db, uid)
+        count = revoke_user_tokens(db, uid)
         logger.info(f"✅ {count} session(s) révoquée(s) pour user_id={uid}")
     except Exception as e:
         logger.error(f"❌ Erreur lors de la révocation des sessions: {str(e)}", exc_info=True)
@@ -309,7 +423,8 @@ def list_user_devices(
     logger.debug(f"📱 Liste des devices pour user_id={uid}")
     
     try:
-        devices = get_active_devices(db, uid)
+        # Miroir si chargé, sinon PostgreSQL
+        devices = get_user_devices(db, uid)
         logger.debug(f"   → {len(devices)} device(s) actif(s) trouvé(s)")
         return {"devices": devices}
     except Exception as e:
@@ -340,22 +455,12 @@ def revoke_device(
     logger.info(f"🔒 Révocation du device {device_id} pour user_id={uid}")
 
     try:
-        from models import RefreshToken
-        
-        deleted = (
-            db.query(RefreshToken)
-            .filter(RefreshToken.user_id == uid)
-            .filter(RefreshToken.device_id == device_id)
-            .delete()
-        )
-        
-        db.commit()
+        deleted = revoke_user_tokens(db, uid, device_id)
         
         logger.info(f"✅ Device {device_id} révoqué avec succès ({deleted} token(s) supprimé(s))")
 
         return {"revoked": deleted, "device_id": device_id}
         
     except Exception as e:
-        db.rollback()
         logger.error(f"❌ Erreur lors de la révocation du device: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to revoke device")
\ No newline at end of file
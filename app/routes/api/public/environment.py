@@ -0,0 +1,27 @@
+# app/routes/api/public/environment.py
+"""
+Routes publiques pour l'environnement de jeu (saison, météo).
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from utils.logger import get_logger
+from services.cache_service import CacheService, get_cache
+from services.environment_service import get_environment
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/environment", tags=["Public - Environment"])
+
+
+@router.get("/")
+def read_environment(cache: Optional[CacheService] = Depends(get_cache)):
+    """
+    Saison et météo courantes (avec leurs modificateurs).
+    
+    Accessible sans authentification.
+    """
+    logger.info("🌦️  Public: Environnement courant")
+    return get_environment(cache)
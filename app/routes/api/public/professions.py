@@ -4,12 +4,12 @@ Routes publiques pour les professions (lecture seule).
 """
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from utils.logger import get_logger
-from utils.db_crud import profession_crud
-from database.connection import get_db
+from utils.db_crud import async_profession_crud
+from database.connection import get_async_db
 from schemas.profession import ProfessionResponse
 
 logger = get_logger(__name__)
@@ -18,10 +18,10 @@ router = APIRouter(prefix="/professions", tags=["Public - Professions"])
 
 
 @router.get("/", response_model=List[ProfessionResponse])
-def list_professions(
+async def list_professions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Liste toutes les professions disponibles.
@@ -30,16 +30,16 @@ def list_professions(
     """
     logger.info(f"📋 Public: Liste des professions (skip={skip}, limit={limit})")
     
-    professions = profession_crud.get_multi(db, skip=skip, limit=limit)
+    professions = await async_profession_crud.get_multi(db, skip=skip, limit=limit)
     
     logger.debug(f"   → {len(professions)} profession(s) trouvée(s)")
     return professions
 
 
 @router.get("/{profession_id}", response_model=ProfessionResponse)
-def get_profession(
+async def get_profession(
     profession_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupère les détails d'une profession.
@@ -48,7 +48,7 @@ def get_profession(
     """
     logger.info(f"🔍 Public: Récupération profession '{profession_id}'")
     
-    profession = profession_crud.get_or_404(db, profession_id, "Profession")
+    profession = await async_profession_crud.get_or_404(db, profession_id, "Profession", cached=True)
     
     logger.debug(f"   → Profession '{profession_id}' récupérée")
     return profession
\ No newline at end of file
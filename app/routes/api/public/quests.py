@@ -4,13 +4,13 @@ Routes publiques pour les quêtes - VERSION POSTGRESQL
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from utils.logger import get_logger
 from utils.feature_flags import require_feature
-from utils.db_crud import quest_crud
-from database.connection import get_db
+from utils.db_crud import async_quest_crud
+from database.connection import get_async_db
 
 logger = get_logger(__name__)
 
@@ -22,16 +22,16 @@ router = APIRouter(
 
 
 @router.get("/")
-def list_quests(
+async def list_quests(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Liste toutes les quêtes disponibles."""
     logger.info(f"📜 Public: Liste des quêtes")
     
     try:
-        quests = quest_crud.get_multi(db, skip=skip, limit=limit)
+        quests = await async_quest_crud.get_multi(db, skip=skip, limit=limit)
         result = [q.to_dict() for q in quests]
         
         logger.debug(f"   → {len(result)} quête(s)")
@@ -43,12 +43,12 @@ def list_quests(
 
 
 @router.get("/{quest_id}")
-def get_quest(
+async def get_quest(
     quest_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Récupère une quête spécifique."""
     logger.info(f"🔍 Public: Récupération quête '{quest_id}'")
     
-    quest = quest_crud.get_or_404(db, quest_id, "Quest")
+    quest = await async_quest_crud.get_or_404(db, quest_id, "Quest", cached=True)
     return quest.to_dict()
\ No newline at end of file
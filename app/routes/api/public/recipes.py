@@ -4,13 +4,16 @@ Routes publiques pour les recettes (lecture seule).
 """
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from utils.logger import get_logger
-from utils.db_crud import recipe_crud
-from database.connection import get_db
+from utils.db_crud import async_recipe_crud
+from database.connection import get_db, get_async_db
 from schemas.recipe import RecipeResponse
+from services.cache_service import CacheService, get_cache
+from services.crafting_service import get_recipe_catalog
 
 logger = get_logger(__name__)
 
@@ -22,29 +25,27 @@ def list_recipes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     profession: str = Query(None, description="Filtrer par profession"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    cache: Optional[CacheService] = Depends(get_cache)
 ):
     """
     Liste toutes les recettes disponibles.
     
-    Accessible sans authentification.
+    Accessible sans authentification. Le catalogue complet est caché
+    (préchargé au démarrage), la pagination est faite sur la copie cachée.
     """
     logger.info(f"📋 Public: Liste des recettes (skip={skip}, limit={limit}, profession={profession})")
     
-    filters = {}
-    if profession:
-        filters["required_profession"] = profession
-    
-    recipes = recipe_crud.get_multi(db, skip=skip, limit=limit, filters=filters)
+    recipes = get_recipe_catalog(db, cache, profession)[skip:skip + limit]
     
     logger.debug(f"   → {len(recipes)} recette(s) trouvée(s)")
     return recipes
 
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
-def get_recipe(
+async def get_recipe(
     recipe_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupère les détails d'une recette.
@@ -53,7 +54,7 @@ def get_recipe(
     """
     logger.info(f"🔍 Public: Récupération recette '{recipe_id}'")
     
-    recipe = recipe_crud.get_or_404(db, recipe_id, "Recipe")
+    recipe = await async_recipe_crud.get_or_404(db, recipe_id, "Recipe", cached=True)
     
     logger.debug(f"   → Recette '{recipe_id}' récupérée")
     return recipe
\ No newline at end of file
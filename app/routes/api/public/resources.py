@@ -4,12 +4,12 @@ Routes publiques pour les ressources (lecture seule).
 """
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from utils.logger import get_logger
-from utils.db_crud import resource_crud
-from database.connection import get_db
+from utils.db_crud import async_resource_crud
+from database.connection import get_async_db
 from schemas.resource import ResourceResponse
 
 logger = get_logger(__name__)
@@ -18,11 +18,11 @@ router = APIRouter(prefix="/resources", tags=["Public - Resources"])
 
 
 @router.get("/", response_model=List[ResourceResponse])
-def list_resources(
+async def list_resources(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     type: str = Query(None, description="Filtrer par type"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Liste toutes les ressources disponibles.
@@ -35,16 +35,16 @@ def list_resources(
     if type:
         filters["type"] = type
     
-    resources = resource_crud.get_multi(db, skip=skip, limit=limit, filters=filters)
+    resources = await async_resource_crud.get_multi(db, skip=skip, limit=limit, filters=filters)
     
     logger.debug(f"   → {len(resources)} ressource(s) trouvée(s)")
     return resources
 
 
 @router.get("/{resource_id}", response_model=ResourceResponse)
-def get_resource(
+async def get_resource(
     resource_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupère les détails d'une ressource.
@@ -53,7 +53,7 @@ def get_resource(
     """
     logger.info(f"🔍 Public: Récupération ressource '{resource_id}'")
     
-    resource = resource_crud.get_or_404(db, resource_id, "Resource")
+    resource = await async_resource_crud.get_or_404(db, resource_id, "Resource", cached=True)
     
     logger.debug(f"   → Ressource '{resource_id}' récupérée")
     return resource
\ No newline at end of file
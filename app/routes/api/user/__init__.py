@@ -4,6 +4,7 @@ from fastapi import APIRouter
 from .crafting import router as crafting_router
 from .dashboard import router as dashboard_router
 from .inventory import router as inventory_router
+from .leaderboard import router as leaderboard_router
 from .me import router as me_router
 from .professions import router as professions_router
 from .quests import router as quests_router
@@ -16,6 +17,7 @@ router = APIRouter(prefix="/user")
 router.include_router(crafting_router)
 router.include_router(dashboard_router)
 router.include_router(inventory_router)
+router.include_router(leaderboard_router)
 router.include_router(me_router)
 router.include_router(professions_router)
 router.include_router(quests_router)
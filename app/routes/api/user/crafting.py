@@ -11,6 +11,7 @@ from utils.roles import require_user
 from utils.logger import get_logger
 from utils.db_crud import user_crud
 from database.connection import get_db
+from database.optimistic import UpdateConflict
 from services.crafting_service import possible_recipes_for_user, apply_craft
 
 logger = get_logger(__name__)
@@ -122,6 +123,10 @@ def craft_recipe(
         logger.warning(f"⚠️  Craft impossible: {str(e)}")
         raise HTTPException(400, str(e))
         
+    except UpdateConflict:
+        # 409 (handler de main.py)
+        raise
+        
     except Exception as e:
         logger.error(f"❌ Erreur durant le craft: {e}", exc_info=True)
         raise HTTPException(500, f"Failed to craft: {str(e)}")
\ No newline at end of file
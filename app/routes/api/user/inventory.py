@@ -10,7 +10,7 @@ from utils.roles import require_user
 from utils.logger import get_logger
 from utils.db_crud import user_crud
 from database.connection import get_db
-from services.inventory_service import add_item, remove_item, clear_inventory
+from services.inventory_service import add_item, remove_item, clear_inventory, get_inventory
 
 logger = get_logger(__name__)
 
@@ -22,7 +22,7 @@ router = APIRouter(
 
 
 @router.get("/")
-def get_inventory(
+def get_inventory_route(
     current=Depends(require_user),
     db: Session = Depends(get_db)
 ):
@@ -38,7 +38,7 @@ def get_inventory(
     # Récupère l'utilisateur depuis la DB pour avoir les données à jour
     user = user_crud.get_or_404(db, user_id, "User")
     
-    inventory = user.inventory or {}
+    inventory = get_inventory(user)
     logger.debug(f"   → {len(inventory)} type(s) d'item(s)")
     
     return inventory
@@ -0,0 +1,104 @@
+# app/routes/api/user/leaderboard.py
+"""
+Routes user pour les leaderboards (sorted sets Redis)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from utils.roles import require_user
+from utils.logger import get_logger
+from database.connection import get_db
+from models import User, UserStatistics
+from services.leaderboard_service import BOARDS, LeaderboardService, get_leaderboards, scores_for
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/leaderboard",
+    tags=["Users - Leaderboard"],
+    dependencies=[Depends(require_user)]
+)
+
+
+def _check_board(board: str):
+    if board not in BOARDS:
+        raise HTTPException(404, f"Classement inconnu: {board} (disponibles: {', '.join(BOARDS)})")
+
+
+def _with_logins(db: Session, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ajoute le login des joueurs affichés (une requête pour la page)"""
+    ids = [entry["user_id"] for entry in entries]
+    if not ids:
+        return entries
+    logins = dict(db.query(User.id, User.login).filter(User.id.in_(ids)).all())
+    for entry in entries:
+        entry["login"] = logins.get(entry["user_id"])
+    return entries
+
+
+@router.get("/{board}")
+def read_leaderboard(
+    board: str,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    boards: Optional[LeaderboardService] = Depends(get_leaderboards),
+    db: Session = Depends(get_db)
+):
+    """
+    Top-K d'un classement (crafters, traders, richest, global).
+
+    Sans Redis, repli sur un tri PostgreSQL (sans pagination).
+    """
+    _check_board(board)
+    logger.info(f"🏆 Leaderboard '{board}' (limit={limit}, offset={offset})")
+
+    if boards is not None:
+        entries = boards.top(board, limit=limit, offset=offset)
+    else:
+        logger.warning("⚠️  Leaderboards Redis indisponibles, tri PostgreSQL")
+        if board == "global":
+            rows = [stats for stats, _ in UserStatistics.get_leaderboard(db, limit)]
+        else:
+            rows = {
+                "crafters": UserStatistics.get_top_crafters,
+                "traders": UserStatistics.get_top_traders,
+                "richest": UserStatistics.get_richest_players,
+            }[board](db, limit)
+        entries = [
+            {"rank": i + 1, "user_id": stats.user_id, "score": scores_for(stats)[board]}
+            for i, stats in enumerate(rows)
+        ]
+
+    return {"board": board, "entries": _with_logins(db, entries)}
+
+
+@router.get("/{board}/me")
+def read_my_rank(
+    board: str,
+    radius: int = Query(5, ge=0, le=25, description="Joueurs affichés de chaque côté"),
+    current=Depends(require_user),
+    boards: Optional[LeaderboardService] = Depends(get_leaderboards),
+    db: Session = Depends(get_db)
+):
+    """
+    Rang de l'utilisateur et joueurs classés autour de lui.
+
+    Returns:
+        - rank: {rank, score, total} ou None si pas encore classé
+        - around: joueurs de rank-radius à rank+radius
+    """
+    _check_board(board)
+    if boards is None:
+        raise HTTPException(503, "Leaderboards unavailable")
+
+    user_id = current.get("id")
+    logger.info(f"🏆 Rang de user={user_id} sur '{board}'")
+
+    return {
+        "board": board,
+        "rank": boards.rank(board, user_id),
+        "around": _with_logins(db, boards.around(board, user_id, radius=radius)),
+    }
@@ -9,9 +9,9 @@ from sqlalchemy.orm import Session
 from utils.logger import get_logger
 from utils.deps import get_current_user_required
 from database.connection import get_db
-from models import User, RefreshToken
+from models import User
 from schemas.user import UserResponse
-from sqlalchemy import text
+from services.refresh_token_store import get_user_devices, revoke_user_tokens
 
 logger = get_logger(__name__)
 
@@ -53,23 +53,8 @@ def list_devices(
     logger.debug(f"📱 Liste des devices pour user_id={uid}")
     
     try:
-        devices = (
-            db.query(RefreshToken)
-            .filter(RefreshToken.user_id == uid)
-            .filter(RefreshToken.expires_at > text("NOW()"))  # ✅ Utilise text() pour SQL brut
-            .all()
-        )
-        
-        result = [
-            {
-                "token_hash": d.token_hash,
-                "device_id": d.device_id,
-                "device_name": d.device_name,
-                "created_at": d.created_at.isoformat(),
-                "expires_at": d.expires_at.isoformat(),
-            }
-            for d in devices
-        ]
+        # Miroir Redis si chargé (PostgreSQL suit la file du writer)
+        result = get_user_devices(db, uid)
         
         logger.debug(f"   → {len(result)} device(s) actif(s) trouvé(s)")
         return {"devices": result}
@@ -95,20 +80,13 @@ def revoke_device(
     logger.info(f"🔒 Révocation du device {device_id} pour user_id={uid}")
 
     try:
-        deleted = (
-            db.query(RefreshToken)
-            .filter(RefreshToken.user_id == uid)
-            .filter(RefreshToken.device_id == device_id)
-            .delete()
-        )
-        
-        db.commit()
+        # Miroir Redis d'abord: /auth/refresh le consulte avant PostgreSQL
+        deleted = revoke_user_tokens(db, uid, device_id)
         
         logger.info(f"✅ Device {device_id} révoqué avec succès ({deleted} token(s) supprimé(s))")
 
         return {"revoked": deleted}
         
     except Exception as e:
-        db.rollback()
         logger.error(f"❌ Erreur lors de la révocation du device: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to revoke device")
\ No newline at end of file
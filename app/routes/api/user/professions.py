@@ -47,6 +47,6 @@ def get_profession(
     user_id = current.get("id")
     logger.info(f"🔍 User {user_id}: Récupération profession '{profession_id}'")
     
-    profession = profession_crud.get_or_404(db, profession_id, "Profession")
+    profession = profession_crud.get_or_404(db, profession_id, "Profession", cached=True)
     
     return profession
\ No newline at end of file
@@ -52,6 +52,6 @@ def get_recipe(
     user_id = current.get("id")
     logger.info(f"🔍 User {user_id}: Récupération recette '{recipe_id}'")
     
-    recipe = recipe_crud.get_or_404(db, recipe_id, "Recipe")
+    recipe = recipe_crud.get_or_404(db, recipe_id, "Recipe", cached=True)
     
     return recipe
\ No newline at end of file
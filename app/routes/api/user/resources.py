@@ -48,6 +48,6 @@ def get_resource(
     user_id = current.get("id")
     logger.info(f"🔍 User {user_id}: Récupération ressource '{resource_id}'")
     
-    resource = resource_crud.get_or_404(db, resource_id, "Resource")
+    resource = resource_crud.get_or_404(db, resource_id, "Resource", cached=True)
     
     return resource
\ No newline at end of file
@@ -11,7 +11,8 @@ from utils.feature_flags import require_feature
 from utils.logger import get_logger
 from utils.db_crud import user_crud
 from database.connection import get_db
-from services.xp_service import add_xp, xp_for_level
+from database.optimistic import UpdateConflict
+from services.xp_service import apply_xp, xp_for_level
 
 logger = get_logger(__name__)
 
@@ -107,25 +108,15 @@ def add_xp_route(
         # Récupère l'utilisateur
         user = user_crud.get_or_404(db, user_id, "User")
         
-        # Sauvegarde état avant
-        old_level = user.level
-        old_xp = user.xp
-        
-        # Ajoute l'XP (gère automatiquement les level ups)
-        add_xp(user, amount)
-        
-        # Commit en base
-        db.commit()
-        db.refresh(user)
-        
-        # Calcul progression
-        levels_gained = user.level - old_level
+        # Ajoute l'XP (gère automatiquement les level ups), commit rejoué
+        # si une autre requête a modifié l'utilisateur entre-temps
+        levels_gained = apply_xp(db, user, amount)
         level_up = levels_gained > 0
         
         if level_up:
-            logger.info(f"   🎉 Level up! {old_level} → {user.level} (+{levels_gained})")
+            logger.info(f"   🎉 Level up! {user.level - levels_gained} → {user.level} (+{levels_gained})")
         else:
-            logger.info(f"   ✅ {amount} XP ajoutée (Level {user.level}, XP: {old_xp} → {user.xp})")
+            logger.info(f"   ✅ {amount} XP ajoutée (Level {user.level}, XP: {user.xp})")
         
         return {
             "xp": user.xp,
@@ -136,6 +127,9 @@ def add_xp_route(
             "xp_gained": amount,
         }
         
+    except UpdateConflict:
+        # 409 (handler de main.py)
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"❌ Erreur ajout XP: {e}", exc_info=True)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# app/scripts/benchmark_async_db.py
+"""
+Benchmark des accès PostgreSQL: routes synchrones (threadpool) vs asyncpg.
+
+Simule `concurrency` requêtes simultanées exécutant chacune une requête SQL:
+- sync: Session SQLAlchemy dans un thread, limité comme le threadpool de
+  Starlette (40 threads par défaut)
+- async: AsyncSession (asyncpg) dans la boucle, limitée par le pool
+
+La latence est mesurée depuis l'arrivée de la requête (attente d'un thread
+ou d'une connexion incluse). --sleep-ms ajoute un pg_sleep pour simuler une
+requête plus lente que le simple aller-retour réseau.
+
+Usage:
+    python -m scripts.benchmark_async_db
+    python -m scripts.benchmark_async_db --concurrency 500 --requests 5000 --sleep-ms 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ajoute app/ au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import anyio
+from sqlalchemy import text
+
+from database import connection
+
+
+def build_query(sleep_ms: float):
+    if sleep_ms:
+        return text("SELECT pg_sleep(:seconds)"), {"seconds": sleep_ms / 1000}
+    return text("SELECT 1"), {}
+
+
+async def run_load(handler, concurrency: int, requests: int):
+    """Lance `requests` appels, au plus `concurrency` en vol; retourne (latences, durée)"""
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            await handler()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def sync_handler(statement, params, threads: int):
+    limiter = anyio.CapacityLimiter(threads)
+
+    def query():
+        db = connection.SessionLocal()
+        try:
+            db.execute(statement, params)
+        finally:
+            db.close()
+
+    async def handler():
+        await anyio.to_thread.run_sync(query, limiter=limiter)
+
+    return handler
+
+
+def async_handler(statement, params):
+    factory = connection._async_session_factory
+
+    async def handler():
+        async with factory() as db:
+            await db.execute(statement, params)
+
+    return handler
+
+
+def report(name: str, latencies, duration: float):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<6} {len(latencies) / duration:>9.0f} req/s"
+        f"  p50 {quantiles[49] * 1000:>8.1f} ms"
+        f"  p95 {quantiles[94] * 1000:>8.1f} ms"
+        f"  p99 {quantiles[98] * 1000:>8.1f} ms"
+        f"  max {latencies[-1] * 1000:>8.1f} ms"
+    )
+
+
+async def main(args):
+    statement, params = build_query(args.sleep_ms)
+
+    if connection.init_async_db() is None:
+        print("❌ Engine async indisponible (asyncpg installé ? DATABASE_URL PostgreSQL ?)")
+        return 1
+
+    print(
+        f"{args.requests} requêtes, {args.concurrency} simultanées, "
+        f"{args.threads} threads (sync), pg_sleep {args.sleep_ms} ms\n"
+    )
+    try:
+        # Tour de chauffe: ouvre les connexions des deux pools
+        await run_load(sync_handler(statement, params, args.threads), args.threads, args.threads)
+        await run_load(async_handler(statement, params), args.concurrency, args.concurrency)
+
+        report("sync", *await run_load(
+            sync_handler(statement, params, args.threads), args.concurrency, args.requests
+        ))
+        report("async", *await run_load(
+            async_handler(statement, params), args.concurrency, args.requests
+        ))
+    finally:
+        await connection.close_async_db()
+        connection.engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sync (threadpool) vs asyncpg")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requêtes simultanées")
+    parser.add_argument("--requests", type=int, default=2000, help="Nombre total de requêtes")
+    parser.add_argument("--threads", type=int, default=40, help="Threads du chemin sync (Starlette: 40)")
+    parser.add_argument("--sleep-ms", type=float, default=5.0, help="pg_sleep par requête (0 = SELECT 1)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
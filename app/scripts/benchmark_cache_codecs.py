@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# app/scripts/benchmark_cache_codecs.py
+"""
+Benchmark des codecs du cache Redis sur des listings marché.
+
+Compare pour chaque codec:
+- le temps d'encodage / décodage
+- la taille du payload
+- la mémoire Redis occupée (MEMORY USAGE), si Redis est joignable
+
+Usage:
+    python -m scripts.benchmark_cache_codecs
+    python -m scripts.benchmark_cache_codecs --listings 10000 --rounds 20
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Ajoute app/ au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from redis import Redis, RedisError
+from services.cache_codecs import CODECS_BY_NAME, decode_entry, encode_entry
+
+
+def build_listings(count: int):
+    """Génère des listings comparables à ceux de set_market_listings"""
+    now = datetime.now()
+    return [
+        {
+            "id": i,
+            "seller_id": random.randint(1, 5000),
+            "resource_id": random.randint(1, 300),
+            "quantity": random.randint(1, 999),
+            "unit_price": Decimal(f"{random.uniform(1, 5000):.2f}"),
+            "status": "active",
+            "created_at": now - timedelta(minutes=random.randint(0, 10000)),
+            "expires_at": now + timedelta(hours=random.randint(1, 72)),
+        }
+        for i in range(count)
+    ]
+
+
+def bench(codec, listings, rounds: int):
+    """Retourne (encode_ms, decode_ms, payload) moyens sur `rounds` tours"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        payload = encode_entry(listings, codec)
+    encode_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode_entry(payload)
+    decode_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    return encode_ms, decode_ms, payload
+
+
+def redis_memory(payload: bytes, key: str):
+    """Mémoire Redis utilisée par une clé (None si Redis injoignable)"""
+    try:
+        redis = Redis(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            password=config.REDIS_PASSWORD,
+            db=config.REDIS_DB,
+            socket_connect_timeout=2,
+        )
+        redis.set(key, payload, ex=60)
+        usage = redis.memory_usage(key)
+        redis.delete(key)
+        return usage
+    except RedisError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listings", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    listings = build_listings(args.listings)
+    print(f"📦 {args.listings} listings, {args.rounds} tours par codec\n")
+    print(f"{'codec':<10}{'encode (ms)':>14}{'decode (ms)':>14}{'taille (Ko)':>14}{'Redis (Ko)':>14}")
+
+    for name, codec in CODECS_BY_NAME.items():
+        encode_ms, decode_ms, payload = bench(codec, listings, args.rounds)
+        usage = redis_memory(payload, f"bench:codec:{name}")
+        redis_kb = f"{usage / 1024:.1f}" if usage is not None else "n/a"
+        print(
+            f"{name:<10}{encode_ms:>14.2f}{decode_ms:>14.2f}"
+            f"{len(payload) / 1024:>14.1f}{redis_kb:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
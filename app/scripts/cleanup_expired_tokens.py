@@ -6,7 +6,9 @@ Script de nettoyage des refresh tokens expirés.
 Usage:
     python -m scripts.cleanup_expired_tokens
     
-Recommandation: Exécuter via cron toutes les heures
+Le nettoyage tourne déjà dans l'application (tâche token_cleanup du
+planificateur, services/scheduler.py): ce script sert aux passages manuels
+ou aux déploiements avec SCHEDULER_ENABLED=false, via cron par exemple:
     0 * * * * cd /app && python -m scripts.cleanup_expired_tokens
 """
 
@@ -31,7 +33,7 @@ def main():
     
     try:
         with get_db_context() as db:
-            deleted = cleanup_expired_tokens(db)
+            deleted = cleanup_expired_tokens(db, pause=0.1)
             
             if deleted > 0:
                 logger.info(f"✅ {deleted} token(s) expiré(s) supprimé(s)")
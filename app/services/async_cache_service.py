@@ -0,0 +1,1200 @@
+# app/services/async_cache_service.py
+"""
+B-CraftD v3.0 - Redis Cache Service (variante asyncio)
+
+Même API que CacheService, en coroutines, sur redis.asyncio:
+à utiliser depuis les routes et dépendances `async def` pour ne pas
+bloquer la boucle d'événements (ni passer par le threadpool).
+
+Clés, TTL, politiques L1/codecs, sérialisation et charges utiles
+(dashboard, recettes, rate limiting, brute-force) sont partagés avec
+la version synchrone (CacheKeyspace): seules les E/S sont écrites ici. Dans l'application, l'instance
+asynchrone réutilise le cache L1, les métriques et l'identité de
+l'instance synchrone: les deux variantes voient les mêmes données.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from redis.asyncio import ConnectionPool, Redis
+from redis.client import NEVER_DECODE
+from redis.exceptions import LockError, RedisError
+
+import config
+from services.cache_metrics import CacheMetrics, key_prefix
+from services.cache_service import (
+    _LOGIN_FAILURE_LUA,
+    _MISSING,
+    _TOKEN_BUCKET_LUA,
+    CacheKeyspace,
+    CacheService,
+    LocalLRUCache,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSingleFlight:
+    """
+    Coalescence des calculs concurrents par clé (coroutines d'une même boucle)
+
+    La première coroutine exécute fn, les suivantes attendent son résultat.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # évite "exception never retrieved" sans attente
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+
+class AsyncCacheService(CacheKeyspace):
+    """Service centralisé pour tous les caches Redis (asyncio)"""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        password: Optional[str] = None,
+        db: int = 0,
+        max_connections: int = 50,
+        l1: Optional[LocalLRUCache] = None,
+        metrics: Optional[CacheMetrics] = None,
+        instance_id: Optional[str] = None
+    ):
+        """
+        Prépare le pool de connexions (aucune E/S: voir connect())
+
+        Args:
+            host: Hôte Redis
+            port: Port Redis
+            password: Mot de passe Redis (optionnel)
+            db: Numéro de base Redis (0-15)
+            max_connections: Nombre max de connexions dans le pool
+            l1: Cache L1 partagé (celui de l'instance synchrone), None = pas de L1
+            metrics: Registre de métriques partagé (nouveau registre si None)
+            instance_id: Identité pour les invalidations L1 (celle de l'instance synchrone)
+        """
+        self.pool = ConnectionPool(
+            host=host,
+            port=port,
+            password=password,
+            db=db,
+            max_connections=max_connections,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True
+        )
+        self.redis: Redis = Redis(connection_pool=self.pool)
+        self._singleflight = AsyncSingleFlight()
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self.metrics = metrics or CacheMetrics()
+        self._token_bucket = self.redis.register_script(_TOKEN_BUCKET_LUA)
+        self._login_failure = self.redis.register_script(_LOGIN_FAILURE_LUA)
+        self._instance_id = instance_id or uuid.uuid4().hex
+        self.l1 = l1
+        self._address = f"{host}:{port} (DB {db})"
+
+    @classmethod
+    def from_sync(cls, cache: CacheService, **kwargs) -> "AsyncCacheService":
+        """
+        Variante asynchrone partageant L1, métriques et identité d'une instance
+        synchrone. Le L1 partagé reste invalidé par l'écoute pub/sub de
+        l'instance synchrone.
+        """
+        return cls(
+            l1=cache.l1,
+            metrics=cache.metrics,
+            instance_id=cache._instance_id,
+            **kwargs
+        )
+
+    async def connect(self) -> "AsyncCacheService":
+        """
+        Vérifie la connexion Redis
+
+        Raises:
+            RedisError: Redis injoignable
+        """
+        try:
+            await self.redis.ping()
+        except RedisError as e:
+            logger.error(f"❌ Erreur connexion Redis (async): {e}")
+            raise
+        logger.info(f"✅ Connexion Redis async établie: {self._address}")
+        return self
+
+    # =========================================================================
+    # CACHE L1 (mémoire du worker)
+    # =========================================================================
+
+    async def _publish_invalidation(self, *keys: str):
+        """Publie l'invalidation de clés L1 vers les autres workers"""
+        message = self._invalidation_message(keys)
+        if message is None:
+            return
+        try:
+            await self.redis.publish(self.INVALIDATION_CHANNEL, message)
+        except RedisError as e:
+            logger.error(f"Erreur publication invalidation L1 keys={keys}: {e}")
+
+    # =========================================================================
+    # OPÉRATIONS DE BASE
+    # =========================================================================
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        nx: bool = False,
+        xx: bool = False,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Définit une valeur dans Redis
+
+        Args:
+            key: Clé Redis
+            value: Valeur (sérialisée avec le codec du préfixe)
+            ttl: Time To Live en secondes (None = pas d'expiration)
+            nx: Set only if Not eXists
+            xx: Set only if eXists
+            tags: Tags d'invalidation de la clé (voir invalidate_tags)
+
+        Returns:
+            bool: Succès de l'opération
+        """
+        prefix = key_prefix(key)
+        start = time.perf_counter()
+        try:
+            serialized = self._serialize(value, key)
+            if tags:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.set(key, serialized, ex=ttl, nx=nx, xx=xx)
+                self._add_tags(pipe, key, tags, ttl)
+                result = (await pipe.execute())[0]
+            else:
+                result = await self.redis.set(key, serialized, ex=ttl, nx=nx, xx=xx)
+        except RedisError as e:
+            logger.error(f"Erreur set Redis key={key}: {e}")
+            self.metrics.record(prefix, "set", "error", time.perf_counter() - start)
+            return False
+        self.metrics.record(
+            prefix, "set", "ok" if result else "skipped", time.perf_counter() - start
+        )
+        self.metrics.record_size(prefix, "write", len(serialized))
+
+        l1_ttl = self._l1_ttl(key)
+        if l1_ttl is not None and result:
+            self.l1.set(key, value, min(l1_ttl, ttl) if ttl else l1_ttl)
+            await self._publish_invalidation(key)
+        return bool(result)
+
+    async def get(self, key: str) -> Any:
+        """
+        Récupère une valeur depuis Redis
+
+        Args:
+            key: Clé Redis
+
+        Returns:
+            Any: Valeur désérialisée ou None
+        """
+        return self._unwrap(await self._get_entry(key))
+
+    async def _get_entry(self, key: str) -> Any:
+        """Entrée brute (enveloppe stale-while-revalidate incluse)"""
+        prefix = key_prefix(key)
+        l1_ttl = self._l1_ttl(key)
+        if l1_ttl is not None:
+            value = self.l1.get(key)
+            if value is not _MISSING:
+                self.metrics.record(prefix, "get", "l1_hit")
+                return value
+
+        start = time.perf_counter()
+        try:
+            # Payload binaire: pas de décodage UTF-8 côté client
+            data = await self.redis.execute_command("GET", key, **{NEVER_DECODE: []})
+            value = self._deserialize(data)
+        except RedisError as e:
+            logger.error(f"Erreur get Redis key={key}: {e}")
+            self.metrics.record(prefix, "get", "error", time.perf_counter() - start)
+            return None
+        except ValueError as e:
+            logger.error(f"Entrée cache illisible key={key}: {e}")
+            self.metrics.record(prefix, "get", "error", time.perf_counter() - start)
+            return None
+
+        self.metrics.record(
+            prefix, "get", "miss" if data is None else "hit", time.perf_counter() - start
+        )
+        if data is not None:
+            self.metrics.record_size(prefix, "read", len(data))
+
+        if l1_ttl is not None and value is not None:
+            self.l1.set(key, value, l1_ttl)
+        return value
+
+    async def delete(self, *keys: str) -> int:
+        """
+        Supprime une ou plusieurs clés
+
+        Args:
+            *keys: Clés à supprimer
+
+        Returns:
+            int: Nombre de clés supprimées
+        """
+        if self.l1 is not None:
+            self.l1.delete(*keys)
+            await self._publish_invalidation(*keys)
+        prefix = self._batch_prefix(keys)
+        start = time.perf_counter()
+        try:
+            deleted = await self.redis.delete(*keys)
+        except RedisError as e:
+            logger.error(f"Erreur delete Redis keys={keys}: {e}")
+            self.metrics.record(prefix, "delete", "error", time.perf_counter() - start)
+            return 0
+        self.metrics.record(prefix, "delete", "ok", time.perf_counter() - start)
+        return deleted
+
+    # =========================================================================
+    # OPÉRATIONS MULTI-CLÉS (un seul aller-retour réseau)
+    # =========================================================================
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Récupère plusieurs valeurs en un seul MGET
+
+        Args:
+            keys: Clés Redis
+
+        Returns:
+            Dict: {clé: valeur désérialisée ou None}, dans l'ordre des clés
+        """
+        result: Dict[str, Any] = {key: None for key in keys}
+        to_fetch = []
+        for key in result:
+            if self._l1_ttl(key) is not None:
+                value = self.l1.get(key)
+                if value is not _MISSING:
+                    result[key] = self._unwrap(value)
+                    self.metrics.record(key_prefix(key), "mget", "l1_hit")
+                    continue
+            to_fetch.append(key)
+
+        if not to_fetch:
+            return result
+
+        prefix = self._batch_prefix(to_fetch)
+        start = time.perf_counter()
+        try:
+            raw_values = await self.redis.execute_command(
+                "MGET", *to_fetch, **{NEVER_DECODE: []}
+            )
+        except RedisError as e:
+            logger.error(f"Erreur get_many Redis keys={to_fetch}: {e}")
+            self.metrics.record(prefix, "mget", "error", time.perf_counter() - start)
+            return result
+        duration = time.perf_counter() - start
+
+        for key, data in zip(to_fetch, raw_values):
+            self.metrics.record(key_prefix(key), "mget", "miss" if data is None else "hit")
+            if data is not None:
+                self.metrics.record_size(key_prefix(key), "read", len(data))
+            try:
+                value = self._deserialize(data)
+            except ValueError as e:
+                logger.error(f"Entrée cache illisible key={key}: {e}")
+                continue
+            result[key] = self._unwrap(value)
+            l1_ttl = self._l1_ttl(key)
+            if l1_ttl is not None and value is not None:
+                self.l1.set(key, value, l1_ttl)
+        self.metrics.record(prefix, "mget", "batch", duration)
+
+        return result
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        ttls: Optional[Dict[str, Optional[int]]] = None,
+        tags: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
+        """
+        Définit plusieurs valeurs en un seul pipeline
+
+        Args:
+            items: {clé: valeur}
+            ttl: TTL par défaut en secondes (None = pas d'expiration)
+            ttls: TTL spécifique par clé (prioritaire sur ttl)
+            tags: Tags d'invalidation par clé
+
+        Returns:
+            bool: Succès de l'opération
+        """
+        if not items:
+            return True
+        ttls = ttls or {}
+        tags = tags or {}
+
+        prefix = self._batch_prefix(items)
+        start = time.perf_counter()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in items.items():
+                key_ttl = ttls.get(key, ttl)
+                serialized = self._serialize(value, key)
+                self.metrics.record_size(key_prefix(key), "write", len(serialized))
+                pipe.set(key, serialized, ex=key_ttl)
+                if tags.get(key):
+                    self._add_tags(pipe, key, tags[key], key_ttl)
+            await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Erreur set_many Redis keys={list(items)}: {e}")
+            self.metrics.record(prefix, "mset", "error", time.perf_counter() - start)
+            return False
+        self.metrics.record(prefix, "mset", "batch", time.perf_counter() - start)
+
+        l1_keys = []
+        for key, value in items.items():
+            l1_ttl = self._l1_ttl(key)
+            if l1_ttl is None:
+                continue
+            key_ttl = ttls.get(key, ttl)
+            self.l1.set(key, value, min(l1_ttl, key_ttl) if key_ttl else l1_ttl)
+            l1_keys.append(key)
+        if l1_keys:
+            await self._publish_invalidation(*l1_keys)
+
+        return True
+
+    async def delete_many(self, keys: List[str]) -> int:
+        """Supprime plusieurs clés en une seule commande DEL"""
+        if not keys:
+            return 0
+        return await self.delete(*keys)
+
+    # =========================================================================
+    # TAGS D'INVALIDATION
+    # =========================================================================
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Supprime toutes les clés rattachées à un ou plusieurs tags
+
+        Args:
+            *tags: Tags à invalider
+
+        Returns:
+            int: Nombre de clés supprimées
+        """
+        if not tags:
+            return 0
+        tag_keys = [self._tag_key(tag) for tag in tags]
+
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            pipe.delete(*tag_keys)
+            results = await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Erreur invalidation tags={list(tags)}: {e}")
+            return 0
+
+        members = set()
+        for tag_members in results[:-1]:
+            members.update(tag_members)
+        if not members:
+            return 0
+        return await self.delete(*members)
+
+    async def exists(self, *keys: str) -> int:
+        """Vérifie l'existence de clés (nombre de clés existantes)"""
+        try:
+            return await self.redis.exists(*keys)
+        except RedisError as e:
+            logger.error(f"Erreur exists Redis keys={keys}: {e}")
+            return 0
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """Définit une expiration sur une clé"""
+        try:
+            return bool(await self.redis.expire(key, seconds))
+        except RedisError as e:
+            logger.error(f"Erreur expire Redis key={key}: {e}")
+            return False
+
+    async def increment(self, key: str, amount: int = 1) -> int:
+        """Incrémente une valeur, retourne la nouvelle valeur"""
+        try:
+            return await self.redis.incrby(key, amount)
+        except RedisError as e:
+            logger.error(f"Erreur increment Redis key={key}: {e}")
+            return 0
+
+    async def decrement(self, key: str, amount: int = 1) -> int:
+        """Décrémente une valeur, retourne la nouvelle valeur"""
+        try:
+            return await self.redis.decrby(key, amount)
+        except RedisError as e:
+            logger.error(f"Erreur decrement Redis key={key}: {e}")
+            return 0
+
+    # =========================================================================
+    # CACHE-ASIDE AVEC PROTECTION SINGLE-FLIGHT
+    # =========================================================================
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        lock_timeout: int = CacheKeyspace.TTL_LOCK,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Récupère une valeur ou la calcule une seule fois en cas de MISS
+
+        Mêmes garanties que CacheService.get_or_set (coroutines du worker
+        coalescées, verrou Redis entre workers).
+
+        Args:
+            key: Clé Redis
+            loader: Fonction ou coroutine qui calcule la valeur en cas de MISS
+            ttl: Time To Live en secondes
+            lock_timeout: Durée max du verrou / de l'attente (secondes)
+            tags: Tags d'invalidation de la valeur calculée
+
+        Returns:
+            Any: Valeur cachée ou calculée
+        """
+        cached_value = await self.get(key)
+        if cached_value is not None:
+            logger.debug(f"Cache HIT: {key}")
+            return cached_value
+
+        return await self._singleflight.do(
+            key,
+            lambda: self._load_with_lock(key, loader, ttl, lock_timeout, tags)
+        )
+
+    async def _load_with_lock(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int],
+        lock_timeout: int,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Recalcule une valeur sous verrou Redis (un seul worker à la fois)"""
+        cached_value = await self.get(key)
+        if cached_value is not None:
+            return cached_value
+
+        lock = None
+        try:
+            lock = self.redis.lock(
+                self._make_key(self.PREFIX_LOCK, key),
+                timeout=lock_timeout,
+                blocking=False
+            )
+            acquired = await lock.acquire()
+        except RedisError as e:
+            logger.error(f"Erreur verrou Redis key={key}: {e}")
+            acquired = False
+            lock = None
+
+        if lock is not None and not acquired:
+            # Un autre worker recalcule: on attend son résultat
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                cached_value = await self.get(key)
+                if cached_value is not None:
+                    logger.debug(f"Cache HIT (après attente): {key}")
+                    return cached_value
+            logger.warning(f"⚠️  Attente verrou expirée, recalcul local: {key}")
+
+        try:
+            logger.debug(f"Cache MISS: {key}")
+            result = loader()
+            if inspect.isawaitable(result):
+                result = await result
+            if result is not None:
+                await self.set(key, result, ttl=ttl, tags=tags)
+            return result
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except (LockError, RedisError):
+                    # Verrou expiré entre-temps: rien à libérer
+                    pass
+
+    # =========================================================================
+    # STALE-WHILE-REVALIDATE (rafraîchissement en arrière-plan)
+    # =========================================================================
+
+    async def get_or_refresh(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int = CacheKeyspace.TTL_STALE,
+        beta: float = CacheKeyspace.XFETCH_BETA,
+        lock_timeout: int = CacheKeyspace.TTL_LOCK
+    ) -> Any:
+        """
+        Récupère une valeur sans jamais attendre son recalcul, sauf au premier MISS
+
+        Mêmes garanties que CacheService.get_or_refresh; le rafraîchissement
+        tourne dans une tâche asyncio (une par clé dans le worker).
+
+        Args:
+            key: Clé Redis
+            loader: Fonction ou coroutine qui calcule la valeur
+            ttl: TTL doux en secondes (fraîcheur métier)
+            stale_ttl: Durée supplémentaire pendant laquelle la valeur périmée reste servie
+            beta: Agressivité de l'anticipation XFetch (0 = désactivée)
+            lock_timeout: Durée max du verrou de recalcul (secondes)
+
+        Returns:
+            Any: Valeur cachée ou calculée
+        """
+        prefix = key_prefix(key)
+        entry = await self._get_entry(key)
+        if entry is None:
+            self.metrics.record(prefix, "swr", "miss")
+            return self._unwrap(await self.get_or_set(
+                key,
+                lambda: self._compute_swr_entry(loader, ttl),
+                ttl=ttl + stale_ttl,
+                lock_timeout=lock_timeout
+            ))
+
+        state = self._swr_state(entry, beta)
+        self.metrics.record(prefix, "swr", state)
+        if state != "fresh" and key not in self._refresh_tasks:
+            task = asyncio.create_task(
+                self._refresh_entry(key, loader, ttl, stale_ttl, lock_timeout)
+            )
+            self._refresh_tasks[key] = task
+            task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+        return self._unwrap(entry)
+
+    async def _compute_swr_entry(
+        self,
+        loader: Callable[[], Any],
+        ttl: int
+    ) -> Optional[Dict[str, Any]]:
+        """Exécute loader et enveloppe le résultat avec son coût de calcul"""
+        start = time.perf_counter()
+        value = loader()
+        if inspect.isawaitable(value):
+            value = await value
+        if value is None:
+            return None
+        return self._swr_entry(value, ttl, delta=time.perf_counter() - start)
+
+    async def _refresh_entry(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        lock_timeout: int
+    ):
+        """Recalcule une entrée si aucun autre worker ne le fait déjà (voir CacheService)"""
+        lock_key = self._make_key(self.PREFIX_LOCK, "refresh", key)
+        try:
+            if not await self.redis.set(lock_key, self._instance_id, nx=True, ex=lock_timeout):
+                return
+            try:
+                entry = await self._compute_swr_entry(loader, ttl)
+            except Exception as e:
+                await self.redis.delete(lock_key)
+                logger.error(f"Erreur rafraîchissement key={key}: {e}", exc_info=True)
+                return
+            if entry is not None:
+                await self.set(key, entry, ttl=ttl + stale_ttl)
+                logger.debug(f"Cache rafraîchi en arrière-plan: {key}")
+        except RedisError as e:
+            logger.error(f"Erreur verrou de rafraîchissement key={key}: {e}")
+
+    # =========================================================================
+    # ENVIRONNEMENT (météo, saison, biome)
+    # =========================================================================
+
+    async def get_current_environment(self) -> Optional[Dict[str, Any]]:
+        """Récupère l'environnement actuel (météo + saison)"""
+        return await self.get(self._current_key(self.PREFIX_ENVIRONMENT))
+
+    async def set_current_environment(self, environment: Dict[str, Any]) -> bool:
+        """Cache l'environnement actuel"""
+        entry, ttl = self._swr_item(environment, self.TTL_ENVIRONMENT)
+        return await self.set(self._current_key(self.PREFIX_ENVIRONMENT), entry, ttl=ttl)
+
+    async def get_or_load_environment(self, loader: Callable[[], Any]) -> Dict[str, Any]:
+        """Environnement actuel en stale-while-revalidate (voir get_or_refresh)"""
+        key = self._current_key(self.PREFIX_ENVIRONMENT)
+        return await self.get_or_refresh(key, loader, ttl=self.TTL_ENVIRONMENT)
+
+    async def get_current_weather(self) -> Optional[Dict[str, Any]]:
+        """Récupère la météo actuelle depuis le cache"""
+        return await self.get(self._current_key(self.PREFIX_WEATHER))
+
+    async def set_current_weather(self, weather: Dict[str, Any]) -> bool:
+        """Cache la météo actuelle"""
+        entry, ttl = self._swr_item(weather, self.TTL_CURRENT_WEATHER)
+        return await self.set(self._current_key(self.PREFIX_WEATHER), entry, ttl=ttl)
+
+    async def get_or_load_weather(self, loader: Callable[[], Any]) -> Dict[str, Any]:
+        """Météo actuelle en stale-while-revalidate (voir get_or_refresh)"""
+        key = self._current_key(self.PREFIX_WEATHER)
+        return await self.get_or_refresh(key, loader, ttl=self.TTL_CURRENT_WEATHER)
+
+    async def get_current_season(self) -> Optional[Dict[str, Any]]:
+        """Récupère la saison actuelle depuis le cache"""
+        return await self.get(self._current_key(self.PREFIX_SEASON))
+
+    async def set_current_season(self, season: Dict[str, Any]) -> bool:
+        """Cache la saison actuelle"""
+        entry, ttl = self._swr_item(season, self.TTL_ENVIRONMENT)
+        return await self.set(self._current_key(self.PREFIX_SEASON), entry, ttl=ttl)
+
+    async def get_or_load_season(self, loader: Callable[[], Any]) -> Dict[str, Any]:
+        """Saison actuelle en stale-while-revalidate (voir get_or_refresh)"""
+        key = self._current_key(self.PREFIX_SEASON)
+        return await self.get_or_refresh(key, loader, ttl=self.TTL_ENVIRONMENT)
+
+    async def invalidate_environment(self) -> int:
+        """Invalide tous les caches environnement"""
+        return await self.delete(*self._environment_keys())
+
+    # =========================================================================
+    # MARCHÉ
+    # =========================================================================
+
+    async def get_market_listings(
+        self,
+        resource_id: Optional[int] = None,
+        status: str = "active"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Récupère les listings marché depuis le cache"""
+        return await self.get(self._market_key(resource_id, status))
+
+    async def set_market_listings(
+        self,
+        listings: List[Dict[str, Any]],
+        resource_id: Optional[int] = None,
+        status: str = "active"
+    ) -> bool:
+        """Cache les listings marché"""
+        return await self.set(
+            self._market_key(resource_id, status),
+            listings,
+            ttl=self.TTL_MARKET_LISTINGS,
+            tags=self._market_tags(resource_id)
+        )
+
+    async def invalidate_market_cache(self, resource_id: Optional[int] = None) -> int:
+        """Invalide le cache marché (une ressource ou tout le marché)"""
+        if resource_id:
+            return await self.invalidate_tags(
+                self._make_key(self.PREFIX_MARKET, "resource", resource_id)
+            )
+        return await self.invalidate_tags(self._make_key(self.PREFIX_MARKET, "all"))
+
+    # =========================================================================
+    # LEADERBOARD
+    # =========================================================================
+
+    async def get_leaderboard(self, limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """Récupère le leaderboard depuis le cache"""
+        return await self.get(self._leaderboard_key(limit))
+
+    async def set_leaderboard(self, leaderboard: List[Dict[str, Any]], limit: int = 100) -> bool:
+        """Cache le leaderboard"""
+        return await self.set(
+            self._leaderboard_key(limit),
+            leaderboard,
+            ttl=self.TTL_LEADERBOARD,
+            tags=[self.PREFIX_LEADERBOARD]
+        )
+
+    async def invalidate_leaderboard(self) -> int:
+        """Invalide tous les caches leaderboard"""
+        return await self.invalidate_tags(self.PREFIX_LEADERBOARD)
+
+    # =========================================================================
+    # INVENTAIRE UTILISATEUR
+    # =========================================================================
+
+    async def get_user_inventory(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Récupère l'inventaire d'un utilisateur depuis le cache"""
+        return await self.get(self._inventory_key(user_id))
+
+    async def set_user_inventory(self, user_id: int, inventory: List[Dict[str, Any]]) -> bool:
+        """Cache l'inventaire d'un utilisateur"""
+        return await self.set(
+            self._inventory_key(user_id), inventory, ttl=self.TTL_USER_INVENTORY
+        )
+
+    async def invalidate_user_inventory(self, user_id: int) -> int:
+        """Invalide le cache inventaire d'un utilisateur"""
+        return await self.delete(self._inventory_key(user_id))
+
+    # =========================================================================
+    # RECETTES
+    # =========================================================================
+
+    async def get_craftable_recipes(
+        self,
+        user_id: int,
+        profession_id: Union[int, List[int]]
+    ) -> Union[Optional[List[Dict]], Dict[int, Optional[List[Dict]]]]:
+        """
+        Récupère les recettes craftables pour un utilisateur
+
+        Returns:
+            List[Dict] pour un ID, {profession_id: List[Dict] ou None} pour une liste
+        """
+        if isinstance(profession_id, (list, tuple, set)):
+            keys = {pid: self._craftable_key(user_id, pid) for pid in profession_id}
+            values = await self.get_many(list(keys.values()))
+            return {pid: values[key] for pid, key in keys.items()}
+
+        return await self.get(self._craftable_key(user_id, profession_id))
+
+    async def set_craftable_recipes(
+        self,
+        user_id: int,
+        profession_id: int,
+        recipes: List[Dict]
+    ) -> bool:
+        """Cache les recettes craftables"""
+        return await self.set(
+            self._craftable_key(user_id, profession_id),
+            recipes,
+            ttl=self.TTL_RECIPES,
+            tags=[self._recipes_tag(user_id)]
+        )
+
+    async def set_craftable_recipes_many(
+        self,
+        user_id: int,
+        recipes_by_profession: Dict[int, List[Dict]]
+    ) -> bool:
+        """Cache les recettes craftables de plusieurs professions (un seul pipeline)"""
+        items, tags = self._craftable_items(user_id, recipes_by_profession)
+        return await self.set_many(items, ttl=self.TTL_RECIPES, tags=tags)
+
+    async def invalidate_user_recipes(self, user_id: int) -> int:
+        """Invalide toutes les recettes cachées d'un utilisateur"""
+        return await self.invalidate_tags(self._recipes_tag(user_id))
+
+    async def get_or_load_recipe_catalog(
+        self,
+        loader: Callable[[], Any],
+        profession: Optional[str] = None
+    ) -> List[Dict]:
+        """Catalogue des recettes, chargé par loader en cas de MISS (single-flight)"""
+        return await self.get_or_set(
+            self._recipe_catalog_key(profession),
+            loader,
+            ttl=self.TTL_RECIPES,
+            tags=[self._recipe_catalog_tag()]
+        )
+
+    async def invalidate_recipe_catalog(self) -> int:
+        """Invalide toutes les variantes du catalogue (création/modif/suppression)"""
+        return await self.invalidate_tags(self._recipe_catalog_tag())
+
+    # =========================================================================
+    # DASHBOARD (lecture/préchauffage d'une page complète)
+    # =========================================================================
+
+    async def get_dashboard_bundle(
+        self,
+        user_id: int,
+        profession_ids: List[int],
+        leaderboard_limit: int = 100
+    ) -> Dict[str, Any]:
+        """Lit tout le dashboard d'un joueur en un seul aller-retour"""
+        keys = self._dashboard_keys(user_id, profession_ids, leaderboard_limit)
+        values = await self.get_many(self._dashboard_read_keys(keys))
+        return self._dashboard_bundle(keys, values)
+
+    async def set_dashboard_bundle(
+        self,
+        user_id: int,
+        inventory: Optional[List[Dict[str, Any]]] = None,
+        craftable_recipes: Optional[Dict[int, List[Dict]]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        leaderboard: Optional[List[Dict[str, Any]]] = None,
+        leaderboard_limit: int = 100
+    ) -> bool:
+        """Préchauffe le dashboard d'un joueur en un seul pipeline"""
+        items, ttls, tags = self._dashboard_items(
+            user_id, inventory, craftable_recipes or {}, environment, leaderboard,
+            leaderboard_limit
+        )
+        return await self.set_many(items, ttls=ttls, tags=tags)
+
+    # =========================================================================
+    # AUTHENTIFICATION (identité des requêtes)
+    # =========================================================================
+
+    async def get_auth_user(self, user_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Identité cachée d'un utilisateur: (version courante, identité ou None)"""
+        version_key, user_key = self._auth_keys(user_id)
+        values = await self.get_many([version_key, user_key])
+        return self._auth_user_from(values[version_key], values[user_key])
+
+    async def set_auth_user(self, user_id: str, version: int, identity: Dict[str, Any]) -> bool:
+        """Cache l'identité d'un utilisateur pour la version lue avant son chargement"""
+        _, user_key = self._auth_keys(user_id)
+        return await self.set(
+            user_key, {"version": version, "user": identity}, ttl=self.TTL_AUTH_USER
+        )
+
+    async def bump_user_versions(self, *user_ids: str) -> bool:
+        """Incrémente la version d'utilisateurs modifiés (invalide leur identité cachée)"""
+        if not user_ids:
+            return True
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                version_key, _ = self._auth_keys(user_id)
+                pipe.incr(version_key)
+                pipe.expire(version_key, self.TTL_AUTH_VERSION)
+            await pipe.execute()
+            return True
+        except RedisError as e:
+            logger.error(f"Erreur bump version utilisateurs={user_ids}: {e}")
+            return False
+
+    # =========================================================================
+    # SESSIONS UTILISATEUR
+    # =========================================================================
+
+    async def set_session(self, session_id: str, user_data: Dict[str, Any]) -> bool:
+        """Crée une session utilisateur"""
+        return await self.set(self._session_key(session_id), user_data, ttl=self.TTL_SESSION)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère une session"""
+        return await self.get(self._session_key(session_id))
+
+    async def delete_session(self, session_id: str) -> int:
+        """Supprime une session (logout)"""
+        return await self.delete(self._session_key(session_id))
+
+    async def refresh_session(self, session_id: str) -> bool:
+        """Prolonge la durée d'une session"""
+        return await self.expire(self._session_key(session_id), self.TTL_SESSION)
+
+    # =========================================================================
+    # RATE LIMITING
+    # =========================================================================
+
+    async def acquire_rate_limit(
+        self,
+        identifier: str,
+        max_requests: int = 60,
+        window_seconds: int = 60,
+        cost: int = 1
+    ) -> Tuple[bool, int, float]:
+        """
+        Consomme des jetons dans le seau d'un identifiant (token bucket)
+
+        Returns:
+            Tuple[bool, int, float]: (autorisé, requêtes restantes, secondes avant retry)
+        """
+        start = time.perf_counter()
+        try:
+            result = await self._token_bucket(
+                keys=[self._rate_limit_key(identifier)],
+                args=[max_requests, window_seconds, cost]
+            )
+        except RedisError as e:
+            logger.error(f"Erreur rate limit: {e}")
+            self.metrics.record(
+                self.PREFIX_RATE_LIMIT, "acquire", "error", time.perf_counter() - start
+            )
+            return True, max_requests, 0.0  # En cas d'erreur Redis, autoriser la requête
+        allowed, remaining, retry_after = self._rate_limit_result(*result)
+        self.metrics.record(
+            self.PREFIX_RATE_LIMIT,
+            "acquire",
+            "allowed" if allowed else "rejected",
+            time.perf_counter() - start
+        )
+
+        return allowed, remaining, retry_after
+
+    async def check_rate_limit(
+        self,
+        identifier: str,
+        max_requests: int = 60,
+        window_seconds: int = 60
+    ) -> bool:
+        """Vérifie si une requête respecte la limite de taux"""
+        allowed, _, _ = await self.acquire_rate_limit(identifier, max_requests, window_seconds)
+        return allowed
+
+    async def get_remaining_requests(
+        self,
+        identifier: str,
+        max_requests: int = 60,
+        window_seconds: int = 60
+    ) -> int:
+        """Récupère le nombre de requêtes restantes"""
+        _, remaining, _ = await self.acquire_rate_limit(
+            identifier, max_requests, window_seconds, cost=0
+        )
+        return remaining
+
+    # =========================================================================
+    # BRUTE-FORCE (échecs de connexion)
+    # =========================================================================
+
+    async def check_login_block(self, login: str, ip: str) -> float:
+        """Secondes de blocage restantes pour un login ou une IP (0 = autorisé)"""
+        keys = self._login_keys(self.PREFIX_LOGIN_BLOCK, login, ip)
+        start = time.perf_counter()
+        now = time.time()
+        until = self._login_block_from_l1(keys)
+        if until > now:
+            self.metrics.record(
+                self.PREFIX_LOGIN_BLOCK, "check", "l1_blocked", time.perf_counter() - start
+            )
+            return until - now
+
+        try:
+            values = await self.redis.mget(keys)
+        except RedisError as e:
+            logger.error(f"Erreur vérification blocage login={login}: {e}")
+            self.metrics.record(
+                self.PREFIX_LOGIN_BLOCK, "check", "error", time.perf_counter() - start
+            )
+            return 0.0  # En cas d'erreur Redis, autoriser la tentative
+
+        until = self._login_block_from(keys, values, now)
+        self.metrics.record(
+            self.PREFIX_LOGIN_BLOCK,
+            "check",
+            "blocked" if until else "allowed",
+            time.perf_counter() - start
+        )
+        return max(0.0, until - now)
+
+    async def record_login_failure(
+        self,
+        login: str,
+        ip: str,
+        threshold: int,
+        ip_threshold: int,
+        window_seconds: int,
+        block_seconds: int
+    ) -> Tuple[int, int, float]:
+        """
+        Compte un échec de connexion; bloque le login ou l'IP au seuil
+
+        Returns:
+            Tuple[int, int, float]: (échecs login, échecs IP, secondes de blocage posées)
+        """
+        keys, args = self._login_failure_call(
+            login, ip, threshold, ip_threshold, window_seconds, block_seconds
+        )
+        try:
+            result = await self._login_failure(keys=keys, args=args)
+        except RedisError as e:
+            logger.error(f"Erreur comptage échec login={login}: {e}")
+            return 0, 0, 0.0
+        return self._login_failure_result(result)
+
+    async def clear_login_failures(self, login: str) -> bool:
+        """Remet à zéro les échecs d'un login (connexion réussie; l'IP garde les siens)"""
+        try:
+            await self.redis.delete(self._make_key(self.PREFIX_LOGIN_FAIL, "login", login))
+            return True
+        except RedisError as e:
+            logger.error(f"Erreur remise à zéro échecs login={login}: {e}")
+            return False
+
+    async def get_login_failures(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Compteurs d'échecs et blocages en cours (administration)
+
+        Returns:
+            List[Dict]: {kind: login|ip, subject, failures, blocked_for}, bloqués d'abord
+        """
+        index = self._login_index_key()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zremrangebyscore(index, "-inf", time.time())
+            pipe.zrevrange(index, 0, limit - 1)
+            _, members = await pipe.execute()
+
+            pipe = self.redis.pipeline(transaction=False)
+            for member in members:
+                block_key, fail_key = self._login_subject_keys(*member.split(":", 1))
+                pipe.ttl(block_key)
+                pipe.get(fail_key)
+            results = await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Erreur lecture des échecs de connexion: {e}")
+            return []
+
+        entries, stale = self._login_failure_entries(members, results)
+        if stale:
+            try:
+                await self.redis.zrem(index, *stale)
+            except RedisError as e:
+                logger.warning(f"Nettoyage de l'index des échecs impossible: {e}")
+        return entries
+
+    async def unblock_login(self, kind: str, subject: str) -> int:
+        """Lève le blocage et les échecs d'un login ou d'une IP (tous les workers)"""
+        deleted = await self.delete(*self._login_subject_keys(kind, subject))
+        try:
+            await self.redis.zrem(self._login_index_key(), f"{kind}:{subject}")
+        except RedisError as e:
+            logger.error(f"Erreur retrait de l'index des échecs {kind}={subject}: {e}")
+        return deleted
+
+    # =========================================================================
+    # STATISTIQUES & MONITORING
+    # =========================================================================
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Récupère les statistiques Redis"""
+        try:
+            return self._stats_from_info(await self.redis.info())
+        except RedisError as e:
+            logger.error(f"Erreur get_stats: {e}")
+            return {}
+
+    async def flush_all(self) -> bool:
+        """⚠️ DANGER: Supprime TOUTES les clés Redis"""
+        try:
+            await self.redis.flushdb()
+            if self.l1 is not None:
+                self.l1.clear()
+                await self._publish_invalidation("*")
+            logger.warning("🗑️ Cache Redis vidé complètement")
+            return True
+        except RedisError as e:
+            logger.error(f"Erreur flush_all: {e}")
+            return False
+
+    async def close(self):
+        """Ferme les connexions Redis"""
+        try:
+            await self.redis.aclose()
+            await self.pool.disconnect()
+            logger.info("Connexion Redis async fermée")
+        except RedisError as e:
+            logger.error(f"Erreur fermeture Redis async: {e}")
+
+
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_async_cache_service: Optional[AsyncCacheService] = None
+
+
+async def init_async_cache_service(
+    shared: Optional[CacheService] = None
+) -> Optional[AsyncCacheService]:
+    """
+    Crée l'instance AsyncCacheService partagée (lifespan de main.py)
+
+    Args:
+        shared: Instance synchrone dont on partage L1, métriques et identité
+
+    Returns:
+        AsyncCacheService: Instance partagée ou None (Redis désactivé/injoignable)
+    """
+    global _async_cache_service
+
+    if not config.REDIS_ENABLED or not config.CACHE_ASYNC_ENABLED:
+        return None
+
+    options = dict(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        password=config.REDIS_PASSWORD,
+        db=config.REDIS_DB,
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+    )
+    service = (
+        AsyncCacheService.from_sync(shared, **options)
+        if shared is not None
+        else AsyncCacheService(**options)
+    )
+    try:
+        _async_cache_service = await service.connect()
+    except RedisError as e:
+        logger.warning(f"⚠️  Redis indisponible, démarrage sans cache async: {e}")
+        await service.close()
+        _async_cache_service = None
+
+    return _async_cache_service
+
+
+async def close_async_cache_service():
+    """Ferme l'instance partagée (shutdown de l'application)"""
+    global _async_cache_service
+
+    if _async_cache_service is not None:
+        await _async_cache_service.close()
+        _async_cache_service = None
+
+
+def get_async_cache() -> Optional[AsyncCacheService]:
+    """
+    FastAPI dependency: retourne l'instance AsyncCacheService partagée
+
+    Usage:
+        @router.get("/environment")
+        async def environment(cache: Optional[AsyncCacheService] = Depends(get_async_cache)):
+            if cache:
+                return await cache.get_current_environment()
+
+    Returns:
+        AsyncCacheService: Instance partagée ou None si cache indisponible
+    """
+    return _async_cache_service
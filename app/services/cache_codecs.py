@@ -0,0 +1,175 @@
+# app/services/cache_codecs.py
+"""
+B-CraftD v3.0 - Codecs de sérialisation pour le cache Redis
+
+Chaque entrée écrite dans Redis commence par un en-tête de 2 octets:
+- octet 0: marqueur (0xBC), jamais présent en tête d'un texte JSON
+- octet 1: identifiant du codec
+
+Les entrées sans en-tête (écrites avant l'introduction des codecs) sont
+lues comme du JSON standard: un changement de codec ne nécessite donc
+aucun flush, les anciennes entrées expirent naturellement.
+
+Codecs disponibles:
+- json    (id 1): JSON rapide (orjson si installé, sinon json standard)
+- msgpack (id 2): binaire compact, conserve datetime/date/Decimal
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+HEADER_MARKER = 0xBC
+HEADER_SIZE = 2
+
+
+class CacheCodec(ABC):
+    """Interface d'un codec de cache"""
+
+    codec_id: int = 0
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """Sérialise une valeur en octets (sans en-tête)"""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Désérialise des octets (sans en-tête)"""
+
+
+class JsonCodec(CacheCodec):
+    """JSON rapide (orjson si disponible). Les types non JSON deviennent des str."""
+
+    codec_id = 1
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+# Types étendus msgpack (conservation des types Python)
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Encode les types non natifs msgpack"""
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("ascii"))
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode("ascii"))
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode("ascii"))
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # Même comportement que json.dumps(default=str)
+    return str(obj)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """Décode les types étendus"""
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode("ascii"))
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode("ascii"))
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode("ascii"))
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackCodec(CacheCodec):
+    """Binaire compact (MessagePack), conserve datetime/date/Decimal"""
+
+    codec_id = 2
+    name = "msgpack"
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(
+            data,
+            ext_hook=_msgpack_ext_hook,
+            raw=False,
+            strict_map_key=False
+        )
+
+
+# =========================================================================
+# REGISTRE
+# =========================================================================
+
+CODECS_BY_NAME: Dict[str, CacheCodec] = {"json": JsonCodec()}
+if msgpack is not None:
+    CODECS_BY_NAME["msgpack"] = MsgpackCodec()
+
+CODECS_BY_ID: Dict[int, CacheCodec] = {c.codec_id: c for c in CODECS_BY_NAME.values()}
+
+DEFAULT_CODEC = CODECS_BY_NAME["json"]
+
+
+def get_codec(name: Optional[str]) -> CacheCodec:
+    """
+    Retourne un codec par son nom (json par défaut)
+
+    Si le codec demandé n'est pas installé (ex: msgpack absent), retombe
+    sur le codec JSON.
+    """
+    if not name:
+        return DEFAULT_CODEC
+    codec = CODECS_BY_NAME.get(name)
+    if codec is None:
+        logger.warning(f"⚠️  Codec cache '{name}' indisponible, utilisation de json")
+        return DEFAULT_CODEC
+    return codec
+
+
+def encode_entry(value: Any, codec: CacheCodec = DEFAULT_CODEC) -> bytes:
+    """Sérialise une valeur avec en-tête de version"""
+    return bytes((HEADER_MARKER, codec.codec_id)) + codec.encode(value)
+
+
+def decode_entry(data: Optional[bytes]) -> Any:
+    """
+    Désérialise une entrée (avec ou sans en-tête)
+
+    Raises:
+        ValueError: Codec inconnu (entrée écrite par une version plus récente)
+    """
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if len(data) >= HEADER_SIZE and data[0] == HEADER_MARKER:
+        codec = CODECS_BY_ID.get(data[1])
+        if codec is None:
+            raise ValueError(f"Codec cache inconnu: id={data[1]}")
+        return codec.decode(data[HEADER_SIZE:])
+
+    # Entrée historique sans en-tête: JSON standard
+    return json.loads(data)
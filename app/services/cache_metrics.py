@@ -0,0 +1,175 @@
+# app/services/cache_metrics.py
+"""
+B-CraftD v3.0 - Métriques côté client du cache Redis
+
+Mesures enregistrées par CacheService, ventilées par préfixe de clé
+(env, market, inv, recipes, session, ratelimit, ...):
+- compteurs d'opérations par résultat (hit, l1_hit, miss, ok, error, ...)
+- histogrammes de latence par opération
+- histogrammes de taille des payloads (lectures et écritures)
+
+Les métriques sont propres au processus (un registre par worker).
+Export: snapshot() pour l'API admin, render_prometheus() pour le scrape.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Bornes supérieures des buckets (le dernier bucket implicite est +Inf)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def key_prefix(key: str) -> str:
+    """Préfixe d'une clé Redis ("market:listings:active:all" -> "market")"""
+    return key.split(":", 1)[0]
+
+
+class Histogram:
+    """Histogramme cumulatif à buckets fixes (format Prometheus)"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """[(borne, nombre cumulé)], borne finale "+Inf\""""
+        result = []
+        running = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            running += count
+            result.append((str(bound), running))
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class CacheMetrics:
+    """Registre thread-safe des métriques du cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.payload_size: Dict[Tuple[str, str], Histogram] = {}
+
+    def record(self, prefix: str, op: str, result: str, duration: float = None):
+        """
+        Enregistre une opération
+
+        Args:
+            prefix: Préfixe de clé
+            op: Opération (get, set, delete, mget, ...)
+            result: Résultat (hit, l1_hit, miss, ok, error, ...)
+            duration: Latence en secondes (None = pas d'aller-retour Redis)
+        """
+        with self._lock:
+            key = (prefix, op, result)
+            self.operations[key] = self.operations.get(key, 0) + 1
+            if duration is not None:
+                hist = self.latency.get((prefix, op))
+                if hist is None:
+                    hist = self.latency[(prefix, op)] = Histogram(LATENCY_BUCKETS)
+                hist.observe(duration)
+
+    def record_size(self, prefix: str, direction: str, size: int):
+        """Enregistre la taille d'un payload (direction: read / write)"""
+        with self._lock:
+            hist = self.payload_size.get((prefix, direction))
+            if hist is None:
+                hist = self.payload_size[(prefix, direction)] = Histogram(SIZE_BUCKETS)
+            hist.observe(size)
+
+    def reset(self):
+        """Remet toutes les métriques à zéro"""
+        with self._lock:
+            self.operations.clear()
+            self.latency.clear()
+            self.payload_size.clear()
+
+    # =========================================================================
+    # EXPORT
+    # =========================================================================
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Métriques par préfixe
+
+        Returns:
+            Dict: {prefix: {operations, hit_rate, latency, payload_size}}
+        """
+        with self._lock:
+            prefixes: Dict[str, Dict] = {}
+
+            def entry(prefix):
+                return prefixes.setdefault(prefix, {
+                    "operations": {},
+                    "hit_rate": None,
+                    "latency": {},
+                    "payload_size": {},
+                })
+
+            for (prefix, op, result), count in self.operations.items():
+                entry(prefix)["operations"][f"{op}_{result}"] = count
+            for (prefix, op), hist in self.latency.items():
+                entry(prefix)["latency"][op] = hist.to_dict()
+            for (prefix, direction), hist in self.payload_size.items():
+                entry(prefix)["payload_size"][direction] = hist.to_dict()
+
+        for data in prefixes.values():
+            ops = data["operations"]
+            hits = sum(ops.get(f"{op}_{r}", 0) for op in ("get", "mget") for r in ("hit", "l1_hit"))
+            misses = sum(ops.get(f"{op}_miss", 0) for op in ("get", "mget"))
+            if hits + misses:
+                data["hit_rate"] = round(hits / (hits + misses) * 100, 2)
+        return prefixes
+
+    def render_prometheus(self) -> str:
+        """Export au format texte Prometheus (exposition 0.0.4)"""
+        lines = [
+            "# HELP bcraftd_cache_operations_total Opérations cache par préfixe et résultat",
+            "# TYPE bcraftd_cache_operations_total counter",
+        ]
+        with self._lock:
+            for (prefix, op, result), count in sorted(self.operations.items()):
+                lines.append(
+                    f'bcraftd_cache_operations_total{{prefix="{prefix}",op="{op}",result="{result}"}} {count}'
+                )
+            lines += self._render_histograms(
+                "bcraftd_cache_latency_seconds",
+                "Latence des allers-retours Redis",
+                "op",
+                self.latency,
+            )
+            lines += self._render_histograms(
+                "bcraftd_cache_payload_bytes",
+                "Taille des payloads cache",
+                "direction",
+                self.payload_size,
+            )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(name: str, help_text: str, label: str, histograms) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (prefix, value), hist in sorted(histograms.items()):
+            labels = f'prefix="{prefix}",{label}="{value}"'
+            for bound, count in hist.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.total}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        return lines
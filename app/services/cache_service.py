@@ -4,6 +4,10 @@ B-CraftD v3.0 - Redis Cache Service
 Date: 4 décembre 2025
 
 Service centralisé pour le cache Redis:
+- Cache L1 optionnel en mémoire (LRU par worker) devant Redis
+- Codecs de sérialisation par préfixe (JSON rapide / binaire msgpack)
+- Lectures/écritures multi-clés en un seul aller-retour (MGET, pipelines)
+- Métriques côté client par préfixe (compteurs, latences, tailles)
 - Environnement (météo, saison, biome)
 - Listings marché actifs
 - Leaderboard
@@ -11,19 +15,215 @@ Service centralisé pour le cache Redis:
 - Sessions & rate limiting
 """
 
+import inspect
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from datetime import timedelta
 from redis import Redis, RedisError, ConnectionPool
 from redis.connection import ConnectionPool as RedisConnectionPool
+from redis.client import NEVER_DECODE
+from redis.exceptions import LockError
 from functools import wraps
 
+import config
+from services.cache_codecs import CacheCodec, decode_entry, encode_entry, get_codec
+from services.cache_metrics import CacheMetrics, key_prefix
+
 logger = logging.getLogger(__name__)
 
 
-class CacheService:
-    """Service centralisé pour tous les caches Redis"""
+# Token bucket atomique (un seul aller-retour, horloge du serveur Redis).
+# KEYS[1] = seau, ARGV = capacité, période (s), coût.
+# Retourne {autorisé (0/1), jetons restants, attente avant retry (s)}.
+# Le seau expire après une période d'inactivité (il serait plein de toute façon).
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = capacity / period
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(period * 1000))
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+# Échec de connexion: compteurs par login et par IP, blocage au seuil.
+# KEYS = échecs login, échecs IP, blocage login, blocage IP, index des sujets
+# ARGV = fenêtre (s), durée de blocage (s), seuil login, seuil IP,
+#        sujet login ("login:<login>"), sujet IP ("ip:<ip>")
+# L'index (sorted set) garde chaque sujet avec pour score l'expiration la
+# plus lointaine de ses clés: l'administration le lit sans SCAN.
+# Retourne {échecs login, échecs IP, fin du blocage posé (epoch, 0 = aucun)}.
+_LOGIN_FAILURE_LUA = """
+local now = tonumber(redis.call('TIME')[1])
+local counts = {}
+local blocked_until = 0
+for i = 1, 2 do
+    local n = redis.call('INCR', KEYS[i])
+    if n == 1 then
+        redis.call('EXPIRE', KEYS[i], ARGV[1])
+    end
+    counts[i] = n
+    local expires = now + tonumber(ARGV[1])
+    if n >= tonumber(ARGV[2 + i]) then
+        blocked_until = now + tonumber(ARGV[2])
+        redis.call('SET', KEYS[i + 2], blocked_until, 'EX', ARGV[2])
+        redis.call('DEL', KEYS[i])
+        expires = math.max(expires, blocked_until)
+    end
+    local current = tonumber(redis.call('ZSCORE', KEYS[5], ARGV[4 + i]) or 0)
+    if expires > current then
+        redis.call('ZADD', KEYS[5], expires, ARGV[4 + i])
+    end
+end
+return {counts[1], counts[2], blocked_until}
+"""
+
+
+class _SingleFlightCall:
+    """Calcul en cours pour une clé (partagé entre les threads en attente)"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce les appels concurrents sur une même clé (dans un worker).
+    
+    Le premier thread qui demande une clé exécute la fonction, les suivants
+    attendent son résultat au lieu de relancer le même calcul.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _SingleFlightCall] = {}
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Exécute fn() une seule fois pour tous les appels concurrents sur key
+        
+        Args:
+            key: Clé de coalescence
+            fn: Fonction à exécuter (sans argument)
+            
+        Returns:
+            Any: Résultat de fn() (ou exception relevée par le leader)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _SingleFlightCall()
+                self._calls[key] = call
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Cache L1 en mémoire, borné (LRU) avec TTL par entrée.
+    
+    Un cache par worker uvicorn: les valeurs retournées sont partagées
+    entre les requêtes du worker et doivent être traitées en lecture seule.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def get(self, key: str) -> Any:
+        """
+        Récupère une entrée non expirée
+        
+        Returns:
+            Any: Valeur ou _MISSING si absente/expirée
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: int):
+        """Ajoute une entrée (évince la moins récemment utilisée si plein)"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, *keys: str) -> int:
+        """Supprime des entrées, retourne le nombre d'entrées supprimées"""
+        with self._lock:
+            return sum(1 for key in keys if self._entries.pop(key, None) is not None)
+    
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheKeyspace:
+    """
+    Partie commune aux services de cache synchrone et asynchrone:
+    TTL, préfixes, politiques L1/codecs, construction des clés, sérialisation,
+    valeurs/TTL/tags à écrire et interprétation des réponses des scripts.
+    Aucune méthode de cette classe ne fait d'entrée/sortie réseau: les deux
+    variantes ne diffèrent que par leurs appels Redis.
+    """
     
     # Configuration TTL (Time To Live) en secondes
     TTL_ENVIRONMENT = 3600          # 1 heure
@@ -33,6 +233,9 @@ class CacheService:
     TTL_CURRENT_WEATHER = 3600      # 1 heure
     TTL_RECIPES = 1800              # 30 minutes
     TTL_SESSION = 86400             # 24 heures
+    TTL_LOCK = 10                   # 10 secondes (verrou de recalcul)
+    TTL_AUTH_USER = 300             # 5 minutes (identité des requêtes authentifiées)
+    TTL_AUTH_VERSION = 86400        # 24 heures (doit rester > TTL_AUTH_USER)
     
     # Préfixes de clés
     PREFIX_ENVIRONMENT = "env"
@@ -44,6 +247,487 @@ class CacheService:
     PREFIX_RECIPES = "recipes"
     PREFIX_SESSION = "session"
     PREFIX_RATE_LIMIT = "ratelimit"
+    PREFIX_LOCK = "lock"
+    PREFIX_TAG = "tag"
+    PREFIX_CRUD = "crud"
+    PREFIX_AUTH = "auth"
+    PREFIX_AUTH_VERSION = "authver"
+    PREFIX_LOGIN_FAIL = "bffail"
+    PREFIX_LOGIN_BLOCK = "bfblock"
+    PREFIX_LOGIN_INDEX = "bfindex"      # sorted set des sujets (login / IP) suivis
+    
+    # Cache L1 (mémoire du worker): TTL local par préfixe, en secondes.
+    # Seules les clés lues très souvent et rarement modifiées y passent;
+    # inventaires, sessions, marché et rate limiting restent 100% Redis.
+    L1_POLICIES = {
+        PREFIX_ENVIRONMENT: 60,
+        PREFIX_WEATHER: 60,
+        PREFIX_SEASON: 60,
+        PREFIX_LEADERBOARD: 10,
+        PREFIX_CRUD: 30,
+        PREFIX_AUTH: 60,
+        PREFIX_LOGIN_BLOCK: 30,
+    }
+    
+    # Canal pub/sub d'invalidation L1 entre workers
+    INVALIDATION_CHANNEL = "cache:invalidate"
+    
+    # Codec de sérialisation par préfixe (défaut: json).
+    # Les gros tableaux (listings, classements) passent en binaire compact,
+    # qui conserve aussi les datetime.
+    CODEC_POLICIES = {
+        PREFIX_MARKET: "msgpack",
+        PREFIX_LEADERBOARD: "msgpack",
+        PREFIX_CRUD: "msgpack",
+    }
+    
+    # Stale-while-revalidate (environnement, météo, saison): l'entrée garde
+    # son expiration douce (TTL métier) sous un TTL Redis rallongé de
+    # TTL_STALE. Passé l'expiration douce, la valeur périmée est servie
+    # tout de suite et un seul rafraîchissement tourne en arrière-plan.
+    TTL_STALE = 600                 # 10 minutes de service périmé au plus
+    XFETCH_BETA = 1.0               # > 1 = rafraîchissements anticipés plus tôt
+    SWR_MARKER = "__swr__"
+    
+    # Renseignés par les sous-classes
+    l1: Optional[LocalLRUCache] = None
+    _instance_id: str = ""
+    metrics: CacheMetrics
+    
+    # =========================================================================
+    # UTILITAIRES GÉNÉRIQUES
+    # =========================================================================
+    
+    def _make_key(self, prefix: str, *parts) -> str:
+        """
+        Crée une clé Redis formatée
+        
+        Args:
+            prefix: Préfixe de la clé
+            *parts: Parties de la clé
+            
+        Returns:
+            str: Clé formatée (ex: "market:listings:active")
+        """
+        return f"{prefix}:{':'.join(str(p) for p in parts)}"
+    
+    @staticmethod
+    def _batch_prefix(keys) -> str:
+        """Préfixe commun d'un lot de clés ("multi" si préfixes mélangés)"""
+        prefixes = {key_prefix(key) for key in keys}
+        return prefixes.pop() if len(prefixes) == 1 else "multi"
+    
+    # =========================================================================
+    # CACHE L1 (mémoire du worker)
+    # =========================================================================
+    
+    def _l1_ttl(self, key: str) -> Optional[int]:
+        """Retourne le TTL L1 applicable à une clé (None = pas de L1)"""
+        if self.l1 is None:
+            return None
+        return self.L1_POLICIES.get(key.split(":", 1)[0])
+    
+    def _on_invalidation(self, message: Dict[str, Any]):
+        """Évince du L1 local les clés invalidées par un autre worker"""
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") == self._instance_id or self.l1 is None:
+            return
+        keys = payload.get("keys") or []
+        if "*" in keys:
+            self.l1.clear()
+        else:
+            self.l1.delete(*keys)
+    
+    def _invalidation_message(self, keys) -> Optional[str]:
+        """Message pub/sub d'invalidation L1 (None si aucune clé concernée)"""
+        keys = [k for k in keys if k == "*" or self._l1_ttl(k) is not None]
+        if not keys:
+            return None
+        return json.dumps({"origin": self._instance_id, "keys": keys})
+    
+    # =========================================================================
+    # SÉRIALISATION
+    # =========================================================================
+    
+    def _codec_for(self, key: str) -> CacheCodec:
+        """Retourne le codec configuré pour le préfixe d'une clé"""
+        return get_codec(self.CODEC_POLICIES.get(key.split(":", 1)[0]))
+    
+    def _serialize(self, data: Any, key: str = "") -> bytes:
+        """Sérialise les données avec le codec du préfixe (en-tête de version inclus)"""
+        return encode_entry(data, self._codec_for(key))
+    
+    def _deserialize(self, data: Union[str, bytes, None]) -> Any:
+        """Désérialise une entrée, quel que soit le codec qui l'a écrite"""
+        return decode_entry(data)
+    
+    # =========================================================================
+    # STALE-WHILE-REVALIDATE
+    # =========================================================================
+    
+    def _swr_entry(self, value: Any, ttl: int, delta: float = 0.0) -> Dict[str, Any]:
+        """
+        Enveloppe une valeur avec son expiration douce
+        
+        Args:
+            value: Valeur métier
+            ttl: TTL doux en secondes
+            delta: Durée du calcul de la valeur (secondes, pour XFetch)
+        """
+        return {self.SWR_MARKER: 1, "value": value, "soft": time.time() + ttl, "delta": delta}
+    
+    def _unwrap(self, value: Any) -> Any:
+        """Valeur métier d'une entrée (enveloppée ou non)"""
+        if isinstance(value, dict) and self.SWR_MARKER in value:
+            return value.get("value")
+        return value
+    
+    def _swr_state(self, entry: Any, beta: float, now: Optional[float] = None) -> str:
+        """
+        État d'une entrée stale-while-revalidate lue en cache
+        
+        Returns:
+            str: "fresh" (servie telle quelle), "early" (rafraîchissement
+            anticipé tiré par XFetch: now - delta * beta * ln(rand) >= soft,
+            d'autant plus probable que l'échéance approche et que le calcul
+            est long) ou "stale" (expiration douce dépassée, ou entrée
+            écrite sans enveloppe)
+        """
+        if not (isinstance(entry, dict) and self.SWR_MARKER in entry):
+            return "stale"
+        now = time.time() if now is None else now
+        if now >= entry["soft"]:
+            return "stale"
+        delta = entry.get("delta") or 0.0
+        # 1 - random() est dans ]0, 1]: log défini
+        if delta and now - delta * beta * math.log(1.0 - random.random()) >= entry["soft"]:
+            return "early"
+        return "fresh"
+    
+    # =========================================================================
+    # CLÉS MÉTIER
+    # =========================================================================
+    
+    def _tag_key(self, tag: str) -> str:
+        """Clé du set Redis qui liste les membres d'un tag"""
+        return self._make_key(self.PREFIX_TAG, tag)
+    
+    def _add_tags(self, pipe, key: str, tags: List[str], ttl: Optional[int]):
+        """
+        Enregistre une clé dans ses sets de tags (dans le pipeline fourni)
+        
+        Le set de tag reçoit le TTL de la dernière clé ajoutée: tous les
+        membres d'un même tag ont le même TTL, le set expire donc avec
+        son membre le plus récent et ne grossit pas indéfiniment.
+        """
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, key)
+            if ttl:
+                pipe.expire(tag_key, ttl)
+    
+    def _market_key(self, resource_id: Optional[int], status: str) -> str:
+        """Clé des listings marché (par ressource ou "all")"""
+        return self._make_key(self.PREFIX_MARKET, "listings", status, resource_id or "all")
+    
+    def _market_tags(self, resource_id: Optional[int]) -> List[str]:
+        """Tags d'un listing: tout le marché + la ressource éventuelle"""
+        tags = [self._make_key(self.PREFIX_MARKET, "all")]
+        if resource_id:
+            tags.append(self._make_key(self.PREFIX_MARKET, "resource", resource_id))
+        return tags
+    
+    def _current_key(self, prefix: str) -> str:
+        """Valeur courante (PREFIX_ENVIRONMENT, PREFIX_WEATHER ou PREFIX_SEASON)"""
+        return self._make_key(prefix, "current")
+    
+    def _environment_keys(self) -> List[str]:
+        """Toutes les clés environnement (invalidation)"""
+        return [
+            self._current_key(prefix)
+            for prefix in (self.PREFIX_ENVIRONMENT, self.PREFIX_WEATHER, self.PREFIX_SEASON)
+        ]
+    
+    def _leaderboard_key(self, limit: int) -> str:
+        """Classement global (top N)"""
+        return self._make_key(self.PREFIX_LEADERBOARD, "global", limit)
+    
+    def _inventory_key(self, user_id: int) -> str:
+        """Inventaire caché d'un utilisateur"""
+        return self._make_key(self.PREFIX_INVENTORY, user_id)
+    
+    def _craftable_key(self, user_id: int, profession_id: int) -> str:
+        """Recettes craftables d'un utilisateur pour une profession"""
+        return self._make_key(self.PREFIX_RECIPES, "craftable", user_id, profession_id)
+    
+    def _session_key(self, session_id: str) -> str:
+        """Session utilisateur"""
+        return self._make_key(self.PREFIX_SESSION, session_id)
+    
+    def _rate_limit_key(self, identifier: str) -> str:
+        """Seau du token bucket d'un identifiant"""
+        return self._make_key(self.PREFIX_RATE_LIMIT, identifier)
+    
+    def _recipes_tag(self, user_id: int) -> str:
+        """Tag regroupant les recettes craftables d'un utilisateur"""
+        return self._make_key(self.PREFIX_RECIPES, "craftable", user_id)
+    
+    def _crud_key(self, table: str, id: Any) -> str:
+        """Entrée d'une ligne de catalogue lue par id (utils.db_crud)"""
+        return self._make_key(self.PREFIX_CRUD, table, id)
+    
+    def _auth_keys(self, user_id: str) -> Tuple[str, str]:
+        """(compteur de version, identité cachée) d'un utilisateur"""
+        return (
+            self._make_key(self.PREFIX_AUTH_VERSION, user_id),
+            self._make_key(self.PREFIX_AUTH, user_id),
+        )
+    
+    @staticmethod
+    def _auth_user_from(version: Any, entry: Any) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Identité cachée, si elle a été écrite pour la version courante"""
+        version = int(version or 0)
+        if isinstance(entry, dict) and entry.get("version") == version:
+            return version, entry.get("user")
+        return version, None
+    
+    def _recipe_catalog_key(self, profession: Optional[str]) -> str:
+        """Catalogue public des recettes (toutes ou d'une profession)"""
+        return self._make_key(self.PREFIX_RECIPES, "catalog", profession or "all")
+    
+    def _recipe_catalog_tag(self) -> str:
+        """Tag regroupant toutes les variantes du catalogue"""
+        return self._make_key(self.PREFIX_RECIPES, "catalog")
+    
+    def _dashboard_keys(
+        self,
+        user_id: int,
+        profession_ids: List[int],
+        leaderboard_limit: int
+    ) -> Dict[str, Any]:
+        """Clés Redis nécessaires au rendu du dashboard"""
+        return {
+            "inventory": self._inventory_key(user_id),
+            "environment": self._current_key(self.PREFIX_ENVIRONMENT),
+            "leaderboard": self._leaderboard_key(leaderboard_limit),
+            "craftable_recipes": {
+                pid: self._craftable_key(user_id, pid) for pid in profession_ids
+            },
+        }
+    
+    # =========================================================================
+    # CHARGES UTILES (valeurs, TTL et tags écrits par les deux variantes)
+    # =========================================================================
+    
+    def _swr_item(self, value: Any, ttl: int) -> Tuple[Dict[str, Any], int]:
+        """(entrée enveloppée, TTL Redis) d'une valeur servie en stale-while-revalidate"""
+        return self._swr_entry(value, ttl), ttl + self.TTL_STALE
+    
+    def _craftable_items(
+        self,
+        user_id: int,
+        recipes_by_profession: Dict[int, List[Dict]]
+    ) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """({clé: recettes}, {clé: tags}) des recettes craftables, pour set_many"""
+        items = {
+            self._craftable_key(user_id, pid): recipes
+            for pid, recipes in recipes_by_profession.items()
+        }
+        tag = [self._recipes_tag(user_id)]
+        return items, {key: tag for key in items}
+    
+    @staticmethod
+    def _dashboard_read_keys(keys: Dict[str, Any]) -> List[str]:
+        """Clés de _dashboard_keys à lire en un seul MGET"""
+        flat = [key for name, key in keys.items() if name != "craftable_recipes"]
+        return flat + list(keys["craftable_recipes"].values())
+    
+    @staticmethod
+    def _dashboard_bundle(keys: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+        """Dashboard assemblé à partir des valeurs lues (None = absent du cache)"""
+        bundle = {
+            name: values[key] for name, key in keys.items() if name != "craftable_recipes"
+        }
+        bundle["craftable_recipes"] = {
+            pid: values[key] for pid, key in keys["craftable_recipes"].items()
+        }
+        return bundle
+    
+    def _dashboard_items(
+        self,
+        user_id: int,
+        inventory: Optional[List[Dict[str, Any]]],
+        craftable_recipes: Dict[int, List[Dict]],
+        environment: Optional[Dict[str, Any]],
+        leaderboard: Optional[List[Dict[str, Any]]],
+        leaderboard_limit: int
+    ) -> Tuple[Dict[str, Any], Dict[str, int], Dict[str, List[str]]]:
+        """
+        (items, ttls, tags) du préchauffage d'un dashboard, pour set_many
+        
+        Chaque entrée garde son TTL habituel; les entrées None sont ignorées.
+        """
+        keys = self._dashboard_keys(user_id, list(craftable_recipes), leaderboard_limit)
+        
+        items: Dict[str, Any] = {}
+        ttls: Dict[str, int] = {}
+        tags: Dict[str, List[str]] = {}
+        if inventory is not None:
+            items[keys["inventory"]] = inventory
+            ttls[keys["inventory"]] = self.TTL_USER_INVENTORY
+        if environment is not None:
+            items[keys["environment"]], ttls[keys["environment"]] = self._swr_item(
+                environment, self.TTL_ENVIRONMENT
+            )
+        if leaderboard is not None:
+            items[keys["leaderboard"]] = leaderboard
+            ttls[keys["leaderboard"]] = self.TTL_LEADERBOARD
+            tags[keys["leaderboard"]] = [self.PREFIX_LEADERBOARD]
+        for pid, recipes in craftable_recipes.items():
+            key = keys["craftable_recipes"][pid]
+            items[key] = recipes
+            ttls[key] = self.TTL_RECIPES
+            tags[key] = [self._recipes_tag(user_id)]
+        return items, ttls, tags
+    
+    @staticmethod
+    def _rate_limit_result(allowed: Any, tokens: Any, retry_after: Any) -> Tuple[bool, int, float]:
+        """Réponse du script token bucket → (autorisé, requêtes restantes, secondes avant retry)"""
+        return bool(allowed), int(float(tokens)), float(retry_after)
+    
+    # =========================================================================
+    # BRUTE-FORCE (clés et réponses des compteurs d'échecs)
+    # =========================================================================
+    
+    def _login_keys(self, prefix: str, login: str, ip: str) -> List[str]:
+        return [self._make_key(prefix, "login", login), self._make_key(prefix, "ip", ip)]
+    
+    def _login_index_key(self) -> str:
+        return self._make_key(self.PREFIX_LOGIN_INDEX, "subjects")
+    
+    def _login_subject_keys(self, kind: str, subject: str) -> List[str]:
+        """(blocage, échecs) d'un login ou d'une IP"""
+        return [
+            self._make_key(self.PREFIX_LOGIN_BLOCK, kind, subject),
+            self._make_key(self.PREFIX_LOGIN_FAIL, kind, subject),
+        ]
+    
+    def _login_block_from_l1(self, keys: List[str]) -> float:
+        """Fin (epoch) du plus long blocage déjà vu par ce worker, 0 si aucun"""
+        if self.l1 is None:
+            return 0
+        cached = [self.l1.get(key) for key in keys]
+        return max((value for value in cached if value is not _MISSING), default=0)
+    
+    def _login_block_from(self, keys: List[str], values: List[Any], now: float) -> float:
+        """Fin (epoch) du plus long blocage lu en Redis, 0 si aucun; garde les blocages en L1"""
+        until = 0
+        for key, value in zip(keys, values):
+            if value is None or int(value) <= now:
+                continue
+            until = max(until, int(value))
+            if self.l1 is not None:
+                self.l1.set(key, int(value), min(self._l1_ttl(key), math.ceil(int(value) - now)))
+        return until
+    
+    def _login_failure_call(
+        self,
+        login: str,
+        ip: str,
+        threshold: int,
+        ip_threshold: int,
+        window_seconds: int,
+        block_seconds: int
+    ) -> Tuple[List[str], List[Any]]:
+        """(KEYS, ARGV) du script _LOGIN_FAILURE_LUA"""
+        keys = (
+            self._login_keys(self.PREFIX_LOGIN_FAIL, login, ip)
+            + self._login_keys(self.PREFIX_LOGIN_BLOCK, login, ip)
+            + [self._login_index_key()]
+        )
+        args = [
+            window_seconds, block_seconds, threshold, ip_threshold,
+            f"login:{login}", f"ip:{ip}",
+        ]
+        return keys, args
+    
+    @staticmethod
+    def _login_failure_result(result: List[Any]) -> Tuple[int, int, float]:
+        """Réponse de _LOGIN_FAILURE_LUA → (échecs login, échecs IP, secondes de blocage posées)"""
+        login_count, ip_count, blocked_until = result
+        blocked_for = max(0.0, int(blocked_until) - time.time()) if int(blocked_until) else 0.0
+        return int(login_count), int(ip_count), blocked_for
+    
+    @staticmethod
+    def _login_failure_entries(
+        members: List[str],
+        results: List[Any]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Entrées d'administration à partir des paires (TTL blocage, échecs) lues
+        
+        Returns:
+            Tuple: (entrées, bloquées d'abord ; sujets à retirer de l'index)
+        """
+        entries = []
+        stale = []
+        for i, member in enumerate(members):
+            blocked_ttl, failures = results[2 * i], results[2 * i + 1]
+            if blocked_ttl < 0 and failures is None:
+                # Échecs remis à zéro (connexion réussie) depuis l'indexation
+                stale.append(member)
+                continue
+            kind, subject = member.split(":", 1)
+            entries.append({
+                "kind": kind,
+                "subject": subject,
+                "failures": int(failures or 0),
+                "blocked_for": max(0, blocked_ttl),
+            })
+        entries.sort(key=lambda e: (-e["blocked_for"], -e["failures"]))
+        return entries, stale
+    
+    # =========================================================================
+    # STATISTIQUES
+    # =========================================================================
+    
+    def _stats_from_info(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Statistiques serveur à partir de la réponse INFO"""
+        return {
+            "connected_clients": info.get("connected_clients", 0),
+            "used_memory_human": info.get("used_memory_human", "0B"),
+            "used_memory_peak_human": info.get("used_memory_peak_human", "0B"),
+            "total_commands_processed": info.get("total_commands_processed", 0),
+            "keyspace_hits": info.get("keyspace_hits", 0),
+            "keyspace_misses": info.get("keyspace_misses", 0),
+            "hit_rate": self._calculate_hit_rate(info),
+            "uptime_in_seconds": info.get("uptime_in_seconds", 0),
+            "redis_version": info.get("redis_version", "unknown"),
+            "l1_entries": len(self.l1) if self.l1 is not None else None
+        }
+    
+    def get_client_metrics(self) -> Dict[str, Any]:
+        """
+        Métriques côté client par préfixe (ce worker uniquement)
+        
+        Returns:
+            Dict: {prefix: {operations, hit_rate, latency, payload_size}}
+        """
+        return self.metrics.snapshot()
+    
+    def _calculate_hit_rate(self, info: Dict) -> float:
+        """Calcule le taux de hit du cache"""
+        hits = info.get("keyspace_hits", 0)
+        misses = info.get("keyspace_misses", 0)
+        total = hits + misses
+        return (hits / total * 100) if total > 0 else 0.0
+
+
+class CacheService(CacheKeyspace):
+    """Service centralisé pour tous les caches Redis"""
     
     def __init__(
         self,
@@ -52,7 +736,9 @@ class CacheService:
         password: Optional[str] = None,
         db: int = 0,
         max_connections: int = 50,
-        decode_responses: bool = True
+        decode_responses: bool = True,
+        l1_enabled: bool = False,
+        l1_max_entries: int = 1024
     ):
         """
         Initialise la connexion Redis avec pool de connexions
@@ -64,6 +750,8 @@ class CacheService:
             db: Numéro de base Redis (0-15)
             max_connections: Nombre max de connexions dans le pool
             decode_responses: Décoder automatiquement en UTF-8
+            l1_enabled: Active le cache L1 en mémoire (voir L1_POLICIES)
+            l1_max_entries: Nombre max d'entrées du cache L1
         """
         try:
             # Pool de connexions pour performance
@@ -80,43 +768,65 @@ class CacheService:
             )
             
             self.redis: Redis = Redis(connection_pool=self.pool)
+            self._singleflight = SingleFlight()
+            self._refreshing: set = set()
+            self._refreshing_lock = threading.Lock()
+            self.metrics = CacheMetrics()
+            self._token_bucket = self.redis.register_script(_TOKEN_BUCKET_LUA)
+            self._login_failure = self.redis.register_script(_LOGIN_FAILURE_LUA)
             
             # Test de connexion
             self.redis.ping()
             logger.info(f"✅ Connexion Redis établie: {host}:{port} (DB {db})")
             
+            # Cache L1 + abonnement aux invalidations des autres workers
+            self._instance_id = uuid.uuid4().hex
+            self.l1: Optional[LocalLRUCache] = None
+            self._pubsub = None
+            self._pubsub_thread = None
+            if l1_enabled:
+                self.l1 = LocalLRUCache(max_entries=l1_max_entries)
+                self._start_invalidation_listener()
+            
         except RedisError as e:
             logger.error(f"❌ Erreur connexion Redis: {e}")
             raise
     
     # =========================================================================
-    # UTILITAIRES GÉNÉRIQUES
+    # CACHE L1 (mémoire du worker)
     # =========================================================================
     
-    def _make_key(self, prefix: str, *parts) -> str:
-        """
-        Crée une clé Redis formatée
-        
-        Args:
-            prefix: Préfixe de la clé
-            *parts: Parties de la clé
-            
-        Returns:
-            str: Clé formatée (ex: "market:listings:active")
-        """
-        return f"{prefix}:{':'.join(str(p) for p in parts)}"
+    def _start_invalidation_listener(self):
+        """Écoute le canal d'invalidation dans un thread daemon"""
+        try:
+            self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.INVALIDATION_CHANNEL: self._on_invalidation})
+            self._pubsub_thread = self._pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_listener_error
+            )
+        except RedisError as e:
+            # Sans invalidation, le L1 servirait des valeurs périmées
+            logger.error(f"❌ Abonnement invalidation L1 impossible, L1 désactivé: {e}")
+            self.l1 = None
     
-    def _serialize(self, data: Any) -> str:
-        """Sérialise les données en JSON"""
-        return json.dumps(data, default=str)
+    def _on_listener_error(self, error: Exception, pubsub, thread):
+        """Erreur pub/sub: des invalidations ont pu être perdues, on vide le L1"""
+        logger.error(f"Erreur écoute invalidations L1: {error}")
+        if self.l1 is not None:
+            self.l1.clear()
+        time.sleep(1.0)
     
-    def _deserialize(self, data: Union[str, bytes, None]) -> Any:
-        """Désérialise les données JSON"""
-        if data is None:
-            return None
-        if isinstance(data, bytes):
-            data = data.decode('utf-8')
-        return json.loads(data)
+    def _publish_invalidation(self, *keys: str):
+        """Publie l'invalidation de clés L1 vers les autres workers"""
+        message = self._invalidation_message(keys)
+        if message is None:
+            return
+        try:
+            self.redis.publish(self.INVALIDATION_CHANNEL, message)
+        except RedisError as e:
+            logger.error(f"Erreur publication invalidation L1 keys={keys}: {e}")
     
     def set(
         self,
@@ -124,28 +834,48 @@ class CacheService:
         value: Any,
         ttl: Optional[int] = None,
         nx: bool = False,
-        xx: bool = False
+        xx: bool = False,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
         Définit une valeur dans Redis
         
         Args:
             key: Clé Redis
-            value: Valeur (sera sérialisée en JSON)
+            value: Valeur (sérialisée avec le codec du préfixe)
             ttl: Time To Live en secondes (None = pas d'expiration)
             nx: Set only if Not eXists
             xx: Set only if eXists
+            tags: Tags d'invalidation de la clé (voir invalidate_tags)
             
         Returns:
             bool: Succès de l'opération
         """
+        prefix = key_prefix(key)
+        start = time.perf_counter()
         try:
-            serialized = self._serialize(value)
-            result = self.redis.set(key, serialized, ex=ttl, nx=nx, xx=xx)
-            return bool(result)
+            serialized = self._serialize(value, key)
+            if tags:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.set(key, serialized, ex=ttl, nx=nx, xx=xx)
+                self._add_tags(pipe, key, tags, ttl)
+                result = pipe.execute()[0]
+            else:
+                result = self.redis.set(key, serialized, ex=ttl, nx=nx, xx=xx)
         except RedisError as e:
             logger.error(f"Erreur set Redis key={key}: {e}")
+            self.metrics.record(prefix, "set", "error", time.perf_counter() - start)
             return False
+        self.metrics.record(
+            prefix, "set", "ok" if result else "skipped", time.perf_counter() - start
+        )
+        self.metrics.record_size(prefix, "write", len(serialized))
+        
+        l1_ttl = self._l1_ttl(key)
+        if l1_ttl is not None and result:
+            self.l1.set(key, value, min(l1_ttl, ttl) if ttl else l1_ttl)
+            self._publish_invalidation(key)
+        return bool(result)
     
     def get(self, key: str) -> Any:
         """
@@ -157,12 +887,41 @@ class CacheService:
         Returns:
             Any: Valeur désérialisée ou None
         """
+        return self._unwrap(self._get_entry(key))
+    
+    def _get_entry(self, key: str) -> Any:
+        """Entrée brute (enveloppe stale-while-revalidate incluse)"""
+        prefix = key_prefix(key)
+        l1_ttl = self._l1_ttl(key)
+        if l1_ttl is not None:
+            value = self.l1.get(key)
+            if value is not _MISSING:
+                self.metrics.record(prefix, "get", "l1_hit")
+                return value
+        
+        start = time.perf_counter()
         try:
-            data = self.redis.get(key)
-            return self._deserialize(data)
+            # Payload binaire: pas de décodage UTF-8 côté client
+            data = self.redis.execute_command("GET", key, **{NEVER_DECODE: []})
+            value = self._deserialize(data)
         except RedisError as e:
             logger.error(f"Erreur get Redis key={key}: {e}")
+            self.metrics.record(prefix, "get", "error", time.perf_counter() - start)
             return None
+        except ValueError as e:
+            logger.error(f"Entrée cache illisible key={key}: {e}")
+            self.metrics.record(prefix, "get", "error", time.perf_counter() - start)
+            return None
+        
+        self.metrics.record(
+            prefix, "get", "miss" if data is None else "hit", time.perf_counter() - start
+        )
+        if data is not None:
+            self.metrics.record_size(prefix, "read", len(data))
+        
+        if l1_ttl is not None and value is not None:
+            self.l1.set(key, value, l1_ttl)
+        return value
     
     def delete(self, *keys: str) -> int:
         """
@@ -174,11 +933,186 @@ class CacheService:
         Returns:
             int: Nombre de clés supprimées
         """
+        if self.l1 is not None:
+            self.l1.delete(*keys)
+            self._publish_invalidation(*keys)
+        prefix = self._batch_prefix(keys)
+        start = time.perf_counter()
         try:
-            return self.redis.delete(*keys)
+            deleted = self.redis.delete(*keys)
         except RedisError as e:
             logger.error(f"Erreur delete Redis keys={keys}: {e}")
+            self.metrics.record(prefix, "delete", "error", time.perf_counter() - start)
+            return 0
+        self.metrics.record(prefix, "delete", "ok", time.perf_counter() - start)
+        return deleted
+    
+    # =========================================================================
+    # OPÉRATIONS MULTI-CLÉS (un seul aller-retour réseau)
+    # =========================================================================
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Récupère plusieurs valeurs en un seul MGET
+        
+        Les clés présentes dans le cache L1 ne sont pas redemandées à Redis.
+        
+        Args:
+            keys: Clés Redis
+            
+        Returns:
+            Dict: {clé: valeur désérialisée ou None}, dans l'ordre des clés
+        """
+        result: Dict[str, Any] = {key: None for key in keys}
+        to_fetch = []
+        for key in result:
+            if self._l1_ttl(key) is not None:
+                value = self.l1.get(key)
+                if value is not _MISSING:
+                    result[key] = self._unwrap(value)
+                    self.metrics.record(key_prefix(key), "mget", "l1_hit")
+                    continue
+            to_fetch.append(key)
+        
+        if not to_fetch:
+            return result
+        
+        prefix = self._batch_prefix(to_fetch)
+        start = time.perf_counter()
+        try:
+            raw_values = self.redis.execute_command("MGET", *to_fetch, **{NEVER_DECODE: []})
+        except RedisError as e:
+            logger.error(f"Erreur get_many Redis keys={to_fetch}: {e}")
+            self.metrics.record(prefix, "mget", "error", time.perf_counter() - start)
+            return result
+        duration = time.perf_counter() - start
+        
+        for key, data in zip(to_fetch, raw_values):
+            # Latence de l'aller-retour comptée une seule fois pour le lot
+            self.metrics.record(key_prefix(key), "mget", "miss" if data is None else "hit")
+            if data is not None:
+                self.metrics.record_size(key_prefix(key), "read", len(data))
+            try:
+                value = self._deserialize(data)
+            except ValueError as e:
+                logger.error(f"Entrée cache illisible key={key}: {e}")
+                continue
+            result[key] = self._unwrap(value)
+            l1_ttl = self._l1_ttl(key)
+            if l1_ttl is not None and value is not None:
+                self.l1.set(key, value, l1_ttl)
+        self.metrics.record(prefix, "mget", "batch", duration)
+        
+        return result
+    
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        ttls: Optional[Dict[str, Optional[int]]] = None,
+        tags: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
+        """
+        Définit plusieurs valeurs en un seul pipeline
+        
+        Args:
+            items: {clé: valeur}
+            ttl: TTL par défaut en secondes (None = pas d'expiration)
+            ttls: TTL spécifique par clé (prioritaire sur ttl)
+            tags: Tags d'invalidation par clé
+            
+        Returns:
+            bool: Succès de l'opération
+        """
+        if not items:
+            return True
+        ttls = ttls or {}
+        tags = tags or {}
+        
+        prefix = self._batch_prefix(items)
+        start = time.perf_counter()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in items.items():
+                key_ttl = ttls.get(key, ttl)
+                serialized = self._serialize(value, key)
+                self.metrics.record_size(key_prefix(key), "write", len(serialized))
+                pipe.set(key, serialized, ex=key_ttl)
+                if tags.get(key):
+                    self._add_tags(pipe, key, tags[key], key_ttl)
+            pipe.execute()
+        except RedisError as e:
+            logger.error(f"Erreur set_many Redis keys={list(items)}: {e}")
+            self.metrics.record(prefix, "mset", "error", time.perf_counter() - start)
+            return False
+        self.metrics.record(prefix, "mset", "batch", time.perf_counter() - start)
+        
+        l1_keys = []
+        for key, value in items.items():
+            l1_ttl = self._l1_ttl(key)
+            if l1_ttl is None:
+                continue
+            key_ttl = ttls.get(key, ttl)
+            self.l1.set(key, value, min(l1_ttl, key_ttl) if key_ttl else l1_ttl)
+            l1_keys.append(key)
+        if l1_keys:
+            self._publish_invalidation(*l1_keys)
+        
+        return True
+    
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Supprime plusieurs clés en une seule commande DEL
+        
+        Args:
+            keys: Clés à supprimer
+            
+        Returns:
+            int: Nombre de clés supprimées
+        """
+        if not keys:
             return 0
+        return self.delete(*keys)
+    
+    # =========================================================================
+    # TAGS D'INVALIDATION
+    # =========================================================================
+    
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Supprime toutes les clés rattachées à un ou plusieurs tags
+        
+        Coût O(membres) quel que soit le nombre de clés dans Redis
+        (pas de SCAN). Les membres déjà expirés sont ignorés par DEL.
+        
+        Args:
+            *tags: Tags à invalider
+            
+        Returns:
+            int: Nombre de clés supprimées
+        """
+        if not tags:
+            return 0
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        
+        try:
+            # Lecture + suppression des sets atomiques: une clé taguée
+            # entre les deux restera rattachée à un nouveau set
+            pipe = self.redis.pipeline(transaction=True)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            pipe.delete(*tag_keys)
+            results = pipe.execute()
+        except RedisError as e:
+            logger.error(f"Erreur invalidation tags={list(tags)}: {e}")
+            return 0
+        
+        members = set()
+        for tag_members in results[:-1]:
+            members.update(tag_members)
+        if not members:
+            return 0
+        return self.delete(*members)
     
     def exists(self, *keys: str) -> int:
         """
@@ -213,39 +1147,244 @@ class CacheService:
             logger.error(f"Erreur expire Redis key={key}: {e}")
             return False
     
-    def increment(self, key: str, amount: int = 1) -> int:
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Incrémente une valeur
+        
+        Args:
+            key: Clé Redis
+            amount: Montant d'incrémentation
+            
+        Returns:
+            int: Nouvelle valeur
+        """
+        try:
+            return self.redis.incrby(key, amount)
+        except RedisError as e:
+            logger.error(f"Erreur increment Redis key={key}: {e}")
+            return 0
+    
+    def decrement(self, key: str, amount: int = 1) -> int:
+        """
+        Décrémente une valeur
+        
+        Args:
+            key: Clé Redis
+            amount: Montant de décrémentation
+            
+        Returns:
+            int: Nouvelle valeur
+        """
+        try:
+            return self.redis.decrby(key, amount)
+        except RedisError as e:
+            logger.error(f"Erreur decrement Redis key={key}: {e}")
+            return 0
+    
+    # =========================================================================
+    # CACHE-ASIDE AVEC PROTECTION SINGLE-FLIGHT
+    # =========================================================================
+    
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        lock_timeout: int = CacheKeyspace.TTL_LOCK,
+        tags: Optional[List[str]] = None
+    ) -> Any:
         """
-        Incrémente une valeur
+        Récupère une valeur ou la calcule une seule fois en cas de MISS
+        
+        Les MISS concurrents sur la même clé sont coalescés:
+        - dans le worker: un seul thread exécute loader, les autres attendent
+        - entre workers: un verrou Redis (lock:<key>) désigne le worker qui
+          recalcule, les autres relisent le cache jusqu'à lock_timeout
         
         Args:
             key: Clé Redis
-            amount: Montant d'incrémentation
+            loader: Fonction qui calcule la valeur en cas de MISS
+            ttl: Time To Live en secondes
+            lock_timeout: Durée max du verrou / de l'attente (secondes)
+            tags: Tags d'invalidation de la valeur calculée
             
         Returns:
-            int: Nouvelle valeur
+            Any: Valeur cachée ou calculée
         """
+        cached_value = self.get(key)
+        if cached_value is not None:
+            logger.debug(f"Cache HIT: {key}")
+            return cached_value
+        
+        return self._singleflight.do(
+            key,
+            lambda: self._load_with_lock(key, loader, ttl, lock_timeout, tags)
+        )
+    
+    def _load_with_lock(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int],
+        lock_timeout: int,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Recalcule une valeur sous verrou Redis (un seul worker à la fois)"""
+        # Un autre thread a peut-être rempli le cache pendant notre attente
+        cached_value = self.get(key)
+        if cached_value is not None:
+            return cached_value
+        
+        lock = None
         try:
-            return self.redis.incrby(key, amount)
+            lock = self.redis.lock(
+                self._make_key(self.PREFIX_LOCK, key),
+                timeout=lock_timeout,
+                blocking=False
+            )
+            acquired = lock.acquire()
         except RedisError as e:
-            logger.error(f"Erreur increment Redis key={key}: {e}")
-            return 0
+            logger.error(f"Erreur verrou Redis key={key}: {e}")
+            acquired = False
+            lock = None
+        
+        if lock is not None and not acquired:
+            # Un autre worker recalcule: on attend son résultat
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                cached_value = self.get(key)
+                if cached_value is not None:
+                    logger.debug(f"Cache HIT (après attente): {key}")
+                    return cached_value
+            logger.warning(f"⚠️  Attente verrou expirée, recalcul local: {key}")
+        
+        try:
+            logger.debug(f"Cache MISS: {key}")
+            result = loader()
+            if result is not None:
+                self.set(key, result, ttl=ttl, tags=tags)
+            return result
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except (LockError, RedisError):
+                    # Verrou expiré entre-temps: rien à libérer
+                    pass
     
-    def decrement(self, key: str, amount: int = 1) -> int:
+    # =========================================================================
+    # STALE-WHILE-REVALIDATE (rafraîchissement en arrière-plan)
+    # =========================================================================
+    
+    def get_or_refresh(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int = CacheKeyspace.TTL_STALE,
+        beta: float = CacheKeyspace.XFETCH_BETA,
+        lock_timeout: int = CacheKeyspace.TTL_LOCK
+    ) -> Any:
         """
-        Décrémente une valeur
+        Récupère une valeur sans jamais attendre son recalcul, sauf au premier MISS
+        
+        - MISS: calcul bloquant, single-flight (comme get_or_set)
+        - expiration douce dépassée: valeur périmée servie immédiatement,
+          un seul rafraîchissement en arrière-plan (un thread par clé dans le
+          worker, verrou Redis lock:refresh:<key> entre workers)
+        - avant l'échéance: rafraîchissement anticipé probabiliste (XFetch),
+          qui étale les recalculs au lieu de les concentrer à l'expiration
         
         Args:
             key: Clé Redis
-            amount: Montant de décrémentation
+            loader: Fonction qui calcule la valeur
+            ttl: TTL doux en secondes (fraîcheur métier)
+            stale_ttl: Durée supplémentaire pendant laquelle la valeur périmée reste servie
+            beta: Agressivité de l'anticipation XFetch (0 = désactivée)
+            lock_timeout: Durée max du verrou de recalcul (secondes)
             
         Returns:
-            int: Nouvelle valeur
+            Any: Valeur cachée ou calculée
         """
+        prefix = key_prefix(key)
+        entry = self._get_entry(key)
+        if entry is None:
+            self.metrics.record(prefix, "swr", "miss")
+            return self._unwrap(self.get_or_set(
+                key,
+                lambda: self._compute_swr_entry(loader, ttl),
+                ttl=ttl + stale_ttl,
+                lock_timeout=lock_timeout
+            ))
+        
+        state = self._swr_state(entry, beta)
+        self.metrics.record(prefix, "swr", state)
+        if state != "fresh":
+            self._refresh_in_background(key, loader, ttl, stale_ttl, lock_timeout)
+        return self._unwrap(entry)
+    
+    def _compute_swr_entry(self, loader: Callable[[], Any], ttl: int) -> Optional[Dict[str, Any]]:
+        """Exécute loader et enveloppe le résultat avec son coût de calcul"""
+        start = time.perf_counter()
+        value = loader()
+        if value is None:
+            return None
+        return self._swr_entry(value, ttl, delta=time.perf_counter() - start)
+    
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        lock_timeout: int
+    ):
+        """Lance le rafraîchissement d'une clé, sauf s'il tourne déjà dans ce worker"""
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh_entry,
+            args=(key, loader, ttl, stale_ttl, lock_timeout),
+            name=f"cache-refresh-{key}",
+            daemon=True
+        ).start()
+    
+    def _refresh_entry(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        lock_timeout: int
+    ):
+        """
+        Recalcule une entrée si aucun autre worker ne le fait déjà
+        
+        Le verrou n'est pas relâché après un succès: il expire seul au bout
+        de lock_timeout, ce qui évite qu'un worker ayant lu l'ancienne
+        entrée juste avant l'écriture relance aussitôt un second calcul.
+        """
+        lock_key = self._make_key(self.PREFIX_LOCK, "refresh", key)
         try:
-            return self.redis.decrby(key, amount)
+            if not self.redis.set(lock_key, self._instance_id, nx=True, ex=lock_timeout):
+                return
+            try:
+                entry = self._compute_swr_entry(loader, ttl)
+            except Exception as e:
+                self.redis.delete(lock_key)
+                logger.error(f"Erreur rafraîchissement key={key}: {e}", exc_info=True)
+                return
+            if entry is not None:
+                self.set(key, entry, ttl=ttl + stale_ttl)
+                logger.debug(f"Cache rafraîchi en arrière-plan: {key}")
         except RedisError as e:
-            logger.error(f"Erreur decrement Redis key={key}: {e}")
-            return 0
+            logger.error(f"Erreur verrou de rafraîchissement key={key}: {e}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
     
     # =========================================================================
     # ENVIRONNEMENT (météo, saison, biome)
@@ -258,8 +1397,7 @@ class CacheService:
         Returns:
             Dict: {weather: {...}, season: {...}, timestamp: ...}
         """
-        key = self._make_key(self.PREFIX_ENVIRONMENT, "current")
-        return self.get(key)
+        return self.get(self._current_key(self.PREFIX_ENVIRONMENT))
     
     def set_current_environment(self, environment: Dict[str, Any]) -> bool:
         """
@@ -271,37 +1409,51 @@ class CacheService:
         Returns:
             bool: Succès
         """
-        key = self._make_key(self.PREFIX_ENVIRONMENT, "current")
-        return self.set(key, environment, ttl=self.TTL_ENVIRONMENT)
+        entry, ttl = self._swr_item(environment, self.TTL_ENVIRONMENT)
+        return self.set(self._current_key(self.PREFIX_ENVIRONMENT), entry, ttl=ttl)
+    
+    def get_or_load_environment(self, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Environnement actuel en stale-while-revalidate (voir get_or_refresh):
+        seul le tout premier MISS attend loader
+        
+        Args:
+            loader: Calcul de l'environnement (services.environment_service)
+        """
+        key = self._current_key(self.PREFIX_ENVIRONMENT)
+        return self.get_or_refresh(key, loader, ttl=self.TTL_ENVIRONMENT)
     
     def get_current_weather(self) -> Optional[Dict[str, Any]]:
         """Récupère la météo actuelle depuis le cache"""
-        key = self._make_key(self.PREFIX_WEATHER, "current")
-        return self.get(key)
+        return self.get(self._current_key(self.PREFIX_WEATHER))
     
     def set_current_weather(self, weather: Dict[str, Any]) -> bool:
         """Cache la météo actuelle"""
-        key = self._make_key(self.PREFIX_WEATHER, "current")
-        return self.set(key, weather, ttl=self.TTL_CURRENT_WEATHER)
+        entry, ttl = self._swr_item(weather, self.TTL_CURRENT_WEATHER)
+        return self.set(self._current_key(self.PREFIX_WEATHER), entry, ttl=ttl)
+    
+    def get_or_load_weather(self, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Météo actuelle en stale-while-revalidate (voir get_or_refresh)"""
+        key = self._current_key(self.PREFIX_WEATHER)
+        return self.get_or_refresh(key, loader, ttl=self.TTL_CURRENT_WEATHER)
     
     def get_current_season(self) -> Optional[Dict[str, Any]]:
         """Récupère la saison actuelle depuis le cache"""
-        key = self._make_key(self.PREFIX_SEASON, "current")
-        return self.get(key)
+        return self.get(self._current_key(self.PREFIX_SEASON))
     
     def set_current_season(self, season: Dict[str, Any]) -> bool:
         """Cache la saison actuelle"""
-        key = self._make_key(self.PREFIX_SEASON, "current")
-        return self.set(key, season, ttl=self.TTL_ENVIRONMENT)
+        entry, ttl = self._swr_item(season, self.TTL_ENVIRONMENT)
+        return self.set(self._current_key(self.PREFIX_SEASON), entry, ttl=ttl)
+    
+    def get_or_load_season(self, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Saison actuelle en stale-while-revalidate (voir get_or_refresh)"""
+        key = self._current_key(self.PREFIX_SEASON)
+        return self.get_or_refresh(key, loader, ttl=self.TTL_ENVIRONMENT)
     
     def invalidate_environment(self) -> int:
         """Invalide tous les caches environnement"""
-        keys = [
-            self._make_key(self.PREFIX_ENVIRONMENT, "current"),
-            self._make_key(self.PREFIX_WEATHER, "current"),
-            self._make_key(self.PREFIX_SEASON, "current")
-        ]
-        return self.delete(*keys)
+        return self.delete(*self._environment_keys())
     
     # =========================================================================
     # MARCHÉ
@@ -322,12 +1474,7 @@ class CacheService:
         Returns:
             List[Dict]: Liste des listings ou None
         """
-        if resource_id:
-            key = self._make_key(self.PREFIX_MARKET, "listings", status, resource_id)
-        else:
-            key = self._make_key(self.PREFIX_MARKET, "listings", status, "all")
-        
-        return self.get(key)
+        return self.get(self._market_key(resource_id, status))
     
     def set_market_listings(
         self,
@@ -346,12 +1493,12 @@ class CacheService:
         Returns:
             bool: Succès
         """
-        if resource_id:
-            key = self._make_key(self.PREFIX_MARKET, "listings", status, resource_id)
-        else:
-            key = self._make_key(self.PREFIX_MARKET, "listings", status, "all")
-        
-        return self.set(key, listings, ttl=self.TTL_MARKET_LISTINGS)
+        return self.set(
+            self._market_key(resource_id, status),
+            listings,
+            ttl=self.TTL_MARKET_LISTINGS,
+            tags=self._market_tags(resource_id)
+        )
     
     def invalidate_market_cache(self, resource_id: Optional[int] = None) -> int:
         """
@@ -364,20 +1511,10 @@ class CacheService:
             int: Nombre de clés supprimées
         """
         if resource_id:
-            # Invalider seulement cette ressource
-            pattern = f"{self.PREFIX_MARKET}:listings:*:{resource_id}"
-        else:
-            # Invalider tout le marché
-            pattern = f"{self.PREFIX_MARKET}:listings:*"
-        
-        # Scan pattern (plus sûr que KEYS)
-        keys_to_delete = []
-        for key in self.redis.scan_iter(match=pattern, count=100):
-            keys_to_delete.append(key)
-        
-        if keys_to_delete:
-            return self.delete(*keys_to_delete)
-        return 0
+            # Invalider seulement cette ressource (tous statuts)
+            return self.invalidate_tags(self._make_key(self.PREFIX_MARKET, "resource", resource_id))
+        # Invalider tout le marché
+        return self.invalidate_tags(self._make_key(self.PREFIX_MARKET, "all"))
     
     # =========================================================================
     # LEADERBOARD
@@ -393,8 +1530,7 @@ class CacheService:
         Returns:
             List[Dict]: Classement ou None
         """
-        key = self._make_key(self.PREFIX_LEADERBOARD, "global", limit)
-        return self.get(key)
+        return self.get(self._leaderboard_key(limit))
     
     def set_leaderboard(self, leaderboard: List[Dict[str, Any]], limit: int = 100) -> bool:
         """
@@ -407,16 +1543,16 @@ class CacheService:
         Returns:
             bool: Succès
         """
-        key = self._make_key(self.PREFIX_LEADERBOARD, "global", limit)
-        return self.set(key, leaderboard, ttl=self.TTL_LEADERBOARD)
+        return self.set(
+            self._leaderboard_key(limit),
+            leaderboard,
+            ttl=self.TTL_LEADERBOARD,
+            tags=[self.PREFIX_LEADERBOARD]
+        )
     
     def invalidate_leaderboard(self) -> int:
         """Invalide tous les caches leaderboard"""
-        pattern = f"{self.PREFIX_LEADERBOARD}:*"
-        keys_to_delete = list(self.redis.scan_iter(match=pattern, count=100))
-        if keys_to_delete:
-            return self.delete(*keys_to_delete)
-        return 0
+        return self.invalidate_tags(self.PREFIX_LEADERBOARD)
     
     # =========================================================================
     # INVENTAIRE UTILISATEUR
@@ -432,8 +1568,7 @@ class CacheService:
         Returns:
             List[Dict]: Inventaire ou None
         """
-        key = self._make_key(self.PREFIX_INVENTORY, user_id)
-        return self.get(key)
+        return self.get(self._inventory_key(user_id))
     
     def set_user_inventory(self, user_id: int, inventory: List[Dict[str, Any]]) -> bool:
         """
@@ -446,8 +1581,7 @@ class CacheService:
         Returns:
             bool: Succès
         """
-        key = self._make_key(self.PREFIX_INVENTORY, user_id)
-        return self.set(key, inventory, ttl=self.TTL_USER_INVENTORY)
+        return self.set(self._inventory_key(user_id), inventory, ttl=self.TTL_USER_INVENTORY)
     
     def invalidate_user_inventory(self, user_id: int) -> int:
         """
@@ -459,17 +1593,33 @@ class CacheService:
         Returns:
             int: Nombre de clés supprimées
         """
-        key = self._make_key(self.PREFIX_INVENTORY, user_id)
-        return self.delete(key)
+        return self.delete(self._inventory_key(user_id))
     
     # =========================================================================
     # RECETTES
     # =========================================================================
     
-    def get_craftable_recipes(self, user_id: int, profession_id: int) -> Optional[List[Dict]]:
-        """Récupère les recettes craftables pour un utilisateur"""
-        key = self._make_key(self.PREFIX_RECIPES, "craftable", user_id, profession_id)
-        return self.get(key)
+    def get_craftable_recipes(
+        self,
+        user_id: int,
+        profession_id: Union[int, List[int]]
+    ) -> Union[Optional[List[Dict]], Dict[int, Optional[List[Dict]]]]:
+        """
+        Récupère les recettes craftables pour un utilisateur
+        
+        Args:
+            user_id: ID de l'utilisateur
+            profession_id: ID de profession, ou liste d'IDs (un seul MGET)
+            
+        Returns:
+            List[Dict] pour un ID, {profession_id: List[Dict] ou None} pour une liste
+        """
+        if isinstance(profession_id, (list, tuple, set)):
+            keys = {pid: self._craftable_key(user_id, pid) for pid in profession_id}
+            values = self.get_many(list(keys.values()))
+            return {pid: values[key] for pid, key in keys.items()}
+        
+        return self.get(self._craftable_key(user_id, profession_id))
     
     def set_craftable_recipes(
         self,
@@ -478,16 +1628,149 @@ class CacheService:
         recipes: List[Dict]
     ) -> bool:
         """Cache les recettes craftables"""
-        key = self._make_key(self.PREFIX_RECIPES, "craftable", user_id, profession_id)
-        return self.set(key, recipes, ttl=self.TTL_RECIPES)
+        return self.set(
+            self._craftable_key(user_id, profession_id),
+            recipes,
+            ttl=self.TTL_RECIPES,
+            tags=[self._recipes_tag(user_id)]
+        )
+    
+    def set_craftable_recipes_many(
+        self,
+        user_id: int,
+        recipes_by_profession: Dict[int, List[Dict]]
+    ) -> bool:
+        """Cache les recettes craftables de plusieurs professions (un seul pipeline)"""
+        items, tags = self._craftable_items(user_id, recipes_by_profession)
+        return self.set_many(items, ttl=self.TTL_RECIPES, tags=tags)
     
     def invalidate_user_recipes(self, user_id: int) -> int:
         """Invalide toutes les recettes cachées d'un utilisateur"""
-        pattern = f"{self.PREFIX_RECIPES}:craftable:{user_id}:*"
-        keys_to_delete = list(self.redis.scan_iter(match=pattern, count=100))
-        if keys_to_delete:
-            return self.delete(*keys_to_delete)
-        return 0
+        return self.invalidate_tags(self._recipes_tag(user_id))
+    
+    def get_or_load_recipe_catalog(
+        self,
+        loader: Callable[[], List[Dict]],
+        profession: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Catalogue des recettes, chargé par loader en cas de MISS (single-flight)
+        
+        Args:
+            loader: Lecture du catalogue en base
+            profession: Filtre profession (None = toutes)
+        """
+        return self.get_or_set(
+            self._recipe_catalog_key(profession),
+            loader,
+            ttl=self.TTL_RECIPES,
+            tags=[self._recipe_catalog_tag()]
+        )
+    
+    def invalidate_recipe_catalog(self) -> int:
+        """Invalide toutes les variantes du catalogue (création/modif/suppression)"""
+        return self.invalidate_tags(self._recipe_catalog_tag())
+    
+    # =========================================================================
+    # DASHBOARD (lecture/préchauffage d'une page complète)
+    # =========================================================================
+    
+    def get_dashboard_bundle(
+        self,
+        user_id: int,
+        profession_ids: List[int],
+        leaderboard_limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Lit tout le dashboard d'un joueur en un seul aller-retour
+        
+        Args:
+            user_id: ID de l'utilisateur
+            profession_ids: Professions dont on veut les recettes craftables
+            leaderboard_limit: Top N du leaderboard
+            
+        Returns:
+            Dict: {inventory, environment, leaderboard, craftable_recipes: {pid: ...}}
+            (None pour chaque entrée absente du cache)
+        """
+        keys = self._dashboard_keys(user_id, profession_ids, leaderboard_limit)
+        values = self.get_many(self._dashboard_read_keys(keys))
+        return self._dashboard_bundle(keys, values)
+    
+    def set_dashboard_bundle(
+        self,
+        user_id: int,
+        inventory: Optional[List[Dict[str, Any]]] = None,
+        craftable_recipes: Optional[Dict[int, List[Dict]]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        leaderboard: Optional[List[Dict[str, Any]]] = None,
+        leaderboard_limit: int = 100
+    ) -> bool:
+        """
+        Préchauffe le dashboard d'un joueur en un seul pipeline
+        
+        Chaque entrée garde son TTL habituel; les entrées None sont ignorées.
+        """
+        items, ttls, tags = self._dashboard_items(
+            user_id, inventory, craftable_recipes or {}, environment, leaderboard,
+            leaderboard_limit
+        )
+        return self.set_many(items, ttls=ttls, tags=tags)
+    
+    # =========================================================================
+    # AUTHENTIFICATION (identité des requêtes)
+    # =========================================================================
+    
+    def get_auth_user(self, user_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Identité cachée d'un utilisateur authentifié
+        
+        Le compteur authver:<id> est relu à chaque appel (MGET unique, l'identité
+        elle-même pouvant venir du L1): une identité écrite pour une version
+        antérieure est ignorée.
+        
+        Args:
+            user_id: ID de l'utilisateur
+            
+        Returns:
+            Tuple: (version courante, identité ou None)
+        """
+        version_key, user_key = self._auth_keys(user_id)
+        values = self.get_many([version_key, user_key])
+        return self._auth_user_from(values[version_key], values[user_key])
+    
+    def set_auth_user(self, user_id: str, version: int, identity: Dict[str, Any]) -> bool:
+        """
+        Cache l'identité d'un utilisateur pour une version donnée
+        
+        Args:
+            user_id: ID de l'utilisateur
+            version: Version lue AVANT le chargement depuis PostgreSQL
+            identity: Identité et rôles (sans données de jeu)
+        """
+        _, user_key = self._auth_keys(user_id)
+        return self.set(user_key, {"version": version, "user": identity}, ttl=self.TTL_AUTH_USER)
+    
+    def bump_user_versions(self, *user_ids: str) -> bool:
+        """
+        Incrémente la version d'utilisateurs modifiés (invalide leur identité cachée)
+        
+        Le compteur vit plus longtemps que les identités: s'il expire, la
+        version repart de 0 alors qu'aucune identité antérieure ne subsiste.
+        """
+        if not user_ids:
+            return True
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                version_key, _ = self._auth_keys(user_id)
+                pipe.incr(version_key)
+                pipe.expire(version_key, self.TTL_AUTH_VERSION)
+            pipe.execute()
+            return True
+        except RedisError as e:
+            logger.error(f"Erreur bump version utilisateurs={user_ids}: {e}")
+            return False
     
     # =========================================================================
     # SESSIONS UTILISATEUR
@@ -504,28 +1787,69 @@ class CacheService:
         Returns:
             bool: Succès
         """
-        key = self._make_key(self.PREFIX_SESSION, session_id)
-        return self.set(key, user_data, ttl=self.TTL_SESSION)
+        return self.set(self._session_key(session_id), user_data, ttl=self.TTL_SESSION)
     
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Récupère une session"""
-        key = self._make_key(self.PREFIX_SESSION, session_id)
-        return self.get(key)
+        return self.get(self._session_key(session_id))
     
     def delete_session(self, session_id: str) -> int:
         """Supprime une session (logout)"""
-        key = self._make_key(self.PREFIX_SESSION, session_id)
-        return self.delete(key)
+        return self.delete(self._session_key(session_id))
     
     def refresh_session(self, session_id: str) -> bool:
         """Prolonge la durée d'une session"""
-        key = self._make_key(self.PREFIX_SESSION, session_id)
-        return self.expire(key, self.TTL_SESSION)
+        return self.expire(self._session_key(session_id), self.TTL_SESSION)
     
     # =========================================================================
     # RATE LIMITING
     # =========================================================================
     
+    def acquire_rate_limit(
+        self,
+        identifier: str,
+        max_requests: int = 60,
+        window_seconds: int = 60,
+        cost: int = 1
+    ) -> Tuple[bool, int, float]:
+        """
+        Consomme des jetons dans le seau d'un identifiant (token bucket)
+        
+        Le seau contient max_requests jetons et se remplit en continu
+        (max_requests par window_seconds): pas de double rafale en bord
+        de fenêtre. Lecture, calcul et écriture sont atomiques (script Lua).
+        
+        Args:
+            identifier: Identifiant (user_id, IP, etc.)
+            max_requests: Capacité du seau
+            window_seconds: Temps de remplissage complet (secondes)
+            cost: Jetons consommés (0 = simple lecture)
+            
+        Returns:
+            Tuple[bool, int, float]: (autorisé, requêtes restantes, secondes avant retry)
+        """
+        start = time.perf_counter()
+        try:
+            result = self._token_bucket(
+                keys=[self._rate_limit_key(identifier)],
+                args=[max_requests, window_seconds, cost]
+            )
+        except RedisError as e:
+            logger.error(f"Erreur rate limit: {e}")
+            self.metrics.record(
+                self.PREFIX_RATE_LIMIT, "acquire", "error", time.perf_counter() - start
+            )
+            return True, max_requests, 0.0  # En cas d'erreur Redis, autoriser la requête
+        allowed, remaining, retry_after = self._rate_limit_result(*result)
+        self.metrics.record(
+            self.PREFIX_RATE_LIMIT,
+            "acquire",
+            "allowed" if allowed else "rejected",
+            time.perf_counter() - start
+        )
+        
+        return allowed, remaining, retry_after
+    
     def check_rate_limit(
         self,
         identifier: str,
@@ -543,27 +1867,14 @@ class CacheService:
         Returns:
             bool: True si autorisé, False si limite dépassée
         """
-        try:
-            key = self._make_key(self.PREFIX_RATE_LIMIT, identifier)
-            
-            # Incrémenter le compteur
-            current = self.redis.incr(key)
-            
-            # Définir expiration lors de la première requête
-            if current == 1:
-                self.redis.expire(key, window_seconds)
-            
-            # Vérifier la limite
-            return current <= max_requests
-            
-        except RedisError as e:
-            logger.error(f"Erreur rate limit: {e}")
-            return True  # En cas d'erreur Redis, autoriser la requête
+        allowed, _, _ = self.acquire_rate_limit(identifier, max_requests, window_seconds)
+        return allowed
     
     def get_remaining_requests(
         self,
         identifier: str,
-        max_requests: int = 60
+        max_requests: int = 60,
+        window_seconds: int = 60
     ) -> int:
         """
         Récupère le nombre de requêtes restantes
@@ -571,16 +1882,147 @@ class CacheService:
         Args:
             identifier: Identifiant
             max_requests: Limite max
+            window_seconds: Fenêtre de temps (secondes)
             
         Returns:
             int: Requêtes restantes
         """
+        _, remaining, _ = self.acquire_rate_limit(
+            identifier, max_requests, window_seconds, cost=0
+        )
+        return remaining
+    
+    # =========================================================================
+    # BRUTE-FORCE (échecs de connexion)
+    # =========================================================================
+    
+    def check_login_block(self, login: str, ip: str) -> float:
+        """
+        Secondes de blocage restantes pour un login ou une IP (0 = autorisé)
+        
+        Appelée avant la lecture de l'utilisateur et avant PBKDF2. Un
+        blocage déjà vu par ce worker est servi par le L1, sans Redis.
+        
+        Args:
+            login: Login normalisé
+            ip: Adresse du client
+            
+        Returns:
+            float: Secondes avant la fin du blocage le plus long
+        """
+        keys = self._login_keys(self.PREFIX_LOGIN_BLOCK, login, ip)
+        start = time.perf_counter()
+        now = time.time()
+        until = self._login_block_from_l1(keys)
+        if until > now:
+            self.metrics.record(
+                self.PREFIX_LOGIN_BLOCK, "check", "l1_blocked", time.perf_counter() - start
+            )
+            return until - now
+        
+        try:
+            values = self.redis.mget(keys)
+        except RedisError as e:
+            logger.error(f"Erreur vérification blocage login={login}: {e}")
+            self.metrics.record(
+                self.PREFIX_LOGIN_BLOCK, "check", "error", time.perf_counter() - start
+            )
+            return 0.0  # En cas d'erreur Redis, autoriser la tentative
+        
+        until = self._login_block_from(keys, values, now)
+        self.metrics.record(
+            self.PREFIX_LOGIN_BLOCK,
+            "check",
+            "blocked" if until else "allowed",
+            time.perf_counter() - start
+        )
+        return max(0.0, until - now)
+    
+    def record_login_failure(
+        self,
+        login: str,
+        ip: str,
+        threshold: int,
+        ip_threshold: int,
+        window_seconds: int,
+        block_seconds: int
+    ) -> Tuple[int, int, float]:
+        """
+        Compte un échec de connexion; bloque le login ou l'IP au seuil
+        
+        Args:
+            login: Login normalisé
+            ip: Adresse du client
+            threshold: Échecs tolérés par login dans la fenêtre
+            ip_threshold: Échecs tolérés par IP dans la fenêtre
+            window_seconds: Fenêtre de comptage
+            block_seconds: Durée du blocage
+            
+        Returns:
+            Tuple[int, int, float]: (échecs login, échecs IP, secondes de blocage posées)
+        """
+        keys, args = self._login_failure_call(
+            login, ip, threshold, ip_threshold, window_seconds, block_seconds
+        )
+        try:
+            result = self._login_failure(keys=keys, args=args)
+        except RedisError as e:
+            logger.error(f"Erreur comptage échec login={login}: {e}")
+            return 0, 0, 0.0
+        return self._login_failure_result(result)
+    
+    def clear_login_failures(self, login: str) -> bool:
+        """Remet à zéro les échecs d'un login (connexion réussie; l'IP garde les siens)"""
+        try:
+            self.redis.delete(self._make_key(self.PREFIX_LOGIN_FAIL, "login", login))
+            return True
+        except RedisError as e:
+            logger.error(f"Erreur remise à zéro échecs login={login}: {e}")
+            return False
+    
+    def get_login_failures(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Compteurs d'échecs et blocages en cours (administration)
+        
+        Lit l'index des sujets (expiration la plus lointaine d'abord) au lieu
+        de parcourir le keyspace; les sujets expirés en sont retirés au passage.
+        
+        Returns:
+            List[Dict]: {kind: login|ip, subject, failures, blocked_for}, bloqués d'abord
+        """
+        index = self._login_index_key()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zremrangebyscore(index, "-inf", time.time())
+            pipe.zrevrange(index, 0, limit - 1)
+            _, members = pipe.execute()
+            
+            pipe = self.redis.pipeline(transaction=False)
+            for member in members:
+                block_key, fail_key = self._login_subject_keys(*member.split(":", 1))
+                pipe.ttl(block_key)
+                pipe.get(fail_key)
+            results = pipe.execute()
+        except RedisError as e:
+            logger.error(f"Erreur lecture des échecs de connexion: {e}")
+            return []
+        
+        entries, stale = self._login_failure_entries(members, results)
+        if stale:
+            try:
+                self.redis.zrem(index, *stale)
+            except RedisError as e:
+                logger.warning(f"Nettoyage de l'index des échecs impossible: {e}")
+        return entries
+    
+    def unblock_login(self, kind: str, subject: str) -> int:
+        """Lève le blocage et les échecs d'un login ou d'une IP (tous les workers)"""
+        deleted = self.delete(*self._login_subject_keys(kind, subject))
         try:
-            key = self._make_key(self.PREFIX_RATE_LIMIT, identifier)
-            current = int(self.redis.get(key) or 0)
-            return max(0, max_requests - current)
-        except RedisError:
-            return max_requests
+            self.redis.zrem(self._login_index_key(), f"{kind}:{subject}")
+        except RedisError as e:
+            logger.error(f"Erreur retrait de l'index des échecs {kind}={subject}: {e}")
+        return deleted
     
     # =========================================================================
     # STATISTIQUES & MONITORING
@@ -594,29 +2036,11 @@ class CacheService:
             Dict: Statistiques serveur
         """
         try:
-            info = self.redis.info()
-            return {
-                "connected_clients": info.get("connected_clients", 0),
-                "used_memory_human": info.get("used_memory_human", "0B"),
-                "used_memory_peak_human": info.get("used_memory_peak_human", "0B"),
-                "total_commands_processed": info.get("total_commands_processed", 0),
-                "keyspace_hits": info.get("keyspace_hits", 0),
-                "keyspace_misses": info.get("keyspace_misses", 0),
-                "hit_rate": self._calculate_hit_rate(info),
-                "uptime_in_seconds": info.get("uptime_in_seconds", 0),
-                "redis_version": info.get("redis_version", "unknown")
-            }
+            return self._stats_from_info(self.redis.info())
         except RedisError as e:
             logger.error(f"Erreur get_stats: {e}")
             return {}
     
-    def _calculate_hit_rate(self, info: Dict) -> float:
-        """Calcule le taux de hit du cache"""
-        hits = info.get("keyspace_hits", 0)
-        misses = info.get("keyspace_misses", 0)
-        total = hits + misses
-        return (hits / total * 100) if total > 0 else 0.0
-    
     def flush_all(self) -> bool:
         """
         ⚠️ DANGER: Supprime TOUTES les clés Redis
@@ -626,6 +2050,9 @@ class CacheService:
         """
         try:
             self.redis.flushdb()
+            if self.l1 is not None:
+                self.l1.clear()
+                self._publish_invalidation("*")
             logger.warning("🗑️ Cache Redis vidé complètement")
             return True
         except RedisError as e:
@@ -635,12 +2062,79 @@ class CacheService:
     def close(self):
         """Ferme la connexion Redis"""
         try:
+            if self._pubsub_thread is not None:
+                self._pubsub_thread.stop()
             self.redis.close()
             logger.info("Connexion Redis fermée")
         except RedisError as e:
             logger.error(f"Erreur fermeture Redis: {e}")
 
 
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_cache_service: Optional[CacheService] = None
+
+
+def init_cache_service() -> Optional[CacheService]:
+    """
+    Crée l'instance CacheService partagée par toute l'application
+    
+    Appelée une seule fois dans le lifespan de main.py. Si Redis est
+    désactivé ou injoignable, l'application démarre sans cache.
+    
+    Returns:
+        CacheService: Instance partagée ou None
+    """
+    global _cache_service
+    
+    if not config.REDIS_ENABLED:
+        logger.info("Cache Redis désactivé (REDIS_ENABLED=false)")
+        return None
+    
+    try:
+        _cache_service = CacheService(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            password=config.REDIS_PASSWORD,
+            db=config.REDIS_DB,
+            max_connections=config.REDIS_MAX_CONNECTIONS,
+            l1_enabled=config.CACHE_L1_ENABLED,
+            l1_max_entries=config.CACHE_L1_MAX_ENTRIES
+        )
+    except RedisError as e:
+        logger.warning(f"⚠️  Redis indisponible, démarrage sans cache: {e}")
+        _cache_service = None
+    
+    return _cache_service
+
+
+def close_cache_service():
+    """Ferme l'instance partagée (shutdown de l'application)"""
+    global _cache_service
+    
+    if _cache_service is not None:
+        _cache_service.close()
+        _cache_service = None
+
+
+def get_cache() -> Optional[CacheService]:
+    """
+    FastAPI dependency: retourne l'instance CacheService partagée
+    
+    Usage:
+        @router.get("/environment")
+        def environment(cache: Optional[CacheService] = Depends(get_cache)):
+            if cache:
+                return cache.get_current_environment()
+    
+    Returns:
+        CacheService: Instance partagée ou None si cache indisponible
+    """
+    return _cache_service
+
+
 # =========================================================================
 # DÉCORATEUR DE CACHE
 # =========================================================================
@@ -649,45 +2143,58 @@ def cached(ttl: int = 300, key_prefix: str = "cached"):
     """
     Décorateur pour cacher automatiquement le résultat d'une fonction
     
+    Utilise l'instance partagée (get_cache) et coalesce les MISS concurrents:
+    une seule exécution de la fonction par clé, même quand une clé chaude
+    expire sous charge.
+    
     Args:
         ttl: Time To Live en secondes
         key_prefix: Préfixe de la clé Redis
         
+    Les fonctions `async def` passent par l'instance AsyncCacheService
+    (get_async_cache), sans bloquer la boucle d'événements.
+    
     Example:
         @cached(ttl=600, key_prefix="user")
         def get_user_data(user_id: int):
             return db.query(User).filter_by(id=user_id).first()
     """
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            # Import local: async_cache_service dépend de ce module
+            from services.async_cache_service import get_async_cache
+            
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
+                
+                cache = get_async_cache()
+                if cache is None:
+                    return await func(*args, **kwargs)
+                
+                return await cache.get_or_set(
+                    cache_key,
+                    lambda: func(*args, **kwargs),
+                    ttl=ttl
+                )
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Créer une clé unique basée sur les arguments
             cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
             
-            # TODO: Injecter CacheService via dependency injection
-            # Pour l'instant, instancier localement (à améliorer)
-            try:
-                cache = CacheService()
-                
-                # Vérifier le cache
-                cached_result = cache.get(cache_key)
-                if cached_result is not None:
-                    logger.debug(f"Cache HIT: {cache_key}")
-                    return cached_result
-                
-                # Cache MISS: exécuter la fonction
-                logger.debug(f"Cache MISS: {cache_key}")
-                result = func(*args, **kwargs)
-                
-                # Cacher le résultat
-                cache.set(cache_key, result, ttl=ttl)
-                
-                return result
-                
-            except Exception as e:
-                logger.error(f"Erreur cache decorator: {e}")
-                # En cas d'erreur, exécuter la fonction normalement
+            cache = get_cache()
+            if cache is None:
+                # Pas de cache: exécuter la fonction normalement
                 return func(*args, **kwargs)
+            
+            return cache.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl
+            )
         
         return wrapper
     return decorator
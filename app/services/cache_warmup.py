@@ -0,0 +1,157 @@
+# app/services/cache_warmup.py
+"""
+Préchauffage du cache au démarrage (lifespan de main.py).
+
+Après un déploiement ou un redémarrage de Redis (ou une éviction
+LRU), la première vague de requêtes rate toutes les mêmes clés et
+tombe ensemble sur PostgreSQL. Le warm-up recharge ces clés avant d'ouvrir
+le trafic:
+
+- Groupes enregistrés avec @warmup_group, sélectionnés par
+  config.CACHE_WARMUP_GROUPS
+- Groupes exécutés en parallèle (un thread et une session chacun), avec un
+  délai max par groupe
+- Rapport par groupe: statut, durée, nombre d'entrées chargées
+
+Usage:
+    report = await run_warmup(cache, SessionLocal, ["environment", "recipes"])
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from models import Recipe
+from services.cache_service import CacheService
+from services.crafting_service import get_recipe_catalog
+from services.environment_service import get_environment
+from services.leaderboard_service import get_leaderboards
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Nom → fonction (cache, db) -> nombre d'entrées chargées
+WARMUP_GROUPS: Dict[str, Callable[[CacheService, Session], int]] = {}
+
+
+def warmup_group(name: str):
+    """Enregistre un groupe de préchauffage"""
+    def decorator(func: Callable[[CacheService, Session], int]):
+        WARMUP_GROUPS[name] = func
+        return func
+    return decorator
+
+
+# ============================================================================
+# GROUPES
+# ============================================================================
+
+@warmup_group("environment")
+def warm_environment(cache: CacheService, db: Session) -> int:
+    """Saison et météo courantes"""
+    get_environment(cache)
+    return 1
+
+
+@warmup_group("recipes")
+def warm_recipes(cache: CacheService, db: Session) -> int:
+    """Catalogue public complet + une variante par profession"""
+    professions = [row[0] for row in db.query(Recipe.required_profession).distinct()]
+    count = len(get_recipe_catalog(db, cache))
+    for profession in professions:
+        get_recipe_catalog(db, cache, profession)
+    logger.debug(f"   → Catalogue: {count} recette(s), {len(professions)} profession(s)")
+    return 1 + len(professions)
+
+
+@warmup_group("leaderboard")
+def warm_leaderboard(cache: CacheService, db: Session) -> int:
+    """Sorted sets des leaderboards (reconstruits s'ils sont absents)"""
+    boards = get_leaderboards()
+    if boards is None:
+        return 0
+    boards.rebuild_if_due(lambda: db)
+    return boards.size("global")
+
+
+# ============================================================================
+# EXÉCUTION
+# ============================================================================
+
+async def _run_group(
+    name: str,
+    cache: CacheService,
+    session_factory: Callable[[], Session],
+    timeout: float
+) -> Dict[str, Any]:
+    def work() -> int:
+        db = session_factory()
+        try:
+            return WARMUP_GROUPS[name](cache, db)
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"status": "ok", "items": 0}
+    try:
+        result["items"] = await asyncio.wait_for(run_in_threadpool(work), timeout)
+    except asyncio.TimeoutError:
+        result["status"] = "timeout"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        logger.error(f"❌ Warm-up '{name}' échoué: {e}", exc_info=True)
+
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(
+        f"🔥 Warm-up '{name}': {result['status']}, "
+        f"{result['items']} entrée(s) en {result['duration_ms']} ms"
+    )
+    return result
+
+
+async def run_warmup(
+    cache: Optional[CacheService],
+    session_factory: Callable[[], Session],
+    groups: List[str],
+    timeout: float = 30.0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Préchauffe les groupes demandés en parallèle.
+
+    Args:
+        cache: CacheService partagé (rien à faire si None)
+        session_factory: Fabrique de sessions (une session par groupe)
+        groups: Noms des groupes (voir WARMUP_GROUPS)
+        timeout: Délai max par groupe (s)
+
+    Returns:
+        {groupe: {status (ok/error/timeout/unknown), items, duration_ms}}
+    """
+    if cache is None:
+        logger.info("Warm-up ignoré (pas de cache)")
+        return {}
+
+    report: Dict[str, Dict[str, Any]] = {}
+    known = []
+    for name in groups:
+        if name in WARMUP_GROUPS:
+            known.append(name)
+        else:
+            logger.warning(f"⚠️  Groupe de warm-up inconnu: {name}")
+            report[name] = {"status": "unknown", "items": 0, "duration_ms": 0.0}
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        _run_group(name, cache, session_factory, timeout) for name in known
+    ])
+    report.update(zip(known, results))
+
+    logger.info(
+        f"🔥 Warm-up terminé en {(time.perf_counter() - start) * 1000:.1f} ms "
+        f"({sum(r['status'] == 'ok' for r in results)}/{len(known)} groupe(s) OK)"
+    )
+    return report
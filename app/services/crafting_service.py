@@ -3,11 +3,14 @@
 Service de crafting - VERSION POSTGRESQL
 """
 
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 
+from database.optimistic import retry_on_conflict
 from models import User, Recipe
-from services.inventory_service import has_items, remove_item, add_item
+from schemas.recipe import RecipeResponse
+from services.inventory_service import InventoryUnitOfWork, has_items
+from services.inventory_store import InsufficientItems
 from services.xp_service import add_xp
 from utils.logger import get_logger
 
@@ -87,19 +90,68 @@ def possible_recipes_for_user(db: Session, user: User) -> List[Dict[str, Any]]:
     return possible
 
 
+def load_recipe_catalog(db: Session, profession: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Lit le catalogue des recettes en base (trié par ID).
+    
+    Args:
+        db: Session SQLAlchemy
+        profession: Filtre profession (None = toutes)
+    
+    Returns:
+        Liste de recettes sérialisées (RecipeResponse)
+    """
+    query = db.query(Recipe)
+    if profession:
+        query = query.filter(Recipe.required_profession == profession)
+    
+    recipes = query.order_by(Recipe.id).all()
+    logger.debug(f"📚 Catalogue recettes chargé: {len(recipes)} recette(s) (profession={profession})")
+    return [RecipeResponse.model_validate(recipe).model_dump() for recipe in recipes]
+
+
+def get_recipe_catalog(
+    db: Session,
+    cache=None,
+    profession: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Catalogue des recettes, via le cache partagé si disponible.
+    
+    Args:
+        db: Session SQLAlchemy
+        cache: CacheService partagé ou None
+        profession: Filtre profession (None = toutes)
+    
+    Returns:
+        Liste de recettes sérialisées
+    """
+    if cache is None:
+        return load_recipe_catalog(db, profession)
+    return cache.get_or_load_recipe_catalog(
+        lambda: load_recipe_catalog(db, profession),
+        profession=profession
+    )
+
+
 def apply_craft(
     db: Session, 
     user: User, 
     recipe_id: str
 ) -> Tuple[Dict[str, int], Dict[str, Any]]:
     """
-    Exécute le crafting d'une recette.
+    Exécute le crafting d'une recette, en une transaction.
     
     - Vérifie les conditions
     - Retire les ingrédients
     - Ajoute le produit
     - Donne l'XP
     
+    Ingrédients, produit et XP sont écrits par un seul commit
+    (InventoryUnitOfWork): un échec n'en laisse aucun appliqué. Si
+    l'utilisateur a été modifié entre-temps (conflit de version), le craft
+    est rejoué sur l'état relu (retry_on_conflict).
+    
     Args:
         db: Session SQLAlchemy
         user: Utilisateur
@@ -110,6 +162,7 @@ def apply_craft(
     
     Raises:
         ValueError: Si conditions non remplies ou recette inconnue
+        UpdateConflict: Conflit de version persistant
     """
     logger.info(f"🛠️  Craft de '{recipe_id}' par user={user.id}")
     
@@ -120,26 +173,28 @@ def apply_craft(
         logger.warning(f"⚠️  Recette '{recipe_id}' inconnue")
         raise ValueError(f"Recette '{recipe_id}' inconnue")
     
+    return retry_on_conflict(db, "craft", lambda: _craft_once(db, user, recipe))
+
+
+def _craft_once(
+    db: Session,
+    user: User,
+    recipe: Recipe
+) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """Un essai de craft: vérifications sur l'état courant puis commit unique"""
     # Vérifie les conditions
     can, reason = can_craft(db, user, recipe)
     if not can:
         logger.warning(f"⚠️  Craft impossible: {reason}")
         raise ValueError(reason)
     
-    logger.debug(f"   → Retrait des ingrédients...")
+    logger.debug(f"   → Retrait des ingrédients, ajout du produit: {recipe.output}")
     
-    # Retire les ingrédients
+    # Retire les ingrédients et ajoute le produit (quantity = 1)
+    uow = InventoryUnitOfWork(db, user)
     for ingredient, qty in recipe.ingredients.items():
-        success = remove_item(db, user, ingredient, qty)
-        if not success:
-            # Rollback si échec (ne devrait pas arriver après can_craft)
-            db.rollback()
-            raise ValueError(f"Erreur lors du retrait de {ingredient}")
-    
-    logger.debug(f"   → Ajout du produit: {recipe.output}")
-    
-    # Ajoute le produit (quantity = 1 par défaut)
-    add_item(db, user, recipe.output, 1)
+        uow.remove(ingredient, qty)
+    uow.add(recipe.output)
     
     # Donne l'XP
     if recipe.xp_reward > 0:
@@ -150,9 +205,12 @@ def apply_craft(
         if user.level > old_level:
             logger.info(f"   🎉 Level up! {old_level} → {user.level}")
     
-    # Commit final
-    db.commit()
-    db.refresh(user)
+    # Commit unique
+    try:
+        inventory = uow.commit()
+    except InsufficientItems:
+        # Ne devrait pas arriver après can_craft (sauf craft concurrent)
+        raise ValueError("Ingrédients insuffisants")
     
     logger.info(f"✅ Craft réussi: {recipe.output}")
     
@@ -162,4 +220,4 @@ def apply_craft(
         "xp_gained": recipe.xp_reward,
     }
     
-    return user.inventory, produced
\ No newline at end of file
+    return inventory, produced
\ No newline at end of file
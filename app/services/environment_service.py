@@ -0,0 +1,88 @@
+# app/services/environment_service.py
+"""
+Service d'environnement (saison, météo) - lu depuis storage/loot_environment.json
+
+- Saison: déterminée par le mois courant
+- Météo: tirage déterministe par créneau de WEATHER_SLOT_SECONDS, identique
+  sur tous les workers (graine = numéro du créneau)
+- Le résultat est partagé via le cache Redis (env:current), en
+  stale-while-revalidate: une fois chaud, aucun appel n'attend le recalcul
+"""
+
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENVIRONMENT_FILE = config.STORAGE_DIR / "loot_environment.json"
+
+WEATHER_SLOT_SECONDS = 3600
+
+SEASONS_BY_MONTH = {
+    12: "winter", 1: "winter", 2: "winter",
+    3: "spring", 4: "spring", 5: "spring",
+    6: "summer", 7: "summer", 8: "summer",
+    9: "autumn", 10: "autumn", 11: "autumn",
+}
+
+
+def _load_modifiers() -> Dict[str, Dict[str, float]]:
+    """Modificateurs saison/météo/événements"""
+    with open(ENVIRONMENT_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compute_environment(now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Calcule l'environnement courant.
+
+    Args:
+        now: Timestamp UNIX (défaut: maintenant)
+
+    Returns:
+        Dict: {weather: {...}, season: {...}, timestamp: ...}
+    """
+    now = time.time() if now is None else now
+    modifiers = _load_modifiers()
+
+    month = datetime.fromtimestamp(now, tz=timezone.utc).month
+    season = SEASONS_BY_MONTH[month]
+
+    slot = int(now // WEATHER_SLOT_SECONDS)
+    weather = random.Random(slot).choice(sorted(modifiers["weather_modifiers"]))
+
+    logger.debug(f"🌦️  Environnement calculé: {season}, {weather}")
+
+    return {
+        "season": {
+            "name": season,
+            "modifier": modifiers["season_modifiers"][season],
+        },
+        "weather": {
+            "name": weather,
+            "modifier": modifiers["weather_modifiers"][weather],
+            "until": (slot + 1) * WEATHER_SLOT_SECONDS,
+        },
+        "timestamp": now,
+    }
+
+
+def get_environment(cache=None) -> Dict[str, Any]:
+    """
+    Environnement courant, via le cache partagé si disponible.
+
+    Args:
+        cache: CacheService partagé ou None
+
+    Returns:
+        Dict: {weather: {...}, season: {...}, timestamp: ...}
+    """
+    if cache is None:
+        return compute_environment()
+    return cache.get_or_load_environment(compute_environment)
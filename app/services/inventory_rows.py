@@ -0,0 +1,191 @@
+# app/services/inventory_rows.py
+"""
+Accès à la table inventory (une ligne par utilisateur et par item).
+
+Chaque variation ne touche que la ligne de l'item concerné, en une
+instruction atomique côté PostgreSQL:
+- retrait: UPDATE ... SET quantity = quantity - :qty WHERE quantity >= :qty
+  RETURNING (aucune ligne retournée = quantité insuffisante)
+- ajout: INSERT ... ON CONFLICT DO UPDATE SET quantity = quantity + :qty
+
+Deux crafts concurrents sur un même compte ne se perdent donc plus de
+mises à jour, et un gros inventaire n'est plus resérialisé à chaque
+modification. Les lignes tombées à 0 sont conservées (ignorées à la
+lecture, cf. idx_inventory_nonzero).
+
+Migration: les inventaires encore dans la colonne JSON User.inventory sont
+repris dans la table à la première écriture (adopt_legacy) puis la colonne
+est vidée; d'ici là, les lectures fusionnent les deux.
+
+Aucune fonction ne committe: l'appelant (InventoryUnitOfWork, flusher du
+store) décide de la transaction.
+"""
+
+from typing import Dict
+
+from sqlalchemy import String, cast, delete, select, text, update
+from sqlalchemy.orm import Session, object_session
+
+from models import InventoryItem, User
+
+
+class InsufficientItems(Exception):
+    """Quantité insuffisante pour un retrait (rien n'a été modifié)"""
+
+    def __init__(self, item: str):
+        super().__init__(f"Quantité insuffisante: {item}")
+        self.item = item
+
+
+# Une ligne par item; verrouille uniquement la ligne modifiée
+_REMOVE_SQL = text("""
+    UPDATE inventory
+    SET quantity = quantity - :qty, updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = :user_id AND resource_id = :item AND quantity >= :qty
+    RETURNING quantity
+""")
+
+_ADD_SQL = text("""
+    INSERT INTO inventory (user_id, resource_id, quantity)
+    VALUES (:user_id, :item, :qty)
+    ON CONFLICT (user_id, resource_id) DO UPDATE
+    SET quantity = inventory.quantity + EXCLUDED.quantity, updated_at = CURRENT_TIMESTAMP
+""")
+
+
+def _has_legacy():
+    """Condition: colonne JSON User.inventory encore remplie"""
+    return cast(User.inventory, String) != "{}"
+
+
+def _legacy(db: Session, user_id: str, lock: bool = False) -> Dict[str, int]:
+    """Inventaire encore dans User.inventory ({} une fois migré)"""
+    query = select(User.inventory).where(User.id == user_id, _has_legacy())
+    if lock:
+        # Ne verrouille que les utilisateurs pas encore migrés
+        query = query.with_for_update()
+    legacy = db.execute(query).scalar()
+    return {item: int(qty) for item, qty in (legacy or {}).items() if qty > 0}
+
+
+# =============================================================================
+# LECTURES
+# =============================================================================
+
+def load_inventory(db: Session, user_id: str) -> Dict[str, int]:
+    """
+    Inventaire d'un utilisateur (lignes non nulles + inventaire JSON non migré).
+
+    Args:
+        db: Session SQLAlchemy
+        user_id: ID de l'utilisateur
+
+    Returns:
+        Dict {item: quantité}
+    """
+    rows = db.execute(
+        select(InventoryItem.resource_id, InventoryItem.quantity)
+        .where(InventoryItem.user_id == user_id, InventoryItem.quantity > 0)
+    ).all()
+    inventory = {item: qty for item, qty in rows}
+    for item, qty in _legacy(db, user_id).items():
+        inventory[item] = inventory.get(item, 0) + qty
+    return inventory
+
+
+def load_user_inventory(user: User) -> Dict[str, int]:
+    """
+    Inventaire d'un utilisateur via sa session (chargement du store Redis).
+
+    Un objet détaché retombe sur User.inventory.
+    """
+    db = object_session(user)
+    if db is None:
+        return dict(user.inventory or {})
+    return load_inventory(db, user.id)
+
+
+# =============================================================================
+# ÉCRITURES (sans commit)
+# =============================================================================
+
+def adopt_legacy(db: Session, user_id: str) -> Dict[str, int]:
+    """
+    Reprend l'inventaire JSON d'un utilisateur dans la table et vide la colonne.
+
+    La ligne users n'est verrouillée (FOR UPDATE) que si la colonne est
+    encore remplie: deux requêtes concurrentes ne reprennent pas deux fois
+    le même inventaire, et un utilisateur migré ne coûte qu'un SELECT.
+
+    Returns:
+        Items repris ({} si déjà migré)
+    """
+    legacy = _legacy(db, user_id, lock=True)
+    if legacy:
+        db.execute(_ADD_SQL, [
+            {"user_id": user_id, "item": item, "qty": qty} for item, qty in legacy.items()
+        ])
+        db.execute(
+            update(User).where(User.id == user_id).values(inventory={}),
+            execution_options={"synchronize_session": False}
+        )
+    return legacy
+
+
+def apply_deltas(db: Session, user_id: str, deltas: Dict[str, int]) -> None:
+    """
+    Applique des variations de quantités, ligne par ligne.
+
+    Les items sont traités dans un ordre fixe (tri par ID) pour que deux
+    transactions concurrentes verrouillent leurs lignes dans le même ordre.
+
+    Args:
+        db: Session SQLAlchemy
+        user_id: ID de l'utilisateur
+        deltas: {item: variation} (positive = ajout, négative = retrait)
+
+    Raises:
+        InsufficientItems: Un retrait dépasse la quantité possédée
+            (l'appelant doit annuler la transaction)
+    """
+    adopt_legacy(db, user_id)
+    for item in sorted(deltas):
+        delta = deltas[item]
+        params = {"user_id": user_id, "item": item, "qty": abs(delta)}
+        if delta < 0:
+            if db.execute(_REMOVE_SQL, params).first() is None:
+                raise InsufficientItems(item)
+        elif delta > 0:
+            db.execute(_ADD_SQL, params)
+
+
+def replace_inventories(db: Session, inventories: Dict[str, Dict[str, int]]) -> None:
+    """
+    Remplace l'inventaire complet de plusieurs utilisateurs (flush du store, vidage).
+
+    Deux instructions par lot quel que soit le nombre d'utilisateurs, plus
+    le vidage de la colonne JSON de ceux qui n'étaient pas encore migrés.
+
+    Args:
+        db: Session SQLAlchemy
+        inventories: {user_id: {item: quantité}}
+    """
+    if not inventories:
+        return
+    user_ids = list(inventories)
+
+    db.execute(delete(InventoryItem).where(InventoryItem.user_id.in_(user_ids)))
+    rows = [
+        {"user_id": user_id, "item": item, "qty": int(qty)}
+        for user_id, inventory in inventories.items()
+        for item, qty in inventory.items()
+        if qty > 0
+    ]
+    if rows:
+        db.execute(_ADD_SQL, rows)
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids), _has_legacy())
+        .values(inventory={}),
+        execution_options={"synchronize_session": False}
+    )
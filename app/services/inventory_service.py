@@ -1,15 +1,184 @@
 # app/services/inventory_service.py
 """
 Service de gestion d'inventaire - VERSION POSTGRESQL
+
+Si le store Redis est actif (services.inventory_store), les inventaires sont
+lus et modifiés en Redis puis flushés par lots vers PostgreSQL; sinon ils
+sont écrits directement dans la table inventory, une ligne par item
+(services.inventory_rows).
+
+Les mutations composées (craft, quête) passent par InventoryUnitOfWork:
+variations cumulées en mémoire, un seul commit, tout ou rien.
 """
 
-from sqlalchemy.orm import Session
+from typing import Dict, Optional
+
+from redis import RedisError
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
 from models import User
+from services.inventory_rows import InsufficientItems, apply_deltas, load_inventory, replace_inventories
+from services.inventory_store import get_inventory_store
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _sync_user(user: User, inventory: Dict[str, int]) -> Dict[str, int]:
+    """
+    Reflète l'inventaire courant sur l'objet User sans le marquer modifié:
+    la colonne JSON n'est plus écrite, l'inventaire vit dans la table
+    inventory (ou dans le store Redis).
+    """
+    set_committed_value(user, "inventory", inventory)
+    return inventory
+
+
+def get_inventory(user: User) -> Dict[str, int]:
+    """
+    Inventaire courant d'un utilisateur.
+    
+    Args:
+        user: Utilisateur
+    
+    Returns:
+        Dict {item_id: quantity}
+    """
+    store = get_inventory_store()
+    if store is not None:
+        return _sync_user(user, store.get(user))
+    db = object_session(user)
+    if db is None:
+        return user.inventory or {}
+    return _sync_user(user, load_inventory(db, user.id))
+
+
+class InventoryUnitOfWork:
+    """
+    Variations d'inventaire d'un utilisateur appliquées en une transaction.
+    
+    Les variations sont cumulées en mémoire; commit() les applique ligne
+    par ligne (UPDATE conditionnel / upsert, cf. inventory_rows) puis
+    committe avec les autres modifications ORM de la session (xp, level...)
+    en une seule transaction. Tout ou rien.
+    
+    Avec le store Redis, l'inventaire est modifié en Redis (script atomique)
+    juste avant le commit PostgreSQL, et remis en état si ce commit échoue.
+    
+    Usage:
+        uow = InventoryUnitOfWork(db, user)
+        uow.remove("argile", 2)
+        uow.add("brique")
+        add_xp(user, 10)
+        inventory = uow.commit()  # InsufficientItems: rien n'est écrit
+    """
+    
+    def __init__(self, db: Session, user: User):
+        self.db = db
+        self.user = user
+        self.deltas: Dict[str, int] = {}
+    
+    def stage(self, deltas: Dict[str, int]) -> "InventoryUnitOfWork":
+        """Cumule des variations {item_id: +/-quantité}"""
+        for item, delta in deltas.items():
+            self.deltas[item] = self.deltas.get(item, 0) + delta
+        return self
+    
+    def add(self, item: str, qty: int = 1) -> "InventoryUnitOfWork":
+        return self.stage({item: qty})
+    
+    def remove(self, item: str, qty: int = 1) -> "InventoryUnitOfWork":
+        return self.stage({item: -qty})
+    
+    def commit(self) -> Dict[str, int]:
+        """
+        Applique les variations et committe la session.
+        
+        Returns:
+            Inventaire mis à jour
+        
+        Raises:
+            InsufficientItems: Un retrait dépasse la quantité possédée
+                (session annulée, inventaire inchangé)
+        """
+        deltas = {item: delta for item, delta in self.deltas.items() if delta}
+        store = get_inventory_store()
+        if store is None:
+            return self._commit_rows(deltas)
+        
+        try:
+            inventory = store.apply(self.user, deltas)
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        # Rien d'autre à écrire (simple ajout/retrait): pas d'aller-retour PostgreSQL
+        if self.db.new or self.db.dirty or self.db.deleted:
+            try:
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                self._compensate(store, deltas)
+                raise
+        return _sync_user(self.user, inventory)
+    
+    def _compensate(self, store, deltas: Dict[str, int]):
+        """Annule en Redis des variations dont le commit PostgreSQL a échoué"""
+        try:
+            store.apply(self.user, {item: -delta for item, delta in deltas.items()})
+            logger.warning(f"⚠️  Commit échoué, inventaire Redis remis en état pour user={self.user.id}")
+        except (InsufficientItems, RedisError) as e:
+            # Produit déjà consommé entre-temps: l'inventaire garde le craft
+            logger.error(f"❌ Inventaire Redis non remis en état pour user={self.user.id}: {e}")
+    
+    def _commit_rows(self, deltas: Dict[str, int]) -> Dict[str, int]:
+        """Écriture directe dans la table inventory (sans store)"""
+        try:
+            apply_deltas(self.db, self.user.id, deltas)
+            inventory = load_inventory(self.db, self.user.id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        # Inventaire relu dans la transaction: pas de SELECT après le commit
+        return _sync_user(self.user, inventory)
+    
+    def rollback(self):
+        """Abandonne les variations et les modifications de la session"""
+        self.deltas.clear()
+        self.db.rollback()
+
+
+def apply_changes(
+    db: Session,
+    user: User,
+    deltas: Dict[str, int]
+) -> Optional[Dict[str, int]]:
+    """
+    Applique plusieurs variations de quantités et committe (voir InventoryUnitOfWork).
+    
+    Tout ou rien: si un retrait dépasse la quantité possédée, rien n'est
+    modifié.
+    
+    Args:
+        db: Session SQLAlchemy
+        user: Utilisateur
+        deltas: {item_id: variation} (positive = ajout, négative = retrait)
+    
+    Returns:
+        Inventaire mis à jour, None si quantité insuffisante
+    
+    Example:
+        apply_changes(db, user, {"argile": -2, "calcaire": -1, "brique": 1})
+    """
+    try:
+        return InventoryUnitOfWork(db, user).stage(deltas).commit()
+    except InsufficientItems as e:
+        logger.warning(f"⚠️  Quantité insuffisante: {e.item}")
+        return None
+
+
 def add_item(db: Session, user: User, item: str, qty: int = 1) -> dict:
     """
     Ajoute des items à l'inventaire d'un utilisateur.
@@ -25,23 +194,15 @@ def add_item(db: Session, user: User, item: str, qty: int = 1) -> dict:
     """
     if qty <= 0:
         logger.warning(f"⚠️  Tentative d'ajout quantité invalide: {qty}")
-        return user.inventory
+        return get_inventory(user)
     
     logger.debug(f"➕ Ajout {item} x{qty} pour user={user.id}")
     
-    # Mise à jour de l'inventaire
-    if user.inventory is None:
-        user.inventory = {}
-    
-    user.inventory[item] = user.inventory.get(item, 0) + qty
+    inventory = apply_changes(db, user, {item: qty})
     
-    # Commit en base
-    db.commit()
-    db.refresh(user)
+    logger.debug(f"   → Total {item}: {inventory[item]}")
     
-    logger.debug(f"   → Total {item}: {user.inventory[item]}")
-    
-    return user.inventory
+    return inventory
 
 
 def remove_item(db: Session, user: User, item: str, qty: int = 1) -> bool:
@@ -63,28 +224,11 @@ def remove_item(db: Session, user: User, item: str, qty: int = 1) -> bool:
     
     logger.debug(f"➖ Retrait {item} x{qty} pour user={user.id}")
     
-    # Vérifications
-    if user.inventory is None or item not in user.inventory:
-        logger.warning(f"⚠️  Item {item} non trouvé dans l'inventaire")
-        return False
-    
-    if user.inventory[item] < qty:
-        logger.warning(f"⚠️  Quantité insuffisante: {user.inventory[item]} < {qty}")
+    inventory = apply_changes(db, user, {item: -qty})
+    if inventory is None:
         return False
     
-    # Mise à jour
-    user.inventory[item] -= qty
-    
-    # Supprime la clé si quantité = 0
-    if user.inventory[item] <= 0:
-        del user.inventory[item]
-        logger.debug(f"   → {item} retiré complètement de l'inventaire")
-    else:
-        logger.debug(f"   → Reste {item}: {user.inventory[item]}")
-    
-    # Commit en base
-    db.commit()
-    db.refresh(user)
+    logger.debug(f"   → Reste {item}: {inventory.get(item, 0)}")
     
     return True
 
@@ -99,10 +243,17 @@ def clear_inventory(db: Session, user: User) -> None:
     """
     logger.info(f"🗑️  Vidage inventaire pour user={user.id}")
     
-    user.inventory = {}
-    
-    db.commit()
-    db.refresh(user)
+    store = get_inventory_store()
+    if store is not None:
+        _sync_user(user, store.replace(user, {}))
+    else:
+        try:
+            replace_inventories(db, {user.id: {}})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        _sync_user(user, {})
     
     logger.info(f"✅ Inventaire vidé")
 
@@ -139,12 +290,11 @@ def has_items(user: User, requirements: dict) -> bool:
         if has_items(user, {"argile": 2, "calcaire": 1}):
             # Peut crafter
     """
-    if user.inventory is None:
-        return False
+    inventory = get_inventory(user)
     
     for item, qty in requirements.items():
-        if user.inventory.get(item, 0) < qty:
-            logger.debug(f"   → Item manquant: {item} (requis: {qty}, possédé: {user.inventory.get(item, 0)})")
+        if inventory.get(item, 0) < qty:
+            logger.debug(f"   → Item manquant: {item} (requis: {qty}, possédé: {inventory.get(item, 0)})")
             return False
     
     return True
\ No newline at end of file
@@ -0,0 +1,515 @@
+# app/services/inventory_store.py
+"""
+Inventaires en write-behind: hash Redis par utilisateur, flush PostgreSQL par lots.
+
+- Un hash par utilisateur (invstore:<user_id>) {item: quantité}, chargé
+  depuis PostgreSQL (table inventory) au premier accès
+- Mises à jour atomiques (HINCRBY) dans un script Lua qui vérifie toutes
+  les quantités avant d'écrire: jamais de quantité négative, un craft
+  (retrait des ingrédients + ajout du produit) passe entièrement ou pas du tout
+- Les utilisateurs modifiés sont inscrits dans un sorted set (score = date de
+  la première modification non flushée)
+- Un thread flusher écrit les inventaires modifiés dans PostgreSQL par lots
+  (lignes de la table inventory remplacées, une transaction par lot)
+
+Bornes de durabilité:
+- En régime normal, une modification atteint PostgreSQL en moins de
+  INVENTORY_FLUSH_INTERVAL secondes
+- Si le plus ancien inventaire non flushé dépasse INVENTORY_MAX_DIRTY_SECONDS,
+  le flusher enchaîne les lots sans attendre et le signale dans les logs
+- Un hash modifié n'expire jamais; un hash flushé expire après
+  INVENTORY_IDLE_TTL secondes d'inactivité (PostgreSQL est alors à jour)
+- Au shutdown, tous les inventaires modifiés sont flushés
+- Un seul flusher actif à la fois (verrou Redis): deux workers ne peuvent
+  pas écrire des instantanés dans le désordre
+
+Les hashes modifiés sont la source de vérité tant qu'ils ne sont pas flushés:
+en cas d'erreur Redis, pas de repli silencieux sur PostgreSQL.
+
+Éviction: un hash modifié n'a pas de TTL, il n'est donc jamais évincé sous
+une politique volatile-* (redis/redis.conf). Sous allkeys-*, Redis peut le
+supprimer avant son flush: un avertissement est logué au démarrage, et un
+hash disparu (sans marqueur __loaded__) n'est jamais flushé, pour ne pas
+écraser l'inventaire PostgreSQL par un inventaire vide.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from redis import Redis, RedisError
+from redis.exceptions import LockError
+from sqlalchemy.orm import Session
+
+import config
+from models import User
+from services.inventory_rows import InsufficientItems, load_user_inventory, replace_inventories
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Charge un inventaire s'il n'est pas déjà en Redis (ne remplace jamais
+# un hash existant, qui peut contenir des modifications non flushées).
+# KEYS[1] = hash ; ARGV = TTL d'inactivité, puis paires item, quantité.
+_HYDRATE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], '__loaded__', 1)
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Applique des deltas {item: +/-n} si aucune quantité ne devient négative.
+# KEYS[1] = hash, KEYS[2] = sorted set des inventaires modifiés ;
+# ARGV = user_id, puis paires item, delta (items uniques).
+# Retourne {-1} si l'inventaire n'est pas chargé, {0, item} si quantité
+# insuffisante, {1, HGETALL} sinon.
+_APPLY_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-1}
+end
+for i = 2, #ARGV, 2 do
+    local delta = tonumber(ARGV[i + 1])
+    if delta < 0 then
+        local current = tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or '0')
+        if current + delta < 0 then
+            return {0, ARGV[i]}
+        end
+    end
+end
+for i = 2, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1]) <= 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+redis.call('PERSIST', KEYS[1])
+redis.call('ZADD', KEYS[2], 'NX', redis.call('TIME')[1], ARGV[1])
+return {1, redis.call('HGETALL', KEYS[1])}
+"""
+
+# Remplace tout l'inventaire (vidage, correction admin).
+# KEYS/ARGV comme _APPLY_LUA, avec des quantités au lieu de deltas.
+_REPLACE_LUA = """
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], '__loaded__', 1)
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('ZADD', KEYS[2], 'NX', redis.call('TIME')[1], ARGV[1])
+return 1
+"""
+
+# Prend un instantané des inventaires à flusher et les retire du set des
+# modifiés, atomiquement: une modification ultérieure les y réinscrit.
+# KEYS[1] = sorted set, KEYS[2..] = hashes ; ARGV = user_ids (même ordre).
+# Retourne {user_id, score, HGETALL, ...} pour les utilisateurs encore modifiés;
+# HGETALL vaut 0 si le hash a disparu (évincé): il n'y a rien à flusher.
+_SNAPSHOT_LUA = """
+local result = {}
+for i, user_id in ipairs(ARGV) do
+    local score = redis.call('ZSCORE', KEYS[1], user_id)
+    if score then
+        redis.call('ZREM', KEYS[1], user_id)
+        table.insert(result, user_id)
+        table.insert(result, score)
+        if redis.call('HEXISTS', KEYS[i + 1], '__loaded__') == 1 then
+            table.insert(result, redis.call('HGETALL', KEYS[i + 1]))
+        else
+            table.insert(result, 0)
+        end
+    end
+end
+return result
+"""
+
+# Après un flush réussi: les hashes non modifiés entre-temps peuvent expirer.
+# KEYS comme _SNAPSHOT_LUA ; ARGV[1] = TTL, ARGV[2..] = user_ids.
+_SETTLE_LUA = """
+for i = 2, #ARGV do
+    if not redis.call('ZSCORE', KEYS[1], ARGV[i]) then
+        redis.call('EXPIRE', KEYS[i], ARGV[1])
+    end
+end
+return 1
+"""
+
+
+class InventoryStore:
+    """
+    Inventaires utilisateurs en Redis avec flush différé vers PostgreSQL.
+
+    Usage:
+        store = InventoryStore(cache.redis)
+        store.start_flusher(SessionLocal)
+        inventory = store.apply(user, {"argile": -2, "brique": 1})
+    """
+
+    PREFIX = "invstore"
+    DIRTY_KEY = "invstore:dirty"
+    LOCK_KEY = "lock:invstore:flush"
+    LOADED_FIELD = "__loaded__"
+
+    def __init__(
+        self,
+        redis: Redis,
+        flush_interval: float = 2.0,
+        flush_batch: int = 200,
+        max_dirty_seconds: float = 30.0,
+        idle_ttl: int = 3600,
+        loader: Optional[Callable[[User], Dict[str, int]]] = None
+    ):
+        """
+        Args:
+            redis: Client Redis (decode_responses=True), celui du CacheService
+            flush_interval: Période du flusher (s)
+            flush_batch: Nombre max d'utilisateurs par transaction PostgreSQL
+            max_dirty_seconds: Âge max toléré d'une modification non flushée (s)
+            idle_ttl: Expiration d'un inventaire flushé et inactif (s)
+            loader: Lecture de l'inventaire PostgreSQL d'un utilisateur
+                (défaut: User.inventory déjà chargé)
+        """
+        self.redis = redis
+        self.loader = loader or (lambda user: user.inventory or {})
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.max_dirty_seconds = max_dirty_seconds
+        self.idle_ttl = idle_ttl
+
+        self._hydrate = redis.register_script(_HYDRATE_LUA)
+        self._apply = redis.register_script(_APPLY_LUA)
+        self._replace = redis.register_script(_REPLACE_LUA)
+        self._snapshot = redis.register_script(_SNAPSHOT_LUA)
+        self._settle = redis.register_script(_SETTLE_LUA)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self.stats = {
+            "flushed_users": 0, "flush_batches": 0, "flush_errors": 0,
+            "evicted_users": 0, "last_flush_ms": 0.0,
+        }
+
+    # =========================================================================
+    # LECTURES / ÉCRITURES
+    # =========================================================================
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.PREFIX}:{user_id}"
+
+    def _decode(self, flat: List[Any]) -> Dict[str, int]:
+        """HGETALL brut (liste plate) → {item: quantité}, sans le marqueur"""
+        inventory = {}
+        for i in range(0, len(flat), 2):
+            field = flat[i].decode() if isinstance(flat[i], bytes) else flat[i]
+            if field != self.LOADED_FIELD:
+                inventory[field] = int(flat[i + 1])
+        return inventory
+
+    def load(self, user: User) -> None:
+        """Charge l'inventaire PostgreSQL en Redis s'il n'y est pas déjà"""
+        args = [self.idle_ttl]
+        for item, qty in self.loader(user).items():
+            if qty > 0:
+                args.extend([item, int(qty)])
+        if self._hydrate(keys=[self._key(user.id)], args=args):
+            logger.debug(f"📥 Inventaire user={user.id} chargé en Redis")
+
+    def get(self, user: User) -> Dict[str, int]:
+        """
+        Inventaire courant (Redis), chargé depuis PostgreSQL si absent.
+
+        Args:
+            user: Utilisateur
+
+        Returns:
+            Dict {item: quantité}
+        """
+        key = self._key(user.id)
+        flat = self.redis.hgetall(key)
+        if not flat:
+            self.load(user)
+            flat = self.redis.hgetall(key)
+        return {
+            item: int(qty) for item, qty in flat.items()
+            if item != self.LOADED_FIELD
+        }
+
+    def apply(self, user: User, deltas: Dict[str, int]) -> Dict[str, int]:
+        """
+        Applique des variations de quantités en une opération atomique.
+
+        Args:
+            user: Utilisateur
+            deltas: {item: variation} (positive = ajout, négative = retrait)
+
+        Returns:
+            Inventaire mis à jour
+
+        Raises:
+            InsufficientItems: Un retrait dépasse la quantité possédée
+                (aucune variation n'est appliquée)
+        """
+        args = [user.id]
+        for item, delta in deltas.items():
+            if delta:
+                args.extend([item, int(delta)])
+
+        keys = [self._key(user.id), self.DIRTY_KEY]
+        result = self._apply(keys=keys, args=args)
+        if result[0] == -1:
+            self.load(user)
+            result = self._apply(keys=keys, args=args)
+
+        if result[0] == 0:
+            raise InsufficientItems(result[1])
+        return self._decode(result[1])
+
+    def replace(self, user: User, inventory: Dict[str, int]) -> Dict[str, int]:
+        """
+        Remplace tout l'inventaire (ex: vidage).
+
+        Args:
+            user: Utilisateur
+            inventory: Nouvel inventaire {item: quantité}
+
+        Returns:
+            Inventaire enregistré
+        """
+        inventory = {item: int(qty) for item, qty in inventory.items() if qty > 0}
+        args = [user.id]
+        for item, qty in inventory.items():
+            args.extend([item, qty])
+        self._replace(keys=[self._key(user.id), self.DIRTY_KEY], args=args)
+        return inventory
+
+    # =========================================================================
+    # FLUSH VERS POSTGRESQL
+    # =========================================================================
+
+    def dirty_count(self) -> int:
+        """Nombre d'inventaires modifiés non flushés"""
+        return self.redis.zcard(self.DIRTY_KEY)
+
+    def oldest_dirty_age(self) -> float:
+        """Âge (s) de la plus ancienne modification non flushée, 0 si aucune"""
+        oldest = self.redis.zrange(self.DIRTY_KEY, 0, 0, withscores=True)
+        if not oldest:
+            return 0.0
+        return max(0.0, time.time() - oldest[0][1])
+
+    def flush_batch_once(self, db: Session) -> int:
+        """
+        Flushe un lot d'inventaires modifiés (les plus anciens d'abord).
+
+        Les lignes d'inventaire du lot sont remplacées en une transaction.
+        En cas d'échec PostgreSQL, les utilisateurs sont réinscrits dans le
+        set des modifiés. Un hash évincé avant son flush est ignoré (ses
+        modifications sont perdues, PostgreSQL garde l'état précédent).
+
+        Args:
+            db: Session SQLAlchemy
+
+        Returns:
+            Nombre d'utilisateurs flushés
+        """
+        user_ids = self.redis.zrange(self.DIRTY_KEY, 0, self.flush_batch - 1)
+        if not user_ids:
+            return 0
+
+        keys = [self.DIRTY_KEY] + [self._key(uid) for uid in user_ids]
+        flat = self._snapshot(keys=keys, args=user_ids)
+        snapshots: List[Tuple[str, float, Dict[str, int]]] = []
+        for i in range(0, len(flat), 3):
+            user_id, score, entries = flat[i], float(flat[i + 1]), flat[i + 2]
+            if entries == 0:
+                self.stats["evicted_users"] += 1
+                logger.error(
+                    f"🚨 Inventaire user={user_id} évincé de Redis avant son flush: "
+                    f"modifications depuis {time.time() - score:.0f}s perdues, "
+                    f"inventaire PostgreSQL conservé (vérifier maxmemory-policy)"
+                )
+                continue
+            snapshots.append((user_id, score, self._decode(entries)))
+        if not snapshots:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            replace_inventories(db, {uid: inventory for uid, _, inventory in snapshots})
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.redis.zadd(self.DIRTY_KEY, {uid: score for uid, score, _ in snapshots}, nx=True)
+            self.stats["flush_errors"] += 1
+            raise
+
+        flushed = [uid for uid, _, _ in snapshots]
+        self._settle(
+            keys=[self.DIRTY_KEY] + [self._key(uid) for uid in flushed],
+            args=[self.idle_ttl] + flushed
+        )
+
+        self.stats["flushed_users"] += len(flushed)
+        self.stats["flush_batches"] += 1
+        self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        logger.debug(f"💾 {len(flushed)} inventaire(s) flushé(s) vers PostgreSQL")
+        return len(flushed)
+
+    def flush(self, session_factory: Callable[[], Session], drain: bool = False) -> int:
+        """
+        Flushe les inventaires modifiés sous le verrou du flusher.
+
+        Enchaîne les lots tant qu'ils sont pleins ou que la plus ancienne
+        modification dépasse max_dirty_seconds; drain=True vide tout (shutdown).
+
+        Args:
+            session_factory: Fabrique de sessions (SessionLocal)
+            drain: Flushe jusqu'à ce qu'il n'y ait plus rien
+
+        Returns:
+            Nombre d'utilisateurs flushés (0 si un autre worker tient le verrou)
+        """
+        lock = self.redis.lock(self.LOCK_KEY, timeout=max(30, int(self.max_dirty_seconds)))
+        if not lock.acquire(blocking=drain, blocking_timeout=10):
+            return 0
+
+        total = 0
+        try:
+            db = session_factory()
+            try:
+                while True:
+                    flushed = self.flush_batch_once(db)
+                    total += flushed
+                    if flushed == 0:
+                        break
+                    age = self.oldest_dirty_age()
+                    if age > self.max_dirty_seconds:
+                        logger.warning(
+                            f"⚠️  Flush inventaires en retard: plus ancienne modification "
+                            f"il y a {age:.1f}s ({self.dirty_count()} en attente)"
+                        )
+                    elif not drain and flushed < self.flush_batch:
+                        break
+                    lock.extend(max(30, int(self.max_dirty_seconds)), replace_ttl=True)
+            finally:
+                db.close()
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush(self._session_factory)
+            except (RedisError, LockError) as e:
+                logger.warning(f"⚠️  Flush inventaires impossible (Redis): {e}")
+            except Exception as e:
+                logger.error(f"❌ Flush inventaires échoué: {e}", exc_info=True)
+
+    def start_flusher(self, session_factory: Callable[[], Session]):
+        """Démarre le thread flusher (daemon)"""
+        self._session_factory = session_factory
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="inventory-flusher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"💾 Flusher inventaires démarré (toutes les {self.flush_interval}s)")
+
+    def stop_flusher(self):
+        """Arrête le thread puis flushe tout ce qui reste"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        if self._session_factory is not None:
+            try:
+                flushed = self.flush(self._session_factory, drain=True)
+                logger.info(f"💾 Flush final: {flushed} inventaire(s)")
+            except Exception as e:
+                logger.error(f"❌ Flush final des inventaires échoué: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du flusher (ce worker) et backlog global"""
+        return {
+            **self.stats,
+            "dirty_users": self.dirty_count(),
+            "oldest_dirty_seconds": round(self.oldest_dirty_age(), 1),
+        }
+
+
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_inventory_store: Optional[InventoryStore] = None
+
+
+def _warn_if_evictable(redis: Redis):
+    """Signale une politique d'éviction qui peut supprimer des hashes non flushés"""
+    try:
+        policy = redis.info("memory").get("maxmemory_policy", "")
+    except RedisError as e:
+        logger.debug(f"Politique d'éviction Redis inconnue: {e}")
+        return
+    if policy.startswith("allkeys"):
+        logger.warning(
+            f"⚠️  Redis maxmemory-policy={policy}: des inventaires non flushés peuvent "
+            f"être évincés (utiliser volatile-lru ou noeviction)"
+        )
+
+
+def init_inventory_store(cache, session_factory: Callable[[], Session]) -> Optional[InventoryStore]:
+    """
+    Crée le store partagé et démarre son flusher.
+
+    Appelée dans le lifespan de main.py après init_cache_service. Sans
+    cache Redis (ou INVENTORY_STORE_ENABLED=false), les inventaires restent
+    écrits directement dans PostgreSQL.
+
+    Args:
+        cache: CacheService partagé (son client Redis est réutilisé) ou None
+        session_factory: Fabrique de sessions pour le flusher
+
+    Returns:
+        InventoryStore: Instance partagée ou None
+    """
+    global _inventory_store
+
+    if cache is None or not config.INVENTORY_STORE_ENABLED:
+        logger.info("Inventaires en écriture directe PostgreSQL (store Redis désactivé)")
+        return None
+
+    _warn_if_evictable(cache.redis)
+    _inventory_store = InventoryStore(
+        cache.redis,
+        flush_interval=config.INVENTORY_FLUSH_INTERVAL,
+        flush_batch=config.INVENTORY_FLUSH_BATCH,
+        max_dirty_seconds=config.INVENTORY_MAX_DIRTY_SECONDS,
+        idle_ttl=config.INVENTORY_IDLE_TTL,
+        loader=load_user_inventory
+    )
+    _inventory_store.start_flusher(session_factory)
+    return _inventory_store
+
+
+def close_inventory_store():
+    """Arrête le flusher après un flush complet (avant close_cache_service)"""
+    global _inventory_store
+
+    if _inventory_store is not None:
+        _inventory_store.stop_flusher()
+        _inventory_store = None
+
+
+def get_inventory_store() -> Optional[InventoryStore]:
+    """Store partagé ou None (écriture directe PostgreSQL)"""
+    return _inventory_store
@@ -0,0 +1,373 @@
+# app/services/leaderboard_service.py
+"""
+Leaderboards en sorted sets Redis.
+
+- Un sorted set par classement (member = user_id, score = valeur classée)
+- Mise à jour incrémentale: chaque commit qui modifie des UserStatistics
+  via l'ORM pousse les nouveaux scores (ZADD), sans relire la table
+- Requêtes en O(log N + K): top-K, rang d'un joueur, joueurs autour de lui
+- Reconstruction complète périodique depuis PostgreSQL (réconciliation des
+  mises à jour faites hors ORM, ex: triggers SQL), construite dans des clés
+  temporaires puis basculée atomiquement (RENAME): les lecteurs ne voient
+  jamais un classement partiel
+
+Classements: crafters, traders, richest, global (voir BOARDS).
+"""
+
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from redis import Redis, RedisError
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, lazyload, object_session
+
+import config
+from models import UserStatistics
+from services.cache_service import CacheKeyspace
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Classement → score d'un UserStatistics (ordre décroissant)
+BOARDS: Dict[str, Callable[[UserStatistics], float]] = {
+    "crafters": lambda stats: stats.total_crafts,
+    "traders": lambda stats: stats.total_sales,
+    "richest": lambda stats: stats.total_gold_earned,
+    "global": lambda stats: stats.get_rank_score(),
+}
+
+
+def scores_for(stats: UserStatistics) -> Dict[str, float]:
+    """Scores d'un joueur sur tous les classements"""
+    return {board: float(score(stats)) for board, score in BOARDS.items()}
+
+
+class LeaderboardService:
+    """
+    Classements Redis (sorted sets) alimentés par UserStatistics.
+
+    Usage:
+        boards = LeaderboardService(cache.redis)
+        boards.top("crafters", limit=10)
+        boards.around("global", user_id, radius=5)
+    """
+
+    LOCK_KEY = "lock:leaderboard:rebuild"
+    REBUILD_TTL = 3600  # Clés temporaires abandonnées (worker tué en pleine reconstruction)
+
+    def __init__(self, redis: Redis, rebuild_interval: int = 900, rebuild_batch: int = 1000):
+        """
+        Args:
+            redis: Client Redis (decode_responses=True), celui du CacheService
+            rebuild_interval: Période de la reconstruction complète (s)
+            rebuild_batch: Lignes lues / ZADD envoyés par lot pendant la reconstruction
+        """
+        self.redis = redis
+        self.rebuild_interval = rebuild_interval
+        self.rebuild_batch = rebuild_batch
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._rebuild_lock = threading.Lock()
+
+    def _key(self, board: str) -> str:
+        if board not in BOARDS:
+            raise ValueError(f"Classement inconnu: {board}")
+        return f"{CacheKeyspace.PREFIX_LEADERBOARD}:board:{board}"
+
+    # =========================================================================
+    # MISES À JOUR INCRÉMENTALES
+    # =========================================================================
+
+    def update_many(self, scores: Dict[str, Dict[str, float]]) -> None:
+        """
+        Enregistre les scores de plusieurs joueurs en un aller-retour.
+
+        Args:
+            scores: {user_id: {board: score}}
+        """
+        by_board: Dict[str, Dict[str, float]] = {}
+        for user_id, boards in scores.items():
+            for board, score in boards.items():
+                by_board.setdefault(board, {})[user_id] = score
+
+        pipe = self.redis.pipeline(transaction=False)
+        for board, mapping in by_board.items():
+            pipe.zadd(self._key(board), mapping)
+        pipe.execute()
+
+    def update_user(self, user_id: str, scores: Dict[str, float]) -> None:
+        """Enregistre les scores d'un joueur"""
+        self.update_many({user_id: scores})
+
+    def remove_user(self, user_id: str) -> None:
+        """Retire un joueur de tous les classements"""
+        pipe = self.redis.pipeline(transaction=False)
+        for board in BOARDS:
+            pipe.zrem(self._key(board), user_id)
+        pipe.execute()
+
+    # =========================================================================
+    # REQUÊTES
+    # =========================================================================
+
+    def _entries(self, rows: List[Any], first_rank: int) -> List[Dict[str, Any]]:
+        return [
+            {"rank": first_rank + i, "user_id": user_id, "score": score}
+            for i, (user_id, score) in enumerate(rows)
+        ]
+
+    def top(self, board: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Top-K d'un classement.
+
+        Args:
+            board: Nom du classement
+            limit: Nombre de joueurs
+            offset: Décalage (pagination)
+
+        Returns:
+            [{rank (1 = premier), user_id, score}]
+        """
+        rows = self.redis.zrevrange(self._key(board), offset, offset + limit - 1, withscores=True)
+        return self._entries(rows, offset + 1)
+
+    def rank(self, board: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Rang et score d'un joueur.
+
+        Returns:
+            {rank, user_id, score, total} ou None si le joueur n'est pas classé
+        """
+        key = self._key(board)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrevrank(key, user_id)
+        pipe.zscore(key, user_id)
+        pipe.zcard(key)
+        position, score, total = pipe.execute()
+        if position is None:
+            return None
+        return {"rank": position + 1, "user_id": user_id, "score": score, "total": total}
+
+    def around(self, board: str, user_id: str, radius: int = 5) -> List[Dict[str, Any]]:
+        """
+        Joueurs classés autour d'un joueur (lui compris).
+
+        Args:
+            board: Nom du classement
+            user_id: Joueur central
+            radius: Nombre de joueurs de chaque côté
+
+        Returns:
+            [{rank, user_id, score}] ; vide si le joueur n'est pas classé
+        """
+        key = self._key(board)
+        position = self.redis.zrevrank(key, user_id)
+        if position is None:
+            return []
+        start = max(0, position - radius)
+        rows = self.redis.zrevrange(key, start, position + radius, withscores=True)
+        return self._entries(rows, start + 1)
+
+    def size(self, board: str) -> int:
+        """Nombre de joueurs classés"""
+        return self.redis.zcard(self._key(board))
+
+    # =========================================================================
+    # RECONSTRUCTION DEPUIS POSTGRESQL
+    # =========================================================================
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Reconstruit tous les classements depuis user_statistics.
+
+        Lecture en flux (yield_per), écriture par lots dans des clés
+        temporaires, puis bascule atomique. Une mise à jour incrémentale
+        commitée pendant la reconstruction peut être écrasée par la bascule;
+        elle réapparaît à la mise à jour suivante du joueur ou au prochain
+        passage.
+
+        Args:
+            db: Session SQLAlchemy
+
+        Returns:
+            Nombre de joueurs classés
+        """
+        token = uuid.uuid4().hex
+        temp = {board: f"{self._key(board)}:rebuild:{token}" for board in BOARDS}
+        count = 0
+
+        try:
+            rows = db.execute(
+                select(UserStatistics)
+                .options(lazyload(UserStatistics.user))
+                .execution_options(yield_per=self.rebuild_batch)
+            ).scalars()
+            batch: Dict[str, Dict[str, float]] = {}
+            for stats in rows:
+                batch[stats.user_id] = scores_for(stats)
+                if len(batch) >= self.rebuild_batch:
+                    count += self._write_temp(temp, batch)
+                    batch = {}
+            if batch:
+                count += self._write_temp(temp, batch)
+
+            swap = self.redis.pipeline(transaction=True)
+            for board, key in temp.items():
+                if count:
+                    # RENAME conserve le TTL de secours de la clé temporaire
+                    swap.rename(key, self._key(board))
+                    swap.persist(self._key(board))
+                else:
+                    swap.delete(self._key(board))
+            swap.execute()
+        except Exception:
+            self.redis.delete(*temp.values())
+            raise
+
+        logger.info(f"🏆 Leaderboards reconstruits: {count} joueur(s)")
+        return count
+
+    def _write_temp(self, temp: Dict[str, str], batch: Dict[str, Dict[str, float]]) -> int:
+        pipe = self.redis.pipeline(transaction=False)
+        for board, key in temp.items():
+            pipe.zadd(key, {user_id: scores[board] for user_id, scores in batch.items()})
+            pipe.expire(key, self.REBUILD_TTL)
+        pipe.execute()
+        return len(batch)
+
+    def rebuild_if_due(self, session_factory: Callable[[], Session], force: bool = False) -> Optional[int]:
+        """
+        Reconstruit si aucun worker ne l'a fait depuis rebuild_interval.
+
+        Le verrou n'est pas relâché: il expire après rebuild_interval et
+        sert de marqueur "dernière reconstruction" partagé par les workers.
+
+        Returns:
+            Nombre de joueurs classés, None si pas dû
+        """
+        # Un seul passage à la fois dans ce worker (thread périodique, warm-up)
+        with self._rebuild_lock:
+            # Classements absents (Redis vidé, premier démarrage): sans attendre
+            force = force or not self.redis.exists(self._key("global"))
+            if force:
+                self.redis.set(self.LOCK_KEY, "1", ex=self.rebuild_interval)
+            elif not self.redis.set(self.LOCK_KEY, "1", nx=True, ex=self.rebuild_interval):
+                return None
+
+            db = session_factory()
+            try:
+                return self.rebuild(db)
+            finally:
+                db.close()
+
+    def _run(self):
+        while True:
+            try:
+                self.rebuild_if_due(self._session_factory)
+            except RedisError as e:
+                logger.warning(f"⚠️  Reconstruction leaderboards impossible (Redis): {e}")
+            except Exception as e:
+                logger.error(f"❌ Reconstruction leaderboards échouée: {e}", exc_info=True)
+            if self._stop.wait(self.rebuild_interval):
+                return
+
+    def start_rebuilder(self, session_factory: Callable[[], Session]):
+        """Démarre la reconstruction périodique (thread daemon, premier passage immédiat)"""
+        self._session_factory = session_factory
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="leaderboard-rebuilder", daemon=True)
+        self._thread.start()
+        logger.info(f"🏆 Reconstruction des leaderboards toutes les {self.rebuild_interval}s")
+
+    def stop_rebuilder(self):
+        """Arrête le thread de reconstruction"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# =========================================================================
+# MISES À JOUR VIA L'ORM (poussées après commit)
+# =========================================================================
+
+_PENDING_KEY = "leaderboard_pending"
+
+
+@event.listens_for(UserStatistics, "after_insert")
+@event.listens_for(UserStatistics, "after_update")
+def _collect_scores(mapper, connection, target):
+    """Calcule les scores pendant le flush (les attributs expirent au commit)"""
+    if _leaderboard_service is None:
+        return
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, {})[target.user_id] = scores_for(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_scores(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and _leaderboard_service is not None:
+        try:
+            _leaderboard_service.update_many(pending)
+        except RedisError as e:
+            # Rattrapé par la prochaine reconstruction
+            logger.warning(f"⚠️  Mise à jour leaderboards impossible: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_scores(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_leaderboard_service: Optional[LeaderboardService] = None
+
+
+def init_leaderboard_service(cache, session_factory: Callable[[], Session]) -> Optional[LeaderboardService]:
+    """
+    Crée le service partagé et démarre la reconstruction périodique.
+
+    Args:
+        cache: CacheService partagé (son client Redis est réutilisé) ou None
+        session_factory: Fabrique de sessions pour la reconstruction
+
+    Returns:
+        LeaderboardService: Instance partagée ou None sans Redis
+    """
+    global _leaderboard_service
+
+    if cache is None:
+        logger.info("Leaderboards Redis indisponibles (pas de cache)")
+        return None
+
+    _leaderboard_service = LeaderboardService(
+        cache.redis,
+        rebuild_interval=config.LEADERBOARD_REBUILD_INTERVAL,
+        rebuild_batch=config.LEADERBOARD_REBUILD_BATCH
+    )
+    _leaderboard_service.start_rebuilder(session_factory)
+    return _leaderboard_service
+
+
+def close_leaderboard_service():
+    """Arrête la reconstruction périodique"""
+    global _leaderboard_service
+
+    if _leaderboard_service is not None:
+        _leaderboard_service.stop_rebuilder()
+        _leaderboard_service = None
+
+
+def get_leaderboards() -> Optional[LeaderboardService]:
+    """
+    FastAPI dependency: service de leaderboards partagé ou None sans Redis
+    """
+    return _leaderboard_service
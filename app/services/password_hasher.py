@@ -0,0 +1,259 @@
+# app/services/password_hasher.py
+"""
+Hachage des mots de passe (PBKDF2, 260 000 itérations) hors du threadpool.
+
+Les calculs PBKDF2 tournent dans un pool de processus dédié, dimensionné
+sur les cœurs: une rafale de connexions n'occupe plus que les threads qui
+attendent leur résultat, jamais le CPU du worker. L'admission est bornée
+(calculs en cours + file d'attente): au-delà, PasswordHasherBusy est levée
+immédiatement et la route répond 503, sans attendre.
+
+- Processus démarrés par spawn (pas de fork d'un worker multi-thread:
+  verrous, connexions Redis/PostgreSQL et threads ne sont pas hérités)
+  et pré-chauffés au démarrage (aucune connexion ne paie leur lancement)
+- Délai max par calcul (attente dans la file incluse)
+- Métriques: profondeur de file, calculs en cours, latence, rejets
+
+Sans pool (scripts, tests, PASSWORD_HASH_POOL_ENABLED=false), les fonctions
+hash_password / verify_password calculent dans le thread appelant.
+
+Usage:
+    from services.password_hasher import verify_password, PasswordHasherBusy
+
+    try:
+        ok = verify_password(password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(503, ...)
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+import config
+from services.cache_metrics import Histogram
+from utils import auth
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# PBKDF2 dure ~100-300 ms: buckets plus larges que ceux du cache
+HASH_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PasswordHasherBusy(Exception):
+    """Pool saturé ou calcul trop long: réessayer plus tard (HTTP 503)"""
+
+
+class PasswordHasher:
+    """
+    Pool de processus pour PBKDF2, avec admission bornée.
+
+    Usage:
+        hasher = PasswordHasher(workers=4, max_queue=16, timeout=5)
+        hasher.verify(password, hashed)
+        hasher.close()
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        """
+        Args:
+            workers: Processus du pool (calculs simultanés)
+            max_queue: Calculs admis en attente d'un processus libre
+            timeout: Délai max d'un calcul, file d'attente incluse (s)
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        # spawn: un fork copierait l'état du worker HTTP (threads, verrous tenus, sockets)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self.counters = {"ok": 0, "rejected": 0, "timeout": 0, "error": 0}
+        self.wait_latency = Histogram(HASH_LATENCY_BUCKETS)
+        self.hash_latency = Histogram(HASH_LATENCY_BUCKETS)
+
+    def _count(self, result: str):
+        with self._lock:
+            self.counters[result] += 1
+
+    def _run(self, fn: Callable, *args) -> Any:
+        """Soumet fn au pool et attend son résultat (au plus timeout)"""
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            logger.warning("⚠️  Pool de hachage saturé, requête refusée")
+            raise PasswordHasherBusy("Password hashing pool saturated")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._admitted += 1
+        try:
+            future: Future = self._executor.submit(_timed, fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        # Le créneau n'est rendu qu'à la fin réelle du calcul (même après un timeout)
+        future.add_done_callback(self._release)
+
+        try:
+            result, started, duration = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._count("timeout")
+            logger.warning(f"⚠️  Hachage abandonné après {self.timeout}s")
+            raise PasswordHasherBusy("Password hashing timed out")
+        except Exception:
+            self._count("error")
+            raise
+
+        with self._lock:
+            self.counters["ok"] += 1
+            self.wait_latency.observe(max(0.0, started - submitted))
+            self.hash_latency.observe(duration)
+        return result
+
+    def _release(self, future: Optional[Future]):
+        with self._lock:
+            self._admitted -= 1
+        self._slots.release()
+
+    def warm_up(self, timeout: float = 30.0):
+        """
+        Démarre tous les processus du pool et y charge utils.auth.
+
+        Le pool ne lance ses processus qu'à la demande: sans pré-chauffage,
+        les premières connexions paient le démarrage d'un interpréteur
+        (plusieurs centaines de ms avec spawn).
+
+        Args:
+            timeout: Délai max de démarrage de l'ensemble des processus (s)
+        """
+        started = time.perf_counter()
+        futures = [self._executor.submit(_warm) for _ in range(self.workers)]
+        for future in futures:
+            future.result(timeout=timeout)
+        logger.debug(f"   → {self.workers} processus de hachage prêts en {time.perf_counter() - started:.2f}s")
+
+    def hash(self, password: str) -> str:
+        return self._run(auth.hash_password, password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run(auth.verify_password, password, hashed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """File d'attente, compteurs et latences (pour /metrics et l'admin)"""
+        with self._lock:
+            in_flight = self._admitted
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": in_flight,
+                "queued": max(0, in_flight - self.workers),
+                **self.counters,
+                "wait_latency": self.wait_latency.to_dict(),
+                "hash_latency": self.hash_latency.to_dict(),
+            }
+
+    def render_prometheus(self) -> str:
+        """Export au format texte Prometheus"""
+        stats = self.get_stats()
+        lines = [
+            "# HELP bcraftd_password_hash_in_flight Calculs PBKDF2 admis (en cours + en file)",
+            "# TYPE bcraftd_password_hash_in_flight gauge",
+            f"bcraftd_password_hash_in_flight {stats['in_flight']}",
+            "# HELP bcraftd_password_hash_queued Calculs PBKDF2 en attente d'un processus",
+            "# TYPE bcraftd_password_hash_queued gauge",
+            f"bcraftd_password_hash_queued {stats['queued']}",
+            "# HELP bcraftd_password_hash_total Calculs PBKDF2 par résultat",
+            "# TYPE bcraftd_password_hash_total counter",
+        ]
+        for result in ("ok", "rejected", "timeout", "error"):
+            lines.append(f'bcraftd_password_hash_total{{result="{result}"}} {stats[result]}')
+        for name, hist in (("wait", self.wait_latency), ("hash", self.hash_latency)):
+            metric = f"bcraftd_password_hash_{name}_seconds"
+            lines += [f"# HELP {metric} Latence PBKDF2 ({name})", f"# TYPE {metric} histogram"]
+            with self._lock:
+                for bound, count in hist.cumulative():
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {count}')
+                lines.append(f"{metric}_sum {hist.total}")
+                lines.append(f"{metric}_count {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _warm() -> int:
+    """Exécuté dans le processus du pool: import de utils.auth fait, rien d'autre"""
+    return os.getpid()
+
+
+def _timed(fn: Callable, *args):
+    """
+    Exécuté dans le processus du pool: (résultat, début, durée)
+
+    perf_counter est une horloge monotone système: le début est comparable
+    à l'instant de soumission mesuré dans le worker HTTP.
+    """
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, started, time.perf_counter() - started
+
+
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def init_password_hasher() -> Optional[PasswordHasher]:
+    """Démarre le pool de hachage (lifespan), si activé"""
+    global _password_hasher
+    if not config.PASSWORD_HASH_POOL_ENABLED:
+        logger.info("Pool de hachage désactivé (PBKDF2 dans le thread appelant)")
+        return None
+    workers = config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    _password_hasher = PasswordHasher(
+        workers=workers,
+        max_queue=config.PASSWORD_HASH_QUEUE,
+        timeout=config.PASSWORD_HASH_TIMEOUT,
+    )
+    _password_hasher.warm_up()
+    logger.info(
+        f"✅ Pool de hachage: {workers} processus, file {config.PASSWORD_HASH_QUEUE}, "
+        f"timeout {config.PASSWORD_HASH_TIMEOUT}s"
+    )
+    return _password_hasher
+
+
+def close_password_hasher():
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.close()
+        _password_hasher = None
+
+
+def get_password_hasher() -> Optional[PasswordHasher]:
+    return _password_hasher
+
+
+def hash_password(password: str) -> str:
+    """Hash un password (pool si démarré). Peut lever PasswordHasherBusy."""
+    if _password_hasher is None:
+        return auth.hash_password(password)
+    return _password_hasher.hash(password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Vérifie un password (pool si démarré). Peut lever PasswordHasherBusy."""
+    if _password_hasher is None:
+        return auth.verify_password(password, hashed)
+    return _password_hasher.verify(password, hashed)
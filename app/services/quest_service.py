@@ -0,0 +1,107 @@
+# app/services/quest_service.py
+"""
+Service de quêtes - VERSION POSTGRESQL
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from database.optimistic import retry_on_conflict
+from models import Quest, User
+from services.inventory_service import InventoryUnitOfWork, get_inventory
+from services.inventory_store import InsufficientItems
+from services.xp_service import add_xp
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def complete_quest(db: Session, user: User, quest: Quest) -> Dict[str, Any]:
+    """
+    Complète une quête, en une transaction.
+
+    - Vérifie les conditions (niveau, profession)
+    - Vérifie les requirements (items collectés)
+    - Retire les items requis
+    - Donne les rewards (XP, items)
+
+    Items et XP sont écrits par un seul commit (InventoryUnitOfWork). Si
+    l'utilisateur a été modifié entre-temps (conflit de version), la quête
+    est rejouée sur l'état relu (retry_on_conflict).
+
+    Args:
+        db: Session SQLAlchemy
+        user: Utilisateur
+        quest: Quête
+
+    Returns:
+        {"status": "completed", ...} ou {"status": "not_enough_items", "missing": {...}}
+
+    Raises:
+        ValueError: Niveau ou profession insuffisants
+        UpdateConflict: Conflit de version persistant
+    """
+    return retry_on_conflict(db, "quest_complete", lambda: _complete_once(db, user, quest))
+
+
+def _complete_once(db: Session, user: User, quest: Quest) -> Dict[str, Any]:
+    """Un essai de complétion: vérifications sur l'état courant puis commit unique"""
+    # Vérifications niveau
+    if quest.required_level > user.level:
+        logger.warning(f"⚠️  Niveau insuffisant: requis={quest.required_level}, actuel={user.level}")
+        raise ValueError(f"Niveau {quest.required_level} requis")
+
+    # Vérifications profession
+    if quest.required_profession and quest.required_profession != user.profession:
+        logger.warning(f"⚠️  Profession incorrecte")
+        raise ValueError(f"Profession '{quest.required_profession}' requise")
+
+    # Vérifications requirements (collect)
+    req_collect = quest.requirements.get("collect", {})
+
+    logger.debug(f"   → Vérification requirements: {req_collect}")
+
+    inventory = get_inventory(user)
+    for item, qty in req_collect.items():
+        if inventory.get(item, 0) < qty:
+            logger.warning(f"⚠️  Items insuffisants: {item} (requis: {qty}, possédé: {inventory.get(item, 0)})")
+            return {
+                "status": "not_enough_items",
+                "missing": {item: qty - inventory.get(item, 0)}
+            }
+
+    # Applique rewards
+    rewards = quest.rewards or {}
+    logger.debug(f"   → Application rewards: {rewards}")
+
+    old_level = user.level
+
+    # XP
+    if "xp" in rewards:
+        add_xp(user, rewards["xp"])
+
+    # Retire les items requis et ajoute les items de récompense: un seul
+    # commit avec l'XP (tout ou rien)
+    logger.debug(f"   → Retrait des items requis")
+    uow = InventoryUnitOfWork(db, user)
+    for item, qty in req_collect.items():
+        uow.remove(item, qty)
+    uow.stage(rewards.get("items", {}))
+    try:
+        uow.commit()
+    except InsufficientItems:
+        return {"status": "not_enough_items", "missing": {}}
+
+    level_up = user.level > old_level
+
+    if level_up:
+        logger.info(f"   🎉 Level up! {old_level} → {user.level}")
+
+    return {
+        "status": "completed",
+        "reward": rewards,
+        "level": user.level,
+        "xp": user.xp,
+        "level_up": level_up,
+    }
@@ -0,0 +1,531 @@
+# app/services/refresh_token_store.py
+"""
+Miroir Redis des refresh tokens actifs (PostgreSQL reste la source de vérité).
+
+- Un hash par token (rt:<token_hash>) {user_id, device_id, device_name,
+  created_at, expires_at}, expirant à la date d'expiration du token (EXPIREAT)
+- Un set par utilisateur (rtuser:<user_id>) des hashes actifs: appareils,
+  logout_all, révocation d'un appareil sans lecture PostgreSQL
+- Rotation (/auth/refresh) = un script Lua: vérifie l'ancien token et son
+  propriétaire, le marque "rotaté", crée le nouveau avec les métadonnées de
+  l'appareil. L'écriture PostgreSQL (DELETE ancien + INSERT nouveau) part
+  dans une file, appliquée par un thread writer en arrière-plan
+- Les révocations (logout, appareil, logout_all) passent par la même file:
+  PostgreSQL les reçoit dans l'ordre des rotations (jamais un INSERT en
+  retard après le DELETE qui devait le supprimer)
+- Un token rotaté ou révoqué reste visible (tombstone) TOMBSTONE_TTL
+  secondes: le présenter est refusé même si PostgreSQL n'a pas encore reçu
+  l'écriture correspondante
+
+Un token absent du miroir (Redis vidé, éviction, token émis avant la mise
+en place) n'est pas refusé pour autant: la route retombe sur PostgreSQL
+puis remet le nouveau token dans le miroir. Au démarrage, le miroir est
+reconstruit depuis PostgreSQL s'il est absent.
+
+Bornes de durabilité: une rotation atteint PostgreSQL en quelques ms en
+régime normal; les rotations en file sont appliquées au shutdown. Une
+rotation perdue (crash du worker) laisse l'ancien token en base: après
+reconstruction du miroir, l'appareil doit se reconnecter.
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from redis import Redis, RedisError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+import config
+from models import RefreshToken
+from utils.auth import get_active_devices
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Résultats de rotate()
+ROTATED = 1
+UNKNOWN = 0     # absent du miroir: vérifier dans PostgreSQL
+REUSED = -1     # token déjà rotaté: rejeu refusé
+REVOKED = -2    # token révoqué (logout, appareil): refusé
+
+
+# KEYS[1] = ancien token, KEYS[2] = nouveau token, KEYS[3] = set utilisateur
+# ARGV = user_id, ancien hash, nouveau hash, created_at, expires_at, TTL tombstone
+_ROTATE_LUA = """
+local fields = redis.call('HGETALL', KEYS[1])
+if #fields == 0 then
+    return {0}
+end
+local entry = {}
+for i = 1, #fields, 2 do
+    entry[fields[i]] = fields[i + 1]
+end
+if entry['user_id'] ~= ARGV[1] then
+    return {0}
+end
+if entry['rotated'] then
+    return {-1, entry['device_id'], entry['device_name']}
+end
+if entry['revoked'] then
+    return {-2, entry['device_id'], entry['device_name']}
+end
+redis.call('HSET', KEYS[1], 'rotated', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+redis.call('HSET', KEYS[2], 'user_id', ARGV[1], 'device_id', entry['device_id'],
+    'device_name', entry['device_name'], 'created_at', ARGV[4], 'expires_at', ARGV[5])
+redis.call('EXPIREAT', KEYS[2], ARGV[5])
+redis.call('SREM', KEYS[3], ARGV[2])
+redis.call('SADD', KEYS[3], ARGV[3])
+redis.call('EXPIREAT', KEYS[3], ARGV[5])
+return {1, entry['device_id'], entry['device_name']}
+"""
+
+# Révoque les tokens d'un utilisateur (tous, ou ceux d'un appareil): chaque
+# token devient un tombstone et quitte le set utilisateur
+# KEYS[1] = set utilisateur ; ARGV = préfixe des tokens, device_id ou '', TTL tombstone
+_REVOKE_LUA = """
+local revoked = {}
+for _, th in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local key = ARGV[1] .. th
+    if ARGV[2] == '' or redis.call('HGET', key, 'device_id') == ARGV[2] then
+        if redis.call('EXISTS', key) == 1 then
+            redis.call('HSET', key, 'revoked', 1)
+            redis.call('EXPIRE', key, ARGV[3])
+            table.insert(revoked, th)
+        end
+        redis.call('SREM', KEYS[1], th)
+    end
+end
+return revoked
+"""
+
+
+class RefreshTokenStore:
+    """
+    Miroir Redis des refresh tokens + écriture PostgreSQL différée des rotations.
+
+    Usage:
+        store = RefreshTokenStore(redis_client)
+        store.start_writer(SessionLocal)
+        status, device_id, device_name = store.rotate(old_hash, new_hash, uid, exp)
+    """
+
+    PREFIX = "rt:"
+    USER_PREFIX = "rtuser:"
+    MIRROR_KEY = "rt:__mirror__"    # présent = miroir reconstruit depuis PostgreSQL
+    REBUILD_LOCK_KEY = "lock:rt:rebuild"
+
+    def __init__(self, redis_client: Redis, tombstone_ttl: int = 300, write_batch: int = 100):
+        """
+        Args:
+            redis_client: Client Redis (celui du CacheService partagé)
+            tombstone_ttl: Durée de vie d'un token rotaté (détection de rejeu)
+            write_batch: Rotations max par transaction PostgreSQL
+        """
+        self.redis = redis_client
+        self.tombstone_ttl = tombstone_ttl
+        self.write_batch = write_batch
+        self._rotate = self.redis.register_script(_ROTATE_LUA)
+        self._revoke = self.redis.register_script(_REVOKE_LUA)
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue()
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"rotated": 0, "reused": 0, "revoked": 0, "unknown": 0, "written": 0, "write_errors": 0}
+
+    def _key(self, token_hash: str) -> str:
+        return f"{self.PREFIX}{token_hash}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.USER_PREFIX}{user_id}"
+
+    # =====================================================================
+    # MIROIR
+    # =====================================================================
+
+    def _add(self, pipe, token_hash: str, user_id: str, device_id: str,
+             device_name: str, created_at: int, expires_at: int):
+        pipe.hset(self._key(token_hash), mapping={
+            "user_id": user_id,
+            "device_id": device_id,
+            "device_name": device_name or "",
+            "created_at": created_at,
+            "expires_at": expires_at,
+        })
+        pipe.expireat(self._key(token_hash), expires_at)
+        pipe.sadd(self._user_key(user_id), token_hash)
+        # Durée de vie fixe: le dernier token émis est celui qui expire le plus tard
+        pipe.expireat(self._user_key(user_id), expires_at)
+
+    def add(self, token_hash: str, user_id: str, device_id: str,
+            device_name: str, expires_at: int, created_at: Optional[int] = None):
+        """Ajoute un token déjà écrit dans PostgreSQL (login, rotation de repli)"""
+        pipe = self.redis.pipeline(transaction=True)
+        self._add(pipe, token_hash, user_id, device_id, device_name,
+                  created_at or int(time.time()), expires_at)
+        pipe.execute()
+
+    def rotate(self, old_hash: str, new_hash: str, user_id: str,
+               expires_at: int) -> Tuple[int, Optional[str], Optional[str]]:
+        """
+        Valide et rotate un token en une opération Redis atomique.
+
+        La rotation PostgreSQL correspondante est mise en file (writer).
+
+        Args:
+            old_hash: Hash du token présenté
+            new_hash: Hash du token émis en remplacement
+            user_id: Claim "sub" du token présenté
+            expires_at: Expiration du nouveau token (timestamp)
+
+        Returns:
+            (ROTATED | UNKNOWN | REUSED | REVOKED, device_id, device_name)
+        """
+        now = int(time.time())
+        result = self._rotate(
+            keys=[self._key(old_hash), self._key(new_hash), self._user_key(user_id)],
+            args=[user_id, old_hash, new_hash, now, expires_at, self.tombstone_ttl],
+        )
+        status = int(result[0])
+        device_id, device_name = (_text(v) for v in (result[1:] + [None, None])[:2])
+
+        if status == ROTATED:
+            self.stats["rotated"] += 1
+            self._queue.put(("rotate", {
+                "old_hash": old_hash,
+                "token_hash": new_hash,
+                "user_id": user_id,
+                "device_id": device_id,
+                "device_name": device_name or "",
+                "created_at": datetime.fromtimestamp(now),
+                "expires_at": datetime.fromtimestamp(expires_at),
+            }))
+        elif status == REUSED:
+            self.stats["reused"] += 1
+        elif status == REVOKED:
+            self.stats["revoked"] += 1
+        else:
+            self.stats["unknown"] += 1
+        return status, device_id, device_name
+
+    def revoke(self, token_hash: str):
+        """Révoque un token (logout); suppression PostgreSQL mise en file"""
+        user_id = self.redis.hget(self._key(token_hash), "user_id")
+        if user_id is not None:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hset(self._key(token_hash), "revoked", 1)
+            pipe.expire(self._key(token_hash), self.tombstone_ttl)
+            pipe.srem(self._user_key(_text(user_id)), token_hash)
+            pipe.execute()
+        self._queue.put(("revoke", {"token_hash": token_hash}))
+
+    def revoke_user(self, user_id: str, device_id: Optional[str] = None) -> int:
+        """
+        Révoque tous les tokens d'un utilisateur, ou ceux d'un appareil.
+
+        Returns:
+            Nombre de tokens retirés du miroir (PostgreSQL supprime aussi
+            ceux que le miroir aurait perdus)
+        """
+        revoked = self._revoke(
+            keys=[self._user_key(user_id)],
+            args=[self.PREFIX, device_id or "", self.tombstone_ttl],
+        )
+        self._queue.put(("revoke_user", {"user_id": user_id, "device_id": device_id}))
+        return len(revoked)
+
+    def devices(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Tokens actifs d'un utilisateur (même format que get_active_devices).
+
+        Returns:
+            Liste des appareils, None si le miroir n'est pas chargé
+        """
+        if not self.redis.exists(self.MIRROR_KEY):
+            return None
+        hashes = sorted(_text(th) for th in self.redis.smembers(self._user_key(user_id)))
+        pipe = self.redis.pipeline(transaction=False)
+        for th in hashes:
+            pipe.hgetall(self._key(th))
+        entries = pipe.execute()
+
+        devices, expired = [], []
+        for th, entry in zip(hashes, entries):
+            entry = {_text(k): _text(v) for k, v in entry.items()}
+            if not entry or "rotated" in entry or "revoked" in entry:
+                expired.append(th)
+                continue
+            devices.append({
+                "token_hash": th,
+                "device_id": entry["device_id"],
+                "device_name": entry["device_name"],
+                "created_at": datetime.fromtimestamp(int(entry["created_at"])).isoformat(),
+                "expires_at": datetime.fromtimestamp(int(entry["expires_at"])).isoformat(),
+            })
+        if expired:
+            self.redis.srem(self._user_key(user_id), *expired)
+        return devices
+
+    # =====================================================================
+    # RECONSTRUCTION DEPUIS POSTGRESQL
+    # =====================================================================
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        Recharge tous les tokens non expirés de PostgreSQL dans le miroir.
+
+        Les entrées existantes (dont les tombstones) sont réécrites ou
+        conservées, jamais supprimées: une rotation en vol n'est pas annulée.
+
+        Returns:
+            Nombre de tokens chargés
+        """
+        now = datetime.now()
+        rows = db.execute(
+            select(RefreshToken)
+            .where(RefreshToken.expires_at > now)
+            .order_by(RefreshToken.expires_at)  # EXPIREAT du set: le plus tardif en dernier
+            .execution_options(yield_per=batch_size)
+        ).scalars()
+
+        count = 0
+        pipe = self.redis.pipeline(transaction=False)
+        for token in rows:
+            self._add(pipe, token.token_hash, token.user_id, token.device_id, token.device_name,
+                      int(token.created_at.timestamp()), int(token.expires_at.timestamp()))
+            count += 1
+            if count % batch_size == 0:
+                pipe.execute()
+        pipe.set(self.MIRROR_KEY, int(time.time()))
+        pipe.execute()
+        logger.info(f"🔑 Miroir des refresh tokens reconstruit: {count} token(s)")
+        return count
+
+    def rebuild_if_missing(self, session_factory: Callable[[], Session]) -> Optional[int]:
+        """Reconstruit si le miroir est absent (premier démarrage, Redis vidé)"""
+        if self.redis.exists(self.MIRROR_KEY):
+            return None
+        if not self.redis.set(self.REBUILD_LOCK_KEY, "1", nx=True, ex=300):
+            return None  # un autre worker s'en charge
+        db = session_factory()
+        try:
+            return self.rebuild(db)
+        finally:
+            db.close()
+            self.redis.delete(self.REBUILD_LOCK_KEY)
+
+    # =====================================================================
+    # WRITER (rotations vers PostgreSQL)
+    # =====================================================================
+
+    def _apply(self, db: Session, ops: List[Tuple[str, Dict[str, Any]]]):
+        # Dans l'ordre: une chaîne A -> B -> C du même lot reste cohérente
+        for kind, op in ops:
+            if kind == "rotate":
+                db.execute(delete(RefreshToken).where(RefreshToken.token_hash == op["old_hash"]))
+                db.execute(insert(RefreshToken).values(
+                    {k: v for k, v in op.items() if k != "old_hash"}
+                ))
+            elif kind == "revoke":
+                db.execute(delete(RefreshToken).where(RefreshToken.token_hash == op["token_hash"]))
+            else:
+                stmt = delete(RefreshToken).where(RefreshToken.user_id == op["user_id"])
+                if op["device_id"]:
+                    stmt = stmt.where(RefreshToken.device_id == op["device_id"])
+                db.execute(stmt)
+
+    def write_pending(self, session_factory: Callable[[], Session], block: bool = False) -> int:
+        """
+        Applique les écritures en file, par lots d'une transaction.
+
+        Un lot en échec est rejoué écriture par écriture: une ligne fautive
+        n'emporte pas les autres.
+
+        Returns:
+            Nombre d'écritures appliquées
+        """
+        written = 0
+        while True:
+            try:
+                ops = [self._queue.get(timeout=0.5) if block else self._queue.get_nowait()]
+            except queue.Empty:
+                return written
+            block = False
+            while len(ops) < self.write_batch:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            db = session_factory()
+            try:
+                try:
+                    self._apply(db, ops)
+                    db.commit()
+                    done = len(ops)
+                except Exception:
+                    db.rollback()
+                    done = 0
+                    for op in ops:
+                        try:
+                            self._apply(db, [op])
+                            db.commit()
+                            done += 1
+                        except Exception as e:
+                            db.rollback()
+                            self.stats["write_errors"] += 1
+                            logger.error(f"❌ Écriture refresh token perdue ({op[0]}): {e}")
+            finally:
+                db.close()
+            written += done
+            self.stats["written"] += done
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.write_pending(self._session_factory, block=True)
+            except Exception as e:
+                logger.error(f"❌ Writer refresh tokens: {e}", exc_info=True)
+                self._stop.wait(1)
+
+    def start_writer(self, session_factory: Callable[[], Session]):
+        """Démarre le thread writer (daemon)"""
+        self._session_factory = session_factory
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="refresh-token-writer", daemon=True)
+        self._thread.start()
+
+    def stop_writer(self):
+        """Arrête le thread puis applique les écritures restantes"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._session_factory is not None:
+            written = self.write_pending(self._session_factory)
+            if written:
+                logger.info(f"💾 {written} écriture(s) de refresh tokens appliquée(s) au shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending_writes": self._queue.qsize()}
+
+
+def _text(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_refresh_token_store: Optional[RefreshTokenStore] = None
+
+
+def init_refresh_token_store(cache, session_factory: Callable[[], Session]) -> Optional[RefreshTokenStore]:
+    """
+    Crée le miroir partagé, le reconstruit si besoin et démarre le writer.
+
+    Sans cache Redis (ou REFRESH_TOKEN_STORE_ENABLED=false), les refresh
+    tokens sont lus et écrits directement dans PostgreSQL.
+
+    Args:
+        cache: CacheService partagé (son client Redis est réutilisé) ou None
+        session_factory: Fabrique de sessions (reconstruction, writer)
+
+    Returns:
+        RefreshTokenStore: Instance partagée ou None
+    """
+    global _refresh_token_store
+
+    if cache is None or not config.REFRESH_TOKEN_STORE_ENABLED:
+        logger.info("Refresh tokens lus directement dans PostgreSQL (miroir Redis désactivé)")
+        return None
+
+    store = RefreshTokenStore(
+        cache.redis,
+        tombstone_ttl=config.REFRESH_TOKEN_TOMBSTONE_TTL,
+        write_batch=config.REFRESH_TOKEN_WRITE_BATCH,
+    )
+    try:
+        store.rebuild_if_missing(session_factory)
+    except RedisError as e:
+        logger.warning(f"⚠️  Miroir des refresh tokens non reconstruit (Redis): {e}")
+    store.start_writer(session_factory)
+    _refresh_token_store = store
+    return store
+
+
+def close_refresh_token_store():
+    """Applique les écritures en file (avant close_cache_service)"""
+    global _refresh_token_store
+
+    if _refresh_token_store is not None:
+        _refresh_token_store.stop_writer()
+        _refresh_token_store = None
+
+
+def get_refresh_token_store() -> Optional[RefreshTokenStore]:
+    """Miroir partagé ou None (PostgreSQL seul)"""
+    return _refresh_token_store
+
+
+# =========================================================================
+# OPÉRATIONS DES ROUTES (miroir si disponible, repli PostgreSQL)
+# =========================================================================
+
+def revoke_user_tokens(db: Session, user_id: str, device_id: Optional[str] = None) -> int:
+    """
+    Révoque les refresh tokens d'un utilisateur, ou ceux d'un appareil.
+
+    Passe par le miroir quand il est actif: /auth/refresh le consulte avant
+    PostgreSQL, une suppression en base seule laisserait le token valide.
+    PostgreSQL reçoit la révocation par la file du writer; sans miroir (ou
+    Redis indisponible), elle y est écrite directement.
+
+    Args:
+        db: Session SQLAlchemy
+        user_id: ID de l'utilisateur
+        device_id: Appareil (None = tous)
+
+    Returns:
+        Nombre de tokens révoqués
+    """
+    store = get_refresh_token_store()
+    if store is not None:
+        try:
+            return store.revoke_user(user_id, device_id)
+        except RedisError as e:
+            logger.warning(f"⚠️  Miroir Redis indisponible, révocation via PostgreSQL: {e}")
+
+    query = delete(RefreshToken).where(RefreshToken.user_id == user_id)
+    if device_id is not None:
+        query = query.where(RefreshToken.device_id == device_id)
+    try:
+        deleted = db.execute(query).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted
+
+
+def get_user_devices(db: Session, user_id: str) -> List[Dict[str, Any]]:
+    """
+    Appareils actifs d'un utilisateur.
+
+    Lus dans le miroir (à jour avant PostgreSQL, qui suit la file du
+    writer); repli PostgreSQL si le miroir n'est pas chargé (Redis vidé,
+    éviction) ou indisponible.
+    """
+    store = get_refresh_token_store()
+    if store is not None:
+        try:
+            devices = store.devices(user_id)
+            if devices is not None:
+                return devices
+        except RedisError as e:
+            logger.warning(f"⚠️  Miroir Redis indisponible, devices lus dans PostgreSQL: {e}")
+    return get_active_devices(db, user_id)
@@ -0,0 +1,429 @@
+# app/services/scheduler.py
+"""
+Planificateur de tâches de maintenance, intégré au processus (lifespan).
+
+- Chaque tâche a un intervalle; un thread par worker vérifie les échéances
+- Élection par tâche via un verrou Redis (SET NX EX intervalle): un seul
+  worker exécute chaque passage. Le verrou n'est pas relâché, il expire
+  après l'intervalle et sert de marqueur "dernier passage" partagé
+- Les workers qui n'ont pas le verrou retentent à son expiration, avec une
+  gigue aléatoire (pas de ruée de tous les workers au même instant)
+- Historique des passages (durée, lignes traitées, erreur) dans une liste
+  Redis par tâche, bornée à SCHEDULER_HISTORY_SIZE entrées
+
+Les tâches suppriment/modifient par lots bornés (run_in_batches), une
+transaction par lot, avec une pause aléatoire entre deux lots.
+
+Sans Redis, pas d'élection possible: chaque worker exécute ses tâches
+(toutes idempotentes) et l'historique reste en mémoire.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from redis import Redis, RedisError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import config
+from models import User
+from services.inventory_rows import InsufficientItems, apply_deltas
+from services.inventory_store import get_inventory_store
+from utils.auth import cleanup_expired_tokens
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ScheduledJob:
+    """
+    Tâche périodique.
+
+    Usage:
+        ScheduledJob("token_cleanup", cleanup, interval=3600)
+    """
+
+    def __init__(self, name: str, func: Callable[[Session, "JobScheduler"], int],
+                 interval: float, jitter: float = 0.1):
+        """
+        Args:
+            name: Nom unique (clé du verrou et de l'historique)
+            func: Fonction (db, scheduler) -> nombre de lignes traitées
+            interval: Intervalle entre deux passages (s)
+            jitter: Gigue relative ajoutée aux échéances (0.1 = jusqu'à +10 %)
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.next_run = 0.0
+
+    def delay(self, base: float) -> float:
+        """Délai avant la prochaine tentative, gigue comprise"""
+        return base + random.uniform(0, self.interval * self.jitter)
+
+
+class JobScheduler:
+    """
+    Exécute des ScheduledJob dans un thread, un seul worker par passage.
+
+    Usage:
+        scheduler = JobScheduler(redis_client, SessionLocal, default_jobs())
+        scheduler.start()
+        scheduler.run_job("token_cleanup", force=True)
+        scheduler.stop()
+    """
+
+    LOCK_PREFIX = "lock:job:"
+    HISTORY_PREFIX = "jobs:history:"
+
+    def __init__(self, redis_client: Optional[Redis], session_factory: Callable[[], Session],
+                 jobs: List[ScheduledJob], history_size: int = 50, tick: float = 1.0):
+        """
+        Args:
+            redis_client: Client Redis (élection, historique) ou None
+            session_factory: Fabrique de sessions (une par passage)
+            jobs: Tâches à planifier
+            history_size: Passages gardés par tâche
+            tick: Période de vérification des échéances (s)
+        """
+        self.redis = redis_client
+        self.session_factory = session_factory
+        self.jobs: Dict[str, ScheduledJob] = {job.name: job for job in jobs}
+        self.history_size = history_size
+        self.tick = tick
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._local_history: Dict[str, Deque[Dict[str, Any]]] = {
+            name: deque(maxlen=history_size) for name in self.jobs
+        }
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Premier passage étalé sur une gigue: les workers ne démarrent pas ensemble
+        now = time.time()
+        for job in self.jobs.values():
+            job.next_run = now + job.delay(0)
+
+    def should_stop(self) -> bool:
+        """Pour les tâches: interrompre entre deux lots (arrêt en cours)"""
+        return self._stop.is_set()
+
+    # =====================================================================
+    # ÉLECTION
+    # =====================================================================
+
+    def _acquire(self, job: ScheduledJob, force: bool) -> bool:
+        """Prend le passage de la tâche (verrou Redis), ou planifie une relance"""
+        if self.redis is None:
+            return True
+        key = f"{self.LOCK_PREFIX}{job.name}"
+        ttl = max(1, int(job.interval))
+        if force:
+            self.redis.set(key, self.worker_id, ex=ttl)
+            return True
+        if self.redis.set(key, self.worker_id, nx=True, ex=ttl):
+            return True
+        # Un autre worker a fait ce passage: retenter à l'expiration du verrou
+        remaining = self.redis.pttl(key)
+        job.next_run = time.time() + job.delay(max(remaining, 0) / 1000)
+        return False
+
+    # =====================================================================
+    # EXÉCUTION
+    # =====================================================================
+
+    def run_job(self, name: str, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Exécute une tâche si ce worker remporte le passage.
+
+        Args:
+            name: Nom de la tâche
+            force: Passage immédiat, même si un autre worker l'a fait récemment
+
+        Returns:
+            Entrée d'historique du passage, None si un autre worker l'a fait
+        """
+        job = self.jobs[name]
+        with self._run_lock:
+            try:
+                if not self._acquire(job, force):
+                    return None
+            except RedisError as e:
+                logger.warning(f"⚠️  Tâche {name} non élue (Redis): {e}")
+                job.next_run = time.time() + job.delay(self.tick * 30)
+                return None
+
+            job.next_run = time.time() + job.delay(job.interval)
+            started = time.time()
+            entry: Dict[str, Any] = {
+                "job": name,
+                "worker": self.worker_id,
+                "started_at": datetime.fromtimestamp(started).isoformat(),
+            }
+            db = self.session_factory()
+            try:
+                entry["rows"] = job.func(db, self)
+                entry["status"] = "ok"
+            except Exception as e:
+                db.rollback()
+                entry["status"] = "error"
+                entry["error"] = str(e)
+                logger.error(f"❌ Tâche {name} en échec: {e}", exc_info=True)
+            finally:
+                db.close()
+            entry["duration_ms"] = round((time.time() - started) * 1000, 1)
+
+        self._record(entry)
+        if entry["status"] == "ok":
+            logger.info(f"⏱️  Tâche {name}: {entry['rows']} ligne(s) en {entry['duration_ms']} ms")
+        return entry
+
+    def _record(self, entry: Dict[str, Any]):
+        self._local_history[entry["job"]].appendleft(entry)
+        if self.redis is None:
+            return
+        key = f"{self.HISTORY_PREFIX}{entry['job']}"
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.lpush(key, json.dumps(entry))
+            pipe.ltrim(key, 0, self.history_size - 1)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"⚠️  Historique de {entry['job']} non enregistré: {e}")
+
+    def get_history(self, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Derniers passages d'une tâche, tous workers confondus (plus récent d'abord)"""
+        limit = limit or self.history_size
+        if self.redis is not None:
+            try:
+                entries = self.redis.lrange(f"{self.HISTORY_PREFIX}{name}", 0, limit - 1)
+                return [json.loads(entry) for entry in entries]
+            except RedisError as e:
+                logger.warning(f"⚠️  Historique de {name} illisible (Redis): {e}")
+        return list(self._local_history[name])[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tâches planifiées, prochaine tentative de ce worker, dernier passage"""
+        jobs = {}
+        for name, job in self.jobs.items():
+            last = self.get_history(name, limit=1)
+            jobs[name] = {
+                "interval": job.interval,
+                "next_attempt_in": round(max(0.0, job.next_run - time.time()), 1),
+                "last_run": last[0] if last else None,
+            }
+        return {"worker": self.worker_id, "jobs": jobs}
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            now = time.time()
+            for job in self.jobs.values():
+                if self._stop.is_set():
+                    return
+                if job.next_run <= now:
+                    self.run_job(job.name)
+
+    def start(self):
+        """Démarre le thread du planificateur (daemon)"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"⏱️  Planificateur démarré: {', '.join(self.jobs)}")
+
+    def stop(self):
+        """Arrête le thread (une tâche en cours s'interrompt au lot suivant)"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=30)
+            self._thread = None
+
+
+# =========================================================================
+# TÂCHES
+# =========================================================================
+
+def cleanup_tokens_job(db: Session, scheduler: JobScheduler) -> int:
+    """Supprime les refresh tokens expirés (lots bornés)"""
+    return cleanup_expired_tokens(
+        db,
+        batch_size=config.SCHEDULER_BATCH_SIZE,
+        max_batches=config.SCHEDULER_MAX_BATCHES,
+        pause=config.SCHEDULER_BATCH_PAUSE,
+    )
+
+
+# Le trigger trg_auto_expire_listings rend les objets dans la table inventory
+_EXPIRE_LISTINGS_SQL = text(
+    "UPDATE markets SET status_id = 4, updated_at = CURRENT_TIMESTAMP "
+    "WHERE id IN (SELECT id FROM markets WHERE status_id = 1 "
+    "AND expires_at <= CURRENT_TIMESTAMP LIMIT :limit) "
+    "RETURNING seller_id, resource_id, quantity"
+)
+
+
+def expire_market_listings_job(db: Session, scheduler: JobScheduler) -> int:
+    """
+    Passe les offres actives échues en "expired" (status_id = 4).
+
+    Le trigger trg_auto_expire_listings rend les objets au vendeur dans la
+    table inventory. Avec le store Redis, cette table est derrière le hash
+    du vendeur et le flush suivant effacerait les objets rendus: ils passent
+    donc par le store (return_expired_items), dans la transaction du lot.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    total = 0
+    batches = 0
+    while True:
+        rows = db.execute(_EXPIRE_LISTINGS_SQL, {"limit": config.SCHEDULER_BATCH_SIZE}).all()
+        return_expired_items(db, rows)
+        total += len(rows)
+        batches += 1
+        if len(rows) < config.SCHEDULER_BATCH_SIZE or batches >= config.SCHEDULER_MAX_BATCHES:
+            return total
+        if scheduler.should_stop():
+            return total
+        time.sleep(random.uniform(0, config.SCHEDULER_BATCH_PAUSE))
+
+
+def return_expired_items(db: Session, rows) -> None:
+    """
+    Committe un lot d'offres expirées, objets rendus via le store Redis s'il est actif.
+
+    L'ajout du trigger est annulé dans la même transaction (la table
+    inventory reste inchangée, un chargement concurrent du hash lit donc
+    le même inventaire avant et après le commit) et les quantités sont
+    ajoutées au hash du vendeur juste avant le commit, puis retirées si
+    le commit échoue (comme InventoryUnitOfWork).
+
+    Args:
+        db: Session SQLAlchemy (transaction du lot en cours)
+        rows: Lignes (seller_id, resource_id, quantity) des offres expirées
+    """
+    store = get_inventory_store()
+    returned: Dict[str, Dict[str, int]] = {}
+    for seller_id, resource_id, quantity in rows:
+        items = returned.setdefault(seller_id, {})
+        items[resource_id] = items.get(resource_id, 0) + quantity
+
+    applied = []
+    try:
+        if store is not None:
+            for seller_id, items in returned.items():
+                apply_deltas(db, seller_id, {item: -qty for item, qty in items.items()})
+                seller = db.get(User, seller_id)
+                if seller is not None:
+                    store.apply(seller, items)
+                    applied.append((seller, items))
+        db.commit()
+    except Exception:
+        db.rollback()
+        for seller, items in applied:
+            try:
+                store.apply(seller, {item: -qty for item, qty in items.items()})
+            except (RedisError, InsufficientItems) as e:
+                logger.error(f"❌ Objets rendus non retirés du store pour user={seller.id}: {e}")
+        raise
+    if applied:
+        logger.info(f"📦 Offres expirées: objets rendus à {len(applied)} vendeur(s) via le store")
+
+
+def refresh_materialized_views_job(db: Session, scheduler: JobScheduler) -> int:
+    """
+    Rafraîchit les vues matérialisées (SCHEDULER_MATVIEWS).
+
+    CONCURRENTLY quand la vue a un index unique (lectures jamais bloquées),
+    sinon REFRESH simple. Une vue absente est ignorée.
+
+    Returns:
+        Nombre de vues rafraîchies
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    refreshed = 0
+    for view in config.SCHEDULER_MATVIEWS:
+        if scheduler.should_stop():
+            break
+        if not _matview_exists(db, view):
+            logger.debug(f"   → Vue {view} absente, ignorée")
+            continue
+        unique = db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid "
+            "WHERE c.relname = :view AND i.indisunique)"
+        ), {"view": view}).scalar()
+        concurrently = "CONCURRENTLY " if unique else ""
+        # Nom issu de la configuration, pas de l'utilisateur
+        db.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}{view}"))
+        db.commit()
+        refreshed += 1
+        time.sleep(random.uniform(0, config.SCHEDULER_BATCH_PAUSE))
+    return refreshed
+
+
+def _matview_exists(db: Session, view: str) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM pg_matviews WHERE matviewname = :view"), {"view": view}
+    ).first() is not None
+
+
+def default_jobs() -> List[ScheduledJob]:
+    """Tâches de maintenance de l'application (intervalles depuis config)"""
+    return [
+        ScheduledJob("token_cleanup", cleanup_tokens_job, config.JOB_TOKEN_CLEANUP_INTERVAL),
+        ScheduledJob("market_expiry", expire_market_listings_job, config.JOB_MARKET_EXPIRY_INTERVAL),
+        ScheduledJob("matview_refresh", refresh_materialized_views_job, config.JOB_MATVIEW_REFRESH_INTERVAL),
+    ]
+
+
+# =========================================================================
+# INSTANCE PARTAGÉE (cycle de vie de l'application)
+# =========================================================================
+
+_scheduler: Optional[JobScheduler] = None
+
+
+def init_scheduler(cache, session_factory: Callable[[], Session]) -> Optional[JobScheduler]:
+    """
+    Crée et démarre le planificateur partagé (lifespan).
+
+    Args:
+        cache: CacheService partagé (son client Redis sert à l'élection) ou None
+        session_factory: Fabrique de sessions pour les tâches
+
+    Returns:
+        JobScheduler: Instance partagée ou None si désactivé
+    """
+    global _scheduler
+
+    if not config.SCHEDULER_ENABLED:
+        logger.info("Planificateur désactivé (SCHEDULER_ENABLED=false)")
+        return None
+    if cache is None:
+        logger.warning("⚠️  Planificateur sans Redis: chaque worker exécute toutes les tâches")
+
+    _scheduler = JobScheduler(
+        cache.redis if cache is not None else None,
+        session_factory,
+        default_jobs(),
+        history_size=config.SCHEDULER_HISTORY_SIZE,
+    )
+    _scheduler.start()
+    return _scheduler
+
+
+def close_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+
+
+def get_scheduler() -> Optional[JobScheduler]:
+    return _scheduler
@@ -0,0 +1,112 @@
+# app/services/user_identity.py
+"""
+Identité des requêtes authentifiées, cachée par utilisateur et par version.
+
+get_current_user_optional n'a besoin que de savoir qui appelle et avec quels
+rôles: l'identité (sans inventaire, stats, xp...) est cachée sous auth:<id>
+avec la version lue dans authver:<id>. Toute modification d'un champ
+d'identité via l'ORM incrémente la version après commit, ce qui rend
+l'entrée cachée caduque sans avoir à la supprimer (une identité rechargée
+pendant la modification est écrite avec l'ancienne version, donc ignorée).
+"""
+
+import inspect as _inspect
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from models import User
+from services.cache_service import get_cache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Champs exposés aux routes par get_current_user_optional
+IDENTITY_FIELDS = (
+    "id", "login", "firstname", "lastname", "mail",
+    "profession", "subclasses", "biome", "is_admin", "is_moderator",
+)
+
+
+def identity_of(user: User) -> Dict[str, Any]:
+    """Identité et rôles d'un utilisateur (sans password_hash ni données de jeu)"""
+    identity = {field: getattr(user, field) for field in IDENTITY_FIELDS}
+    identity["subclasses"] = identity["subclasses"] or []
+    return identity
+
+
+async def resolve_identity(cache, user_id: str, load) -> Optional[Dict[str, Any]]:
+    """
+    Identité d'un utilisateur, depuis le cache si sa version est à jour.
+
+    Args:
+        cache: AsyncCacheService ou None
+        user_id: ID de l'utilisateur (claim "sub")
+        load: Fonction () -> User | None, ou coroutine (lecture PostgreSQL en cas de MISS)
+
+    Returns:
+        Dict d'identité ou None si l'utilisateur n'existe pas
+    """
+    if cache is None:
+        user = await _load(load)
+        return identity_of(user) if user else None
+
+    # La version est lue AVANT la base: une modification concurrente la fait
+    # avancer et l'identité écrite ci-dessous sera ignorée à la prochaine requête
+    version, identity = await cache.get_auth_user(user_id)
+    if identity is not None:
+        return identity
+
+    user = await _load(load)
+    if not user:
+        return None
+    identity = identity_of(user)
+    await cache.set_auth_user(user_id, version, identity)
+    return identity
+
+
+async def _load(load) -> Optional[User]:
+    user = load()
+    if _inspect.isawaitable(user):
+        user = await user
+    return user
+
+
+# =========================================================================
+# INVALIDATION VIA L'ORM (versions incrémentées après commit)
+# =========================================================================
+
+_PENDING_KEY = "auth_versions_pending"
+
+
+def _mark_changed(target: User):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _collect_updated_user(mapper, connection, target):
+    """Note les utilisateurs dont un champ d'identité change pendant le flush"""
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in IDENTITY_FIELDS):
+        _mark_changed(target)
+
+
+@event.listens_for(User, "after_delete")
+def _collect_deleted_user(mapper, connection, target):
+    _mark_changed(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    cache = get_cache()
+    if pending and cache is not None:
+        cache.bump_user_versions(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_versions(session):
+    session.info.pop(_PENDING_KEY, None)
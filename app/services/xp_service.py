@@ -3,6 +3,7 @@
 from typing import Dict, Tuple
 from models.user import User
 from sqlalchemy.orm import Session
+from database.optimistic import retry_on_conflict
 from utils.logger import get_logger
 from utils.feature_flags import check_feature_enabled
 from utils.db_crud import user_crud
@@ -47,8 +48,25 @@ def _apply_level_rewards(user: User):
     Could be replaced by complex rules later.
     """
     # give +1 stat to the lowest stat
-    min_stat = min(user.stats, key=lambda k: user.stats[k])
-    user.stats[min_stat] += 1
+    # (nouveau dict: une mutation en place de la colonne JSON n'est pas écrite)
+    stats = dict(user.stats)
+    min_stat = min(stats, key=lambda k: stats[k])
+    stats[min_stat] += 1
+    user.stats = stats
+
+def apply_xp(db: Session, user: User, amount: int) -> int:
+    """
+    Ajoute de l'xp et committe, rejoué si l'utilisateur a été modifié entre-temps.
+    Retourne le nombre de niveaux gagnés.
+    Lève UpdateConflict si le conflit persiste.
+    """
+    def attempt() -> int:
+        old_level = user.level
+        add_xp(user, amount)
+        db.commit()
+        return user.level - old_level
+
+    return retry_on_conflict(db, "add_xp", attempt)
 
 def award_quest_xp(db: Session, user_id: str, amount: int):
     # Vérification sans lever d'exception
@@ -85,8 +85,9 @@ def db_session(test_engine):
     # Démarre une transaction
     transaction = connection.begin()
     
-    # Crée une session liée à cette transaction
-    SessionLocal = sessionmaker(bind=connection)
+    # Crée une session liée à cette transaction: ses commit/rollback
+    # (rejeu sur conflit, quantité insuffisante...) portent sur un SAVEPOINT
+    SessionLocal = sessionmaker(bind=connection, join_transaction_mode="create_savepoint")
     session = SessionLocal()
     
     yield session
@@ -102,13 +103,23 @@ def db_session(test_engine):
 # ============================================================================
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, monkeypatch):
     """
     TestClient FastAPI avec override de la DB pour utiliser db_session.
     
     Permet de tester les routes API avec rollback automatique.
+    
+    Rate limiting et blocage brute-force désactivés: tous les tests se
+    connectent depuis la même adresse ("testclient") et leurs compteurs
+    Redis survivraient au test (voir test_rate_limit et test_cache_service).
     """
-    from database.connection import get_db
+    import config
+    from database.connection import ThreadedSession, get_async_db, get_db
+    
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(config, "BF_ENABLED", False)
+    # Le middleware lit RATE_LIMIT_ENABLED à la construction de la pile
+    app.middleware_stack = None
     
     # Override la dépendance get_db pour utiliser notre session de test
     def override_get_db():
@@ -117,13 +128,19 @@ def client(db_session):
         finally:
             pass  # Ne pas fermer, géré par la fixture db_session
     
+    # Routes async: même session (et même transaction), via le threadpool
+    async def override_get_async_db():
+        yield ThreadedSession(db_session)
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     with TestClient(app) as test_client:
         yield test_client
     
     # Restore la dépendance originale
     app.dependency_overrides.clear()
+    app.middleware_stack = None
 
 
 # ============================================================================
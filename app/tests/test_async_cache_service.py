@@ -0,0 +1,217 @@
+# app/tests/test_async_cache_service.py
+"""
+Tests de la variante asyncio du cache (AsyncCacheService).
+
+Nécessite Redis sur localhost:6379 (DB 1, comme test_cache_service).
+Chaque test exécute sa coroutine avec asyncio.run (pas de plugin pytest).
+"""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from services import async_cache_service as async_module
+from services.async_cache_service import AsyncCacheService
+from services.cache_service import CacheService, cached
+
+REDIS = dict(host="localhost", port=6379, password="redis_secure_pass", db=1)
+
+
+def run(test):
+    """Exécute test(cache) avec une instance async neuve (pool lié à la boucle)"""
+    async def main():
+        cache = await AsyncCacheService(**REDIS).connect()
+        try:
+            return await test(cache)
+        finally:
+            await cache.close()
+    return asyncio.run(main())
+
+
+# =============================================================================
+# OPÉRATIONS DE BASE
+# =============================================================================
+
+def test_async_set_get_delete():
+    """Même comportement que la version synchrone"""
+    async def scenario(cache):
+        assert await cache.set("test:async:key", {"a": 1}, ttl=60)
+        assert await cache.get("test:async:key") == {"a": 1}
+        assert await cache.delete("test:async:key") == 1
+        assert await cache.get("test:async:key") is None
+    run(scenario)
+
+
+def test_async_market_listings_keep_types():
+    """Codec msgpack partagé: datetime et Decimal conservés"""
+    listings = [{"id": 1, "unit_price": Decimal("12.50"), "created_at": datetime(2025, 1, 2, 3, 4)}]
+
+    async def scenario(cache):
+        assert await cache.set_market_listings(listings, resource_id=10)
+        assert await cache.get_market_listings(resource_id=10) == listings
+        assert await cache.invalidate_market_cache(resource_id=10) == 1
+        assert await cache.get_market_listings(resource_id=10) is None
+    run(scenario)
+
+
+def test_async_interoperates_with_sync():
+    """Les deux variantes lisent les entrées de l'autre"""
+    sync_cache = CacheService(**REDIS)
+    try:
+        sync_cache.set_craftable_recipes_many(4242, {1: [{"id": 1}], 2: [{"id": 2}]})
+
+        async def scenario(cache):
+            recipes = await cache.get_craftable_recipes(4242, [1, 2, 3])
+            assert recipes == {1: [{"id": 1}], 2: [{"id": 2}], 3: None}
+            await cache.set_user_inventory(4242, [{"resource_id": 7}])
+        run(scenario)
+
+        assert sync_cache.get_user_inventory(4242) == [{"resource_id": 7}]
+        assert sync_cache.invalidate_user_recipes(4242) == 2
+        sync_cache.invalidate_user_inventory(4242)
+    finally:
+        sync_cache.close()
+
+
+def test_async_shares_l1_and_metrics_with_sync():
+    """from_sync: même L1, mêmes métriques"""
+    sync_cache = CacheService(**REDIS, l1_enabled=True)
+    try:
+        async def scenario(cache):
+            await cache.set_current_weather({"type": "pluie"})
+        async def main():
+            cache = await AsyncCacheService.from_sync(sync_cache, **REDIS).connect()
+            try:
+                await scenario(cache)
+            finally:
+                await cache.close()
+        sync_cache.metrics.reset()
+        asyncio.run(main())
+
+        key = sync_cache._make_key(sync_cache.PREFIX_WEATHER, "current")
+        assert sync_cache._unwrap(sync_cache.l1.get(key)) == {"type": "pluie"}
+        assert sync_cache.get_client_metrics()["weather"]["operations"]["set_ok"] == 1
+        sync_cache.invalidate_environment()
+    finally:
+        sync_cache.close()
+
+
+# =============================================================================
+# SINGLE-FLIGHT, RATE LIMITING, BRUTE-FORCE
+# =============================================================================
+
+def test_async_get_or_set_coalesces_misses():
+    """Un seul appel au loader pour des MISS concurrents"""
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario(cache):
+        await cache.delete("test:async:singleflight")
+        results = await asyncio.gather(*[
+            cache.get_or_set("test:async:singleflight", loader, ttl=60) for _ in range(10)
+        ])
+        assert all(r == {"value": 42} for r in results)
+        await cache.delete("test:async:singleflight")
+    run(scenario)
+
+    assert len(calls) == 1
+
+
+def test_async_stale_entry_refreshed_once():
+    """Valeur périmée servie tout de suite, une seule tâche de rafraîchissement"""
+    calls = []
+    key = "test:async:swr"
+
+    async def scenario(cache):
+        # Le rafraîchissement reste bloqué tant que tous les appels n'ont pas répondu
+        release = asyncio.Event()
+
+        async def loader():
+            calls.append(1)
+            await release.wait()
+            return {"version": len(calls)}
+
+        await cache.delete(key, f"lock:refresh:{key}")
+        await cache.set(key, {**cache._swr_entry({"version": 0}, ttl=60), "soft": 0}, ttl=600)
+        results = await asyncio.gather(*[
+            cache.get_or_refresh(key, loader, ttl=60) for _ in range(10)
+        ])
+        assert results == [{"version": 0}] * 10
+
+        release.set()
+        for _ in range(100):
+            if await cache.get(key) == {"version": 1}:
+                break
+            await asyncio.sleep(0.02)
+        assert await cache.get_or_refresh(key, loader, ttl=60) == {"version": 1}
+        await cache.delete(key, f"lock:refresh:{key}")
+    run(scenario)
+
+    assert len(calls) == 1
+
+
+def test_async_rate_limit():
+    """Token bucket partagé avec la version synchrone"""
+    async def scenario(cache):
+        for _ in range(3):
+            assert await cache.check_rate_limit("async_rl_user", 3, 60)
+        allowed, remaining, retry_after = await cache.acquire_rate_limit("async_rl_user", 3, 60)
+        assert not allowed
+        assert remaining == 0
+        assert retry_after > 0
+    run(scenario)
+
+
+def test_async_login_block_shared_with_sync():
+    """Blocage brute-force: mêmes clés, même index que la version synchrone"""
+    bf = dict(threshold=3, ip_threshold=5, window_seconds=60, block_seconds=30)
+    sync_cache = CacheService(**REDIS)
+    try:
+        async def scenario(cache):
+            for _ in range(2):
+                assert (await cache.record_login_failure("bf_async", "10.0.1.1", **bf))[2] == 0
+            assert await cache.check_login_block("bf_async", "10.0.1.1") == 0
+            assert 0 < (await cache.record_login_failure("bf_async", "10.0.1.1", **bf))[2] <= 30
+
+            entries = {(e["kind"], e["subject"]): e for e in await cache.get_login_failures()}
+            assert entries[("login", "bf_async")]["blocked_for"] > 0
+            assert entries[("ip", "10.0.1.1")]["failures"] == 3
+        run(scenario)
+
+        assert 0 < sync_cache.check_login_block("bf_async", "10.0.1.2") <= 30
+
+        async def unblock(cache):
+            assert await cache.unblock_login("login", "bf_async") == 1
+            await cache.unblock_login("ip", "10.0.1.1")
+            assert await cache.check_login_block("bf_async", "10.0.1.1") == 0
+        run(unblock)
+    finally:
+        sync_cache.unblock_login("login", "bf_async")
+        sync_cache.unblock_login("ip", "10.0.1.1")
+        sync_cache.close()
+
+
+def test_cached_decorator_on_coroutine(monkeypatch):
+    """@cached sur une coroutine passe par le cache async"""
+    calls = []
+
+    @cached(ttl=60, key_prefix="test:async")
+    async def compute(x):
+        calls.append(x)
+        return {"x": x}
+
+    async def scenario(cache):
+        monkeypatch.setattr(async_module, "_async_cache_service", cache)
+        await cache.delete(f"test:async:compute:(5,):{{}}")
+        assert await compute(5) == {"x": 5}
+        assert await compute(5) == {"x": 5}
+        await cache.delete(f"test:async:compute:(5,):{{}}")
+    run(scenario)
+
+    assert calls == [5]
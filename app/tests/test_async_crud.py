@@ -0,0 +1,52 @@
+# app/tests/test_async_crud.py
+"""
+Tests d'AsyncCRUDBase (routes async) via ThreadedSession, repli de get_async_db.
+
+Nécessite la base de test (conftest).
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from database.connection import ThreadedSession
+from models import Resource
+from utils.db_crud import AsyncCRUDBase
+
+
+@pytest.fixture
+def crud():
+    return AsyncCRUDBase[Resource](Resource)
+
+
+def test_reads(crud, db_session, sample_resource):
+    async def main():
+        db = ThreadedSession(db_session)
+        assert (await crud.get_or_404(db, "argile", "Resource")).name == "Argile"
+        with pytest.raises(HTTPException) as exc:
+            await crud.get_or_404(db, "inconnu", "Resource")
+        assert exc.value.status_code == 404
+
+        assert [r.id for r in await crud.get_multi(db, filters={"type": "mineral"})] == ["argile"]
+        assert await crud.get_multi(db, filters={"type": "metal"}) == []
+        assert await crud.count(db, {"type": "mineral"}) == 1
+
+    asyncio.run(main())
+
+
+def test_writes(crud, db_session):
+    async def main():
+        db = ThreadedSession(db_session)
+        await crud.create(db, obj_in={"id": "sable", "name": "Sable", "type": "mineral"})
+        with pytest.raises(HTTPException) as exc:
+            await crud.create(db, obj_in={"id": "sable", "name": "Sable", "type": "mineral"})
+        assert exc.value.status_code == 400
+
+        await crud.update_by_id(db, id="sable", obj_in={"name": "Sable fin"})
+        assert (await crud.get(db, "sable")).name == "Sable fin"
+
+        assert await crud.delete(db, id="sable") is True
+        assert await crud.get(db, "sable") is None
+
+    asyncio.run(main())
@@ -142,6 +142,37 @@ def test_refresh_fail_reused_token(client, sample_user):
     assert reuse_response.status_code == 401
 
 
+@pytest.mark.auth
+def test_reused_token_revokes_device_family(client, sample_user):
+    """Rejouer un token rotaté révoque aussi le dernier token de l'appareil."""
+    login_response = client.post("/api/public/auth/login", json={
+        "login": sample_user.login,
+        "password": "Test123!",
+        "device_id": "phone"
+    })
+    stolen = login_response.cookies.get("refresh_token")
+    other_device = client.post("/api/public/auth/login", json={
+        "login": sample_user.login,
+        "password": "Test123!",
+        "device_id": "laptop"
+    }).cookies.get("refresh_token")
+
+    current = client.post("/api/public/auth/refresh", json={
+        "refresh_token": stolen
+    }).json()["refresh_token"]
+
+    assert client.post("/api/public/auth/refresh", json={
+        "refresh_token": stolen
+    }).status_code == 401
+    # Famille "phone" révoquée, "laptop" intacte
+    assert client.post("/api/public/auth/refresh", json={
+        "refresh_token": current
+    }).status_code == 401
+    assert client.post("/api/public/auth/refresh", json={
+        "refresh_token": other_device
+    }).status_code == 200
+
+
 # ============================================================================
 # TEST LOGOUT
 # ============================================================================
@@ -8,7 +8,12 @@ Tests unitaires et d'intégration pour CacheService
 
 import pytest
 import time
-from services.cache_service import CacheService
+import threading
+from datetime import datetime
+from decimal import Decimal
+from services import cache_service as cache_module
+from services.cache_service import CacheService, LocalLRUCache, SingleFlight, cached
+from services.cache_codecs import CODECS_BY_NAME, CacheCodec, decode_entry, encode_entry
 
 
 @pytest.fixture(scope="module")
@@ -110,6 +115,258 @@ def test_increment_decrement(cache_service):
     assert cache_service.decrement(key) == 3
 
 
+# =============================================================================
+# TESTS MULTI-CLÉS
+# =============================================================================
+
+def test_set_many_get_many(cache_service):
+    """Test set_many/get_many avec TTL par clé"""
+    items = {"test:many:1": {"v": 1}, "test:many:2": [1, 2, 3], "test:many:3": "x"}
+    
+    assert cache_service.set_many(items, ttl=60, ttls={"test:many:3": 1})
+    
+    values = cache_service.get_many(list(items) + ["test:many:missing"])
+    assert list(values) == list(items) + ["test:many:missing"]
+    assert values["test:many:1"] == {"v": 1}
+    assert values["test:many:missing"] is None
+    
+    assert 0 < cache_service.redis.ttl("test:many:1") <= 60
+    time.sleep(1.5)
+    assert cache_service.get("test:many:3") is None
+
+
+def test_delete_many(cache_service):
+    """Test suppression multi-clés"""
+    cache_service.set_many({"test:dm:1": 1, "test:dm:2": 2})
+    
+    assert cache_service.delete_many(["test:dm:1", "test:dm:2", "test:dm:3"]) == 2
+    assert cache_service.delete_many([]) == 0
+
+
+def test_craftable_recipes_multiple_professions(cache_service):
+    """Test lecture des recettes de plusieurs professions en un MGET"""
+    user_id = 321
+    cache_service.set_craftable_recipes_many(user_id, {1: [{"id": 1}], 2: [{"id": 2}]})
+    
+    recipes = cache_service.get_craftable_recipes(user_id, [1, 2, 3])
+    assert recipes == {1: [{"id": 1}], 2: [{"id": 2}], 3: None}
+
+
+def test_dashboard_bundle(cache_service):
+    """Test préchauffage + lecture d'un dashboard complet"""
+    user_id = 654
+    cache_service.set_dashboard_bundle(
+        user_id,
+        inventory=[{"resource_id": 1, "quantity": 4}],
+        craftable_recipes={1: [{"id": 10}]},
+        environment={"weather": "Pluie"},
+        leaderboard=[{"rank": 1}]
+    )
+    
+    bundle = cache_service.get_dashboard_bundle(user_id, [1, 2])
+    assert bundle["inventory"] == [{"resource_id": 1, "quantity": 4}]
+    assert bundle["environment"] == {"weather": "Pluie"}
+    assert bundle["leaderboard"] == [{"rank": 1}]
+    assert bundle["craftable_recipes"] == {1: [{"id": 10}], 2: None}
+    assert 0 < cache_service.redis.ttl(f"inv:{user_id}") <= CacheService.TTL_USER_INVENTORY
+
+
+# =============================================================================
+# TESTS SINGLE-FLIGHT / DÉCORATEUR
+# =============================================================================
+
+def test_singleflight_coalesces_concurrent_calls():
+    """Test: un seul calcul pour N appels concurrents sur la même clé"""
+    flight = SingleFlight()
+    calls = []
+    
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow_loader)))
+        for _ in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert len(calls) == 1
+    assert results == ["value"] * 10
+
+
+def test_get_or_set(cache_service):
+    """Test cache-aside: MISS calcule, HIT relit le cache"""
+    key = "test:get_or_set"
+    cache_service.delete(key)
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        return {"computed": True}
+    
+    assert cache_service.get_or_set(key, loader, ttl=60) == {"computed": True}
+    assert cache_service.get_or_set(key, loader, ttl=60) == {"computed": True}
+    assert len(calls) == 1
+
+
+def test_cached_decorator_uses_shared_instance(cache_service, monkeypatch):
+    """Test décorateur: instance partagée + une seule exécution par clé"""
+    monkeypatch.setattr(cache_module, "_cache_service", cache_service)
+    calls = []
+    
+    @cached(ttl=60, key_prefix="test_decorator")
+    def expensive(x):
+        calls.append(x)
+        time.sleep(0.1)
+        return x * 2
+    
+    cache_service.delete("test_decorator:expensive:(21,):{}")
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(expensive(21)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert results == [42] * 8
+    assert calls == [21]
+
+
+def test_cached_decorator_without_cache(monkeypatch):
+    """Test décorateur: sans Redis, la fonction est exécutée normalement"""
+    monkeypatch.setattr(cache_module, "_cache_service", None)
+    
+    @cached(ttl=60)
+    def add(a, b):
+        return a + b
+    
+    assert add(1, 2) == 3
+
+
+# =============================================================================
+# TESTS CODECS
+# =============================================================================
+
+@pytest.mark.parametrize("codec_name", sorted(CODECS_BY_NAME))
+def test_codec_roundtrip(codec_name):
+    """Test encodage/décodage avec en-tête de version"""
+    codec = CODECS_BY_NAME[codec_name]
+    value = {"id": 1, "tags": ["a", "b"], "price": 12.5, "nested": {"ok": True}}
+    
+    payload = encode_entry(value, codec)
+    assert payload[1] == codec.codec_id
+    assert decode_entry(payload) == value
+
+
+def test_msgpack_codec_keeps_types():
+    """Test: le codec binaire conserve datetime et Decimal"""
+    if "msgpack" not in CODECS_BY_NAME:
+        pytest.skip("msgpack non installé")
+    
+    value = {"created_at": datetime(2025, 12, 4, 10, 30), "price": Decimal("19.90")}
+    assert decode_entry(encode_entry(value, CODECS_BY_NAME["msgpack"])) == value
+
+
+def test_codec_interface_is_abstract():
+    """Test: un codec incomplet n'est pas instanciable"""
+    class EncodeOnly(CacheCodec):
+        def encode(self, value):
+            return b""
+    
+    with pytest.raises(TypeError):
+        CacheCodec()
+    with pytest.raises(TypeError):
+        EncodeOnly()
+
+
+def test_legacy_entry_without_header(cache_service):
+    """Test: une entrée JSON écrite avant les codecs reste lisible"""
+    cache_service.redis.set("test:legacy", '{"name": "ancien format"}')
+    assert cache_service.get("test:legacy") == {"name": "ancien format"}
+
+
+def test_market_listings_keep_datetimes(cache_service):
+    """Test: listings marché (codec binaire) avec datetime"""
+    if "msgpack" not in CODECS_BY_NAME:
+        pytest.skip("msgpack non installé")
+    
+    listings = [{"id": 1, "price": 10.0, "expires_at": datetime(2025, 12, 5, 12, 0)}]
+    cache_service.set_market_listings(listings, resource_id=77)
+    assert cache_service.get_market_listings(resource_id=77) == listings
+
+
+# =============================================================================
+# TESTS CACHE L1 (mémoire du worker)
+# =============================================================================
+
+def test_local_lru_eviction_and_ttl():
+    """Test LRU borné + expiration des entrées"""
+    lru = LocalLRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.get("a")            # "a" devient la plus récente
+    lru.set("c", 3, ttl=60)  # évince "b"
+    
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert len(lru) == 2
+    
+    lru.set("short", "x", ttl=0)
+    assert lru.get("short") is cache_module._MISSING
+
+
+@pytest.fixture
+def l1_services():
+    """Deux instances avec L1 (simule deux workers uvicorn)"""
+    services = [
+        CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1, l1_enabled=True)
+        for _ in range(2)
+    ]
+    time.sleep(0.2)  # Laisse les abonnements pub/sub s'établir
+    yield services
+    for service in services:
+        service.close()
+
+
+def test_l1_policies_by_prefix(l1_services):
+    """Test: environnement en L1, inventaires jamais"""
+    cache, _ = l1_services
+    
+    cache.set_current_weather({"name": "Brouillard"})
+    cache.set_user_inventory(42, [{"resource_id": 1, "quantity": 3}])
+    
+    assert cache._unwrap(cache.l1.get("weather:current")) == {"name": "Brouillard"}
+    assert cache.l1.get("inv:42") is cache_module._MISSING
+    assert len(cache.l1) == 1
+
+
+def test_l1_invalidation_across_workers(l1_services):
+    """Test: une écriture sur un worker évince le L1 des autres"""
+    worker_a, worker_b = l1_services
+    
+    worker_a.set_current_season({"name": "Hiver"})
+    assert worker_b.get_current_season() == {"name": "Hiver"}  # chargé en L1
+    
+    worker_a.set_current_season({"name": "Printemps"})
+    time.sleep(1.5)  # Propagation pub/sub
+    
+    assert worker_b.get_current_season() == {"name": "Printemps"}
+    
+    worker_a.invalidate_environment()
+    time.sleep(1.5)
+    
+    assert worker_b.get_current_season() is None
+
+
 # =============================================================================
 # TESTS ENVIRONNEMENT
 # =============================================================================
@@ -166,6 +423,50 @@ def test_invalidate_environment(cache_service):
     assert cache_service.get_current_environment() is None
 
 
+def test_stale_entry_served_with_single_refresh(cache_service):
+    """Test: au-delà de l'expiration douce, valeur périmée servie + un seul rafraîchissement"""
+    key = "test:swr"
+    cache_service.delete(key, f"lock:refresh:{key}")
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"version": len(calls)}
+    
+    assert cache_service.get_or_refresh(key, loader, ttl=60) == {"version": 1}
+    entry = cache_service._get_entry(key)
+    assert entry["soft"] > time.time() and entry["delta"] >= 0.2
+    assert cache_service.redis.ttl(key) > 60  # TTL dur = TTL doux + TTL_STALE
+    
+    # Expiration douce dépassée
+    entry["soft"] = time.time() - 1
+    cache_service.set(key, entry, ttl=600)
+    
+    start = time.perf_counter()
+    results = [cache_service.get_or_refresh(key, loader, ttl=60) for _ in range(20)]
+    assert time.perf_counter() - start < 0.2  # personne n'attend le recalcul
+    assert results == [{"version": 1}] * 20
+    
+    time.sleep(0.5)
+    assert len(calls) == 2
+    assert cache_service.get_or_refresh(key, loader, ttl=60) == {"version": 2}
+    cache_service.delete(key, f"lock:refresh:{key}")
+
+
+def test_xfetch_early_refresh_probability(cache_service):
+    """Test: XFetch anticipe d'autant plus que l'échéance approche"""
+    now = time.time()
+    far = cache_service._swr_entry({}, ttl=3600, delta=0.1)
+    near = cache_service._swr_entry({}, ttl=0.05, delta=0.1)
+    
+    assert {cache_service._swr_state(far, beta=1.0, now=now) for _ in range(200)} == {"fresh"}
+    states = [cache_service._swr_state(near, beta=1.0, now=now) for _ in range(200)]
+    assert "early" in states and "fresh" in states
+    assert cache_service._swr_state(near, beta=0, now=now) == "fresh"
+    assert cache_service._swr_state({"plain": True}, beta=1.0) == "stale"
+
+
 # =============================================================================
 # TESTS MARCHÉ
 # =============================================================================
@@ -217,6 +518,30 @@ def test_invalidate_market_cache_all(cache_service):
     assert cache_service.get_market_listings(resource_id=20) is None
 
 
+def test_invalidate_tags_without_scan(cache_service, monkeypatch):
+    """Test invalidation par tags: aucun parcours du keyspace"""
+    def no_scan(*args, **kwargs):
+        raise AssertionError("SCAN interdit pendant une invalidation")
+    monkeypatch.setattr(cache_service.redis, "scan_iter", no_scan)
+
+    cache_service.set("test:tagged:1", 1, ttl=60, tags=["test:group"])
+    cache_service.set_many({"test:tagged:2": 2}, ttl=60, tags={"test:tagged:2": ["test:group"]})
+    cache_service.set("test:untagged", 3, ttl=60)
+
+    tag_key = cache_service._tag_key("test:group")
+    assert cache_service.redis.ttl(tag_key) > 0
+
+    assert cache_service.invalidate_tags("test:group") == 2
+    assert cache_service.get("test:tagged:1") is None
+    assert cache_service.get("test:tagged:2") is None
+    assert cache_service.get("test:untagged") == 3
+    assert not cache_service.exists(tag_key)
+
+    # Tag vide ou déjà invalidé
+    assert cache_service.invalidate_tags("test:group") == 0
+    cache_service.delete("test:untagged")
+
+
 # =============================================================================
 # TESTS LEADERBOARD
 # =============================================================================
@@ -374,6 +699,94 @@ def test_rate_limit_window_reset(cache_service):
     assert cache_service.check_rate_limit(identifier, max_requests, window)
 
 
+# =============================================================================
+# TESTS BRUTE-FORCE (échecs de connexion)
+# =============================================================================
+
+BF = dict(threshold=3, ip_threshold=5, window_seconds=60, block_seconds=30)
+
+
+@pytest.fixture
+def bf_keys(cache_service):
+    """Compteurs et blocages vierges (ils survivent 15 min à un run interrompu)"""
+    def clear():
+        for prefix in (CacheService.PREFIX_LOGIN_FAIL, CacheService.PREFIX_LOGIN_BLOCK,
+                       CacheService.PREFIX_LOGIN_INDEX):
+            keys = list(cache_service.redis.scan_iter(match=f"{prefix}:*"))
+            if keys:
+                cache_service.redis.delete(*keys)
+    clear()
+    yield
+    clear()
+
+
+def test_login_blocked_after_threshold(cache_service, bf_keys):
+    """Le login est bloqué au 3e échec; une autre IP reste bloquée pour ce login"""
+    for _ in range(2):
+        assert cache_service.record_login_failure("bf_alice", "10.0.0.1", **BF)[2] == 0
+    assert cache_service.check_login_block("bf_alice", "10.0.0.1") == 0
+
+    assert 0 < cache_service.record_login_failure("bf_alice", "10.0.0.1", **BF)[2] <= 30
+    assert 0 < cache_service.check_login_block("bf_alice", "10.0.0.2") <= 30
+    assert cache_service.check_login_block("bf_bob", "10.0.0.2") == 0
+
+    entries = {(e["kind"], e["subject"]): e for e in cache_service.get_login_failures()}
+    assert entries[("login", "bf_alice")]["blocked_for"] > 0
+    assert entries[("ip", "10.0.0.1")]["failures"] == 3
+
+    cache_service.unblock_login("login", "bf_alice")
+    assert cache_service.check_login_block("bf_alice", "10.0.0.2") == 0
+
+
+def test_ip_blocked_across_logins(cache_service, bf_keys):
+    """Credential stuffing: un échec par login, mais l'IP atteint son seuil"""
+    for i in range(5):
+        cache_service.record_login_failure(f"bf_user{i}", "10.0.0.9", **BF)
+    assert cache_service.check_login_block("bf_autre", "10.0.0.9") > 0
+
+
+def test_login_block_served_from_l1(l1_services, bf_keys):
+    """Un blocage déjà vu est refusé sans Redis; le déblocage atteint tous les workers"""
+    worker_a, worker_b = l1_services
+    for _ in range(3):
+        worker_a.record_login_failure("bf_carol", "10.0.0.3", **BF)
+    assert worker_b.check_login_block("bf_carol", "10.0.0.4") > 0
+
+    ttl = worker_b.redis.ttl("bfblock:login:bf_carol")
+    worker_b.redis.delete("bfblock:login:bf_carol")  # hors L1: B ne le voit pas
+    assert worker_b.check_login_block("bf_carol", "10.0.0.4") > 0
+    worker_b.redis.set("bfblock:login:bf_carol", int(time.time()) + ttl, ex=ttl)
+
+    worker_a.unblock_login("login", "bf_carol")
+    time.sleep(0.2)  # invalidation pub/sub
+    assert worker_b.check_login_block("bf_carol", "10.0.0.4") == 0
+
+
+def test_login_failures_read_from_index(cache_service, bf_keys, monkeypatch):
+    """L'administration lit l'index des sujets, sans parcourir le keyspace"""
+    cache_service.record_login_failure("bf_erin", "10.0.0.6", **BF)
+    cache_service.record_login_failure("bf_frank", "10.0.0.6", **BF)
+    cache_service.clear_login_failures("bf_frank")
+    monkeypatch.setattr(cache_service.redis, "scan_iter", None)
+    
+    entries = {(e["kind"], e["subject"]): e for e in cache_service.get_login_failures()}
+    assert entries[("login", "bf_erin")]["failures"] == 1
+    assert entries[("ip", "10.0.0.6")]["failures"] == 2
+    assert ("login", "bf_frank") not in entries
+    index = cache_service._login_index_key()
+    assert cache_service.redis.zscore(index, "login:bf_frank") is None
+    
+    cache_service.unblock_login("ip", "10.0.0.6")
+    assert cache_service.redis.zscore(index, "ip:10.0.0.6") is None
+
+
+def test_login_success_clears_login_failures(cache_service, bf_keys):
+    for _ in range(2):
+        cache_service.record_login_failure("bf_dave", "10.0.0.5", **BF)
+    cache_service.clear_login_failures("bf_dave")
+    assert cache_service.record_login_failure("bf_dave", "10.0.0.5", **BF)[:2] == (1, 3)
+
+
 # =============================================================================
 # TESTS STATISTIQUES
 # =============================================================================
@@ -404,6 +817,46 @@ def test_hit_rate_calculation(cache_service):
     assert stats["hit_rate"] <= 100
 
 
+def test_client_metrics_by_prefix(cache_service):
+    """Test métriques côté client ventilées par préfixe"""
+    cache_service.metrics.reset()
+
+    cache_service.set("inv:metrics:1", [{"resource_id": 1}], ttl=60)
+    cache_service.get("inv:metrics:1")             # HIT
+    cache_service.get("inv:metrics:absent")        # MISS
+    cache_service.get_many(["inv:metrics:1", "recipes:metrics:absent"])
+    cache_service.delete("inv:metrics:1")
+    cache_service.check_rate_limit("metrics_user", 1, 60)
+    cache_service.check_rate_limit("metrics_user", 1, 60)
+
+    metrics = cache_service.get_client_metrics()
+    inv = metrics["inv"]
+    assert inv["operations"]["set_ok"] == 1
+    assert inv["operations"]["get_hit"] == 1
+    assert inv["operations"]["get_miss"] == 1
+    assert inv["operations"]["mget_hit"] == 1
+    assert inv["operations"]["delete_ok"] == 1
+    assert inv["hit_rate"] == pytest.approx(66.67)
+    assert inv["latency"]["get"]["count"] == 2
+    assert inv["payload_size"]["write"]["count"] == 1
+    assert inv["payload_size"]["read"]["count"] == 2
+
+    assert metrics["recipes"]["operations"]["mget_miss"] == 1
+    assert metrics["multi"]["latency"]["mget"]["count"] == 1
+    assert metrics["ratelimit"]["operations"] == {"acquire_allowed": 1, "acquire_rejected": 1}
+
+
+def test_client_metrics_prometheus_format(cache_service):
+    """Test export texte Prometheus"""
+    cache_service.metrics.reset()
+    cache_service.get("env:metrics:absent")
+
+    text = cache_service.metrics.render_prometheus()
+    assert 'bcraftd_cache_operations_total{prefix="env",op="get",result="miss"} 1' in text
+    assert 'bcraftd_cache_latency_seconds_bucket{prefix="env",op="get",le="+Inf"} 1' in text
+    assert 'bcraftd_cache_latency_seconds_count{prefix="env",op="get"} 1' in text
+
+
 # =============================================================================
 # TESTS D'INTÉGRATION
 # =============================================================================
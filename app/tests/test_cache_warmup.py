@@ -0,0 +1,88 @@
+# app/tests/test_cache_warmup.py
+"""
+Tests du warm-up du cache au démarrage et de l'environnement préchauffé.
+
+Nécessite Redis sur localhost:6379 (DB 1, comme test_cache_service).
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services import cache_warmup
+from services.cache_service import CacheService
+from services.cache_warmup import run_warmup
+from services.environment_service import compute_environment, get_environment
+
+
+@pytest.fixture(scope="module")
+def cache_service():
+    service = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1)
+    yield service
+    service.flush_all()
+    service.close()
+
+
+class DummySession:
+    closed = 0
+
+    def close(self):
+        DummySession.closed += 1
+
+
+def test_groups_run_concurrently_with_report(cache_service, monkeypatch):
+    """Groupes en parallèle, rapport par groupe (ok / error / timeout / unknown)"""
+    def slow(cache, db):
+        time.sleep(0.2)
+        return 3
+
+    def broken(cache, db):
+        raise RuntimeError("boom")
+
+    def stuck(cache, db):
+        time.sleep(1)
+        return 1
+
+    monkeypatch.setattr(cache_warmup, "WARMUP_GROUPS", {
+        "slow_a": slow, "slow_b": slow, "broken": broken, "stuck": stuck,
+    })
+    DummySession.closed = 0
+
+    start = time.perf_counter()
+    report = asyncio.run(run_warmup(
+        cache_service, DummySession, ["slow_a", "slow_b", "broken", "stuck", "nope"], timeout=0.5
+    ))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9  # slow_a et slow_b en parallèle, stuck coupé à 0.5s
+    assert report["slow_a"]["status"] == "ok" and report["slow_a"]["items"] == 3
+    assert report["slow_a"]["duration_ms"] >= 200
+    assert report["broken"]["status"] == "error"
+    assert report["stuck"]["status"] == "timeout"
+    assert report["nope"]["status"] == "unknown"
+
+
+def test_warmup_without_cache_is_noop():
+    assert asyncio.run(run_warmup(None, DummySession, ["environment"])) == {}
+
+
+def test_environment_group_fills_cache(cache_service):
+    """Après warm-up, l'environnement est servi depuis le cache"""
+    cache_service.invalidate_environment()
+    report = asyncio.run(run_warmup(cache_service, DummySession, ["environment"]))
+
+    assert report["environment"]["status"] == "ok"
+    cached = cache_service.get_current_environment()
+    assert cached is not None
+    assert get_environment(cache_service) == cached
+    cache_service.invalidate_environment()
+
+
+def test_compute_environment_is_deterministic():
+    """Tous les workers calculent la même météo pour un créneau donné"""
+    now = 1_750_000_000
+    first = compute_environment(now)
+    assert compute_environment(now + 1)["weather"] == first["weather"]
+    assert first["season"]["name"] == "summer"
+    assert first["weather"]["until"] > now
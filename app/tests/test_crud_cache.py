@@ -0,0 +1,105 @@
+# app/tests/test_crud_cache.py
+"""
+Tests du cache des lectures par id de CRUDBase (présences et absences).
+
+Nécessite Redis sur localhost:6379 (DB 1) et la base de test (conftest).
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from models import Profession, Resource
+from services.cache_service import CacheService
+from utils import db_crud
+from utils.db_crud import CRUDBase
+
+
+@pytest.fixture(scope="module")
+def cache_service():
+    service = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1)
+    yield service
+    service.flush_all()
+    service.close()
+
+
+@pytest.fixture
+def crud(cache_service, monkeypatch):
+    monkeypatch.setattr(db_crud, "get_cache", lambda: cache_service)
+    crud = CRUDBase[Resource](Resource, cache_ttl=60, negative_ttl=5)
+    cache_service.delete(*[crud._cache_key(cache_service, id) for id in ("argile", "inconnu", "sable")])
+
+    calls = []
+    original_get = crud.get
+    monkeypatch.setattr(crud, "get", lambda db, id: calls.append(id) or original_get(db, id))
+    crud.db_calls = calls
+    return crud
+
+
+def test_hits_and_misses_are_cached(crud, cache_service, db_session, sample_resource):
+    """Une seule requête SQL par id, qu'il existe ou non"""
+    for _ in range(3):
+        assert crud.get_or_404(db_session, "argile", "Resource", cached=True).name == "Argile"
+        with pytest.raises(HTTPException) as exc:
+            crud.get_or_404(db_session, "inconnu", "Resource", cached=True)
+        assert exc.value.status_code == 404
+
+    assert crud.db_calls == ["argile", "inconnu"]
+    assert 0 < cache_service.redis.ttl(crud._cache_key(cache_service, "inconnu")) <= 5
+
+
+def test_writes_invalidate_entries(crud, db_session, sample_resource):
+    """create / update / delete sur la même instance invalident le cache"""
+    assert crud.get_cached(db_session, "sable") is None
+    crud.create(db_session, obj_in={"id": "sable", "name": "Sable", "type": "mineral"})
+    assert crud.get_cached(db_session, "sable").name == "Sable"
+
+    crud.update_by_id(db_session, id="argile", obj_in={"name": "Argile rouge"})
+    assert crud.get_cached(db_session, "argile").name == "Argile rouge"
+
+    crud.delete(db_session, id="sable")
+    assert crud.get_cached(db_session, "sable") is None
+
+
+def test_cached_instance_is_detached(crud, db_session, sample_resource):
+    """Une instance servie par le cache n'est liée à aucune session"""
+    crud.get_cached(db_session, "argile")
+    cached = crud.get_cached(db_session, "argile")
+    assert cached not in db_session
+    assert cached.created_at == sample_resource.created_at
+
+
+def test_get_or_404_is_uncached_by_default(crud, db_session, sample_resource):
+    """Sans cached=True, get_or_404 rend l'instance de la session (écritures)"""
+    resource = crud.get_or_404(db_session, "argile", "Resource")
+    assert resource in db_session
+    assert crud.db_calls == ["argile"]
+
+
+def test_cached_entry_is_copied(db_session, sample_profession, monkeypatch):
+    """Modifier une instance servie par le cache (L1) n'altère pas l'entrée partagée"""
+    service = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1, l1_enabled=True)
+    monkeypatch.setattr(db_crud, "get_cache", lambda: service)
+    profession_crud = CRUDBase(Profession, cache_ttl=60)
+    profession_crud.invalidate_cached(sample_profession.id)
+    profession_crud.get_cached(db_session, sample_profession.id)
+    cached = profession_crud.get_cached(db_session, sample_profession.id)
+    expected = list(cached.resources_found)
+    cached.resources_found.append("intrus")
+
+    assert profession_crud.get_cached(db_session, sample_profession.id).resources_found == expected
+    service.close()
+
+
+def test_admin_add_resource_is_persisted_and_invalidated(crud, cache_service, db_session, sample_profession):
+    """L'ajout admin est écrit en base et la lecture en cache suivante le voit"""
+    from routes.api.admin.professions import add_resource_to_profession
+    from utils.db_crud import profession_crud
+
+    profession_crud.invalidate_cached(sample_profession.id)
+    assert "sable" not in profession_crud.get_cached(db_session, sample_profession.id).resources_found
+
+    add_resource_to_profession(sample_profession.id, "sable", db_session)
+    db_session.expire_all()
+
+    assert "sable" in db_session.get(Profession, sample_profession.id).resources_found
+    assert "sable" in profession_crud.get_cached(db_session, sample_profession.id).resources_found
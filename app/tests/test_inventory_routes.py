@@ -0,0 +1,40 @@
+# app/tests/test_inventory_routes.py
+"""
+Tests des routes d'inventaire (/api/user/inventory).
+
+Nécessite la base de test (conftest); l'authentification est remplacée par
+un override de require_user.
+"""
+
+import pytest
+
+from main import app
+from services import inventory_service
+from utils.roles import require_user
+
+
+@pytest.fixture
+def as_user(client, sample_user, monkeypatch):
+    """Client authentifié comme sample_user, inventaires écrits en base (sans store)"""
+    monkeypatch.setattr(inventory_service, "get_inventory_store", lambda: None)
+    app.dependency_overrides[require_user] = lambda: {"id": sample_user.id}
+    yield client
+    app.dependency_overrides.pop(require_user, None)
+
+
+def test_get_inventory(as_user):
+    response = as_user.get("/api/user/inventory/")
+    assert response.status_code == 200
+    assert response.json() == {"argile": 5, "calcaire": 3}
+
+
+def test_add_then_get(as_user):
+    assert as_user.post("/api/user/inventory/add", params={"item": "fer", "qty": 2}).status_code == 200
+    assert as_user.get("/api/user/inventory/").json()["fer"] == 2
+
+
+def test_remove_returns_current_inventory(as_user):
+    response = as_user.post("/api/user/inventory/remove", params={"item": "argile", "qty": 2})
+    assert response.status_code == 200
+    assert response.json()["inventory"] == {"argile": 3, "calcaire": 3}
+    assert as_user.post("/api/user/inventory/remove", params={"item": "argile", "qty": 9}).status_code == 400
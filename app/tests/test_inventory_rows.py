@@ -0,0 +1,98 @@
+# app/tests/test_inventory_rows.py
+"""
+Tests de l'inventaire normalisé (table inventory, une ligne par item).
+
+Nécessite la base de test (conftest).
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from models import InventoryItem, User
+from services.inventory_rows import (
+    InsufficientItems, adopt_legacy, apply_deltas, load_inventory, replace_inventories
+)
+
+
+def test_legacy_inventory_adopted_once(db_session, sample_user):
+    """L'inventaire JSON est lu tel quel, puis repris dans la table à la première écriture"""
+    assert load_inventory(db_session, sample_user.id) == {"argile": 5, "calcaire": 3}
+
+    apply_deltas(db_session, sample_user.id, {"argile": -1, "brique": 2})
+    db_session.commit()
+    assert adopt_legacy(db_session, sample_user.id) == {}
+
+    db_session.refresh(sample_user)
+    assert sample_user.inventory == {}
+    assert load_inventory(db_session, sample_user.id) == {"argile": 4, "calcaire": 3, "brique": 2}
+
+
+def test_conditional_removal(db_session, sample_user):
+    """Un retrait trop grand ne touche à rien; une ligne vidée reste à 0, hors inventaire"""
+    with pytest.raises(InsufficientItems) as exc:
+        apply_deltas(db_session, sample_user.id, {"argile": -6})
+    assert exc.value.item == "argile"
+    db_session.rollback()
+
+    apply_deltas(db_session, sample_user.id, {"calcaire": -3})
+    db_session.commit()
+    assert load_inventory(db_session, sample_user.id) == {"argile": 5}
+
+    quantity = db_session.execute(
+        select(InventoryItem.quantity)
+        .where(InventoryItem.user_id == sample_user.id, InventoryItem.resource_id == "calcaire")
+    ).scalar()
+    assert quantity == 0
+
+
+def test_replace_inventories(db_session, sample_user):
+    replace_inventories(db_session, {sample_user.id: {"fer": 2, "argile": 0}})
+    db_session.commit()
+    assert load_inventory(db_session, sample_user.id) == {"fer": 2}
+
+    replace_inventories(db_session, {sample_user.id: {}})
+    db_session.commit()
+    assert load_inventory(db_session, sample_user.id) == {}
+
+
+def test_concurrent_removals_never_lose_updates(test_engine):
+    """10 transactions retirent 1 argile sur 5: exactement 5 réussissent, stock à 0"""
+    Session = sessionmaker(bind=test_engine)
+    user_id = "rows-concurrency-user"
+    with Session() as db:
+        db.add(User(
+            id=user_id, firstname="Rows", lastname="User", mail="rows@example.com",
+            login="rowsuser", password_hash="x", inventory={"argile": 5},
+        ))
+        db.commit()
+
+    results = []
+
+    def worker():
+        with Session() as db:
+            try:
+                apply_deltas(db, user_id, {"argile": -1, "brique": 1})
+                db.commit()
+                results.append(True)
+            except InsufficientItems:
+                db.rollback()
+                results.append(False)
+
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results.count(True) == 5
+        with Session() as db:
+            assert load_inventory(db, user_id) == {"brique": 5}
+    finally:
+        with Session() as db:
+            db.execute(InventoryItem.__table__.delete().where(InventoryItem.user_id == user_id))
+            db.execute(User.__table__.delete().where(User.id == user_id))
+            db.commit()
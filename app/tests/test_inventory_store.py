@@ -0,0 +1,155 @@
+# app/tests/test_inventory_store.py
+"""
+Tests du store d'inventaires write-behind (hash Redis + flush PostgreSQL).
+
+Nécessite Redis sur localhost:6379 (DB 1, comme test_cache_service);
+le test de flush utilise aussi la base de test (conftest).
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from services.cache_service import CacheService
+from services.inventory_rows import load_inventory
+from services.inventory_store import InsufficientItems, InventoryStore
+
+
+@pytest.fixture(scope="module")
+def cache_service():
+    service = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1)
+    yield service
+    service.flush_all()
+    service.close()
+
+
+@pytest.fixture
+def store(cache_service):
+    store = InventoryStore(cache_service.redis, flush_batch=2)
+    cache_service.redis.delete(store.DIRTY_KEY)
+    yield store
+    cache_service.redis.delete(store.DIRTY_KEY)
+
+
+def make_user(user_id, inventory=None):
+    """Seuls id et inventory sont lus par le store"""
+    return SimpleNamespace(id=user_id, inventory=inventory or {})
+
+
+@pytest.fixture
+def user(store):
+    user = make_user("store-user-1", {"argile": 5, "calcaire": 3})
+    store.redis.delete(store._key(user.id))
+    yield user
+    store.redis.delete(store._key(user.id))
+
+
+# =============================================================================
+# LECTURES / ÉCRITURES
+# =============================================================================
+
+def test_get_hydrates_from_user(store, user):
+    """Premier accès: inventaire chargé depuis User.inventory, non marqué modifié"""
+    assert store.get(user) == {"argile": 5, "calcaire": 3}
+    assert store.dirty_count() == 0
+
+    # Un hash existant n'est jamais écrasé par l'inventaire PostgreSQL
+    store.apply(user, {"argile": 1})
+    user.inventory = {"argile": 1}
+    assert store.get(user)["argile"] == 6
+
+
+def test_apply_is_all_or_nothing(store, user):
+    """Un retrait impossible n'applique aucune variation"""
+    with pytest.raises(InsufficientItems) as exc:
+        store.apply(user, {"calcaire": -1, "argile": -6, "brique": 1})
+    assert exc.value.item == "argile"
+    assert store.get(user) == {"argile": 5, "calcaire": 3}
+
+    inventory = store.apply(user, {"argile": -2, "calcaire": -3, "brique": 1})
+    assert inventory == {"argile": 3, "brique": 1}
+    assert store.dirty_count() == 1
+
+
+def test_concurrent_removals_never_go_negative(store, user):
+    """10 retraits concurrents de 1 sur 5 argiles: exactement 5 réussissent"""
+    store.get(user)
+    results = []
+
+    def worker():
+        try:
+            store.apply(user, {"argile": -1})
+            results.append(True)
+        except InsufficientItems:
+            results.append(False)
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 5
+    assert "argile" not in store.get(user)
+
+
+def test_replace_clears_inventory(store, user):
+    store.get(user)
+    assert store.replace(user, {}) == {}
+    assert store.get(user) == {}
+    assert store.dirty_count() == 1
+
+
+# =============================================================================
+# FLUSH
+# =============================================================================
+
+def test_flush_writes_dirty_users(store, db_session, sample_user):
+    """Le flush écrit l'inventaire en base, vide le backlog et arme l'expiration"""
+    store.redis.delete(store._key(sample_user.id))
+    store.apply(sample_user, {"argile": -5, "brique": 2})
+    key = store._key(sample_user.id)
+    assert store.redis.ttl(key) == -1
+
+    assert store.flush_batch_once(db_session) == 1
+    assert store.dirty_count() == 0
+    assert store.redis.ttl(key) > 0
+
+    assert load_inventory(db_session, sample_user.id) == {"calcaire": 3, "brique": 2}
+    db_session.refresh(sample_user)
+    assert sample_user.inventory == {}  # colonne JSON reprise dans la table
+    store.redis.delete(key)
+
+
+def test_flush_failure_keeps_users_dirty(store):
+    """Si PostgreSQL échoue, les utilisateurs restent à flusher"""
+    user = make_user("store-user-2", {"argile": 1})
+    store.redis.delete(store._key(user.id))
+    store.apply(user, {"argile": 1})
+
+    class BrokenSession:
+        def execute(self, *args, **kwargs):
+            raise RuntimeError("db down")
+
+        def rollback(self):
+            pass
+
+    with pytest.raises(RuntimeError):
+        store.flush_batch_once(BrokenSession())
+    assert store.dirty_count() == 1
+    assert store.stats["flush_errors"] == 1
+    store.redis.delete(store._key(user.id))
+
+
+def test_evicted_hash_is_never_flushed(store, db_session, sample_user):
+    """Un hash modifié puis évincé ne vide pas l'inventaire PostgreSQL"""
+    key = store._key(sample_user.id)
+    store.redis.delete(key)
+    store.apply(sample_user, {"argile": -1})
+    store.redis.delete(key)  # éviction simulée
+
+    assert store.flush_batch_once(db_session) == 0
+    assert store.dirty_count() == 0
+    assert store.stats["evicted_users"] == 1
+    assert load_inventory(db_session, sample_user.id) == {"argile": 5, "calcaire": 3}
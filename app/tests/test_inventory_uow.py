@@ -0,0 +1,103 @@
+# app/tests/test_inventory_uow.py
+"""
+Tests de l'unité de travail d'inventaire (craft et quêtes en un seul commit).
+
+Nécessite la base de test (conftest); le test du store utilise aussi Redis
+sur localhost:6379 (DB 1, comme test_inventory_store).
+"""
+
+import pytest
+from sqlalchemy import event
+
+from services import inventory_service
+from services.cache_service import CacheService
+from services.crafting_service import apply_craft
+from services.inventory_rows import adopt_legacy, load_inventory
+from services.inventory_service import InventoryUnitOfWork
+from services.inventory_store import InsufficientItems, InventoryStore
+from services.xp_service import add_xp
+
+
+@pytest.fixture
+def no_store(monkeypatch):
+    monkeypatch.setattr(inventory_service, "get_inventory_store", lambda: None)
+
+
+@pytest.fixture
+def writes(db_session):
+    """Commits et UPDATE émis par la session pendant le test"""
+    log = {"commits": 0, "updates": []}
+
+    def on_commit(session):
+        log["commits"] += 1
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            log["updates"].append(statement)
+
+    connection = db_session.connection()
+    event.listen(db_session, "after_commit", on_commit)
+    event.listen(connection, "before_cursor_execute", on_execute)
+    yield log
+    event.remove(db_session, "after_commit", on_commit)
+    event.remove(connection, "before_cursor_execute", on_execute)
+
+
+@pytest.fixture
+def migrated_user(db_session, sample_user):
+    """sample_user dont l'inventaire JSON est déjà repris dans la table"""
+    adopt_legacy(db_session, sample_user.id)
+    db_session.commit()
+    return sample_user
+
+
+def test_craft_writes_once(no_store, db_session, migrated_user, sample_recipe, writes):
+    inventory, produced = apply_craft(db_session, migrated_user, "ciment")
+
+    assert inventory == {"argile": 4, "calcaire": 2, "ciment": 1}
+    assert produced["xp_gained"] == 10
+    assert writes["commits"] == 1
+
+    # Une ligne par ingrédient; users ne reçoit que l'xp, jamais l'inventaire
+    user_updates = [s for s in writes["updates"] if "users" in s]
+    assert len(writes["updates"]) - len(user_updates) == 2
+    assert len(user_updates) == 1 and "inventory" not in user_updates[0]
+
+    db_session.expire_all()
+    assert load_inventory(db_session, migrated_user.id) == inventory
+    assert migrated_user.xp == 10
+
+
+def test_insufficient_items_discards_everything(no_store, db_session, sample_user, writes):
+    uow = InventoryUnitOfWork(db_session, sample_user).remove("argile", 2).remove("calcaire", 4)
+    uow.add("brique")
+    add_xp(sample_user, 50)
+
+    with pytest.raises(InsufficientItems) as exc:
+        uow.commit()
+    assert exc.value.item == "calcaire"
+    assert writes["commits"] == 0
+
+    assert sample_user.xp == 0
+    assert sample_user.inventory == {"argile": 5, "calcaire": 3}
+
+
+def test_store_compensated_when_commit_fails(monkeypatch, db_session, sample_user):
+    cache = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1)
+    store = InventoryStore(cache.redis)
+    store.redis.delete(store._key(sample_user.id))
+    monkeypatch.setattr(inventory_service, "get_inventory_store", lambda: store)
+    try:
+        uow = InventoryUnitOfWork(db_session, sample_user).remove("argile", 2).add("brique")
+        add_xp(sample_user, 10)
+
+        def failing_commit():
+            raise RuntimeError("commit perdu")
+        monkeypatch.setattr(db_session, "commit", failing_commit)
+
+        with pytest.raises(RuntimeError):
+            uow.commit()
+        assert store.get(sample_user) == {"argile": 5, "calcaire": 3}
+    finally:
+        store.redis.delete(store._key(sample_user.id), store.DIRTY_KEY)
+        cache.close()
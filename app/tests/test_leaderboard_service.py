@@ -0,0 +1,99 @@
+# app/tests/test_leaderboard_service.py
+"""
+Tests des leaderboards en sorted sets Redis.
+
+Nécessite Redis sur localhost:6379 (DB 1) et la base de test (conftest).
+"""
+
+import pytest
+
+from models import UserStatistics
+from services import leaderboard_service as leaderboard_module
+from services.cache_service import CacheService
+from services.leaderboard_service import BOARDS, LeaderboardService, scores_for
+
+
+@pytest.fixture(scope="module")
+def cache_service():
+    service = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1)
+    yield service
+    service.flush_all()
+    service.close()
+
+
+@pytest.fixture
+def boards(cache_service):
+    service = LeaderboardService(cache_service.redis, rebuild_batch=2)
+    cache_service.redis.delete(*[service._key(board) for board in BOARDS])
+    yield service
+    cache_service.redis.delete(*[service._key(board) for board in BOARDS])
+
+
+def test_top_rank_and_around(boards):
+    """Rangs 1-based, ordre décroissant, fenêtre autour d'un joueur"""
+    boards.update_many({
+        f"u{i}": {"crafters": float(i)} for i in range(1, 11)
+    })
+
+    top = boards.top("crafters", limit=3)
+    assert [entry["user_id"] for entry in top] == ["u10", "u9", "u8"]
+    assert top[0] == {"rank": 1, "user_id": "u10", "score": 10.0}
+
+    assert boards.rank("crafters", "u7") == {"rank": 4, "user_id": "u7", "score": 7.0, "total": 10}
+    assert boards.rank("crafters", "inconnu") is None
+
+    around = boards.around("crafters", "u9", radius=2)
+    assert [entry["rank"] for entry in around] == [1, 2, 3, 4]
+    assert around[1]["user_id"] == "u9"
+
+    boards.remove_user("u10")
+    assert boards.top("crafters", limit=1)[0]["user_id"] == "u9"
+
+
+def test_unknown_board_rejected(boards):
+    with pytest.raises(ValueError):
+        boards.top("inconnu")
+
+
+def _stats(user_id, crafts, sales, gold):
+    return UserStatistics(
+        user_id=user_id, total_crafts=crafts, total_sales=sales, total_gold_earned=gold,
+        total_purchases=0, total_resources_gathered=0, total_gold_spent=0,
+        workshops_built=0, workshops_repaired=0, rare_items_crafted=0,
+        professions_mastered=0, achievements_unlocked=0, play_time_minutes=0,
+    )
+
+
+def test_rebuild_matches_database(boards, db_session, sample_user):
+    """La reconstruction reproduit get_rank_score et remplace les anciennes entrées"""
+    stats = _stats(sample_user.id, crafts=12, sales=3, gold=5000)
+    db_session.add(stats)
+    db_session.commit()
+    boards.update_user("fantome", {"global": 1e9})
+
+    assert boards.rebuild(db_session) == 1
+    assert boards.rank("global", "fantome") is None
+    assert boards.rank("global", sample_user.id)["score"] == stats.get_rank_score()
+    assert boards.rank("richest", sample_user.id)["score"] == 5000
+    # Le TTL de secours des clés temporaires ne suit pas le classement
+    assert all(boards.redis.ttl(boards._key(board)) == -1 for board in BOARDS)
+
+
+def test_orm_commit_updates_boards(boards, db_session, sample_user, monkeypatch):
+    """Un commit qui modifie des UserStatistics pousse les scores, un rollback non"""
+    monkeypatch.setattr(leaderboard_module, "_leaderboard_service", boards)
+
+    stats = _stats(sample_user.id, crafts=1, sales=0, gold=0)
+    db_session.add(stats)
+    db_session.commit()
+    assert boards.rank("crafters", sample_user.id)["score"] == 1
+
+    stats.total_crafts = 5
+    db_session.flush()
+    db_session.rollback()
+    assert boards.rank("crafters", sample_user.id)["score"] == 1
+
+    stats.total_crafts = 7
+    db_session.commit()
+    assert boards.rank("crafters", sample_user.id)["score"] == 7
+    assert boards.rank("global", sample_user.id)["score"] == scores_for(stats)["global"]
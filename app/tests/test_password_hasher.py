@@ -0,0 +1,75 @@
+# app/tests/test_password_hasher.py
+"""
+Tests du pool de hachage des mots de passe (admission bornée, timeout).
+
+Tests unitaires: ni base de données, ni Redis.
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+from utils.auth import verify_password
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queue=0, timeout=2)
+    hasher.warm_up()
+    yield hasher
+    hasher.close()
+
+
+def test_hash_and_verify_in_pool(hasher):
+    hashed = hasher.hash("Secret123!")
+    assert verify_password("Secret123!", hashed)
+    assert hasher.verify("Secret123!", hashed) is True
+    assert hasher.verify("mauvais", hashed) is False
+
+    stats = hasher.get_stats()
+    assert stats["ok"] == 3 and stats["in_flight"] == 0
+    assert stats["hash_latency"]["count"] == 3
+    assert "bcraftd_password_hash_queued 0" in hasher.render_prometheus()
+
+
+def test_saturated_pool_rejects_immediately(hasher):
+    worker = threading.Thread(target=hasher._run, args=(time.sleep, 0.5))
+    worker.start()
+    time.sleep(0.1)
+
+    assert hasher.get_stats()["in_flight"] == 1
+    start = time.perf_counter()
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(time.sleep, 0)
+    assert time.perf_counter() - start < 0.05
+
+    worker.join()
+    assert hasher.get_stats()["rejected"] == 1
+    hasher._run(time.sleep, 0)  # créneau rendu
+
+
+def test_timeout_keeps_slot_until_work_ends():
+    hasher = PasswordHasher(workers=1, max_queue=0, timeout=0.2)
+    hasher.warm_up()  # le démarrage du processus (spawn) ne compte pas dans le délai
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher._run(time.sleep, 0.6)
+        assert hasher.get_stats()["timeout"] == 1
+        assert hasher.get_stats()["in_flight"] == 1  # le processus calcule encore
+
+        time.sleep(0.6)
+        assert hasher.get_stats()["in_flight"] == 0
+    finally:
+        hasher.close()
+
+
+def test_warm_up_starts_spawned_workers():
+    hasher = PasswordHasher(workers=2, max_queue=0, timeout=2)
+    try:
+        assert hasher._executor._mp_context.get_start_method() == "spawn"
+        hasher.warm_up()
+        assert len(hasher._executor._processes) == 2
+    finally:
+        hasher.close()
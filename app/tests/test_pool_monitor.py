@@ -0,0 +1,86 @@
+# app/tests/test_pool_monitor.py
+"""
+Tests de la télémétrie du pool de connexions et de l'admission (503).
+
+Nécessite la base de test (conftest).
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from database.connection import get_db
+from database.pool_monitor import DatabaseBusy, PoolMonitor, monitored_pool_class
+from main import app
+
+
+@pytest.fixture
+def monitored(test_db_url):
+    """Engine à une connexion, timeout de checkout court"""
+    monitor = PoolMonitor("test", max_waiting=1, capacity=1)
+    engine = create_engine(
+        test_db_url,
+        poolclass=monitored_pool_class(QueuePool, monitor),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.3,
+    )
+    monitor.attach(engine)
+    yield engine, monitor
+    engine.dispose()
+
+
+def test_checkout_counters(monitored):
+    engine, monitor = monitored
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert monitor.get_stats()["in_use"] == 1
+    with engine.connect():
+        pass
+
+    stats = monitor.get_stats()
+    assert stats["in_use"] == 0 and stats["idle"] == 1 and stats["overflow"] == 0
+    assert stats["checkouts"] == 2 and stats["connects"] == 1
+    assert stats["wait_latency"]["count"] == 2
+    assert 'bcraftd_db_pool_checkouts_total{engine="test"} 2' in monitor.render_prometheus()
+
+
+def test_saturated_pool_times_out_and_rejects(monitored):
+    engine, monitor = monitored
+    errors = []
+
+    def waiter():
+        try:
+            engine.connect()
+        except PoolTimeoutError as e:
+            errors.append(e)
+
+    with engine.connect():
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.1)
+
+        assert monitor.get_stats()["waiting"] == 1
+        with pytest.raises(DatabaseBusy):
+            monitor.admit()
+        thread.join()
+
+    assert len(errors) == 1
+    stats = monitor.get_stats()
+    assert stats["waiting"] == 0 and stats["timeouts"] == 1 and stats["rejected"] == 1
+    monitor.admit()  # plus personne en attente
+
+
+def test_busy_database_returns_503(client):
+    def busy_db():
+        raise DatabaseBusy("saturé")
+        yield
+
+    app.dependency_overrides[get_db] = busy_db
+    response = client.get("/api/public/recipes/")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
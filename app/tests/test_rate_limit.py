@@ -0,0 +1,128 @@
+# app/tests/test_rate_limit.py
+"""
+Tests du middleware de rate limiting (token bucket Redis).
+
+Nécessite Redis sur localhost:6379 (DB 1, comme test_cache_service).
+"""
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.cache_service import CacheService
+from utils import rate_limit
+from utils.auth import create_access_token
+from utils.rate_limit import RateLimitMiddleware, identify_client, resolve_limit, _parse_policies
+
+
+POLICIES = {
+    "/api/public/auth/login": {"default": [2, 60]},
+    "/api": {"anonymous": [3, 60], "user": [5, 60], "admin": None},
+}
+
+
+@pytest.fixture(scope="module")
+def cache_service():
+    cache = CacheService(host="localhost", port=6379, password="redis_secure_pass", db=1)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def limited_client(cache_service, monkeypatch):
+    """Mini application protégée par le middleware"""
+    monkeypatch.setattr(rate_limit, "get_cache", lambda: cache_service)
+
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, policies=POLICIES, enabled=True)
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.post("/api/public/auth/login")
+    def login():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    # Adresse client unique par test (seaux indépendants)
+    with TestClient(app, client=(f"10.0.{uuid.uuid4().int % 250}.1", 50000)) as client:
+        yield client
+
+
+# =============================================================================
+# POLITIQUES
+# =============================================================================
+
+def test_resolve_limit_longest_prefix_and_role():
+    """Le préfixe le plus long gagne, puis le rôle (ou default)"""
+    policies = _parse_policies(POLICIES)
+
+    assert resolve_limit(policies, "/api/public/auth/login", "anonymous") == (
+        "/api/public/auth/login", (2, 60)
+    )
+    assert resolve_limit(policies, "/api/user/inventory", "user") == ("/api", (5, 60))
+    assert resolve_limit(policies, "/api/admin/users", "admin") == ("/api", None)
+    assert resolve_limit(policies, "/api/user/inventory", "moderator") == ("/api", None)
+    assert resolve_limit(policies, "/static/app.css", "anonymous") == (None, None)
+
+
+def test_identify_client_from_token():
+    """Rôle et sujet lus dans le token, sinon IP"""
+    token = create_access_token({"sub": "u-1", "role": "admin"})
+    scope = {
+        "type": "http",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("1.2.3.4", 1234),
+    }
+    assert identify_client(scope) == ("admin", "user:u-1")
+
+    scope["headers"] = [(b"authorization", b"Bearer invalid")]
+    assert identify_client(scope) == ("anonymous", "ip:1.2.3.4")
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+def test_rejects_with_retry_after(limited_client):
+    """Au-delà de la capacité: 429 + Retry-After"""
+    for _ in range(3):
+        response = limited_client.get("/api/ping")
+        assert response.status_code == 200
+        assert "x-ratelimit-remaining" in response.headers
+
+    response = limited_client.get("/api/ping")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.headers["x-ratelimit-remaining"] == "0"
+
+
+def test_login_has_its_own_bucket(limited_client):
+    """La limite /login ne consomme pas celle du reste de l'API"""
+    assert limited_client.post("/api/public/auth/login").status_code == 200
+    assert limited_client.post("/api/public/auth/login").status_code == 200
+    assert limited_client.post("/api/public/auth/login").status_code == 429
+
+    assert limited_client.get("/api/ping").status_code == 200
+
+
+def test_unlimited_role_and_unmatched_paths(limited_client):
+    """Admin illimité, routes hors politique non comptées"""
+    token = create_access_token({"sub": f"admin-{uuid.uuid4()}", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(10):
+        assert limited_client.get("/api/ping", headers=headers).status_code == 200
+        assert limited_client.get("/health").status_code == 200
+
+
+def test_fail_open_without_cache(limited_client, monkeypatch):
+    """Sans Redis, les requêtes passent"""
+    monkeypatch.setattr(rate_limit, "get_cache", lambda: None)
+    for _ in range(10):
+        assert limited_client.get("/api/ping").status_code == 200
@@ -0,0 +1,114 @@
+# app/tests/test_refresh_token_store.py
+"""
+Tests du miroir Redis des refresh tokens (rotation atomique, écriture différée).
+
+Nécessite Redis sur localhost:6379 (DB 1) et la base de test (conftest).
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models import RefreshToken
+from services.cache_service import CacheService
+from services import refresh_token_store
+from services.refresh_token_store import (
+    REUSED, REVOKED, ROTATED, UNKNOWN, RefreshTokenStore, get_user_devices, revoke_user_tokens
+)
+
+REDIS = dict(host="localhost", port=6379, password="redis_secure_pass", db=1)
+
+
+@pytest.fixture
+def store():
+    cache = CacheService(**REDIS)
+    yield RefreshTokenStore(cache.redis, tombstone_ttl=60)
+    cache.flush_all()
+    cache.close()
+
+
+@pytest.fixture
+def sessions(db_session):
+    return sessionmaker(bind=db_session.get_bind())
+
+
+def add_token(db_session, token_hash, user_id, device_id, days=14):
+    db_session.add(RefreshToken(
+        token_hash=token_hash, user_id=user_id, device_id=device_id, device_name=device_id,
+        created_at=datetime.now(), expires_at=datetime.fromtimestamp(time.time() + days * 86400),
+    ))
+    db_session.commit()
+
+
+def hashes_in_db(db_session, user_id):
+    db_session.expire_all()
+    rows = db_session.query(RefreshToken).filter(RefreshToken.user_id == user_id).all()
+    return sorted(row.token_hash for row in rows)
+
+
+def test_rotation_in_redis_then_written_behind(store, sessions, db_session):
+    add_token(db_session, "A", "u1", "phone")
+    store.rebuild(db_session)
+    exp = int(time.time()) + 3600
+
+    assert store.rotate("A", "B", "u1", exp) == (ROTATED, "phone", "phone")
+    # Rejeu de l'ancien token: refusé, même avant l'écriture PostgreSQL
+    assert store.rotate("A", "C", "u1", exp)[0] == REUSED
+    assert hashes_in_db(db_session, "u1") == ["A"]
+
+    assert store.rotate("B", "C", "u1", exp)[0] == ROTATED
+    assert store.get_stats()["pending_writes"] == 2
+    assert store.write_pending(sessions) == 2
+    assert hashes_in_db(db_session, "u1") == ["C"]
+    assert [d["token_hash"] for d in store.devices("u1")] == ["C"]
+    assert store.redis.ttl("rt:C") > 3500
+
+
+def test_unknown_or_foreign_token_falls_back(store):
+    exp = int(time.time()) + 3600
+    store.add("A", "u1", "phone", "", exp)
+
+    assert store.rotate("inconnu", "B", "u1", exp)[0] == UNKNOWN
+    assert store.rotate("A", "B", "u2", exp)[0] == UNKNOWN
+    assert store.get_stats()["pending_writes"] == 0
+    assert store.devices("u1") is None  # miroir jamais reconstruit: lecture PostgreSQL
+
+
+def test_rebuild_and_device_revocation(store, sessions, db_session):
+    add_token(db_session, "A", "u1", "phone")
+    add_token(db_session, "B", "u1", "laptop")
+    add_token(db_session, "old", "u1", "tablet", days=-1)
+
+    assert store.rebuild(db_session) == 2
+    assert {d["device_id"] for d in store.devices("u1")} == {"phone", "laptop"}
+
+    assert store.revoke_user("u1", "laptop") == 1
+    assert [d["device_id"] for d in store.devices("u1")] == ["phone"]
+    # Révoqué: refusé même avant la suppression PostgreSQL
+    assert store.rotate("B", "C", "u1", int(time.time()) + 60)[0] == REVOKED
+    store.write_pending(sessions)
+    assert hashes_in_db(db_session, "u1") == ["A", "old"]
+
+    store.revoke("A")
+    assert store.rotate("A", "C", "u1", int(time.time()) + 60)[0] == REVOKED
+    store.write_pending(sessions)
+    assert hashes_in_db(db_session, "u1") == ["old"]
+    assert store.devices("u1") == []
+
+
+def test_route_helpers_go_through_the_mirror(store, sessions, db_session, monkeypatch):
+    """Révocation (profil, admin) visible par /auth/refresh; devices lus en base sans miroir"""
+    monkeypatch.setattr(refresh_token_store, "_refresh_token_store", store)
+    add_token(db_session, "A", "u1", "phone")
+    add_token(db_session, "B", "u1", "laptop")
+    store.rebuild(db_session)
+
+    assert revoke_user_tokens(db_session, "u1", "laptop") == 1
+    assert store.rotate("B", "C", "u1", int(time.time()) + 60)[0] == REVOKED
+    assert [d["device_id"] for d in get_user_devices(db_session, "u1")] == ["phone"]
+
+    store.redis.delete(store.MIRROR_KEY)  # miroir évincé ou Redis vidé
+    monkeypatch.setattr(refresh_token_store, "get_active_devices", lambda db, uid: ["postgresql"])
+    assert get_user_devices(db_session, "u1") == ["postgresql"]
@@ -0,0 +1,102 @@
+# app/tests/test_scheduler.py
+"""
+Tests du planificateur de maintenance (élection Redis, lots bornés, historique).
+
+Nécessite Redis sur localhost:6379 (DB 1) et la base de test (conftest).
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import services.scheduler as scheduler_module
+from models import RefreshToken
+from services.cache_service import CacheService
+from services.inventory_rows import apply_deltas, load_inventory, load_user_inventory
+from services.inventory_store import InventoryStore
+from services.scheduler import JobScheduler, ScheduledJob, cleanup_tokens_job, return_expired_items
+from utils.auth import cleanup_expired_tokens
+
+REDIS = dict(host="localhost", port=6379, password="redis_secure_pass", db=1)
+
+
+@pytest.fixture
+def cache():
+    cache = CacheService(**REDIS)
+    yield cache
+    cache.flush_all()
+    cache.close()
+
+
+@pytest.fixture
+def sessions(db_session):
+    return sessionmaker(bind=db_session.get_bind())
+
+
+def add_tokens(db_session, count, expired):
+    delta = timedelta(days=-1 if expired else 1)
+    for i in range(count):
+        db_session.add(RefreshToken(
+            token_hash=f"{'old' if expired else 'new'}-{i}", user_id="u1", device_id="d",
+            created_at=datetime.now(), expires_at=datetime.now() + delta,
+        ))
+    db_session.commit()
+
+
+def test_cleanup_deletes_in_bounded_batches(db_session):
+    add_tokens(db_session, 7, expired=True)
+    add_tokens(db_session, 2, expired=False)
+
+    assert cleanup_expired_tokens(db_session, batch_size=3, max_batches=2) == 6
+    assert cleanup_expired_tokens(db_session, batch_size=3) == 1
+    assert db_session.query(RefreshToken).count() == 2
+
+
+def test_single_worker_runs_each_pass(cache, sessions):
+    runs = []
+    job = lambda db, scheduler: runs.append(scheduler.worker_id) or 1
+    workers = [
+        JobScheduler(cache.redis, sessions, [ScheduledJob("demo", job, interval=60)])
+        for _ in range(3)
+    ]
+
+    results = [worker.run_job("demo") for worker in workers]
+    assert len(runs) == 1 and results.count(None) == 2
+    # Les perdants retentent à l'expiration du verrou, pas avant
+    assert all(w.jobs["demo"].next_run > time.time() + 50 for w in workers)
+
+    assert workers[1].run_job("demo", force=True)["status"] == "ok"
+    history = workers[2].get_history("demo")
+    assert [entry["worker"] for entry in history] == [workers[1].worker_id, workers[0].worker_id]
+
+
+def test_failed_run_recorded(cache, sessions, db_session):
+    def broken(db, scheduler):
+        raise RuntimeError("boom")
+
+    scheduler = JobScheduler(cache.redis, sessions, [
+        ScheduledJob("broken", broken, interval=60),
+        ScheduledJob("token_cleanup", cleanup_tokens_job, interval=60),
+    ])
+    assert scheduler.run_job("broken")["error"] == "boom"
+
+    add_tokens(db_session, 2, expired=True)
+    assert scheduler.run_job("token_cleanup")["rows"] == 2
+    stats = scheduler.get_stats()["jobs"]
+    assert stats["broken"]["last_run"]["status"] == "error"
+    assert stats["token_cleanup"]["last_run"]["rows"] == 2
+
+
+def test_expired_items_returned_through_store(cache, db_session, sample_user, monkeypatch):
+    """Offre expirée: l'ajout du trigger est annulé, les objets passent par le hash du vendeur"""
+    store = InventoryStore(cache.redis, loader=load_user_inventory)
+    monkeypatch.setattr(scheduler_module, "get_inventory_store", lambda: store)
+    store.apply(sample_user, {"argile": -1})  # hash modifié, pas encore flushé
+
+    apply_deltas(db_session, sample_user.id, {"fer": 2})  # écriture du trigger
+    return_expired_items(db_session, [(sample_user.id, "fer", 2)])
+
+    assert load_inventory(db_session, sample_user.id) == {"argile": 5, "calcaire": 3}
+    assert store.get(sample_user) == {"argile": 4, "calcaire": 3, "fer": 2}
@@ -0,0 +1,75 @@
+# app/tests/test_token_verifier.py
+"""
+Tests du vérificateur de tokens (clés par kid, LRU des tokens vérifiés).
+
+Tests purement unitaires: ni base de données, ni Redis.
+"""
+
+import hashlib
+import hmac
+import time
+
+from utils.auth import TokenVerifier, _b64url_encode
+
+
+def test_verified_tokens_served_from_lru():
+    verifier = TokenVerifier({"k1": "secret"}, active_kid="k1", cache_size=2)
+    token = verifier.encode({"sub": "u1"}, expires_seconds=60)
+
+    assert verifier.verify(token)["sub"] == "u1"
+    payload = verifier.verify(token)
+    payload["sub"] = "modifié"  # copie: le LRU n'est pas altéré
+    assert verifier.verify(token)["sub"] == "u1"
+    assert verifier.stats["misses"] == 1 and verifier.stats["hits"] == 2
+
+    # LRU borné
+    for i in range(3):
+        verifier.verify(verifier.encode({"sub": f"u{i}"}, expires_seconds=60))
+    assert verifier.get_stats()["size"] == 2
+
+
+def test_expiry_enforced_on_cached_tokens(monkeypatch):
+    verifier = TokenVerifier({"k1": "secret"}, active_kid="k1")
+    token = verifier.encode({"sub": "u1"}, expires_seconds=10)
+    assert verifier.verify(token) is not None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert verifier.verify(token) is None
+    assert verifier.get_stats()["size"] == 0
+
+
+def test_tampered_and_unknown_kid_rejected():
+    verifier = TokenVerifier({"k1": "secret"}, active_kid="k1")
+    header_b, payload_b, sig_b = verifier.encode({"sub": "u1", "role": "user"}, 60).split(".")
+    forged = _b64url_encode(b'{"exp":9999999999,"role":"admin","sub":"u1"}')
+
+    assert verifier.verify(f"{header_b}.{forged}.{sig_b}") is None
+    assert verifier.verify("pas.un.token") is None
+    assert verifier.verify("n'importe quoi") is None
+
+    other = TokenVerifier({"k9": "secret"}, active_kid="k9")
+    assert verifier.verify(other.encode({"sub": "u1"}, 60)) is None
+    assert verifier.stats["rejected"] == 4
+
+
+def test_key_rotation_keeps_previous_tokens_valid():
+    old = TokenVerifier({"k1": "ancien"}, active_kid="k1")
+    old_token = old.encode({"sub": "u1"}, expires_seconds=60)
+
+    rotated = TokenVerifier({"k1": "ancien", "k2": "nouveau"}, active_kid="k2")
+    new_token = rotated.encode({"sub": "u2"}, expires_seconds=60)
+
+    assert rotated.verify(old_token)["sub"] == "u1"
+    assert rotated.verify(new_token)["sub"] == "u2"
+    assert old.verify(new_token) is None
+
+
+def test_token_without_kid_uses_active_key():
+    """Tokens émis avant l'ajout du kid dans l'en-tête"""
+    header_b = _b64url_encode(b'{"alg":"HS256","typ":"JWT"}')
+    payload_b = _b64url_encode(b'{"exp":9999999999,"sub":"u1"}')
+    sig = hmac.new(b"secret", f"{header_b}.{payload_b}".encode(), hashlib.sha256).digest()
+
+    verifier = TokenVerifier({"k1": "secret"}, active_kid="k1")
+    assert verifier.verify(f"{header_b}.{payload_b}.{_b64url_encode(sig)}")["sub"] == "u1"
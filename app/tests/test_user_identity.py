@@ -0,0 +1,74 @@
+# app/tests/test_user_identity.py
+"""
+Tests du cache d'identité des requêtes authentifiées (version par utilisateur).
+
+Nécessite Redis sur localhost:6379 (DB 1) et la base de test (conftest).
+"""
+
+import asyncio
+
+import pytest
+
+from services import user_identity
+from services.async_cache_service import AsyncCacheService
+from services.cache_service import CacheService
+from services.user_identity import resolve_identity
+
+REDIS = dict(host="localhost", port=6379, password="redis_secure_pass", db=1)
+
+
+@pytest.fixture
+def sync_cache(monkeypatch):
+    cache = CacheService(**REDIS)
+    monkeypatch.setattr(user_identity, "get_cache", lambda: cache)
+    yield cache
+    cache.flush_all()
+    cache.close()
+
+
+def resolve_many(user_id, load, times):
+    """Résout l'identité `times` fois avec une instance async neuve"""
+    async def main():
+        cache = await AsyncCacheService(**REDIS).connect()
+        try:
+            return [await resolve_identity(cache, user_id, load) for _ in range(times)]
+        finally:
+            await cache.close()
+    return asyncio.run(main())
+
+
+def test_identity_cached_until_user_changes(sync_cache, db_session, sample_user):
+    """Une lecture SQL par version; xp/inventaire ne changent pas la version"""
+    loads = []
+
+    def load():
+        loads.append(1)
+        return db_session.get(type(sample_user), sample_user.id)
+
+    identities = resolve_many(sample_user.id, load, 3)
+    assert len(loads) == 1
+    assert identities[0]["login"] == sample_user.login
+    assert "password_hash" not in identities[0] and "inventory" not in identities[0]
+
+    sample_user.xp += 10
+    db_session.commit()
+    resolve_many(sample_user.id, load, 1)
+    assert len(loads) == 1
+
+    sample_user.is_moderator = True
+    db_session.commit()
+    assert resolve_many(sample_user.id, load, 2)[0]["is_moderator"] is True
+    assert len(loads) == 2
+
+
+def test_identity_written_for_stale_version_is_ignored(sync_cache):
+    """Une identité chargée avant un bump n'est jamais servie"""
+    version, _ = sync_cache.get_auth_user("u-race")
+    sync_cache.bump_user_versions("u-race")
+    sync_cache.set_auth_user("u-race", version, {"id": "u-race", "is_admin": True})
+
+    assert sync_cache.get_auth_user("u-race") == (version + 1, None)
+
+
+def test_unknown_user_is_not_cached():
+    assert resolve_many("inconnu", lambda: None, 1) == [None]
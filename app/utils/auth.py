@@ -4,7 +4,8 @@ Utilities for password hashing and JWT-like access & refresh tokens - VERSION PO
 
 Améliorations:
  - PBKDF2-HMAC-SHA256 pour le hashing des passwords
- - JWT-like tokens signés avec HMAC-SHA256
+ - JWT-like tokens signés avec HMAC-SHA256 (TokenVerifier: clés pré-encodées
+   par "kid", LRU des tokens déjà vérifiés)
  - Refresh tokens stockés dans PostgreSQL (table refresh_tokens)
  - Rotation: usage d'un refresh token révoque l'ancien et crée un nouveau
  - Cleanup automatique des tokens expirés
@@ -17,15 +18,21 @@ import json
 import base64
 import hashlib
 import hmac
+import secrets
+import threading
 import time
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import delete, func, insert, text
 
 from config import (
     JWT_SECRET_KEY,
+    JWT_KEY_ID,
+    JWT_PREVIOUS_KEYS,
+    JWT_VERIFIED_CACHE_SIZE,
     ACCESS_TOKEN_EXPIRE_MIN,
     REFRESH_TOKEN_EXPIRE_DAYS,
 )
@@ -87,51 +94,155 @@ def verify_password(password: str, hashed: str) -> bool:
 # ---------------------------------------------------------------------------
 ALGO = "HS256"
 
-def _jwt_sign(message: bytes, key: bytes) -> bytes:
-    """Signe un message avec HMAC-SHA256."""
-    return hmac.new(key, message, hashlib.sha256).digest()
-
-def _build_token(payload: Dict[str, Any], expires_seconds: int) -> str:
-    """Construit un token JWT-like."""
-    now = int(time.time())
-    exp = now + expires_seconds
-    header = {"alg": ALGO, "typ": "JWT"}
-    payload = dict(payload)
-    payload.update({"iat": now, "exp": exp})
-    
-    header_b = _b64url_encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
-    payload_b = _b64url_encode(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
-    signing_input = f"{header_b}.{payload_b}".encode()
-    
-    sig = _jwt_sign(signing_input, JWT_SECRET_KEY.encode())
-    sig_b = _b64url_encode(sig)
+class TokenVerifier:
+    """
+    Signature et vérification des tokens JWT-like (HMAC-SHA256).
+    
+    - Clés encodées une fois, HMAC pré-initialisés par clé (copiés à chaque
+      usage au lieu de ré-dériver la clé)
+    - Plusieurs clés actives, choisies par le "kid" de l'en-tête: la clé
+      courante signe, les anciennes vérifient encore pendant une rotation.
+      Un token sans "kid" (émis avant la rotation) est vérifié avec la clé
+      courante.
+    - LRU borné des tokens déjà vérifiés (token → payload, exp): un client
+      renvoie le même access token pendant toute sa durée de vie, seule
+      l'expiration est recontrôlée
+    
+    Usage:
+        verifier = TokenVerifier({"k2": "nouveau", "k1": "ancien"}, active_kid="k2")
+        token = verifier.encode({"sub": user_id}, expires_seconds=900)
+        payload = verifier.verify(token)
+    """
     
-    return f"{header_b}.{payload_b}.{sig_b}"
-
-def _decode_token(token: str) -> Optional[Dict[str, Any]]:
-    """Décode et vérifie un token JWT-like."""
-    try:
-        header_b, payload_b, sig_b = token.split(".")
-    except Exception:
-        return None
+    def __init__(self, keys: Dict[str, str], active_kid: str, cache_size: int = 4096):
+        """
+        Args:
+            keys: {kid: secret} des clés acceptées
+            active_kid: kid de la clé qui signe les nouveaux tokens
+            cache_size: Nombre max de tokens vérifiés gardés en mémoire
+        """
+        if active_kid not in keys:
+            raise ValueError(f"Clé active inconnue: {active_kid}")
+        self._macs = {
+            kid: hmac.new(secret.encode(), digestmod=hashlib.sha256)
+            for kid, secret in keys.items()
+        }
+        self.active_kid = active_kid
+        self.cache_size = cache_size
+        self._verified: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "rejected": 0}
+    
+    def _sign(self, signing_input: bytes, kid: str) -> bytes:
+        mac = self._macs[kid].copy()
+        mac.update(signing_input)
+        return mac.digest()
+    
+    def encode(self, payload: Dict[str, Any], expires_seconds: int) -> str:
+        """Construit un token signé avec la clé courante."""
+        now = int(time.time())
+        header = {"alg": ALGO, "kid": self.active_kid, "typ": "JWT"}
+        payload = dict(payload)
+        payload.update({"iat": now, "exp": now + expires_seconds})
+        
+        header_b = _b64url_encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
+        payload_b = _b64url_encode(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
+        sig_b = _b64url_encode(self._sign(f"{header_b}.{payload_b}".encode(), self.active_kid))
+        
+        return f"{header_b}.{payload_b}.{sig_b}"
     
-    try:
-        signing_input = f"{header_b}.{payload_b}".encode()
-        expected_sig = _jwt_sign(signing_input, JWT_SECRET_KEY.encode())
-        actual_sig = _b64url_decode(sig_b)
+    def verify(self, token: str, remember: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Vérifie un token et retourne une copie de son payload.
         
-        if not hmac.compare_digest(expected_sig, actual_sig):
-            return None
+        Args:
+            token: Token brut
+            remember: Garde le token dans le LRU (False pour les refresh
+                tokens, présentés une seule fois)
+        
+        Returns:
+            Payload ou None (signature invalide, clé inconnue, expiré)
+        """
+        now = int(time.time())
+        with self._lock:
+            entry = self._verified.get(token)
+            if entry is not None:
+                self._verified.move_to_end(token)
         
-        payload_json = _b64url_decode(payload_b)
-        payload = json.loads(payload_json)
+        if entry is not None:
+            payload, exp = entry
+            if exp < now:
+                with self._lock:
+                    self._verified.pop(token, None)
+                return None
+            self.stats["hits"] += 1
+            return dict(payload)
         
-        if payload.get("exp", 0) < int(time.time()):
+        self.stats["misses"] += 1
+        payload = self._verify_signature(token)
+        if payload is None:
+            self.stats["rejected"] += 1
             return None
         
-        return payload
-    except Exception:
-        return None
+        exp = payload.get("exp", 0)
+        if exp < now:
+            return None
+        
+        if remember:
+            with self._lock:
+                self._verified[token] = (payload, exp)
+                if len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+        return dict(payload)
+    
+    def _verify_signature(self, token: str) -> Optional[Dict[str, Any]]:
+        """Vérification complète (HMAC + décodage), sans contrôle d'expiration."""
+        try:
+            header_b, payload_b, sig_b = token.split(".")
+            kid = json.loads(_b64url_decode(header_b)).get("kid", self.active_kid)
+            if kid not in self._macs:
+                return None
+            
+            expected_sig = self._sign(f"{header_b}.{payload_b}".encode(), kid)
+            if not hmac.compare_digest(expected_sig, _b64url_decode(sig_b)):
+                return None
+            
+            payload = json.loads(_b64url_decode(payload_b))
+            return payload if isinstance(payload, dict) else None
+        except Exception:
+            return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs du LRU (pour /admin/cache/stats)."""
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._verified),
+            "hit_rate": round(self.stats["hits"] / total * 100, 2) if total else 0.0,
+            "active_kid": self.active_kid,
+            "kids": sorted(self._macs),
+        }
+
+
+_verifier = TokenVerifier(
+    {**JWT_PREVIOUS_KEYS, JWT_KEY_ID: JWT_SECRET_KEY},
+    active_kid=JWT_KEY_ID,
+    cache_size=JWT_VERIFIED_CACHE_SIZE,
+)
+
+
+def get_token_verifier() -> TokenVerifier:
+    """Vérificateur partagé par le worker."""
+    return _verifier
+
+
+def _build_token(payload: Dict[str, Any], expires_seconds: int) -> str:
+    """Construit un token JWT-like."""
+    return _verifier.encode(payload, expires_seconds)
+
+def _decode_token(token: str, remember: bool = True) -> Optional[Dict[str, Any]]:
+    """Décode et vérifie un token JWT-like."""
+    return _verifier.verify(token, remember=remember)
 
 # ---------------------------------------------------------------------------
 # Access token
@@ -145,17 +256,30 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """Décode un access token."""
     return _decode_token(token)
 
+def token_role(user) -> str:
+    """
+    Rôle embarqué dans les tokens (claim "role").
+
+    Sert uniquement au rate limiting (sans accès DB); les autorisations
+    restent vérifiées sur l'utilisateur en base.
+    """
+    if getattr(user, "is_admin", False):
+        return "admin"
+    if getattr(user, "is_moderator", False):
+        return "moderator"
+    return "user"
+
 # ---------------------------------------------------------------------------
 # Refresh token
 # ---------------------------------------------------------------------------
 def create_refresh_token(data: Dict[str, Any]) -> str:
-    """Crée un refresh token."""
+    """Crée un refresh token (jti aléatoire: deux tokens émis la même seconde diffèrent)."""
     ttl = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
-    return _build_token(data, ttl)
+    return _build_token({**data, "jti": secrets.token_urlsafe(12)}, ttl)
 
 def decode_refresh_token(token: str) -> Optional[Dict[str, Any]]:
     """Décode un refresh token."""
-    return _decode_token(token)
+    return _decode_token(token, remember=False)
 
 # ---------------------------------------------------------------------------
 # Token hash (pour stockage dans DB)
@@ -334,71 +458,112 @@ def rotate_refresh_token(
     old_token: str, 
     new_token: str, 
     user_id: str, 
-    device_id: str, 
-    device_name: Optional[str] = None
-) -> None:
+    device_id: Optional[str] = None
+) -> Optional[Tuple[str, str]]:
     """
-    Rotation atomique d'un refresh token.
+    Rotation atomique d'un refresh token (validation incluse).
+    
+    Une transaction: DELETE ... RETURNING device_id, device_name de l'ancien
+    token (s'il appartient à user_id et n'est pas expiré), puis INSERT du
+    nouveau pour le même appareil. Deux rotations concurrentes du même token
+    ne peuvent pas réussir toutes les deux: la seconde attend le verrou de
+    ligne puis ne supprime rien.
     
-    Révoque l'ancien token et stocke le nouveau en une seule transaction.
+    Ancien token absent (déjà rotaté, révoqué, rejoué): la famille de
+    l'appareil (device_id, claim "did" du token) est révoquée dans la même
+    transaction, le token volé comme le dernier émis.
     
     Args:
         db: Session SQLAlchemy
-        old_token: Ancien refresh token à révoquer
+        old_token: Ancien refresh token (signature déjà vérifiée)
         new_token: Nouveau refresh token à stocker
-        user_id: ID de l'utilisateur
-        device_id: ID de l'appareil
-        device_name: Nom de l'appareil (optionnel)
+        user_id: ID de l'utilisateur (claim "sub")
+        device_id: Appareil du token présenté (claim "did"), pour la révocation
+    
+    Returns:
+        (device_id, device_name) de l'appareil, None si l'ancien token est inconnu
     """
     from models import RefreshToken
     
-    logger.debug(f"🔄 Rotation refresh token pour user={user_id}, device={device_id}")
+    logger.debug(f"🔄 Rotation refresh token pour user={user_id}")
     
-    # Révoque l'ancien
     old_hash = _token_hash(old_token)
-    db.query(RefreshToken).filter(RefreshToken.token_hash == old_hash).delete()
-    
-    # Stocke le nouveau
-    new_hash = _token_hash(new_token)
-    payload = decode_refresh_token(new_token) or {}
-    exp_timestamp = payload.get("exp", int(time.time()) + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600)
-    expires_at = datetime.fromtimestamp(exp_timestamp)
-    
-    new_refresh = RefreshToken(
-        token_hash=new_hash,
-        user_id=user_id,
-        device_id=device_id,
-        device_name=device_name or "",
-        expires_at=expires_at,
-    )
-    
-    db.add(new_refresh)
-    db.commit()
+    try:
+        row = db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.token_hash == old_hash)
+            .where(RefreshToken.user_id == user_id)
+            .where(RefreshToken.expires_at > func.now())
+            .returning(RefreshToken.device_id, RefreshToken.device_name)
+        ).first()
+        
+        if row is None:
+            if device_id:
+                revoked = db.execute(
+                    delete(RefreshToken)
+                    .where(RefreshToken.user_id == user_id)
+                    .where(RefreshToken.device_id == device_id)
+                ).rowcount
+                logger.warning(
+                    f"🚨 Refresh token rejoué pour user={user_id}, device={device_id}: "
+                    f"{revoked} token(s) de l'appareil révoqué(s)"
+                )
+            db.commit()
+            return None
+        
+        payload = decode_refresh_token(new_token) or {}
+        exp_timestamp = payload.get("exp", int(time.time()) + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600)
+        db.execute(insert(RefreshToken).values(
+            token_hash=_token_hash(new_token),
+            user_id=user_id,
+            device_id=row.device_id,
+            device_name=row.device_name or "",
+            expires_at=datetime.fromtimestamp(exp_timestamp),
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     
-    logger.debug(f"✅ Token rotaté avec succès")
+    logger.debug(f"✅ Token rotaté avec succès (device={row.device_id})")
+    return row.device_id, row.device_name or ""
 
 
-def cleanup_expired_tokens(db: Session) -> int:
+def cleanup_expired_tokens(
+    db: Session,
+    batch_size: int = 1000,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+) -> int:
     """
-    Nettoie les refresh tokens expirés de la DB.
+    Nettoie les refresh tokens expirés de la DB, par lots.
+    
+    Un DELETE borné par transaction: jamais de verrou long sur
+    refresh_tokens, même après une longue période sans nettoyage.
     
     Args:
         db: Session SQLAlchemy
+        batch_size: Tokens supprimés par transaction
+        max_batches: Lots max (None = jusqu'au bout)
+        pause: Pause aléatoire max entre deux lots (s)
     
     Returns:
         Nombre de tokens supprimés
     """
-    from models import RefreshToken
+    from database.connection import run_in_batches
     
     logger.info("🧹 Nettoyage des refresh tokens expirés...")
     
-    deleted = (
-        db.query(RefreshToken)
-        .filter(RefreshToken.expires_at <= text("NOW()"))
-        .delete()
+    deleted = run_in_batches(
+        db,
+        text(
+            "DELETE FROM refresh_tokens WHERE token_hash IN ("
+            "SELECT token_hash FROM refresh_tokens WHERE expires_at <= CURRENT_TIMESTAMP LIMIT :limit)"
+        ),
+        batch_size=batch_size,
+        max_batches=max_batches,
+        pause=pause,
     )
     
-    db.commit()
-    
     logger.info(f"✅ {deleted} token(s) expiré(s) supprimé(s)")
-    return deleted
\ No newline at end of file
+    return deleted
@@ -1,18 +1,37 @@
 # app/utils/db_crud.py
 """
 CRUD générique pour PostgreSQL avec SQLAlchemy.
+
+Les catalogues en lecture quasi exclusive (recettes, ressources, professions,
+quêtes) activent un cache Redis des lectures par id (cache_ttl): les lignes
+trouvées ET les ids inexistants y sont gardés, ces derniers avec un TTL court
+(negative_ttl), pour que les scans d'ids n'atteignent plus PostgreSQL.
+
+AsyncCRUDBase est la variante des routes `async def` (session de
+database.connection.get_async_db, cache AsyncCacheService); elle partage les
+clés de cache de CRUDBase, donc ses invalidations.
 """
 
+import copy
 from typing import TypeVar, Generic, Type, List, Optional, Dict, Any
+from sqlalchemy import func, inspect, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
+
+import config
+from services.async_cache_service import get_async_cache
+from services.cache_service import get_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 ModelType = TypeVar("ModelType")
 
+# Entrée cachée d'un id absent de la table
+_NOT_FOUND = {"__not_found__": True}
+
 
 class CRUDBase(Generic[ModelType]):
     """
@@ -21,10 +40,74 @@ class CRUDBase(Generic[ModelType]):
     Usage:
         profession_crud = CRUDBase(Profession)
         profession = profession_crud.get(db, id="mineur")
+        
+        # Lectures par id cachées 5 min, ids inexistants 30 s
+        recipe_crud = CRUDBase(Recipe, cache_ttl=300, negative_ttl=30)
     """
     
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self,
+        model: Type[ModelType],
+        cache_ttl: Optional[int] = None,
+        negative_ttl: int = 30
+    ):
+        """
+        Args:
+            model: Modèle SQLAlchemy
+            cache_ttl: TTL du cache des lectures par id (None = pas de cache)
+            negative_ttl: TTL des ids inexistants en cache
+        """
         self.model = model
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+    
+    # ========================================================================
+    # CACHE DES LECTURES PAR ID
+    # ========================================================================
+    
+    def _cache(self):
+        """CacheService partagé si le cache est activé pour ce modèle"""
+        if self.cache_ttl is None:
+            return None
+        return get_cache()
+    
+    def _cache_key(self, cache, id: str) -> str:
+        return cache._crud_key(self.model.__tablename__, id)
+    
+    def get_cached(self, db: Session, id: str) -> Optional[ModelType]:
+        """
+        Récupère un élément par son ID via le cache (présent ou absent).
+        
+        Servi depuis le cache, l'objet est une instance hors session
+        (colonnes seules, copie de l'entrée): à réserver à la lecture,
+        utiliser get() avant toute modification.
+        """
+        cache = self._cache()
+        if cache is None:
+            return self.get(db, id)
+        
+        key = self._cache_key(cache, id)
+        entry = cache.get(key)
+        if entry is not None:
+            if entry.get("__not_found__"):
+                return None
+            # Copie: l'entrée peut être partagée (L1 en mémoire)
+            return self.model(**copy.deepcopy(entry))
+        
+        obj = self.get(db, id)
+        if obj is None:
+            cache.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+        else:
+            columns = {attr.key: getattr(obj, attr.key) for attr in inspect(self.model).column_attrs}
+            cache.set(key, columns, ttl=self.cache_ttl)
+        return obj
+    
+    def invalidate_cached(self, *ids: str) -> int:
+        """Retire des ids du cache (appelé par create / update / delete)"""
+        cache = self._cache()
+        if cache is None or not ids:
+            return 0
+        return cache.delete(*[self._cache_key(cache, id) for id in ids])
     
     # ========================================================================
     # READ
@@ -34,9 +117,20 @@ class CRUDBase(Generic[ModelType]):
         """Récupère un élément par son ID."""
         return db.query(self.model).filter(self.model.id == id).first()
     
-    def get_or_404(self, db: Session, id: str, name: str = "Item") -> ModelType:
-        """Récupère ou lève HTTPException 404."""
-        obj = self.get(db, id)
+    def get_or_404(
+        self,
+        db: Session,
+        id: str,
+        name: str = "Item",
+        cached: bool = False
+    ) -> ModelType:
+        """
+        Récupère ou lève HTTPException 404.
+        
+        cached=True passe par le cache si le modèle l'active (voir
+        get_cached): instance hors session, réservé aux lectures seules.
+        """
+        obj = self.get_cached(db, id) if cached else self.get(db, id)
         if not obj:
             raise HTTPException(404, f"{name} '{id}' not found")
         return obj
@@ -82,6 +176,8 @@ class CRUDBase(Generic[ModelType]):
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            # Efface une éventuelle absence cachée pour cet id
+            self.invalidate_cached(db_obj.id)
             
             logger.info(f"✅ Created {self.model.__name__} with id={obj_in.get('id')}")
             return db_obj
@@ -118,6 +214,7 @@ class CRUDBase(Generic[ModelType]):
             
             db.commit()
             db.refresh(db_obj)
+            self.invalidate_cached(db_obj.id)
             
             logger.info(f"✅ Updated {self.model.__name__} with id={db_obj.id}")
             return db_obj
@@ -148,6 +245,7 @@ class CRUDBase(Generic[ModelType]):
             obj = self.get_or_404(db, id, self.model.__name__)
             db.delete(obj)
             db.commit()
+            self.invalidate_cached(id)
             
             logger.info(f"✅ Deleted {self.model.__name__} with id={id}")
             return True
@@ -160,20 +258,188 @@ class CRUDBase(Generic[ModelType]):
             raise HTTPException(500, f"Failed to delete item: {e}")
 
 
+# ============================================================================
+# VARIANTE ASYNC (routes `async def`)
+# ============================================================================
+
+class AsyncCRUDBase(CRUDBase[ModelType]):
+    """
+    CRUDBase pour AsyncSession (ou ThreadedSession, même API).
+    
+    Usage:
+        async_resource_crud = AsyncCRUDBase(Resource, cache_ttl=300)
+        resource = await async_resource_crud.get_or_404(db, "argile", "Resource", cached=True)
+    """
+    
+    def _cache(self):
+        """AsyncCacheService partagé si le cache est activé pour ce modèle"""
+        if self.cache_ttl is None:
+            return None
+        return get_async_cache()
+    
+    def _filtered(self, statement, filters: Optional[Dict[str, Any]]):
+        for key, value in (filters or {}).items():
+            if hasattr(self.model, key):
+                statement = statement.where(getattr(self.model, key) == value)
+        return statement
+    
+    async def get_cached(self, db: AsyncSession, id: str) -> Optional[ModelType]:
+        """Récupère un élément par son ID via le cache (voir CRUDBase.get_cached)"""
+        cache = self._cache()
+        if cache is None:
+            return await self.get(db, id)
+        
+        key = self._cache_key(cache, id)
+        entry = await cache.get(key)
+        if entry is not None:
+            if entry.get("__not_found__"):
+                return None
+            # Copie: l'entrée peut être partagée (L1 en mémoire)
+            return self.model(**copy.deepcopy(entry))
+        
+        obj = await self.get(db, id)
+        if obj is None:
+            await cache.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+        else:
+            columns = {attr.key: getattr(obj, attr.key) for attr in inspect(self.model).column_attrs}
+            await cache.set(key, columns, ttl=self.cache_ttl)
+        return obj
+    
+    async def invalidate_cached(self, *ids: str) -> int:
+        cache = self._cache()
+        if cache is None or not ids:
+            return 0
+        return await cache.delete(*[self._cache_key(cache, id) for id in ids])
+    
+    async def get(self, db: AsyncSession, id: str) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+    
+    async def get_or_404(
+        self,
+        db: AsyncSession,
+        id: str,
+        name: str = "Item",
+        cached: bool = False
+    ) -> ModelType:
+        obj = await self.get_cached(db, id) if cached else await self.get(db, id)
+        if not obj:
+            raise HTTPException(404, f"{name} '{id}' not found")
+        return obj
+    
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[ModelType]:
+        statement = self._filtered(select(self.model), filters).offset(skip).limit(limit)
+        return (await db.execute(statement)).scalars().all()
+    
+    async def count(self, db: AsyncSession, filters: Optional[Dict[str, Any]] = None) -> int:
+        statement = self._filtered(select(func.count()).select_from(self.model), filters)
+        return await db.scalar(statement)
+    
+    async def create(self, db: AsyncSession, *, obj_in: Dict[str, Any]) -> ModelType:
+        try:
+            db_obj = self.model(**obj_in)
+            db.add(db_obj)
+            await db.commit()
+            await db.refresh(db_obj)
+            await self.invalidate_cached(db_obj.id)
+            
+            logger.info(f"✅ Created {self.model.__name__} with id={obj_in.get('id')}")
+            return db_obj
+            
+        except IntegrityError as e:
+            await db.rollback()
+            logger.warning(f"⚠️  Integrity error creating {self.model.__name__}: {e}")
+            
+            if "unique" in str(e).lower():
+                raise HTTPException(400, "Item with this ID already exists")
+            raise HTTPException(400, f"Database constraint violation: {e}")
+        
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Error creating {self.model.__name__}", exc_info=True)
+            raise HTTPException(500, f"Failed to create item: {e}")
+    
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Dict[str, Any]
+    ) -> ModelType:
+        try:
+            for key, value in obj_in.items():
+                if hasattr(db_obj, key):
+                    setattr(db_obj, key, value)
+            
+            await db.commit()
+            await db.refresh(db_obj)
+            await self.invalidate_cached(db_obj.id)
+            
+            logger.info(f"✅ Updated {self.model.__name__} with id={db_obj.id}")
+            return db_obj
+            
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Error updating {self.model.__name__}", exc_info=True)
+            raise HTTPException(500, f"Failed to update item: {e}")
+    
+    async def update_by_id(
+        self,
+        db: AsyncSession,
+        *,
+        id: str,
+        obj_in: Dict[str, Any]
+    ) -> ModelType:
+        db_obj = await self.get_or_404(db, id, self.model.__name__)
+        return await self.update(db, db_obj=db_obj, obj_in=obj_in)
+    
+    async def delete(self, db: AsyncSession, *, id: str) -> bool:
+        try:
+            obj = await self.get_or_404(db, id, self.model.__name__)
+            await db.delete(obj)
+            await db.commit()
+            await self.invalidate_cached(id)
+            
+            logger.info(f"✅ Deleted {self.model.__name__} with id={id}")
+            return True
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Error deleting {self.model.__name__}", exc_info=True)
+            raise HTTPException(500, f"Failed to delete item: {e}")
+
+
 # ============================================================================
 # INSTANCES PRÊTES À L'EMPLOI
 # ============================================================================
 
 from models import User, Profession, Resource, Recipe, RefreshToken, Quest, Setting
 
+# Catalogues en lecture quasi exclusive: lectures par id cachées
+_catalog_cache = dict(cache_ttl=config.CRUD_CACHE_TTL, negative_ttl=config.CRUD_NEGATIVE_TTL)
+
 user_crud = CRUDBase[User](User)
-profession_crud = CRUDBase[Profession](Profession)
-resource_crud = CRUDBase[Resource](Resource)
-recipe_crud = CRUDBase[Recipe](Recipe)
+profession_crud = CRUDBase[Profession](Profession, **_catalog_cache)
+resource_crud = CRUDBase[Resource](Resource, **_catalog_cache)
+recipe_crud = CRUDBase[Recipe](Recipe, **_catalog_cache)
 refresh_token_crud = CRUDBase[RefreshToken](RefreshToken)
-quest_crud = CRUDBase[Quest](Quest)
+quest_crud = CRUDBase[Quest](Quest, **_catalog_cache)
 setting_crud = CRUDBase[Setting](Setting)
 
+# Routes async (catalogue public)
+async_profession_crud = AsyncCRUDBase[Profession](Profession, **_catalog_cache)
+async_resource_crud = AsyncCRUDBase[Resource](Resource, **_catalog_cache)
+async_recipe_crud = AsyncCRUDBase[Recipe](Recipe, **_catalog_cache)
+async_quest_crud = AsyncCRUDBase[Quest](Quest, **_catalog_cache)
+
 
 # ============================================================================
 # HELPERS SPÉCIFIQUES
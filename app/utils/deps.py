@@ -8,17 +8,20 @@ Dépendances communes pour FastAPI (VERSION POSTGRESQL COMPLÈTE).
 - get_current_moderator : Vérifie is_moderator=True
 
 ⚠️ NOTE: Ce fichier NE dépend PLUS de utils/json.py (supprimé)
-Toutes les données viennent de PostgreSQL via SQLAlchemy.
+Toutes les données viennent de PostgreSQL via SQLAlchemy; l'identité des
+requêtes authentifiées est cachée (services.user_identity).
 """
 
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, Any
 
 from utils.logger import get_logger
 from utils.auth import decode_access_token
-from database.connection import get_db
+from database.connection import get_async_db
 from models import User
+from services.async_cache_service import get_async_cache
+from services.user_identity import resolve_identity
 
 logger = get_logger(__name__)
 
@@ -27,12 +30,19 @@ logger = get_logger(__name__)
 # HELPER: Récupération user depuis payload JWT
 # ============================================================================
 
-def _get_user_from_payload(db: Session, payload: Dict[str, Any]) -> Optional[User]:
+def _user_id_from_payload(payload: Dict[str, Any]) -> Optional[str]:
+    """user_id d'un payload JWT décodé (clé 'sub' standard JWT)"""
+    if not payload:
+        return None
+    return payload.get("sub") or payload.get("user_id") or payload.get("id")
+
+
+async def _get_user_from_payload(db: AsyncSession, payload: Dict[str, Any]) -> Optional[User]:
     """
     Récupère un utilisateur depuis un payload JWT décodé.
     
     Args:
-        db: Session SQLAlchemy
+        db: Session async (get_async_db)
         payload: Dict JWT décodé (avec 'sub' = user_id)
     
     Returns:
@@ -41,8 +51,7 @@ def _get_user_from_payload(db: Session, payload: Dict[str, Any]) -> Optional[Use
     if not payload:
         return None
     
-    # Récupère user_id depuis le payload (clé 'sub' standard JWT)
-    user_id = payload.get("sub") or payload.get("user_id") or payload.get("id")
+    user_id = _user_id_from_payload(payload)
     
     if not user_id:
         logger.debug("⚠️  Payload JWT sans user_id")
@@ -50,7 +59,7 @@ def _get_user_from_payload(db: Session, payload: Dict[str, Any]) -> Optional[Use
     
     # Requête PostgreSQL pour récupérer l'utilisateur
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         
         if not user:
             logger.debug(f"⚠️  User {user_id} non trouvé en DB")
@@ -69,14 +78,16 @@ def _get_user_from_payload(db: Session, payload: Dict[str, Any]) -> Optional[Use
 
 async def get_current_user_optional(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[Dict[str, Any]]:
     """
     Tente de récupérer l'utilisateur authentifié depuis le token JWT.
     
     - Cherche le token dans Authorization header (Bearer <token>)
     - Cherche le token dans les cookies (access_token)
-    - Retourne un dict avec les infos user (sans password_hash)
+    - Retourne l'identité et les rôles de l'utilisateur (IDENTITY_FIELDS de
+      services.user_identity: ni password_hash, ni inventaire, ni stats),
+      servis par le cache tant que l'utilisateur n'a pas été modifié
     - Retourne None si pas authentifié (SANS lever d'exception)
     
     Usage:
@@ -109,18 +120,16 @@ async def get_current_user_optional(
         logger.debug("⚠️  Token JWT invalide ou expiré")
         return None
     
-    # 5. Récupère l'utilisateur depuis PostgreSQL
-    user = _get_user_from_payload(db, payload)
-    if not user:
+    user_id = _user_id_from_payload(payload)
+    if not user_id:
+        logger.debug("⚠️  Payload JWT sans user_id")
         return None
     
-    # 6. Convertit en dict (compatible avec ancien code)
-    user_dict = user.to_dict()
-    
-    # 7. Supprime password_hash pour la sécurité
-    user_dict.pop("password_hash", None)
-    
-    return user_dict
+    # 5. Identité depuis le cache (version à jour) ou PostgreSQL (asyncpg,
+    #    sans bloquer la boucle)
+    return await resolve_identity(
+        get_async_cache(), user_id, lambda: _get_user_from_payload(db, payload)
+    )
 
 
 # ============================================================================
@@ -129,7 +138,7 @@ async def get_current_user_optional(
 
 async def get_current_user_required(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Retourne l'utilisateur authentifié ou lève HTTP 401.
@@ -0,0 +1,191 @@
+# app/utils/rate_limit.py
+"""
+Middleware ASGI de rate limiting (token bucket Redis).
+
+- Politiques par préfixe de route et par rôle (config.RATE_LIMIT_POLICIES)
+- Identification sans base de données: claims du token d'accès
+  (sub + role), sinon adresse IP du client
+- Réponse 429 avec Retry-After avant d'atteindre les routes
+  (donc avant PostgreSQL et PBKDF2)
+- Fail-open: sans Redis, les requêtes passent
+
+Usage (main.py):
+    from utils.rate_limit import RateLimitMiddleware
+    app.add_middleware(RateLimitMiddleware)
+"""
+
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+
+import config
+from utils.auth import decode_access_token
+from utils.logger import get_logger
+from services.async_cache_service import get_async_cache
+from services.cache_service import get_cache
+
+logger = get_logger(__name__)
+
+ROLE_ANONYMOUS = "anonymous"
+ROLE_USER = "user"
+ROLE_DEFAULT = "default"
+
+# (requêtes, période) ; None = illimité
+Limit = Optional[Tuple[int, int]]
+
+
+# ============================================================================
+# POLITIQUES
+# ============================================================================
+
+def _parse_policies(raw: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Limit]]:
+    """Normalise {préfixe: {rôle: [n, période] | None}}"""
+    policies = {}
+    for prefix, roles in raw.items():
+        policies[prefix] = {
+            role: tuple(limit) if limit else None
+            for role, limit in roles.items()
+        }
+    return policies
+
+
+def resolve_limit(
+    policies: Dict[str, Dict[str, Limit]],
+    path: str,
+    role: str
+) -> Tuple[Optional[str], Limit]:
+    """
+    Trouve la limite applicable à une route pour un rôle.
+
+    Args:
+        policies: Politiques normalisées
+        path: Chemin de la requête
+        role: Rôle du client
+
+    Returns:
+        (préfixe retenu, limite) ; (None, None) si aucune politique
+    """
+    for prefix in sorted(policies, key=len, reverse=True):
+        if path.startswith(prefix):
+            roles = policies[prefix]
+            if role in roles:
+                return prefix, roles[role]
+            return prefix, roles.get(ROLE_DEFAULT)
+    return None, None
+
+
+# ============================================================================
+# IDENTIFICATION
+# ============================================================================
+
+def _extract_token(headers: Headers) -> Optional[str]:
+    """Token d'accès (header Authorization puis cookie), comme utils.deps"""
+    auth_header = headers.get("authorization")
+    if auth_header:
+        parts = auth_header.split()
+        if len(parts) == 2 and parts[0].lower() == "bearer":
+            return parts[1]
+    cookie = headers.get("cookie")
+    if cookie:
+        return cookie_parser(cookie).get("access_token")
+    return None
+
+
+def identify_client(scope: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Identifie le client d'une requête sans accès base de données.
+
+    Returns:
+        (rôle, sujet) ; sujet = "user:<id>" ou "ip:<adresse>"
+    """
+    token = _extract_token(Headers(scope=scope))
+    payload = decode_access_token(token) if token else None
+    if payload and payload.get("sub"):
+        return payload.get("role") or ROLE_USER, f"user:{payload['sub']}"
+
+    client = scope.get("client")
+    return ROLE_ANONYMOUS, f"ip:{client[0] if client else 'unknown'}"
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI pur: limite les requêtes HTTP avant le routage.
+
+    Un seau Redis par (préfixe de politique, sujet): la limite de /login
+    ne consomme pas celle du reste de l'API.
+    """
+
+    def __init__(
+        self,
+        app,
+        policies: Optional[Dict[str, Dict[str, Any]]] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.app = app
+        self.policies = _parse_policies(
+            policies if policies is not None else config.RATE_LIMIT_POLICIES
+        )
+        self.enabled = config.RATE_LIMIT_ENABLED if enabled is None else enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        role, subject = identify_client(scope)
+        prefix, limit = resolve_limit(self.policies, scope["path"], role)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        max_requests, period = limit
+        bucket = f"{prefix}:{subject}"
+        async_cache = get_async_cache()
+        cache = get_cache()
+        if async_cache is not None:
+            allowed, remaining, retry_after = await async_cache.acquire_rate_limit(
+                bucket, max_requests, period
+            )
+        elif cache is not None:
+            allowed, remaining, retry_after = await run_in_threadpool(
+                cache.acquire_rate_limit, bucket, max_requests, period
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        if not allowed:
+            retry_seconds = max(1, math.ceil(retry_after))
+            logger.warning(
+                f"🚦 Rate limit atteint pour {subject} ({role}) sur {scope['path']}, "
+                f"retry dans {retry_seconds}s"
+            )
+            response = JSONResponse(
+                status_code=429,
+                content={"error": "Too many requests", "retry_after": retry_seconds},
+                headers={
+                    "Retry-After": str(retry_seconds),
+                    "X-RateLimit-Limit": str(max_requests),
+                    "X-RateLimit-Remaining": "0",
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-ratelimit-limit", str(max_requests).encode()))
+                headers.append((b"x-ratelimit-remaining", str(remaining).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)